@@ -211,7 +211,7 @@ class Pilito_PS_Admin_Page {
             wp_send_json_error(['message' => 'عدم دسترسی']);
         }
         
-        $batch_size = 10;
+        $batch_size = 100;
         $offset = intval($_POST['offset'] ?? 0);
         
         // Get published products
@@ -237,24 +237,26 @@ class Pilito_PS_Admin_Page {
             'errors' => [],
         ];
         
-        // Sync each product in batch
-        foreach ($products as $post) {
-            $result = Pilito_PS_API::sync_product($post->ID, 'product.updated');
-            
-            if (is_wp_error($result)) {
-                $results['failed']++;
+        // Sync the whole page in one request (batch endpoint)
+        $product_ids = wp_list_pluck($products, 'ID');
+        $result = empty($product_ids) ? [] : Pilito_PS_API::sync_products_batch($product_ids);
+        
+        if (is_wp_error($result)) {
+            $results['failed'] += count($product_ids);
+            foreach ($products as $post) {
                 $results['errors'][] = [
                     'id' => $post->ID,
                     'title' => get_the_title($post->ID),
                     'error' => $result->get_error_message()
                 ];
-            } else {
-                $results['success']++;
             }
-            
-            $results['processed']++;
+        } else {
+            $results['success'] += count($product_ids);
+            $results['unchanged'] = (int) ($result['unchanged'] ?? 0);
         }
         
+        $results['processed'] += count($product_ids);
+        
         $results['has_more'] = ($offset + $batch_size) < $total;
         $results['next_offset'] = $offset + $batch_size;
         $results['progress_percent'] = min(100, round(($results['processed'] / $total) * 100));
@@ -362,13 +364,14 @@ class Pilito_PS_Admin_Page {
             'failed' => 0,
         ];
         
-        foreach ($post_ids as $post_id) {
-            $result = Pilito_PS_Content::sync_page($post_id);
+        // Send in batches (one request per batch instead of one per post)
+        foreach (array_chunk($post_ids, Pilito_PS_Content::BATCH_SIZE) as $batch_ids) {
+            $result = Pilito_PS_Content::sync_pages_batch($batch_ids);
             
             if ($result['success']) {
-                $results['success']++;
+                $results['success'] += count($batch_ids);
             } else {
-                $results['failed']++;
+                $results['failed'] += count($batch_ids);
             }
         }
         
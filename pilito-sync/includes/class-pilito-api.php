@@ -63,6 +63,76 @@ class Pilito_PS_API {
         return true;
     }
     
+    /**
+     * Sync a page of products in one request (full sync)
+     * 
+     * Backend deduplicates by content hash and re-chunks the whole batch once
+     */
+    public static function sync_products_batch($product_ids) {
+        $token = get_option('pilito_ps_api_token');
+        
+        if (empty($token)) {
+            self::log('No API token configured', 'error');
+            return new WP_Error('no_token', 'API Token تنظیم نشده است');
+        }
+        
+        $products = [];
+        foreach ($product_ids as $product_id) {
+            $product = wc_get_product($product_id);
+            if ($product) {
+                $products[] = self::build_product_data($product);
+            }
+        }
+        
+        if (empty($products)) {
+            return new WP_Error('invalid_product', 'محصولی یافت نشد');
+        }
+        
+        $batch_id = 'wc_batch_' . gmdate('Y_m_d_His') . '_' . substr(md5(implode(',', $product_ids)), 0, 12) . '_' . wp_rand(1000, 9999);
+        
+        self::log('Syncing batch ' . $batch_id . ' (' . count($products) . ' products)', 'info');
+        
+        // Blocking: the response carries per-batch counts
+        $response = wp_remote_post(self::get_api_url() . '/batch/', [
+            'headers' => [
+                'Content-Type' => 'application/json',
+                'Authorization' => 'Bearer ' . $token,
+            ],
+            'body' => wp_json_encode([
+                'batch_id' => $batch_id,
+                'products' => $products,
+            ]),
+            'timeout' => 60,
+            'sslverify' => true,
+        ]);
+        
+        if (is_wp_error($response)) {
+            self::log("Batch sync failed: " . $response->get_error_message(), 'error');
+            foreach ($product_ids as $product_id) {
+                self::log_product_error($product_id, $response->get_error_message());
+            }
+            return $response;
+        }
+        
+        $code = wp_remote_retrieve_response_code($response);
+        $body = json_decode(wp_remote_retrieve_body($response), true);
+        
+        if ($code < 200 || $code >= 300) {
+            $message = 'خطای سرور ' . $code;
+            self::log("Batch sync failed: $message", 'error');
+            foreach ($product_ids as $product_id) {
+                self::log_product_error($product_id, $message);
+            }
+            return new WP_Error('batch_failed', $message);
+        }
+        
+        foreach ($product_ids as $product_id) {
+            self::log_product_success($product_id, 'product.batch');
+        }
+        
+        return is_array($body) ? $body : [];
+    }
+    
     /**
      * Delete product from Pilito
      */
@@ -136,27 +206,34 @@ class Pilito_PS_API {
         return [
             'event_id' => $event_id,
             'event_type' => $event_type,
-            'product' => [
-                'id' => $product->get_id(),
-                'sku' => $product->get_sku() ?: '',
-                'name' => $product->get_name(),
-                'short_description' => $product->get_short_description(),
-                'description' => $product->get_description(),
-                'price' => (float) $product->get_price(),
-                'regular_price' => (float) $product->get_regular_price(),
-                'sale_price' => $product->get_sale_price() ? (float) $product->get_sale_price() : null,
-                'currency' => get_woocommerce_currency(),
-                'stock_quantity' => $product->get_stock_quantity(),
-                'stock_status' => $product->get_stock_status(),
-                'categories' => self::get_product_categories($product),
-                'tags' => self::get_product_tags($product),
-                'image' => wp_get_attachment_url($product->get_image_id()) ?: '',
-                'gallery' => self::get_gallery_images($product),
-                'permalink' => get_permalink($product->get_id()),
-                'type' => $product->get_type(),
-                'on_sale' => $product->is_on_sale(),
-                'date_modified' => $product->get_date_modified() ? $product->get_date_modified()->format('c') : null,
-            ]
+            'product' => self::build_product_data($product),
+        ];
+    }
+    
+    /**
+     * Build product data (shared by single webhook and batch sync)
+     */
+    private static function build_product_data($product) {
+        return [
+            'id' => $product->get_id(),
+            'sku' => $product->get_sku() ?: '',
+            'name' => $product->get_name(),
+            'short_description' => $product->get_short_description(),
+            'description' => $product->get_description(),
+            'price' => (float) $product->get_price(),
+            'regular_price' => (float) $product->get_regular_price(),
+            'sale_price' => $product->get_sale_price() ? (float) $product->get_sale_price() : null,
+            'currency' => get_woocommerce_currency(),
+            'stock_quantity' => $product->get_stock_quantity(),
+            'stock_status' => $product->get_stock_status(),
+            'categories' => self::get_product_categories($product),
+            'tags' => self::get_product_tags($product),
+            'image' => wp_get_attachment_url($product->get_image_id()) ?: '',
+            'gallery' => self::get_gallery_images($product),
+            'permalink' => get_permalink($product->get_id()),
+            'type' => $product->get_type(),
+            'on_sale' => $product->is_on_sale(),
+            'date_modified' => $product->get_date_modified() ? $product->get_date_modified()->format('c') : null,
         ];
     }
     
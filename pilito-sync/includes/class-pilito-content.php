@@ -7,6 +7,11 @@ defined('ABSPATH') || exit;
 
 class Pilito_PS_Content {
     
+    /**
+     * Pages/posts per batch request (backend accepts up to 100)
+     */
+    const BATCH_SIZE = 50;
+    
     /**
      * Initialize
      */
@@ -354,37 +359,13 @@ class Pilito_PS_Content {
             }
             
             // Step 3: Build API URL
-            $base_url = get_option('pilito_ps_api_url', '');
+            $api_endpoint = self::get_content_api_url('webhook');
             
-            if (empty($base_url)) {
+            if (empty($api_endpoint)) {
                 return ['success' => false, 'message' => '❌ تنظیمات API کامل نیست. لطفاً از بخش محصولات، توکن را تنظیم کنید.'];
             }
             
-            // پاکسازی URL
-            $base_url = rtrim($base_url, '/');
-            
-            // حذف /webhook اگر وجود داشت
-            $base_url = str_replace('/webhook/', '', $base_url);
-            $base_url = str_replace('/webhook', '', $base_url);
-            
-            // تبدیل woocommerce به wordpress-content
-            if (strpos($base_url, 'woocommerce') !== false) {
-                $api_endpoint = str_replace('woocommerce', 'wordpress-content', $base_url) . '/webhook/';
-            } else {
-                // اگه base URL اصلاً woocommerce نداره، پس خودمون بسازیم
-                // مثلاً: http://185.164.72.165/api/v1/integrations/wordpress-content/webhook/
-                if (strpos($base_url, '/api/') !== false) {
-                    // داره /api/ داره
-                    $parts = explode('/api/', $base_url);
-                    $api_endpoint = $parts[0] . '/api/v1/integrations/wordpress-content/webhook/';
-                } else {
-                    // بدون /api/
-                    $api_endpoint = $base_url . '/api/v1/integrations/wordpress-content/webhook/';
-                }
-            }
-            
             $error_details['api_endpoint'] = $api_endpoint;
-            $error_details['base_url'] = $base_url;
             
             // Step 4: Extract content (با timeout protection)
             set_time_limit(30); // max 30 seconds
@@ -396,21 +377,7 @@ class Pilito_PS_Content {
             $payload = [
                 'event_type' => $post->post_type . '.updated',
                 'event_id' => 'wp_' . $post->ID . '_' . time(),
-                'content' => [
-                    'id' => $post->ID,
-                    'post_type' => $post->post_type,
-                    'title' => $post->post_title,
-                    'content' => $full_content,
-                    'excerpt' => self::safe_excerpt($post),
-                    'permalink' => get_permalink($post),
-                    'author' => get_the_author_meta('display_name', $post->post_author),
-                    'categories' => self::safe_categories($post->ID),
-                    'tags' => self::safe_tags($post->ID),
-                    'featured_image' => get_the_post_thumbnail_url($post, 'full') ?: '',
-                    'status' => $post->post_status,
-                    'modified_date' => $post->post_modified_gmt . 'Z',
-                    'metadata' => []
-                ]
+                'content' => self::build_content_data($post, $full_content)
             ];
             
             // Step 6: Send to API
@@ -466,6 +433,126 @@ class Pilito_PS_Content {
         }
     }
     
+    /**
+     * Build content data (shared by single webhook and batch sync)
+     */
+    private static function build_content_data($post, $full_content) {
+        return [
+            'id' => $post->ID,
+            'post_type' => $post->post_type,
+            'title' => $post->post_title,
+            'content' => $full_content,
+            'excerpt' => self::safe_excerpt($post),
+            'permalink' => get_permalink($post),
+            'author' => get_the_author_meta('display_name', $post->post_author),
+            'categories' => self::safe_categories($post->ID),
+            'tags' => self::safe_tags($post->ID),
+            'featured_image' => get_the_post_thumbnail_url($post, 'full') ?: '',
+            'status' => $post->post_status,
+            'modified_date' => $post->post_modified_gmt . 'Z',
+            'metadata' => []
+        ];
+    }
+    
+    /**
+     * Build wordpress-content API URL (webhook / batch) from the configured base URL
+     */
+    private static function get_content_api_url($action) {
+        $base_url = get_option('pilito_ps_api_url', '');
+        
+        if (empty($base_url)) {
+            return '';
+        }
+        
+        // پاکسازی URL
+        $base_url = rtrim($base_url, '/');
+        
+        // حذف /webhook اگر وجود داشت
+        $base_url = str_replace('/webhook/', '', $base_url);
+        $base_url = str_replace('/webhook', '', $base_url);
+        
+        // تبدیل woocommerce به wordpress-content
+        if (strpos($base_url, 'woocommerce') !== false) {
+            return str_replace('woocommerce', 'wordpress-content', $base_url) . '/' . $action . '/';
+        }
+        
+        // اگه base URL اصلاً woocommerce نداره، پس خودمون بسازیم
+        // مثلاً: http://185.164.72.165/api/v1/integrations/wordpress-content/webhook/
+        if (strpos($base_url, '/api/') !== false) {
+            $parts = explode('/api/', $base_url);
+            return $parts[0] . '/api/v1/integrations/wordpress-content/' . $action . '/';
+        }
+        
+        return $base_url . '/api/v1/integrations/wordpress-content/' . $action . '/';
+    }
+    
+    /**
+     * Sync a batch of pages/posts in one request
+     */
+    public static function sync_pages_batch($post_ids) {
+        $api_token = get_option('pilito_ps_api_token', '');
+        if (empty($api_token)) {
+            return ['success' => false, 'message' => '❌ توکن API تنظیم نشده است'];
+        }
+        
+        $api_endpoint = self::get_content_api_url('batch');
+        if (empty($api_endpoint)) {
+            return ['success' => false, 'message' => '❌ تنظیمات API کامل نیست. لطفاً از بخش محصولات، توکن را تنظیم کنید.'];
+        }
+        
+        $contents = [];
+        $hashes = [];
+        foreach ($post_ids as $post_id) {
+            $post = get_post($post_id);
+            if (!$post) {
+                continue;
+            }
+            $full_content = self::extract_full_content_safe($post);
+            $contents[] = self::build_content_data($post, $full_content);
+            $hashes[$post->ID] = md5($full_content);
+        }
+        
+        if (empty($contents)) {
+            return ['success' => false, 'message' => '❌ پستی یافت نشد'];
+        }
+        
+        $response = wp_remote_post($api_endpoint, [
+            'headers' => [
+                'Authorization' => 'Bearer ' . $api_token,
+                'Content-Type' => 'application/json',
+            ],
+            'body' => json_encode([
+                'batch_id' => 'wp_batch_' . time() . '_' . substr(md5(implode(',', $post_ids)), 0, 12),
+                'contents' => $contents,
+            ]),
+            'timeout' => 60,
+            'sslverify' => false, // در محیط development
+        ]);
+        
+        $status_code = is_wp_error($response) ? 0 : wp_remote_retrieve_response_code($response);
+        
+        if ($status_code < 200 || $status_code >= 300) {
+            $error_msg = is_wp_error($response) ? $response->get_error_message() : 'خطای سرور ' . $status_code;
+            foreach ($hashes as $post_id => $hash) {
+                update_post_meta($post_id, '_pilito_page_sync_status', 'error');
+                update_post_meta($post_id, '_pilito_page_sync_error', $error_msg);
+            }
+            return ['success' => false, 'message' => '❌ ' . $error_msg];
+        }
+        
+        foreach ($hashes as $post_id => $hash) {
+            update_post_meta($post_id, '_pilito_page_sync_status', 'success');
+            update_post_meta($post_id, '_pilito_page_last_sync', current_time('mysql'));
+            update_post_meta($post_id, '_pilito_page_content_hash', $hash);
+            delete_post_meta($post_id, '_pilito_page_sync_error');
+        }
+        
+        $body_data = @json_decode(wp_remote_retrieve_body($response), true);
+        $message = isset($body_data['message']) ? $body_data['message'] : 'با موفقیت ارسال شد';
+        
+        return ['success' => true, 'message' => '✅ ' . $message, 'data' => $body_data];
+    }
+    
     /**
      * Safe content extraction (با timeout protection)
      */
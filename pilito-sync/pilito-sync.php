@@ -2,7 +2,7 @@
 /**
  * Plugin Name: Pilito Sync
  * Description: همگام‌سازی خودکار محتوای سایت (محصولات، برگه‌ها و نوشته‌ها) با پلتفرم پیلیتو برای استفاده از هوش مصنوعی
- * Version: 3.2.2
+ * Version: 3.3.0
  * Author: Pilito Team
  * Author URI: https://pilito.com
  * Text Domain: pilito-sync
@@ -18,7 +18,7 @@
 defined('ABSPATH') || exit;
 
 // Plugin constants
-define('PILITO_PS_VERSION', '3.2.2');
+define('PILITO_PS_VERSION', '3.3.0');
 define('PILITO_PS_PLUGIN_FILE', __FILE__);
 define('PILITO_PS_PLUGIN_DIR', plugin_dir_path(__FILE__));
 define('PILITO_PS_PLUGIN_URL', plugin_dir_url(__FILE__));
@@ -4,8 +4,8 @@ from django.db.models import Sum, Count, Q
 from import_export import resources
 from import_export.admin import ExportMixin
 from .models import (
-    AIGlobalConfig, AIUsageTracking, AIUsageLog, TenantKnowledge,
-    SessionMemory, IntentKeyword, IntentRouting
+    AIGlobalConfig, AIUsageTracking, AIUsageLog, AIUsageDailySummary, TenantKnowledge,
+    SessionMemory, IntentKeyword, IntentRouting, AnswerCacheEntry
 )
 
 @admin.register(AIGlobalConfig)
@@ -232,6 +232,15 @@ class AIUsageLogAdmin(ExportMixin, admin.ModelAdmin):
         return super().changelist_view(request, extra_context=extra_context)
 
 
+@admin.register(AIUsageDailySummary)
+class AIUsageDailySummaryAdmin(admin.ModelAdmin):
+    """Daily usage rolled up from AIUsageLog by the retention policy"""
+    list_display = ('date', 'hour', 'user', 'section', 'model_name', 'requests', 'total_tokens', 'successful_tokens')
+    list_filter = ('date', 'section')
+    search_fields = ('user__username', 'user__email')
+    date_hierarchy = 'date'
+
+
 @admin.register(AIUsageTracking)
 class AIUsageTrackingAdmin(admin.ModelAdmin):
     """Daily aggregated AI usage statistics"""
@@ -302,6 +311,16 @@ class SessionMemoryAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(AnswerCacheEntry)
+class AnswerCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('query_text', 'user', 'hit_count', 'prompt_tokens', 'completion_tokens', 'last_hit_at', 'created_at')
+    list_filter = ('user', 'created_at')
+    search_fields = ('query_text', 'response_text', 'user__username')
+    readonly_fields = ('id', 'knowledge_version', 'hit_count', 'last_hit_at', 'created_at')
+    exclude = ('query_embedding',)
+    date_hierarchy = 'created_at'
+
+
 @admin.register(IntentKeyword)
 class IntentKeywordAdmin(admin.ModelAdmin):
     list_display = ('keyword', 'intent', 'language', 'weight', 'user', 'is_active')
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:49
+
+import django.db.models.deletion
+import pgvector.django.vector
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_model', '0011_alter_aiglobalconfig_model_name_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerCacheEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('query_text', models.TextField(help_text='Normalized customer question')),
+                ('query_embedding', pgvector.django.vector.VectorField(dimensions=1536)),
+                ('knowledge_version', models.CharField(help_text='Tenant knowledge-base version the answer was generated from', max_length=32)),
+                ('response_text', models.TextField()),
+                ('customer_name', models.CharField(blank=True, default='', help_text='First name of the customer the answer was generated for (used for adaptation)', max_length=255)),
+                ('prompt_tokens', models.IntegerField(default=0)),
+                ('completion_tokens', models.IntegerField(default=0)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_cache_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '⚡ Answer Cache Entry',
+                'verbose_name_plural': '⚡ Answer Cache Entries',
+                'db_table': 'ai_answer_cache',
+                'indexes': [models.Index(fields=['user', 'knowledge_version', 'created_at'], name='ai_answer_c_user_id_5c0f1d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_model', '0012_answercacheentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIUsageDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('section', models.CharField(choices=[('chat', 'Customer Chat'), ('prompt_generation', 'Prompt Generation'), ('marketing_workflow', 'Marketing Workflow'), ('knowledge_qa', 'Knowledge Base Q&A'), ('product_recommendation', 'Product Recommendation'), ('rag_pipeline', 'RAG Pipeline'), ('web_knowledge', 'Web Knowledge Processing'), ('session_memory', 'Session Memory Summary'), ('intent_detection', 'Intent Detection'), ('embedding_generation', 'Embedding Generation'), ('other', 'Other')], max_length=50)),
+                ('model_name', models.CharField(blank=True, default='', max_length=100)),
+                ('requests', models.IntegerField(default=0)),
+                ('successful_requests', models.IntegerField(default=0)),
+                ('failed_requests', models.IntegerField(default=0)),
+                ('prompt_tokens', models.BigIntegerField(default=0)),
+                ('completion_tokens', models.BigIntegerField(default=0)),
+                ('total_tokens', models.BigIntegerField(default=0)),
+                ('successful_tokens', models.BigIntegerField(default=0, help_text='Tokens of successful requests (billing)')),
+                ('total_response_time_ms', models.BigIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ai_usage_daily_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '📦 AI Usage Daily Summary',
+                'verbose_name_plural': '📦 AI Usage Daily Summaries',
+                'db_table': 'ai_usage_daily_summary',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['user', 'date'], name='ai_usage_da_user_id_3ac34d_idx'), models.Index(fields=['date', 'section'], name='ai_usage_da_date_4e4a04_idx')],
+            },
+        ),
+    ]
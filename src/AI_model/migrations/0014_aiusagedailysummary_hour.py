@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_model', '0013_aiusagedailysummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiusagedailysummary',
+            name='hour',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Local hour of day (empty on rows archived before hourly summaries)', null=True),
+        ),
+    ]
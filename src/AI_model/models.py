@@ -167,6 +167,164 @@ class AIUsageLog(models.Model):
             error_message=error_message,
             metadata=metadata or {}
         )
+    
+    @classmethod
+    def tokens_used(cls, user, since, success_only=True):
+        """
+        Total tokens used by `user` since a datetime
+        
+        Combines AIUsageDailySummary for days archived by the retention policy
+        with raw logs from the retention watermark on. Archived usage is kept
+        per hour: hours that start before `since` are not counted (the raw
+        logs of the hour `since` falls into are gone once it is archived).
+        
+        Args:
+            user: User instance
+            since: Aware datetime to count from
+            success_only: Only count successful requests (billing)
+        
+        Returns:
+            int token count
+        """
+        return cls.tokens_used_by_user({user.pk: since}, success_only=success_only)[user.pk]
+    
+    @classmethod
+    def tokens_used_by_user(cls, since_by_user, success_only=True):
+        """
+        tokens_used for many users at once (one grouped query per table)
+        
+        Args:
+            since_by_user: {user_id: aware datetime to count from}
+            success_only: Only count successful requests (billing)
+        
+        Returns:
+            {user_id: int token count}
+        """
+        from functools import reduce
+        from operator import or_
+        from django.db.models import Q, Sum
+        from core.retention import DataRetentionService
+        
+        totals = dict.fromkeys(since_by_user, 0)
+        if not since_by_user:
+            return totals
+        
+        watermark = DataRetentionService.get_watermark_datetime('ai_usage_log')
+        log_filters, archived_filters = [], []
+        for user_id, since in since_by_user.items():
+            if watermark and since < watermark:
+                log_filters.append(Q(user_id=user_id, created_at__gte=watermark))
+                local_since = timezone.localtime(since)
+                first_hour = local_since.hour + (local_since != local_since.replace(minute=0, second=0, microsecond=0))
+                archived_filters.append(Q(user_id=user_id) & (
+                    Q(date__gt=local_since.date()) | Q(date=local_since.date(), hour__gte=first_hour)
+                ))
+            else:
+                log_filters.append(Q(user_id=user_id, created_at__gte=since))
+        
+        logs = cls.objects.filter(reduce(or_, log_filters))
+        if success_only:
+            logs = logs.filter(success=True)
+        for row in logs.order_by().values('user_id').annotate(total=Sum('total_tokens')):
+            totals[row['user_id']] += row['total'] or 0
+        
+        if archived_filters:
+            archived = AIUsageDailySummary.objects.filter(
+                reduce(or_, archived_filters),
+                date__lt=timezone.localtime(watermark).date()
+            ).order_by().values('user_id').annotate(
+                total=Sum('successful_tokens' if success_only else 'total_tokens')
+            )
+            for row in archived:
+                totals[row['user_id']] += row['total'] or 0
+        
+        return totals
+
+
+class AIUsageDailySummary(models.Model):
+    """
+    Daily AI usage per user, section and model rolled up from AIUsageLog
+    before old rows are purged (see core.retention); one row per local hour,
+    so billing periods starting mid-day are not over-counted
+    """
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField(
+        null=True, blank=True,
+        help_text="Local hour of day (empty on rows archived before hourly summaries)"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='ai_usage_daily_summaries'
+    )
+    section = models.CharField(max_length=50, choices=AIUsageLog.SECTION_CHOICES)
+    model_name = models.CharField(max_length=100, blank=True, default="")
+    requests = models.IntegerField(default=0)
+    successful_requests = models.IntegerField(default=0)
+    failed_requests = models.IntegerField(default=0)
+    prompt_tokens = models.BigIntegerField(default=0)
+    completion_tokens = models.BigIntegerField(default=0)
+    total_tokens = models.BigIntegerField(default=0)
+    successful_tokens = models.BigIntegerField(default=0, help_text="Tokens of successful requests (billing)")
+    total_response_time_ms = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'ai_usage_daily_summary'
+        verbose_name = "📦 AI Usage Daily Summary"
+        verbose_name_plural = "📦 AI Usage Daily Summaries"
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['date', 'section']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} - {self.section}: {self.total_tokens} tokens"
+
+    @classmethod
+    def rollup(cls, start, end, day):
+        """Replace the summary rows of `day` with usage logged in [start, end), per hour"""
+        from django.db.models import Count, Q, Sum
+        from django.db.models.functions import ExtractHour
+
+        rows = (
+            AIUsageLog.objects.filter(created_at__gte=start, created_at__lt=end)
+            .order_by()
+            .annotate(hour=ExtractHour('created_at'))
+            .values('user_id', 'section', 'model_name', 'hour')
+            .annotate(
+                requests=Count('id'),
+                successful_requests=Count('id', filter=Q(success=True)),
+                failed_requests=Count('id', filter=Q(success=False)),
+                # Not named after AIUsageLog fields: later sums would read the aggregate
+                prompt=Sum('prompt_tokens'),
+                completion=Sum('completion_tokens'),
+                tokens=Sum('total_tokens'),
+                successful=Sum('total_tokens', filter=Q(success=True)),
+                response_time=Sum('response_time_ms'),
+            )
+        )
+        summaries = [
+            cls(
+                date=day,
+                hour=row['hour'],
+                user_id=row['user_id'],
+                section=row['section'],
+                model_name=row['model_name'],
+                requests=row['requests'],
+                successful_requests=row['successful_requests'],
+                failed_requests=row['failed_requests'],
+                prompt_tokens=row['prompt'] or 0,
+                completion_tokens=row['completion'] or 0,
+                total_tokens=row['tokens'] or 0,
+                successful_tokens=row['successful'] or 0,
+                total_response_time_ms=row['response_time'] or 0,
+            )
+            for row in rows
+        ]
+        cls.objects.filter(date=day).delete()
+        cls.objects.bulk_create(summaries, batch_size=1000)
+        return len(summaries)
 
 
 class AIUsageTracking(models.Model):
@@ -376,6 +534,67 @@ class SessionMemory(models.Model):
         return f"Memory: {self.conversation_id} ({self.message_count} msgs)"
 
 
+class AnswerCacheEntry(models.Model):
+    """
+    Semantic answer cache (opt-in per tenant via AIBehaviorSettings)
+    Stores AI answers keyed by the query embedding so near-duplicate
+    questions (price, shipping, address) can skip the prompt pipeline.
+    Entries are only valid for the knowledge_version they were built from.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    # Owner (tenant)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='answer_cache_entries',
+        db_index=True
+    )
+    
+    # Cache key
+    query_text = models.TextField(help_text="Normalized customer question")
+    if PGVECTOR_AVAILABLE:
+        query_embedding = VectorField(dimensions=1536)
+    else:
+        query_embedding = models.JSONField()
+    knowledge_version = models.CharField(
+        max_length=32,
+        help_text="Tenant knowledge-base version the answer was generated from"
+    )
+    
+    # Cached answer
+    response_text = models.TextField()
+    customer_name = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text="First name of the customer the answer was generated for (used for adaptation)"
+    )
+    prompt_tokens = models.IntegerField(default=0)
+    completion_tokens = models.IntegerField(default=0)
+    
+    # Usage
+    hit_count = models.IntegerField(default=0)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'ai_answer_cache'
+        verbose_name = "⚡ Answer Cache Entry"
+        verbose_name_plural = "⚡ Answer Cache Entries"
+        indexes = [
+            models.Index(fields=['user', 'knowledge_version', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.query_text[:50]} ({self.hit_count} hits)"
+    
+    @property
+    def saved_tokens(self) -> int:
+        """Tokens saved each time this entry is served instead of calling Gemini"""
+        return self.prompt_tokens + self.completion_tokens
+
+
 class IntentKeyword(models.Model):
     """
     Dynamic intent keywords (optional - for admin panel management)
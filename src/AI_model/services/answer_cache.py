@@ -0,0 +1,314 @@
+"""
+Semantic Answer Cache
+Serves cached AI answers for near-duplicate customer questions
+(price, shipping time, address...) without rebuilding the prompt or calling Gemini.
+
+✅ Opt-in per tenant (AIBehaviorSettings.answer_cache_enabled)
+✅ Keyed by query embedding (pgvector cosine similarity)
+✅ Bound to the tenant knowledge-base version (invalidated when TenantKnowledge changes)
+✅ Only used when the answer does not depend on conversation-specific context
+"""
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """
+    Per-tenant semantic cache of AI answers
+
+    Usage:
+        lookup = SemanticAnswerCache.prepare(user, customer_message, conversation)
+        if lookup:
+            hit = SemanticAnswerCache.get(lookup)
+            ...
+            SemanticAnswerCache.store(lookup, response_text, prompt_tokens, completion_tokens)
+    """
+
+    DEFAULT_SIMILARITY_THRESHOLD = 0.95
+    ENTRY_TTL_DAYS = 7
+    MAX_QUERY_LENGTH = 500  # Long messages are rarely repeated verbatim
+
+    # Redis key holding the current knowledge-base version per tenant
+    VERSION_KEY = 'answer_cache:kb_version:{user_id}'
+    VERSION_TTL = 30 * 24 * 3600
+
+    # Marker added by the Instagram share flow (see AI_model.signals)
+    SHARE_CONTEXT_MARKER = '[CONTEXT:'
+
+    # ==========================================
+    #  Knowledge-base version
+    # ==========================================
+
+    @classmethod
+    def get_knowledge_version(cls, user) -> str:
+        """
+        Get current knowledge-base version for tenant
+
+        A missing key (first use or Redis flush) starts a new version,
+        which safely invalidates all previously stored entries.
+        """
+        key = cls.VERSION_KEY.format(user_id=user.id)
+        version = cache.get(key)
+        if version is None:
+            version = str(time.time_ns())
+            # add() so concurrent workers agree on a single version
+            if not cache.add(key, version, cls.VERSION_TTL):
+                version = cache.get(key) or version
+        return version
+
+    @classmethod
+    def invalidate(cls, user_id) -> int:
+        """
+        Invalidate all cached answers for a tenant
+        Called when TenantKnowledge (or AI behavior) for the tenant changes
+
+        Returns:
+            Number of deleted entries
+        """
+        from AI_model.models import AnswerCacheEntry
+
+        cache.set(cls.VERSION_KEY.format(user_id=user_id), str(time.time_ns()), cls.VERSION_TTL)
+        deleted = AnswerCacheEntry.objects.filter(user_id=user_id).delete()[0]
+        if deleted:
+            logger.info(f"🗑️ Answer cache invalidated for user {user_id}: {deleted} entries")
+        return deleted
+
+    # ==========================================
+    #  Eligibility
+    # ==========================================
+
+    @classmethod
+    def get_threshold(cls, user) -> Optional[float]:
+        """
+        Get similarity threshold for tenant, or None if the cache is disabled
+        """
+        try:
+            behavior = user.ai_behavior
+        except Exception:
+            return None
+
+        if not behavior.answer_cache_enabled:
+            return None
+        return behavior.answer_cache_similarity_threshold or cls.DEFAULT_SIMILARITY_THRESHOLD
+
+    @classmethod
+    def has_conversation_context(cls, customer_message: str, conversation) -> bool:
+        """
+        Check if the answer would depend on conversation-specific context
+
+        Cacheable only when the question is the opening message of the conversation
+        (no history, no greeting state), carries no Instagram share context,
+        no bio personalization and no workflow-injected AI context.
+        """
+        if conversation is None:
+            return True
+
+        if cls.SHARE_CONTEXT_MARKER in customer_message:
+            return True
+
+        # Workflow-injected prompt/context
+        conversation_id = str(conversation.id)
+        ai_control = cache.get(f"ai_control_{conversation_id}") or {}
+        if ai_control.get('custom_prompt') or cache.get(f"ai_context_{conversation_id}"):
+            return True
+
+        # Bio personalization (Instagram only)
+        customer = conversation.customer
+        if conversation.source == 'instagram' and customer and customer.bio:
+            try:
+                if conversation.user.ai_behavior.should_use_bio_context():
+                    return True
+            except Exception:
+                return True
+
+        # Any history besides the current question
+        from message.models import Message
+        message_ids = Message.objects.filter(
+            conversation=conversation
+        ).values_list('id', flat=True)[:2]
+        return len(message_ids) > 1
+
+    # ==========================================
+    #  Lookup / Store
+    # ==========================================
+
+    @classmethod
+    def prepare(cls, user, customer_message: str, conversation=None) -> Optional[Dict]:
+        """
+        Build a cache lookup for this question
+
+        Returns:
+            Lookup dict (query text, embedding, version, threshold) or None
+            if the cache is disabled or the question is not cacheable
+        """
+        if not user or not customer_message or not customer_message.strip():
+            return None
+
+        if len(customer_message) > cls.MAX_QUERY_LENGTH:
+            return None
+
+        threshold = cls.get_threshold(user)
+        if threshold is None:
+            return None
+
+        try:
+            if cls.has_conversation_context(customer_message, conversation):
+                logger.debug("Answer cache skipped: conversation-specific context")
+                return None
+
+            query_text = cls._normalize_query(customer_message)
+            query_embedding = cls._embed(query_text)
+            if not query_embedding:
+                return None
+
+            return {
+                'user': user,
+                'query_text': query_text,
+                'query_embedding': query_embedding,
+                'knowledge_version': cls.get_knowledge_version(user),
+                'threshold': threshold,
+                'customer_name': cls._customer_name(conversation),
+            }
+        except Exception as e:
+            logger.warning(f"⚠️ Answer cache lookup preparation failed: {e}")
+            return None
+
+    @classmethod
+    def get(cls, lookup: Dict) -> Optional[Dict]:
+        """
+        Find the closest cached answer above the tenant threshold
+
+        Returns:
+            {'response': str, 'similarity': float, 'saved_tokens': int, 'entry_id': str}
+            or None on miss (metrics are tracked either way)
+        """
+        from AI_model.models import AnswerCacheEntry, PGVECTOR_AVAILABLE, CosineDistance
+        from AI_model.services.rag_metrics import RAGMetrics
+
+        if not PGVECTOR_AVAILABLE:
+            return None
+
+        try:
+            cutoff = timezone.now() - timedelta(days=cls.ENTRY_TTL_DAYS)
+            entry = AnswerCacheEntry.objects.filter(
+                user=lookup['user'],
+                knowledge_version=lookup['knowledge_version'],
+                created_at__gte=cutoff
+            ).annotate(
+                distance=CosineDistance('query_embedding', lookup['query_embedding'])
+            ).order_by('distance').first()
+
+            similarity = (1 - entry.distance) if entry else 0.0
+
+            response = None
+            if entry and similarity >= lookup['threshold']:
+                response = cls._adapt_answer(
+                    entry.response_text,
+                    entry.customer_name,
+                    lookup['customer_name']
+                )
+
+            if response is None:
+                RAGMetrics.track_answer_cache(hit=False, similarity=similarity)
+                return None
+
+            AnswerCacheEntry.objects.filter(id=entry.id).update(
+                hit_count=entry.hit_count + 1,
+                last_hit_at=timezone.now()
+            )
+            RAGMetrics.track_answer_cache(
+                hit=True,
+                saved_tokens=entry.saved_tokens,
+                similarity=similarity
+            )
+
+            return {
+                'response': response,
+                'similarity': similarity,
+                'saved_tokens': entry.saved_tokens,
+                'entry_id': str(entry.id),
+            }
+
+        except Exception as e:
+            logger.warning(f"⚠️ Answer cache lookup failed: {e}")
+            return None
+
+    @classmethod
+    def store(cls, lookup: Dict, response_text: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        """
+        Store a freshly generated answer for future near-duplicate questions
+        """
+        from AI_model.models import AnswerCacheEntry
+
+        if not response_text or not response_text.strip():
+            return None
+
+        # Don't cache "I don't know" answers - knowledge may be added any time
+        try:
+            fallback_text = lookup['user'].ai_behavior.get_fallback_text()
+            if fallback_text and fallback_text in response_text:
+                return None
+        except Exception:
+            pass
+
+        try:
+            entry = AnswerCacheEntry.objects.create(
+                user=lookup['user'],
+                query_text=lookup['query_text'],
+                query_embedding=lookup['query_embedding'],
+                knowledge_version=lookup['knowledge_version'],
+                response_text=response_text,
+                customer_name=lookup['customer_name'],
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+            logger.debug(f"✅ Answer cached: {entry.id}")
+            return entry
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to store answer in cache: {e}")
+            return None
+
+    # ==========================================
+    #  Helpers
+    # ==========================================
+
+    @classmethod
+    def _normalize_query(cls, text: str) -> str:
+        """Normalize exactly like ContextRetriever so the embedding is shared via Redis"""
+        from AI_model.services.persian_normalizer import get_normalizer
+        normalizer = get_normalizer()
+        if normalizer.is_persian(text):
+            return normalizer.normalize(text)
+        return text
+
+    @classmethod
+    def _embed(cls, query_text: str) -> Optional[List[float]]:
+        from AI_model.services.embedding_service import EmbeddingService
+        return EmbeddingService().get_embedding(query_text, task_type="retrieval_query")
+
+    @classmethod
+    def _customer_name(cls, conversation) -> str:
+        if conversation and conversation.customer and conversation.customer.first_name:
+            return conversation.customer.first_name.strip()
+        return ''
+
+    @classmethod
+    def _adapt_answer(cls, response_text: str, source_name: str, target_name: str) -> Optional[str]:
+        """
+        Adapt a cached answer to the current customer
+
+        Answers addressed to the original customer by name get the new name swapped in.
+        If the new customer has no name, the answer can't be adapted (returns None).
+        """
+        if not source_name or source_name not in response_text:
+            return response_text
+        if not target_name:
+            return None
+        return response_text.replace(source_name, target_name)
@@ -219,6 +219,15 @@ Use KNOWLEDGE BASE fully.""",
                 }
             }
         
+        # ⚡ Semantic answer cache (opt-in per tenant): near-duplicate opening
+        # questions skip the prompt pipeline and the Gemini call entirely
+        from AI_model.services.answer_cache import SemanticAnswerCache
+        cache_lookup = SemanticAnswerCache.prepare(self.user, customer_message, conversation)
+        if cache_lookup:
+            cached_answer = SemanticAnswerCache.get(cache_lookup)
+            if cached_answer:
+                return self._build_cached_response(cached_answer, conversation, start_time)
+        
         try:
             # Build the prompt with conversation context
             prompt = self._build_prompt(customer_message, conversation)
@@ -383,9 +392,12 @@ Use KNOWLEDGE BASE fully.""",
                 success=True,
                 metadata={
                     'conversation_id': str(conversation.id) if conversation else None,
-                    'model_used': self.ai_config.model_name
+                    'model_used': self.ai_config.model_name,
+                    'answer_cache': 'miss' if cache_lookup else 'skipped'
                 }
             )
+            if cache_lookup:
+                SemanticAnswerCache.store(cache_lookup, response_text, prompt_tokens, completion_tokens)
             try:
                 total_tokens = int(prompt_tokens) + int(completion_tokens)
             except Exception:
@@ -450,6 +462,54 @@ Use KNOWLEDGE BASE fully.""",
                 }
             }
     
+    def _build_cached_response(self, cached_answer: Dict[str, Any], conversation, start_time: float) -> Dict[str, Any]:
+        """
+        Build generate_response() result from a semantic answer cache hit
+        No Gemini call, so no tokens are billed - saved tokens are tracked instead
+        """
+        response_time_ms = int((time.time() - start_time) * 1000)
+        
+        # Keep greeting state consistent: the cached answer already greeted the customer
+        if conversation:
+            from django.core.cache import cache
+            cache.add(f"greeted_conv_{conversation.id}", True, timeout=3600)
+        
+        self._track_usage(
+            prompt_tokens=0,
+            completion_tokens=0,
+            response_time_ms=response_time_ms,
+            success=True,
+            metadata={
+                'conversation_id': str(conversation.id) if conversation else None,
+                'model_used': self.ai_config.model_name,
+                'answer_cache': 'hit',
+                'answer_cache_entry_id': cached_answer['entry_id'],
+                'answer_cache_similarity': round(cached_answer['similarity'], 4),
+                'saved_tokens': cached_answer['saved_tokens'],
+            }
+        )
+        
+        logger.info(
+            f"⚡ Answer cache hit for user {self.user.username if self.user else 'Unknown'} "
+            f"(similarity: {cached_answer['similarity']:.3f}, saved: {cached_answer['saved_tokens']} tokens)"
+        )
+        
+        return {
+            'success': True,
+            'response': cached_answer['response'],
+            'response_time_ms': response_time_ms,
+            'metadata': {
+                'model_used': self.ai_config.model_name,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'total_tokens': 0,
+                'answer_cache_hit': True,
+                'saved_tokens': cached_answer['saved_tokens'],
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'api_key_used': 'GeneralSettings'
+            }
+        }
+    
     def _rank_qa_with_bm25(self, qa_queryset, customer_message: str, top_n: int = 8):
         """
         Rank Q&A pairs using BM25 algorithm based on relevance to customer message
@@ -1403,145 +1463,63 @@ INSTRUCTION: Adapt your tone and recommendations based on the customer's backgro
             logger.error(f"Error sending AI response to platform for conversation {conversation.id}: {str(e)}")
 
     def _send_telegram_response(self, ai_message, conversation):
-        """Send AI response to Telegram"""
+        """Queue AI response for Telegram delivery (see OutboundMessageQueue)"""
         try:
-            from message.services.telegram_service import TelegramService
-            
-            telegram_service = TelegramService.get_service_for_conversation(conversation)
-            if not telegram_service:
-                logger.error(f"Could not get Telegram service for conversation {conversation.id}")
-                return
+            from message.services.outbound_queue import OutboundMessageQueue
             
-            result = telegram_service.send_message_to_customer(
-                conversation.customer, 
-                ai_message.content
-            )
-            
-            if result.get('success'):
-                logger.info(f"✅ AI response sent to Telegram successfully: message {ai_message.id}")
+            if OutboundMessageQueue.enqueue(ai_message):
+                logger.info(f"📮 AI response queued for Telegram: message {ai_message.id}")
             else:
-                logger.error(f"❌ Failed to send AI response to Telegram: {result.get('error')}")
+                logger.error(f"❌ Failed to queue AI response for Telegram: message {ai_message.id}")
                 
         except Exception as e:
-            logger.error(f"Error sending AI response to Telegram: {str(e)}")
+            logger.error(f"Error queueing AI response for Telegram: {str(e)}")
 
     def _send_instagram_response(self, ai_message, conversation):
-        """Send AI response to Instagram with dynamic typing indicator management"""
+        """
+        Queue AI response for Instagram delivery with typing indicator
+        
+        typing_on is sent now; the outbound worker delivers the message after a
+        short delay (so the indicator is visible) and turns typing off afterwards.
+        """
         try:
             from message.services.instagram_service import InstagramService
+            from message.services.outbound_queue import OutboundMessageQueue
             from django.core.cache import cache
             
-            instagram_service = InstagramService.get_service_for_conversation(conversation)
-            if not instagram_service:
-                logger.error(f"Could not get Instagram service for conversation {conversation.id}")
-                return
-            
-            customer = conversation.customer
-            
-            # Get typing start time from cache
-            typing_start_key = f"typing_start_{conversation.id}"
-            typing_start_time = cache.get(typing_start_key)
-            
             # Ensure typing_on is active (in case it wasn't sent earlier or timed out)
-            if not typing_start_time:
-                # If no start time in cache, send typing_on now and record time
+            typing_start_key = f"typing_start_{conversation.id}"
+            if not cache.get(typing_start_key):
                 try:
-                    typing_on_result = instagram_service.send_typing_indicator_to_customer(customer, 'typing_on')
-                    if typing_on_result.get('success'):
-                        typing_start_time = time.time()
-                        cache.set(typing_start_key, typing_start_time, timeout=60)
-                        logger.debug(f"✍️ Typing ON sent (no cached start time)")
+                    instagram_service = InstagramService.get_service_for_conversation(conversation)
+                    if instagram_service:
+                        typing_on_result = instagram_service.send_typing_indicator_to_customer(
+                            conversation.customer, 'typing_on'
+                        )
+                        if typing_on_result.get('success'):
+                            cache.set(typing_start_key, time.time(), timeout=60)
+                            logger.debug(f"✍️ Typing ON sent (no cached start time)")
                 except Exception as typing_err:
                     logger.debug(f"Error ensuring typing_on: {typing_err}")
-                    typing_start_time = time.time()  # Use current time as fallback
-            
-            # Wait 1 second to show typing indicator before sending message
-            time.sleep(1)
             
             # ✅ دریافت دکمه‌ها از ai_message
             buttons = getattr(ai_message, 'buttons', None)
             
-            # Send the actual message
-            message_sent_time = time.time()
-            result = instagram_service.send_message_to_customer(
-                customer, 
-                ai_message.content,
-                buttons=buttons  # ✅ پاس دادن دکمه‌ها
+            queued = OutboundMessageQueue.enqueue(
+                ai_message,
+                buttons=buttons,  # ✅ پاس دادن دکمه‌ها
+                typing_off=True,
+                countdown=OutboundMessageQueue.TYPING_DELAY
             )
-            
-            if result.get('success'):
-                logger.info(f"✅ AI response sent to Instagram successfully: message {ai_message.id}")
+            if queued:
+                logger.info(f"📮 AI response queued for Instagram: message {ai_message.id}")
                 if buttons:
-                    logger.info(f"   📌 Sent with {len(buttons)} CTA button(s)")
-                logger.info(f"   Instagram message_id: {result.get('message_id')}")
-                
-                # ✅ Store external message_id in metadata to prevent webhook duplicates
-                if result.get('message_id'):
-                    ai_message.metadata = ai_message.metadata or {}
-                    ai_message.metadata['external_message_id'] = str(result.get('message_id'))
-                    ai_message.metadata['sent_from_app'] = True
-                    ai_message.save(update_fields=['metadata'])
-                    logger.info(f"   Stored Instagram message_id in AI message metadata: {result.get('message_id')}")
-                    logger.info(f"   Updated metadata: {ai_message.metadata}")
-                
-                # ✅ Mark message as sent in cache to prevent duplicate from webhook
-                import hashlib
-                message_hash = hashlib.md5(
-                    f"{conversation.id}:{ai_message.content}".encode()
-                ).hexdigest()
-                cache_key = f"instagram_sent_msg_{message_hash}"
-                cache.set(cache_key, True, timeout=60)
-                logger.info(f"   📝 Cached sent message to prevent webhook duplicate: {cache_key}")
-                
-                # Calculate elapsed time since typing_on
-                elapsed_time = message_sent_time - typing_start_time
-                
-                # Instagram recommends minimum 5 seconds total typing indicator duration
-                # If less than 5 seconds have passed, wait for the remaining time
-                MINIMUM_TYPING_DURATION = 5.0
-                
-                if elapsed_time < MINIMUM_TYPING_DURATION:
-                    remaining_time = MINIMUM_TYPING_DURATION - elapsed_time
-                    logger.debug(f"⏱️ Elapsed: {elapsed_time:.1f}s, waiting {remaining_time:.1f}s more (total: {MINIMUM_TYPING_DURATION}s)")
-                    time.sleep(remaining_time)
-                else:
-                    logger.debug(f"⏱️ Elapsed: {elapsed_time:.1f}s, minimum duration already met")
-                
-                # Turn off typing indicator
-                try:
-                    typing_off_result = instagram_service.send_typing_indicator_to_customer(customer, 'typing_off')
-                    if typing_off_result.get('success'):
-                        total_typing_time = time.time() - typing_start_time
-                        logger.info(f"✍️ Typing indicator OFF for Instagram conversation {conversation.id} (total: {total_typing_time:.1f}s)")
-                    else:
-                        logger.debug(f"Could not send typing_off: {typing_off_result.get('error')}")
-                    
-                    # Clean up cache
-                    cache.delete(typing_start_key)
-                except Exception as typing_err:
-                    logger.debug(f"Error sending typing_off: {typing_err}")
+                    logger.info(f"   📌 With {len(buttons)} CTA button(s)")
             else:
-                logger.error(f"❌ Failed to send AI response to Instagram: {result.get('error')}")
-                # Turn off typing indicator on error
-                try:
-                    instagram_service.send_typing_indicator_to_customer(customer, 'typing_off')
-                    cache.delete(typing_start_key)
-                except:
-                    pass
+                logger.error(f"❌ Failed to queue AI response for Instagram: message {ai_message.id}")
                 
         except Exception as e:
-            logger.error(f"Error sending AI response to Instagram: {str(e)}")
-            # Try to turn off typing indicator on exception
-            try:
-                from message.services.instagram_service import InstagramService
-                from django.core.cache import cache
-                instagram_service = InstagramService.get_service_for_conversation(conversation)
-                if instagram_service:
-                    instagram_service.send_typing_indicator_to_customer(conversation.customer, 'typing_off')
-                    typing_start_key = f"typing_start_{conversation.id}"
-                    cache.delete(typing_start_key)
-            except:
-                pass
+            logger.error(f"Error queueing AI response for Instagram: {str(e)}")
 
     def process_customer_message(self, customer_message: str, conversation=None) -> Dict[str, Any]:
         """
@@ -342,6 +342,10 @@ class IncrementalChunker:
             # Invalidate cache
             cache.delete(f'knowledge_stats:{self.user.id}')
             
+            # bulk_create() skips post_save - invalidate cached answers explicitly
+            from AI_model.services.answer_cache import SemanticAnswerCache
+            SemanticAnswerCache.invalidate(self.user.id)
+            
             return True
             
         except Exception as e:
@@ -80,6 +80,50 @@ class MediaProcessorService:
         except Exception as e:
             logger.exception("❌ Failed to initialize Gemini")
     
+    # kind -> (estimated tokens, feature name, result text field, placeholder)
+    ACCESS_FEATURES = {
+        'voice': (500, "Voice Transcription", 'transcription',
+                  '[Voice transcription unavailable - subscription required]'),
+        'image': (800, "Image Analysis", 'description',
+                  '[Image analysis unavailable - subscription required]'),
+    }
+    
+    @classmethod
+    def access_denial(cls, user, kind: str) -> Optional[Dict[str, Any]]:
+        """
+        Subscription/token check for a media analysis
+        
+        Returns:
+            None when the user may use the feature (or there is no user),
+            else the failed result dict returned to the caller
+        """
+        if not user:
+            return None
+        from billing.utils import check_ai_access_for_user
+        
+        estimated_tokens, feature_name, text_field, placeholder = cls.ACCESS_FEATURES[kind]
+        access_check = check_ai_access_for_user(
+            user=user,
+            estimated_tokens=estimated_tokens,
+            feature_name=feature_name
+        )
+        if access_check['has_access']:
+            return None
+        
+        logger.warning(
+            f"User {user.username} denied access to {feature_name}. "
+            f"Reason: {access_check['reason']}"
+        )
+        return {
+            'success': False,
+            'error': f"Access denied: {access_check['message']}",
+            'error_code': access_check['reason'],
+            text_field: placeholder,
+            'duration_ms': 0,
+            'tokens_remaining': access_check['tokens_remaining'],
+            'days_remaining': access_check['days_remaining']
+        }
+    
     def is_ready(self) -> bool:
         """Check if service is ready to process media"""
         return self.initialized and self.gemini_model is not None
@@ -111,29 +155,9 @@ class MediaProcessorService:
             }
         
         # ✅ CHECK TOKENS AND SUBSCRIPTION BEFORE AI USAGE
-        if self.user:
-            from billing.utils import check_ai_access_for_user
-            
-            access_check = check_ai_access_for_user(
-                user=self.user,
-                estimated_tokens=500,  # Estimated tokens for voice transcription
-                feature_name="Voice Transcription"
-            )
-            
-            if not access_check['has_access']:
-                logger.warning(
-                    f"User {self.user.username} denied access to Voice Transcription. "
-                    f"Reason: {access_check['reason']}"
-                )
-                return {
-                    'success': False,
-                    'error': f"Access denied: {access_check['message']}",
-                    'error_code': access_check['reason'],
-                    'transcription': '[Voice transcription unavailable - subscription required]',
-                    'duration_ms': 0,
-                    'tokens_remaining': access_check['tokens_remaining'],
-                    'days_remaining': access_check['days_remaining']
-                }
+        denied = self.access_denial(self.user, 'voice')
+        if denied:
+            return denied
         
         try:
             # ✅ Setup proxy before importing Gemini
@@ -239,29 +263,9 @@ class MediaProcessorService:
             }
         
         # ✅ CHECK TOKENS AND SUBSCRIPTION BEFORE AI USAGE
-        if self.user:
-            from billing.utils import check_ai_access_for_user
-            
-            access_check = check_ai_access_for_user(
-                user=self.user,
-                estimated_tokens=800,  # Estimated tokens for image analysis
-                feature_name="Image Analysis"
-            )
-            
-            if not access_check['has_access']:
-                logger.warning(
-                    f"User {self.user.username} denied access to Image Analysis. "
-                    f"Reason: {access_check['reason']}"
-                )
-                return {
-                    'success': False,
-                    'error': f"Access denied: {access_check['message']}",
-                    'error_code': access_check['reason'],
-                    'description': '[Image analysis unavailable - subscription required]',
-                    'duration_ms': 0,
-                    'tokens_remaining': access_check['tokens_remaining'],
-                    'days_remaining': access_check['days_remaining']
-                }
+        denied = self.access_denial(self.user, 'image')
+        if denied:
+            return denied
         
         try:
             from PIL import Image
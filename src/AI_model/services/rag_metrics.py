@@ -72,6 +72,24 @@ rag_chunk_scores = Histogram(
     buckets=[0.0, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9, 1.0]
 )
 
+# Answer cache metrics
+rag_answer_cache_lookups_total = Counter(
+    'rag_answer_cache_lookups_total',
+    'Semantic answer cache lookups',
+    ['result']
+)
+
+rag_answer_cache_saved_tokens_total = Counter(
+    'rag_answer_cache_saved_tokens_total',
+    'Gemini tokens saved by serving cached answers'
+)
+
+rag_answer_cache_similarity = Histogram(
+    'rag_answer_cache_similarity',
+    'Similarity of the best cached answer candidate',
+    buckets=[0.8, 0.85, 0.9, 0.93, 0.95, 0.97, 0.99, 1.0]
+)
+
 # Active models
 rag_active_model = Gauge(
     'rag_active_model',
@@ -190,6 +208,62 @@ class RAGMetrics:
             f"{input_chunks}→{output_chunks} chunks"
         )
     
+    @classmethod
+    def track_answer_cache(
+        cls,
+        hit: bool,
+        saved_tokens: int = 0,
+        similarity: float = 0.0
+    ):
+        """
+        Track a semantic answer cache lookup
+        
+        Args:
+            hit: Whether a cached answer was served
+            saved_tokens: Tokens saved by skipping Gemini (hits only)
+            similarity: Similarity of the best candidate (0 if none)
+        """
+        result = 'hit' if hit else 'miss'
+        rag_answer_cache_lookups_total.labels(result=result).inc()
+        
+        if similarity > 0:
+            rag_answer_cache_similarity.observe(similarity)
+        
+        if hit and saved_tokens > 0:
+            rag_answer_cache_saved_tokens_total.inc(saved_tokens)
+        
+        # Running totals for dashboard (hit rate + saved tokens)
+        cls._incr_metric(f'answer_cache_{result}s')
+        if hit and saved_tokens > 0:
+            cls._incr_metric('answer_cache_saved_tokens', saved_tokens)
+        
+        logger.info(
+            f"📊 Answer cache {result}: similarity={similarity:.3f}, "
+            f"saved_tokens={saved_tokens if hit else 0}"
+        )
+    
+    @classmethod
+    def get_answer_cache_stats(cls) -> Dict:
+        """Get answer cache hit rate and saved tokens"""
+        hits = cache.get('rag_metric:answer_cache_hits') or 0
+        misses = cache.get('rag_metric:answer_cache_misses') or 0
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+            'saved_tokens': cache.get('rag_metric:answer_cache_saved_tokens') or 0,
+        }
+    
+    @classmethod
+    def _incr_metric(cls, key: str, delta: int = 1, ttl: int = 7 * 24 * 3600):
+        """Increment a cached counter (created on first use)"""
+        cache_key = f'rag_metric:{key}'
+        try:
+            cache.incr(cache_key, delta)
+        except ValueError:
+            cache.set(cache_key, delta, ttl)
+    
     @classmethod
     def _cache_metric(cls, key: str, value: Dict, ttl: int = 300):
         """Cache metric for dashboard"""
@@ -202,6 +276,7 @@ class RAGMetrics:
         return {
             'last_retrieval': cache.get('rag_metric:last_retrieval'),
             'last_reranking': cache.get('rag_metric:last_reranking'),
+            'answer_cache': cls.get_answer_cache_stats(),
         }
     
     @classmethod
@@ -0,0 +1,157 @@
+"""
+AI Usage Statistics Service
+
+Aggregates AI usage over a date range from three sources:
+- AIUsageDailySummary: days archived by the retention policy (core.retention)
+- MessageStatsRollup: hourly/daily totals from the first rolled-up day on
+  (message.services.stats_rollup)
+- AIUsageLog: raw per-request rows, only for days neither of the above covers
+
+Usage:
+    from AI_model.services.usage_stats import AIUsageStatsService
+
+    totals = AIUsageStatsService.aggregate(start_date, end_date, user=request.user)[None]
+    by_day = AIUsageStatsService.aggregate(start_date, end_date, user=request.user, group_by='day')
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Optional
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from AI_model.models import AIUsageDailySummary, AIUsageLog
+from core.retention import DataRetentionService
+from message.services.stats_rollup import MessageStatsRollupService
+
+
+METRICS = (
+    'requests', 'successful_requests', 'failed_requests',
+    'total_tokens', 'prompt_tokens', 'completion_tokens', 'response_time_ms',
+)
+
+
+class AIUsageStatsService:
+    """Usage totals that stay correct after old logs are purged"""
+
+    LOG_METRICS = {
+        'requests': Count('id'),
+        'successful_requests': Count('id', filter=Q(success=True)),
+        'failed_requests': Count('id', filter=Q(success=False)),
+        'total_tokens': Sum('total_tokens'),
+        'prompt_tokens': Sum('prompt_tokens'),
+        'completion_tokens': Sum('completion_tokens'),
+        'response_time_ms': Sum('response_time_ms'),
+    }
+    SUMMARY_METRICS = {
+        'requests': Sum('requests'),
+        'successful_requests': Sum('successful_requests'),
+        'failed_requests': Sum('failed_requests'),
+        'total_tokens': Sum('total_tokens'),
+        'prompt_tokens': Sum('prompt_tokens'),
+        'completion_tokens': Sum('completion_tokens'),
+        'response_time_ms': Sum('total_response_time_ms'),
+    }
+    ROLLUP_METRICS = {
+        'requests': 'ai_requests',
+        'failed_requests': 'ai_failed_requests',
+        'total_tokens': 'ai_tokens',
+        'prompt_tokens': 'ai_prompt_tokens',
+        'completion_tokens': 'ai_completion_tokens',
+        'response_time_ms': 'ai_response_time_ms',
+    }
+    LOG_GROUPS = {'section': F('section'), 'day': TruncDate('created_at'), 'user': F('user_id')}
+    SUMMARY_GROUPS = {'section': F('section'), 'day': F('date'), 'user': F('user_id')}
+
+    @classmethod
+    def get_querysets(cls, start_date: date, end_date: date, user=None, section: Optional[str] = None,
+                      until: Optional[date] = None):
+        """
+        Split [start_date, end_date] at the retention watermark
+
+        Args:
+            until: Only return logs/summaries before this day (rolled-up days are read elsewhere)
+
+        Returns:
+            (summary queryset or None, AIUsageLog queryset)
+        """
+        watermark = DataRetentionService.get_watermark('ai_usage_log')
+
+        logs = AIUsageLog.objects.filter(
+            created_at__date__gte=max(start_date, watermark) if watermark else start_date,
+            created_at__date__lte=end_date
+        )
+        summaries = None
+        if watermark and start_date < watermark:
+            summaries = AIUsageDailySummary.objects.filter(
+                date__gte=start_date,
+                date__lt=watermark,
+                date__lte=end_date
+            )
+        if until is not None:
+            logs = logs.filter(created_at__date__lt=until)
+            summaries = summaries.filter(date__lt=until) if summaries is not None else None
+
+        if user is not None:
+            logs = logs.filter(user=user)
+            summaries = summaries.filter(user=user) if summaries is not None else None
+        if section:
+            logs = logs.filter(section=section)
+            summaries = summaries.filter(section=section) if summaries is not None else None
+        return summaries, logs
+
+    @classmethod
+    def _rollup_totals(cls, start_date: date, end_date: date, user=None, section: Optional[str] = None,
+                       group_by: Optional[str] = None) -> Dict[Any, Dict[str, int]]:
+        start = timezone.make_aware(datetime.combine(start_date, time.min))
+        end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+        totals = MessageStatsRollupService.totals(start, end, user=user, section=section or None, group_by=group_by)
+
+        results = {}
+        for bucket, row in totals.items():
+            if group_by and not row['ai_requests']:
+                continue  # Message/workflow-only rows
+            metrics = {metric: row[field] for metric, field in cls.ROLLUP_METRICS.items()}
+            metrics['successful_requests'] = metrics['requests'] - metrics['failed_requests']
+            results[bucket] = metrics
+        return results
+
+    @classmethod
+    def aggregate(cls, start_date: date, end_date: date, user=None, section: Optional[str] = None,
+                  group_by: Optional[str] = None) -> Dict[Any, Dict[str, int]]:
+        """
+        Usage metrics for a date range, optionally grouped by 'section', 'day' or 'user'
+
+        Returns:
+            {group value: {metric: int}} - the single key is None without group_by
+        """
+        covered_from = MessageStatsRollupService.get_covered_from()
+        rollup_from = max(start_date, covered_from.date()) if covered_from else None
+
+        summaries, logs = cls.get_querysets(start_date, end_date, user=user, section=section, until=rollup_from)
+        results = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+
+        sources = [(logs, cls.LOG_METRICS, cls.LOG_GROUPS)]
+        if summaries is not None:
+            sources.append((summaries, cls.SUMMARY_METRICS, cls.SUMMARY_GROUPS))
+
+        for queryset, metrics, groups in sources:
+            if group_by:
+                rows = queryset.order_by().annotate(bucket=groups[group_by]).values('bucket').annotate(**metrics)
+            else:
+                rows = [dict(queryset.aggregate(**metrics), bucket=None)]
+            for row in rows:
+                totals = results[row['bucket']]
+                for metric in METRICS:
+                    totals[metric] += row[metric] or 0
+
+        if rollup_from is not None and rollup_from <= end_date:
+            for bucket, row in cls._rollup_totals(rollup_from, end_date, user=user, section=section,
+                                                  group_by=group_by).items():
+                totals = results[bucket]
+                for metric in METRICS:
+                    totals[metric] += row[metric]
+
+        return dict(results)
@@ -431,3 +431,28 @@ def on_aiprompts_saved_for_chunking(sender, instance, **kwargs):
         ).delete()
         if deleted[0] > 0:
             logger.info(f"✅ Deleted {deleted[0]} Manual Prompt chunks (prompt cleared)")
+
+
+# ============================================================
+# SEMANTIC ANSWER CACHE INVALIDATION
+# ============================================================
+
+@receiver(post_save, sender='AI_model.TenantKnowledge')
+@receiver(post_delete, sender='AI_model.TenantKnowledge')
+def on_tenant_knowledge_changed_invalidate_answer_cache(sender, instance, **kwargs):
+    """Cached answers are only valid for the knowledge base they were generated from"""
+    try:
+        from AI_model.services.answer_cache import SemanticAnswerCache
+        SemanticAnswerCache.invalidate(instance.user_id)
+    except Exception as e:
+        logger.error(f"❌ Failed to invalidate answer cache for user {instance.user_id}: {e}")
+
+
+@receiver(post_save, sender='settings.AIBehaviorSettings')
+def on_ai_behavior_changed_invalidate_answer_cache(sender, instance, **kwargs):
+    """Tone/length/fallback changes alter answers - drop cached ones"""
+    try:
+        from AI_model.services.answer_cache import SemanticAnswerCache
+        SemanticAnswerCache.invalidate(instance.user_id)
+    except Exception as e:
+        logger.error(f"❌ Failed to invalidate answer cache for user {instance.user_id}: {e}")
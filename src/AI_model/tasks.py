@@ -226,7 +226,7 @@ def process_ai_response_async(self, message_id):
 @shared_task
 def cleanup_old_usage_data():
     """
-    Cleanup old AI usage tracking data
+    Cleanup old AI usage tracking data and apply the AIUsageLog retention policy
     Runs periodically to keep database size manageable
     """
     try:
@@ -238,10 +238,16 @@ def cleanup_old_usage_data():
         
         logger.info(f"Cleaned up {deleted_count} old AI usage tracking records older than {cutoff_date}")
         
+        # Per-request logs: summarize old days, then delete them in batches
+        from core.retention import DataRetentionService
+        usage_logs = DataRetentionService.apply('ai_usage_log')
+        
         return {
             'success': True,
             'deleted_count': deleted_count,
-            'cutoff_date': cutoff_date.isoformat()
+            'cutoff_date': cutoff_date.isoformat(),
+            'usage_logs_deleted': usage_logs['deleted_rows'],
+            'usage_logs_archived_before': usage_logs['archived_before']
         }
         
     except Exception as e:
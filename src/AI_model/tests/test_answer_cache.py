@@ -0,0 +1,40 @@
+"""
+Test for semantic answer cache adaptation
+"""
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from AI_model.services.answer_cache import SemanticAnswerCache
+
+
+class TestAnswerCacheAdaptation:
+    """Test cases for SemanticAnswerCache._adapt_answer()"""
+    
+    def test_answer_without_name_is_reused(self):
+        """Test: Generic answer is served as-is"""
+        answer = "ارسال به تهران ۲ روز کاری طول می‌کشد."
+        assert SemanticAnswerCache._adapt_answer(answer, "امید", "سارا") == answer
+        assert SemanticAnswerCache._adapt_answer(answer, "", "") == answer
+    
+    def test_name_is_swapped(self):
+        """Test: Answer addressed to original customer gets the new name"""
+        answer = "سلام امید! قیمت این محصول ۲۰۰ هزار تومان است."
+        adapted = SemanticAnswerCache._adapt_answer(answer, "امید", "سارا")
+        assert adapted == "سلام سارا! قیمت این محصول ۲۰۰ هزار تومان است."
+    
+    def test_named_answer_without_target_name_is_miss(self):
+        """Test: Can't adapt a named answer for a customer without name"""
+        answer = "سلام امید! قیمت این محصول ۲۰۰ هزار تومان است."
+        assert SemanticAnswerCache._adapt_answer(answer, "امید", "") is None
+    
+    def test_share_context_is_not_cacheable(self):
+        """Test: Instagram share context is conversation-specific"""
+        message = "[CONTEXT: پست/ریلز اینستاگرام که کاربر فرستاده]\nکت\n[/CONTEXT]"
+        assert SemanticAnswerCache.has_conversation_context(message, object()) is True
+    
+    def test_no_conversation_is_not_cacheable(self):
+        """Test: Answers are only cached for real conversations"""
+        assert SemanticAnswerCache.has_conversation_context("قیمت چنده؟", None) is True
@@ -0,0 +1,87 @@
+"""
+Tests for token totals across the AI usage retention watermark
+"""
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from AI_model.models import AIUsageDailySummary, AIUsageLog
+from core.retention import DataRetentionService
+
+User = get_user_model()
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM, DATA_RETENTION_BATCH_PAUSE=0)
+class TokensUsedAcrossRetentionTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='tokens@example.com', password='securepassword123',
+                                             username='tokens')
+        self.day = timezone.localdate() - timedelta(days=5)
+
+    def _at(self, days, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day + timedelta(days=days), datetime.min.time())) + \
+            timedelta(hours=hour, minutes=minute)
+
+    def _log(self, at, tokens, success=True, user=None):
+        log = AIUsageLog.log_usage(user or self.user, 'chat', prompt_tokens=tokens, success=success)
+        AIUsageLog.objects.filter(id=log.id).update(created_at=at)
+
+    def _archive(self):
+        # Archive everything older than two days ago (the watermark is cached on commit)
+        with self.captureOnCommitCallbacks(execute=True):
+            DataRetentionService.archive('ai_usage_log', days=2)
+        DataRetentionService.purge('ai_usage_log')
+
+    def test_archived_totals_match_raw_totals(self):
+        self._log(self._at(0, 9, 30), 1000)          # before the billing period
+        self._log(self._at(0, 14, 10), 20)
+        self._log(self._at(0, 20), 300)
+        self._log(self._at(0, 21), 4000, success=False)
+        self._log(self._at(1, 10), 50000)
+        self._log(self._at(4, 8), 600000)           # stays raw
+        since = self._at(0, 14)
+
+        raw = (AIUsageLog.tokens_used(self.user, since), AIUsageLog.tokens_used(self.user, since, success_only=False))
+        self._archive()
+
+        self.assertTrue(AIUsageDailySummary.objects.filter(user=self.user).exists())
+        self.assertFalse(AIUsageLog.objects.filter(created_at__lt=self._at(2, 0)).exists())
+        self.assertEqual(raw, (650320, 654320))
+        self.assertEqual(AIUsageLog.tokens_used(self.user, since), raw[0])
+        self.assertEqual(AIUsageLog.tokens_used(self.user, since, success_only=False), raw[1])
+
+    def test_hours_before_a_mid_day_start_are_not_counted(self):
+        self._log(self._at(0, 9, 30), 1000)
+        self._log(self._at(0, 15, 45), 20)
+        self._archive()
+
+        self.assertEqual(AIUsageLog.tokens_used(self.user, self._at(0, 10)), 20)
+        self.assertEqual(AIUsageLog.tokens_used(self.user, self._at(0, 9)), 1020)
+
+    def test_totals_for_many_users_match_single_user_totals(self):
+        other = User.objects.create_user(email='tokens-2@example.com', password='securepassword123',
+                                         username='tokens-2')
+        idle = User.objects.create_user(email='tokens-3@example.com', password='securepassword123',
+                                        username='tokens-3')
+        self._log(self._at(0, 9, 30), 1000)
+        self._log(self._at(0, 15), 20)
+        self._log(self._at(4, 8), 300)
+        self._log(self._at(0, 8), 4000, user=other)
+        self._log(self._at(3, 12), 50000, user=other)
+        self._log(self._at(4, 9), 600000, user=other)
+        self._archive()
+
+        # Across the watermark for one user, raw logs only for the other
+        since = {self.user.pk: self._at(0, 10), other.pk: self._at(4, 0), idle.pk: self._at(0, 0)}
+        totals = AIUsageLog.tokens_used_by_user(since)
+
+        self.assertEqual(totals, {self.user.pk: 320, other.pk: 600000, idle.pk: 0})
+        for user in (self.user, other, idle):
+            self.assertEqual(AIUsageLog.tokens_used(user, since[user.pk]), totals[user.pk])
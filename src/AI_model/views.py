@@ -9,6 +9,7 @@ from django.db.models import Q
 import logging
 
 from .models import AIGlobalConfig, AIUsageTracking, AIUsageLog, TenantKnowledge, SessionMemory, IntentKeyword, IntentRouting, PGVECTOR_AVAILABLE
+from .services.usage_stats import AIUsageStatsService
 from .serializers import (
     AIGlobalConfigSerializer, AIUsageTrackingSerializer,
     AIUsageLogSerializer, AIUsageLogCreateSerializer, AIUsageLogStatsSerializer,
@@ -1133,7 +1134,6 @@ class AIUsageLogStatsAPIView(APIView):
     )
     def get(self, request):
         """Get AI usage statistics from logs"""
-        from django.db.models import Sum, Avg, Count
         from datetime import date, timedelta
         
         days = int(request.query_params.get('days', 30))
@@ -1143,86 +1143,69 @@ class AIUsageLogStatsAPIView(APIView):
         end_date = date.today()
         start_date = end_date - timedelta(days=days-1)
         
-        # Base queryset
-        queryset = AIUsageLog.objects.filter(
-            user=request.user,
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        )
-        
-        if section_filter:
-            queryset = queryset.filter(section=section_filter)
-        
-        # Aggregate totals
-        aggregates = queryset.aggregate(
-            total_requests=Count('id'),
-            sum_total_tokens=Sum('total_tokens'),
-            sum_prompt_tokens=Sum('prompt_tokens'),
-            sum_completion_tokens=Sum('completion_tokens'),
-            successful_requests=Count('id', filter=Q(success=True)),
-            failed_requests=Count('id', filter=Q(success=False)),
-            avg_response_time=Avg('response_time_ms'),
-            avg_tokens_per_request=Avg('total_tokens')
-        )
+        # Totals combine daily summaries (archived days) with raw logs
+        aggregates = AIUsageStatsService.aggregate(
+            start_date, end_date, user=request.user, section=section_filter
+        )[None]
         
         # Calculate success rate
-        total_requests = aggregates['total_requests'] or 0
-        successful_requests = aggregates['successful_requests'] or 0
+        total_requests = aggregates['requests']
+        successful_requests = aggregates['successful_requests']
         success_rate = (successful_requests / total_requests * 100) if total_requests > 0 else 0
         
         # Section breakdown
+        section_totals = AIUsageStatsService.aggregate(
+            start_date, end_date, user=request.user, section=section_filter, group_by='section'
+        )
         section_breakdown = {}
         for section_code, section_name in AIUsageLog.SECTION_CHOICES:
-            section_stats = queryset.filter(section=section_code).aggregate(
-                count=Count('id'),
-                tokens=Sum('total_tokens'),
-                avg_response_time=Avg('response_time_ms')
-            )
+            section_stats = section_totals.get(section_code)
             
-            if section_stats['count'] and section_stats['count'] > 0:
+            if section_stats and section_stats['requests'] > 0:
                 section_breakdown[section_code] = {
                     'display_name': section_name,
-                    'count': section_stats['count'],
-                    'total_tokens': section_stats['tokens'] or 0,
-                    'avg_response_time_ms': round(section_stats['avg_response_time'] or 0, 2),
-                    'percentage': round((section_stats['count'] / total_requests * 100), 2) if total_requests > 0 else 0
+                    'count': section_stats['requests'],
+                    'total_tokens': section_stats['total_tokens'],
+                    'avg_response_time_ms': round(section_stats['response_time_ms'] / section_stats['requests'], 2),
+                    'percentage': round((section_stats['requests'] / total_requests * 100), 2) if total_requests > 0 else 0
                 }
         
         # Daily breakdown
+        day_totals = AIUsageStatsService.aggregate(
+            start_date, end_date, user=request.user, section=section_filter, group_by='day'
+        )
         daily_breakdown = []
         current_date = start_date
         while current_date <= end_date:
-            day_stats = queryset.filter(created_at__date=current_date).aggregate(
-                requests=Count('id'),
-                tokens=Sum('total_tokens'),
-                successful=Count('id', filter=Q(success=True)),
-                failed=Count('id', filter=Q(success=False))
-            )
+            day_stats = day_totals.get(current_date, {})
             
             daily_breakdown.append({
                 'date': current_date.isoformat(),
-                'requests': day_stats['requests'] or 0,
-                'tokens': day_stats['tokens'] or 0,
-                'successful_requests': day_stats['successful'] or 0,
-                'failed_requests': day_stats['failed'] or 0
+                'requests': day_stats.get('requests', 0),
+                'tokens': day_stats.get('total_tokens', 0),
+                'successful_requests': day_stats.get('successful_requests', 0),
+                'failed_requests': day_stats.get('failed_requests', 0)
             })
             
             current_date += timedelta(days=1)
         
         # Recent logs (last 10)
+        _, queryset = AIUsageStatsService.get_querysets(
+            start_date, end_date, user=request.user, section=section_filter
+        )
         recent_logs = queryset.order_by('-created_at')[:10]
         recent_logs_data = AIUsageLogSerializer(recent_logs, many=True).data
         
         response_data = {
-            'total_requests': aggregates['total_requests'] or 0,
-            'total_tokens': aggregates['sum_total_tokens'] or 0,
-            'total_prompt_tokens': aggregates['sum_prompt_tokens'] or 0,
-            'total_completion_tokens': aggregates['sum_completion_tokens'] or 0,
-            'successful_requests': aggregates['successful_requests'] or 0,
-            'failed_requests': aggregates['failed_requests'] or 0,
+            'total_requests': total_requests,
+            'total_tokens': aggregates['total_tokens'],
+            'total_prompt_tokens': aggregates['prompt_tokens'],
+            'total_completion_tokens': aggregates['completion_tokens'],
+            'successful_requests': successful_requests,
+            'failed_requests': aggregates['failed_requests'],
             'success_rate': round(success_rate, 2),
-            'average_response_time_ms': round(aggregates['avg_response_time'] or 0, 2),
-            'average_tokens_per_request': round(aggregates['avg_tokens_per_request'] or 0, 2),
+            'average_response_time_ms': round(aggregates['response_time_ms'] / total_requests, 2) if total_requests else 0,
+            'average_tokens_per_request': round(aggregates['total_tokens'] / total_requests, 2) if total_requests else 0,
             'days_included': days,
             'date_range': {
                 'start': start_date.isoformat(),
@@ -1259,7 +1242,6 @@ class GlobalAIUsageLogStatsAPIView(APIView):
     )
     def get(self, request):
         """Get global AI usage statistics (staff only)"""
-        from django.db.models import Sum, Avg, Count
         from datetime import date, timedelta
         
         # Check if user is staff
@@ -1275,72 +1257,63 @@ class GlobalAIUsageLogStatsAPIView(APIView):
         end_date = date.today()
         start_date = end_date - timedelta(days=days-1)
         
-        # Get all logs for the period
-        queryset = AIUsageLog.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        )
-        
-        # Global aggregates
-        global_aggregates = queryset.aggregate(
-            total_requests=Count('id'),
-            sum_total_tokens=Sum('total_tokens'),
-            sum_prompt_tokens=Sum('prompt_tokens'),
-            sum_completion_tokens=Sum('completion_tokens'),
-            successful_requests=Count('id', filter=Q(success=True)),
-            failed_requests=Count('id', filter=Q(success=False)),
-            avg_response_time=Avg('response_time_ms')
-        )
+        # Global aggregates (daily summaries for archived days + raw logs)
+        global_aggregates = AIUsageStatsService.aggregate(start_date, end_date)[None]
+        user_totals = AIUsageStatsService.aggregate(start_date, end_date, group_by='user')
         
         # Count unique users
-        total_users = queryset.values('user').distinct().count()
+        total_users = len(user_totals)
         
         # Calculate success rate
-        total_requests = global_aggregates['total_requests'] or 0
-        successful_requests = global_aggregates['successful_requests'] or 0
+        total_requests = global_aggregates['requests']
+        successful_requests = global_aggregates['successful_requests']
         success_rate = (successful_requests / total_requests * 100) if total_requests > 0 else 0
         
         # Section breakdown
+        section_totals = AIUsageStatsService.aggregate(start_date, end_date, group_by='section')
         section_breakdown = {}
         for section_code, section_name in AIUsageLog.SECTION_CHOICES:
-            section_stats = queryset.filter(section=section_code).aggregate(
-                count=Count('id'),
-                tokens=Sum('total_tokens')
-            )
+            section_stats = section_totals.get(section_code)
             
-            if section_stats['count'] and section_stats['count'] > 0:
+            if section_stats and section_stats['requests'] > 0:
                 section_breakdown[section_code] = {
                     'display_name': section_name,
-                    'count': section_stats['count'],
-                    'total_tokens': section_stats['tokens'] or 0,
-                    'percentage': round((section_stats['count'] / total_requests * 100), 2) if total_requests > 0 else 0
+                    'count': section_stats['requests'],
+                    'total_tokens': section_stats['total_tokens'],
+                    'percentage': round((section_stats['requests'] / total_requests * 100), 2) if total_requests > 0 else 0
                 }
         
         # Top users by request count
-        top_users = queryset.values(
-            'user__username', 'user__email'
-        ).annotate(
-            user_total_requests=Count('id'),
-            user_total_tokens=Sum('total_tokens')
-        ).order_by('-user_total_requests')[:10]
+        from django.contrib.auth import get_user_model
+        top_user_ids = sorted(user_totals, key=lambda user_id: user_totals[user_id]['requests'], reverse=True)[:10]
+        users = get_user_model().objects.in_bulk(top_user_ids)
+        top_users = [
+            {
+                'user__username': users[user_id].username if user_id in users else None,
+                'user__email': users[user_id].email if user_id in users else None,
+                'user_total_requests': user_totals[user_id]['requests'],
+                'user_total_tokens': user_totals[user_id]['total_tokens'],
+            }
+            for user_id in top_user_ids
+        ]
         
         response_data = {
             'total_users': total_users,
-            'total_requests': global_aggregates['total_requests'] or 0,
-            'total_tokens': global_aggregates['sum_total_tokens'] or 0,
-            'total_prompt_tokens': global_aggregates['sum_prompt_tokens'] or 0,
-            'total_completion_tokens': global_aggregates['sum_completion_tokens'] or 0,
-            'successful_requests': global_aggregates['successful_requests'] or 0,
-            'failed_requests': global_aggregates['failed_requests'] or 0,
+            'total_requests': total_requests,
+            'total_tokens': global_aggregates['total_tokens'],
+            'total_prompt_tokens': global_aggregates['prompt_tokens'],
+            'total_completion_tokens': global_aggregates['completion_tokens'],
+            'successful_requests': successful_requests,
+            'failed_requests': global_aggregates['failed_requests'],
             'success_rate': round(success_rate, 2),
-            'average_response_time_ms': round(global_aggregates['avg_response_time'] or 0, 2),
+            'average_response_time_ms': round(global_aggregates['response_time_ms'] / total_requests, 2) if total_requests else 0,
             'days_included': days,
             'date_range': {
                 'start': start_date.isoformat(),
                 'end': end_date.isoformat()
             },
             'by_section': section_breakdown,
-            'top_users': list(top_users),
+            'top_users': top_users,
         }
         
         return Response(response_data, status=status.HTTP_200_OK)
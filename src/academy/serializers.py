@@ -209,6 +209,22 @@ class VideoWithProgressSerializer(serializers.ModelSerializer):
             # Get language from request parameter, default to persian
             language = request.query_params.get('lang') or request.query_params.get('language') or 'persian'
             
+            # Joined by LearningStatsService.annotate_user_progress (no query per video)
+            if hasattr(obj, 'progress_status'):
+                if obj.progress_status is None:
+                    return {
+                        'language': language,
+                        'status': 'not_started',
+                        'progress_percentage': 0.00,
+                        'last_watched_at': None
+                    }
+                return {
+                    'language': language,
+                    'status': obj.progress_status,
+                    'progress_percentage': obj.progress_percentage,
+                    'last_watched_at': obj.progress_last_watched_at
+                }
+            
             try:
                 progress = UserVideoProgress.objects.get(user=request.user, video=obj, language=language)
                 return {
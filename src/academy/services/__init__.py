@@ -0,0 +1 @@
+# Academy services
@@ -0,0 +1,179 @@
+"""
+Academy learning statistics
+
+user_statistics used to run a COUNT per status, load every video id into a
+Python set and sum durations by iterating over all videos and completed
+progress rows; video lists fetched each user's progress with one query per
+video.
+
+✅ Statistics: one query - videos LEFT JOIN the user's progress, grouped
+   per video, then summed (counts and durations in SQL)
+✅ Video lists: the user's progress for the requested language is joined
+   and annotated (progress_status / progress_percentage / progress_last_watched_at)
+✅ Results cached per user and filter; update_video_progress bumps the
+   user's version so every cached variant is dropped at once
+
+Usage:
+    LearningStatsService.get_statistics(user, language='english', tag='onboarding')
+    LearningStatsService.annotate_user_progress(Video.objects.all(), user, 'persian')
+    LearningStatsService.invalidate(user.id)
+"""
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Case, Count, ExpressionWrapper, F, FilteredRelation, IntegerField, Q, QuerySet, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+
+from academy.models import Video
+
+LANGUAGES = [code for code, _ in Video.LANGUAGE_CHOICES]
+PROGRESS_STATUSES = ['not_started', 'in_progress', 'complete']
+
+
+def language_filter(language: str) -> Q:
+    """Videos with a title or a video file in the language"""
+    title_field = f'title_{language}'
+    video_field = f'video_file_{language}'
+    condition = Q(**{f'{title_field}__isnull': False}) & Q(**{f'{title_field}__gt': ''})
+    return condition | Q(**{f'{video_field}__isnull': False})
+
+
+class LearningStatsService:
+    """Aggregate academy progress statistics and annotate video lists"""
+
+    # Redis key holding the current statistics version per user
+    VERSION_KEY = 'academy:stats_version:{user_id}'
+    STATS_KEY = 'academy:stats:{user_id}:{version}:{filters}'
+
+    # ==========================================
+    #  Per-user progress
+    # ==========================================
+
+    @classmethod
+    def annotate_user_progress(cls, queryset: QuerySet, user, language: str) -> QuerySet:
+        """
+        Join the user's progress row for `language` onto each video
+
+        (user, video, language) is unique, so the join never duplicates videos.
+        Videos without progress get progress_status=None.
+        """
+        return queryset.annotate(
+            my_progress=FilteredRelation(
+                'user_progress',
+                condition=Q(user_progress__user=user, user_progress__language=language),
+            ),
+            progress_status=F('my_progress__status'),
+            progress_percentage=F('my_progress__progress_percentage'),
+            progress_last_watched_at=F('my_progress__last_watched_at'),
+        )
+
+    @classmethod
+    def filter_by_status(cls, queryset: QuerySet, status: str) -> QuerySet:
+        """Filter a queryset annotated by annotate_user_progress (no progress row = not started)"""
+        if status == 'not_started':
+            return queryset.filter(Q(progress_status__isnull=True) | Q(progress_status='not_started'))
+        return queryset.filter(progress_status=status)
+
+    # ==========================================
+    #  Statistics
+    # ==========================================
+
+    @classmethod
+    def compute_statistics(cls, user, language: Optional[str] = None, tag: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Learning statistics of a user in one grouped aggregate query
+
+        Progress counts cover the user's progress rows (of `language` when
+        given); video totals cover videos available in `language`.
+        """
+        progress_condition = Q(user_progress__user=user)
+        if language:
+            progress_condition &= Q(user_progress__language=language)
+
+        videos = Video.objects.order_by()
+        if tag:
+            videos = videos.filter(tag__icontains=tag)
+
+        in_catalog = language_filter(language) if language in LANGUAGES else Q(pk__isnull=False)
+        per_video = videos.annotate(
+            progress=FilteredRelation('user_progress', condition=progress_condition),
+            in_catalog=Case(When(in_catalog, then=Value(1)), default=Value(0), output_field=IntegerField()),
+            duration=ExpressionWrapper(F('video_minutes') * 60 + F('video_seconds'), output_field=IntegerField()),
+            progress_rows=Count('progress'),
+            complete_rows=Count('progress', filter=Q(progress__status='complete')),
+            in_progress_rows=Count('progress', filter=Q(progress__status='in_progress')),
+            not_started_rows=Count('progress', filter=Q(progress__status='not_started')),
+        )
+        totals = per_video.aggregate(
+            total_videos=Coalesce(Sum('in_catalog'), 0),
+            completed_videos=Coalesce(Sum('complete_rows'), 0),
+            in_progress_videos=Coalesce(Sum('in_progress_rows'), 0),
+            not_started_with_progress=Coalesce(Sum('not_started_rows'), 0),
+            videos_without_progress=Coalesce(Sum(Case(
+                When(in_catalog=1, progress_rows=0, then=Value(1)), default=Value(0), output_field=IntegerField(),
+            )), 0),
+            seconds_completed=Coalesce(Sum(F('complete_rows') * F('duration')), 0),
+            seconds_available=Coalesce(Sum(F('in_catalog') * F('duration')), 0),
+        )
+
+        total_videos = totals['total_videos']
+        completed_videos = totals['completed_videos']
+        total_minutes_completed, total_seconds_completed = divmod(totals['seconds_completed'], 60)
+        total_minutes_available, total_seconds_available = divmod(totals['seconds_available'], 60)
+
+        statistics = {
+            'total_videos': total_videos,
+            'completed_videos': completed_videos,
+            'in_progress_videos': totals['in_progress_videos'],
+            'not_started_videos': totals['videos_without_progress'] + totals['not_started_with_progress'],
+            'total_minutes_completed': total_minutes_completed,
+            'total_seconds_completed': total_seconds_completed,
+            'total_duration_completed': f"{total_minutes_completed}m {total_seconds_completed}s",
+            'total_minutes_available': total_minutes_available,
+            'total_seconds_available': total_seconds_available,
+            'total_duration_available': f"{total_minutes_available}m {total_seconds_available}s",
+            'completion_percentage': round((completed_videos / total_videos * 100), 2) if total_videos > 0 else 0,
+            'duration_completion_percentage': (
+                round((totals['seconds_completed'] / totals['seconds_available'] * 100), 2)
+                if totals['seconds_available'] > 0 else 0
+            ),
+        }
+
+        if language:
+            statistics['language'] = language
+        if tag:
+            statistics['tag'] = tag
+        return statistics
+
+    @classmethod
+    def get_version(cls, user_id) -> str:
+        key = cls.VERSION_KEY.format(user_id=user_id)
+        version = cache.get(key)
+        if version is None:
+            version = str(time.time_ns())
+            # add() so concurrent requests agree on a single version
+            if not cache.add(key, version, settings.ACADEMY_STATS_CACHE_TTL * 2):
+                version = cache.get(key) or version
+        return version
+
+    @classmethod
+    def get_statistics(cls, user, language: Optional[str] = None, tag: Optional[str] = None) -> Dict[str, Any]:
+        """Cached compute_statistics (until the user's progress changes or ACADEMY_STATS_CACHE_TTL)"""
+        filters = hashlib.md5(f'{language or ""}|{tag or ""}'.encode()).hexdigest()
+        key = cls.STATS_KEY.format(user_id=user.id, version=cls.get_version(user.id), filters=filters)
+
+        statistics = cache.get(key)
+        if statistics is None:
+            statistics = cls.compute_statistics(user, language=language, tag=tag)
+            cache.set(key, statistics, settings.ACADEMY_STATS_CACHE_TTL)
+        return statistics
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """Drop every cached statistics variant of a user (called on progress updates)"""
+        cache.set(cls.VERSION_KEY.format(user_id=user_id), str(time.time_ns()), settings.ACADEMY_STATS_CACHE_TTL * 2)
@@ -0,0 +1,177 @@
+"""
+Range-aware file responses for academy videos
+
+Video players seek with `Range: bytes=...` requests and re-validate with
+`If-None-Match` / `If-Range`; streaming the whole file through Python for
+every seek made scrubbing slow and pinned a worker per viewer.
+
+✅ Single `bytes=` ranges answered with 206 Partial Content (416 when
+   unsatisfiable); multi-range requests get the whole file
+✅ Strong ETag (mtime + size) and Last-Modified, with 304 for
+   If-None-Match / If-Modified-Since and If-Range validation
+✅ Reads of ACADEMY_VIDEO_CHUNK_SIZE aligned to chunk boundaries
+✅ Optional ACADEMY_VIDEO_OFFLOAD: hand the file to nginx (X-Accel-Redirect)
+   or Apache/lighttpd (X-Sendfile) after the permission checks
+
+Usage:
+    return ranged_file_response(request, video_file, 'video/mp4', f'inline; filename="{title}.mp4"')
+"""
+import os
+import re
+from typing import Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe, parse_etags
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_iterator(file_name: str, chunk_size: int = 8192, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Yield `length` bytes of the file from `start` (to EOF when None)
+
+    The first read stops at the next chunk boundary so every following
+    read is chunk-aligned on disk.
+    """
+    remaining = length
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        to_read = chunk_size - (start % chunk_size)
+        while remaining is None or remaining > 0:
+            if remaining is not None:
+                to_read = min(to_read, remaining)
+            chunk = f.read(to_read)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+            to_read = chunk_size
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (first, last) byte positions of a single `bytes=` range
+
+    Returns:
+        None when the header should be ignored (missing, malformed or
+        multi-range), (size, size) when it is unsatisfiable
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if size == 0:
+        return size, size
+
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0:
+            return size, size
+        return max(size - suffix, 0), size - 1
+
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        return size, size
+    last = min(int(last), size - 1) if last else size - 1
+    return first, last
+
+
+def file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _not_modified(request, etag: str, mtime: int) -> bool:
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        # Weak comparison: a W/ prefix still matches
+        return '*' in etags or any(tag.removeprefix('W/') == etag for tag in etags)
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and mtime <= if_modified_since
+
+
+def _range_allowed(request, etag: str, last_modified: str) -> bool:
+    """If-Range: only honour the range while the client's copy is current (strong comparison)"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return if_range == last_modified
+
+
+def _offload_response(file_name: str, path: str) -> Optional[HttpResponse]:
+    mode = settings.ACADEMY_VIDEO_OFFLOAD
+    if mode == 'x-accel':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = settings.ACADEMY_VIDEO_ACCEL_PREFIX.rstrip('/') + '/' + file_name.lstrip('/')
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+    return None
+
+
+def ranged_file_response(request, field_file, content_type: str, content_disposition: str) -> HttpResponse:
+    """
+    Serve a locally stored file with Range and conditional request support
+
+    Args:
+        request: Incoming request (Range / If-* headers are read from it)
+        field_file: FieldFile on local storage
+        content_type: Content-Type of the full representation
+        content_disposition: Content-Disposition header value
+    """
+    path = field_file.path
+    stat = os.stat(path)
+    size = stat.st_size
+    mtime = int(stat.st_mtime)
+    etag = file_etag(stat)
+    last_modified = http_date(mtime)
+
+    if _not_modified(request, etag, mtime):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        response['Last-Modified'] = last_modified
+        return response
+
+    # nginx/Apache serve Range and conditional headers themselves
+    response = _offload_response(field_file.name, path)
+    if response is None:
+        byte_range = None
+        if _range_allowed(request, etag, last_modified):
+            byte_range = parse_range(request.META.get('HTTP_RANGE', ''), size)
+
+        if byte_range == (size, size):
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+        chunk_size = settings.ACADEMY_VIDEO_CHUNK_SIZE
+        if byte_range:
+            first, last = byte_range
+            length = last - first + 1
+            response = StreamingHttpResponse(file_iterator(path, chunk_size, first, length), status=206)
+            response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        else:
+            length = size
+            response = StreamingHttpResponse(file_iterator(path, chunk_size))
+        response['Content-Length'] = str(length)
+
+    response['Content-Type'] = content_type
+    response['Content-Disposition'] = content_disposition
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
@@ -1,3 +1,160 @@
-from django.test import TestCase
+import os
+import tempfile
+from types import SimpleNamespace
 
-# Create your tests here.
\ No newline at end of file
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from academy.models import UserVideoProgress, Video
+from academy.services.learning_stats import LearningStatsService
+from academy.streaming import file_iterator, parse_range, ranged_file_response
+
+User = get_user_model()
+
+
+@override_settings(ACADEMY_VIDEO_CHUNK_SIZE=4096, ACADEMY_VIDEO_OFFLOAD='')
+class RangedFileResponseTest(SimpleTestCase):
+
+    def setUp(self):
+        self.content = bytes(range(256)) * 40  # 10240 bytes
+        handle, self.path = tempfile.mkstemp(suffix='.mp4')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(self.content)
+        self.addCleanup(os.remove, self.path)
+        self.file = SimpleNamespace(path=self.path, name='academy/videos/intro.mp4')
+        self.factory = RequestFactory()
+
+    def _get(self, **headers):
+        request = self.factory.get('/', **headers)
+        return ranged_file_response(request, self.file, 'video/mp4', 'inline; filename="intro.mp4"')
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=500-5000', 1000), (500, 999))
+        self.assertEqual(parse_range('bytes=1000-', 1000), (1000, 1000))
+        self.assertIsNone(parse_range('bytes=0-1,5-9', 1000))
+        self.assertIsNone(parse_range('items=0-1', 1000))
+        self.assertIsNone(parse_range('bytes=9-1', 1000))
+        self.assertEqual(parse_range('bytes=-10', 0), (0, 0))
+
+    def test_reads_are_aligned_after_the_first_chunk(self):
+        chunks = list(file_iterator(self.path, 4096, start=1000, length=8000))
+        self.assertEqual([len(chunk) for chunk in chunks], [3096, 4096, 808])
+        self.assertEqual(b''.join(chunks), self.content[1000:9000])
+
+    def test_full_response_has_validators(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], '10240')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_range_returns_partial_content(self):
+        response = self._get(HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/10240')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+    def test_unsatisfiable_range(self):
+        response = self._get(HTTP_RANGE='bytes=20000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10240')
+
+    def test_conditional_requests(self):
+        etag = self._get()['ETag']
+
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self._get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        # Stale If-Range: the whole (changed) file is sent instead of the range
+        self.assertEqual(self._get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"').status_code, 200)
+
+    @override_settings(ACADEMY_VIDEO_OFFLOAD='x-accel', ACADEMY_VIDEO_ACCEL_PREFIX='/protected-media/')
+    def test_x_accel_offload(self):
+        response = self._get(HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/academy/videos/intro.mp4')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(ACADEMY_VIDEO_OFFLOAD='x-sendfile')
+    def test_x_sendfile_offload(self):
+        self.assertEqual(self._get()['X-Sendfile'], self.path)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class LearningStatisticsTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='learner@example.com', password='securepassword123',
+                                            username='learner')
+        other = User.objects.create_user(email='other@example.com', password='securepassword123', username='other')
+
+        cls.intro = Video.objects.create(title='Intro', description='-', tag='basics', video_minutes=5,
+                                         video_seconds=40, title_english='Intro')
+        cls.setup = Video.objects.create(title='Setup', description='-', tag='basics', video_minutes=3,
+                                         video_seconds=30)
+        cls.advanced = Video.objects.create(title='Advanced', description='-', tag='advanced', video_minutes=1)
+        UserVideoProgress.objects.create(user=cls.user, video=cls.intro, language='persian', progress_percentage=100)
+        UserVideoProgress.objects.create(user=cls.user, video=cls.intro, language='english', progress_percentage=100)
+        UserVideoProgress.objects.create(user=cls.user, video=cls.setup, language='persian', progress_percentage=50)
+        UserVideoProgress.objects.create(user=other, video=cls.advanced, language='persian', progress_percentage=100)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_statistics_in_one_query(self):
+        with self.assertNumQueries(1):
+            statistics = LearningStatsService.compute_statistics(self.user)
+
+        self.assertEqual(statistics['total_videos'], 3)
+        self.assertEqual(statistics['completed_videos'], 2)
+        self.assertEqual(statistics['in_progress_videos'], 1)
+        self.assertEqual(statistics['not_started_videos'], 1)
+        self.assertEqual(statistics['total_duration_completed'], '11m 20s')
+        self.assertEqual(statistics['total_duration_available'], '10m 10s')
+
+        persian = LearningStatsService.compute_statistics(self.user, language='persian', tag='basics')
+        self.assertEqual(persian['completed_videos'], 1)
+        self.assertEqual(persian['total_duration_completed'], '5m 40s')
+
+    def test_statistics_are_cached_until_progress_changes(self):
+        url = reverse('academy:user-statistics')
+        self.assertEqual(self.client.get(url).data['in_progress_videos'], 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse(any('academy_video' in query['sql'] for query in queries.captured_queries))
+
+        self.client.post(reverse('academy:update-video-progress', args=[self.setup.id]),
+                         {'progress_percentage': 100, 'language': 'persian'})
+        statistics = self.client.get(url).data
+        self.assertEqual(statistics['in_progress_videos'], 0)
+        self.assertEqual(statistics['completed_videos'], 3)
+
+    def test_video_list_joins_progress(self):
+        for i in range(10):
+            Video.objects.create(title=f'Extra {i}', description='-', tag='extra')
+        url = reverse('academy:video-list')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'page_size': 20})
+        with CaptureQueriesContext(connection) as small_page:
+            self.client.get(url, {'page_size': 2})
+        self.assertEqual(len(queries), len(small_page))
+
+        progress = {row['id']: row['user_progress']['status'] for row in response.data['results']}
+        self.assertEqual(progress[self.intro.id], 'complete')
+        self.assertEqual(progress[self.advanced.id], 'not_started')
+
+        not_started = self.client.get(reverse('academy:videos-by-status'), {'status': 'not_started'}).data
+        self.assertIn(self.advanced.id, {row['id'] for row in not_started['results']})
+        self.assertNotIn(self.setup.id, {row['id'] for row in not_started['results']})
@@ -24,19 +24,8 @@ from .serializers import (
     VideoWithProgressSerializer,
     UpdateProgressSerializer
 )
-
-
-def file_iterator(file_name, chunk_size=8192):
-    """
-    Generator function that yields file chunks asynchronously.
-    This resolves the StreamingHttpResponse warning about synchronous iterators.
-    """
-    with open(file_name, 'rb') as f:
-        while True:
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
-            yield chunk
+from .services.learning_stats import LANGUAGES, PROGRESS_STATUSES, LearningStatsService, language_filter
+from .streaming import ranged_file_response
 
 
 class CustomPagination(PageNumberPagination):
@@ -70,8 +59,10 @@ class VideoListView(generics.ListAPIView):
         """
         Filter videos by tag, language availability, and user progress status
         """
-        queryset = Video.objects.all()
         user = self.request.user
+        language = self.request.query_params.get('lang') or self.request.query_params.get('language')
+        # Progress is shown (and filtered) for the requested language, persian by default
+        queryset = LearningStatsService.annotate_user_progress(Video.objects.all(), user, language or 'persian')
         
         # Filter by tag
         tag = self.request.query_params.get('tag')
@@ -79,32 +70,14 @@ class VideoListView(generics.ListAPIView):
             queryset = queryset.filter(tag__icontains=tag)
         
         # Filter by language availability
-        language = self.request.query_params.get('lang') or self.request.query_params.get('language')
-        if language and language in ['persian', 'arabic', 'english', 'turkish']:
+        if language and language in LANGUAGES:
             # Filter videos that have content in the specified language
-            title_field = f'title_{language}'
-            video_field = f'video_file_{language}'
-            
-            language_filter = Q(**{f'{title_field}__isnull': False}) & Q(**{f'{title_field}__gt': ''})
-            language_filter |= Q(**{f'{video_field}__isnull': False})
-            
-            queryset = queryset.filter(language_filter)
+            queryset = queryset.filter(language_filter(language))
         
         # Filter by progress status
         status_filter = self.request.query_params.get('status')
-        if status_filter and status_filter in ['not_started', 'in_progress', 'complete']:
-            if status_filter == 'not_started':
-                # Videos with no progress record or status = 'not_started'
-                queryset = queryset.filter(
-                    Q(user_progress__user=user, user_progress__status='not_started') |
-                    Q(user_progress__isnull=True)
-                ).distinct()
-            else:
-                # Videos with specific progress status
-                queryset = queryset.filter(
-                    user_progress__user=user,
-                    user_progress__status=status_filter
-                ).distinct()
+        if status_filter and status_filter in PROGRESS_STATUSES:
+            queryset = LearningStatsService.filter_by_status(queryset, status_filter)
         
         return queryset
 
@@ -113,10 +86,13 @@ class VideoDetailView(generics.RetrieveAPIView):
     """
     Retrieve a specific video with user progress information
     """
-    queryset = Video.objects.all()
     serializer_class = VideoWithProgressSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        language = self.request.query_params.get('lang') or self.request.query_params.get('language') or 'persian'
+        return LearningStatsService.annotate_user_progress(Video.objects.all(), self.request.user, language)
+
 
 class UserProgressListView(generics.ListAPIView):
     """
@@ -191,6 +167,7 @@ def update_video_progress(request, video_id):
         
         progress.last_watched_at = timezone.now()
         progress.save()  # This will auto-update the status based on progress_percentage
+        LearningStatsService.invalidate(request.user.id)
         
         return Response({
             'message': 'Progress updated successfully',
@@ -240,83 +217,8 @@ def user_statistics(request):
     language = request.query_params.get('lang') or request.query_params.get('language')
     tag = request.query_params.get('tag')
     
-    # Filter user progress by language if specified
-    user_progress = UserVideoProgress.objects.filter(user=request.user)
-    total_videos_query = Video.objects.all()
-    
-    if language:
-        user_progress = user_progress.filter(language=language)
-        # Filter videos that have content in the specified language
-        title_field = f'title_{language}'
-        video_field = f'video_file_{language}'
-        
-        language_filter = Q(**{f'{title_field}__isnull': False}) & Q(**{f'{title_field}__gt': ''})
-        language_filter |= Q(**{f'{video_field}__isnull': False})
-        
-        total_videos_query = total_videos_query.filter(language_filter)
-    
-    if tag:
-        user_progress = user_progress.filter(video__tag__icontains=tag)
-        total_videos_query = total_videos_query.filter(tag__icontains=tag)
-    
-    total_videos = total_videos_query.count()
-    completed_videos = user_progress.filter(status='complete').count()
-    in_progress_videos = user_progress.filter(status='in_progress').count()
-    
-    # Calculate not started videos more accurately
-    # For videos that have progress, count those with not_started status
-    # For videos without progress records, they are also not_started
-    videos_with_progress = user_progress.values_list('video_id', flat=True).distinct()
-    total_video_ids = set(total_videos_query.values_list('id', flat=True))
-    videos_without_progress = total_video_ids - set(videos_with_progress)
-    not_started_with_progress = user_progress.filter(status='not_started').count()
-    not_started_videos = len(videos_without_progress) + not_started_with_progress
-    
-    total_minutes_completed = 0
-    total_seconds_completed = 0
-    for progress in user_progress.filter(status='complete').select_related('video'):
-        total_minutes_completed += progress.video.video_minutes
-        total_seconds_completed += progress.video.video_seconds
-    
-    # Convert excess seconds to minutes
-    total_minutes_completed += total_seconds_completed // 60
-    total_seconds_completed = total_seconds_completed % 60
-    
-    # Calculate total available duration
-    total_minutes_available = 0
-    total_seconds_available = 0
-    for video in total_videos_query:
-        total_minutes_available += video.video_minutes
-        total_seconds_available += video.video_seconds
-    
-    # Convert excess seconds to minutes
-    total_minutes_available += total_seconds_available // 60
-    total_seconds_available = total_seconds_available % 60
-    
-    # Convert to total seconds for percentage calculation
-    total_duration_completed_seconds = total_minutes_completed * 60 + total_seconds_completed
-    total_duration_available_seconds = total_minutes_available * 60 + total_seconds_available
-    
-    statistics = {
-        'total_videos': total_videos,
-        'completed_videos': completed_videos,
-        'in_progress_videos': in_progress_videos,
-        'not_started_videos': not_started_videos,
-        'total_minutes_completed': total_minutes_completed,
-        'total_seconds_completed': total_seconds_completed,
-        'total_duration_completed': f"{total_minutes_completed}m {total_seconds_completed}s",
-        'total_minutes_available': total_minutes_available,
-        'total_seconds_available': total_seconds_available,
-        'total_duration_available': f"{total_minutes_available}m {total_seconds_available}s",
-        'completion_percentage': round((completed_videos / total_videos * 100), 2) if total_videos > 0 else 0,
-        'duration_completion_percentage': round((total_duration_completed_seconds / total_duration_available_seconds * 100), 2) if total_duration_available_seconds > 0 else 0
-    }
-    
-    # Add filter information to response
-    if language:
-        statistics['language'] = language
-    if tag:
-        statistics['tag'] = tag
+    # One aggregate query, cached until the user's progress changes
+    statistics = LearningStatsService.get_statistics(request.user, language=language, tag=tag)
     
     return Response(statistics, status=status.HTTP_200_OK)
 
@@ -345,7 +247,7 @@ def videos_by_status(request):
     tag = request.query_params.get('tag', '')
     
     user = request.user
-    queryset = Video.objects.all()
+    queryset = LearningStatsService.annotate_user_progress(Video.objects.all(), user, language)
     
     # Apply search filter
     if search:
@@ -368,20 +270,8 @@ def videos_by_status(request):
     if tag:
         queryset = queryset.filter(tag__icontains=tag)
     
-    # Filter by progress status
-    if status_filter == 'not_started':
-        # Videos with no progress record or status = 'not_started'
-        queryset = queryset.filter(
-            Q(user_progress__user=user, user_progress__language=language, user_progress__status='not_started') |
-            Q(user_progress__isnull=True)
-        ).distinct()
-    else:
-        # Videos with specific progress status
-        queryset = queryset.filter(
-            user_progress__user=user,
-            user_progress__language=language,
-            user_progress__status=status_filter
-        ).distinct()
+    # Filter by progress status (videos without a progress row are not started)
+    queryset = LearningStatsService.filter_by_status(queryset, status_filter)
     
     # Apply pagination
     paginator = CustomPagination()
@@ -427,22 +317,11 @@ def stream_video(request, video_id):
             signed_url = video_file.storage.url(video_file.name)
             return HttpResponseRedirect(signed_url)
         else:
-            # For local storage, use StreamingHttpResponse with async iterator
-            # This fixes the Django warning about synchronous iterators
-            file_size = os.path.getsize(video_file.path)
-            response = StreamingHttpResponse(
-                file_iterator(video_file.path),
-                content_type='video/mp4'
-            )
-            
-            # Set headers for video streaming
-            response['Accept-Ranges'] = 'bytes'
-            response['Content-Length'] = file_size
-            
-            # Use localized title for filename
+            # For local storage, answer Range / conditional requests (or offload to the web server)
             localized_title = video.get_localized_title(language)
-            response['Content-Disposition'] = f'inline; filename="{localized_title}.mp4"'
-            
+            response = ranged_file_response(
+                request, video_file, 'video/mp4', f'inline; filename="{localized_title}.mp4"'
+            )
             return response
             
     except Exception as e:
@@ -487,13 +366,11 @@ def download_video(request, video_id):
             # The browser will handle the download based on Content-Disposition header set by S3
             return HttpResponseRedirect(signed_url)
         else:
-            # For local storage, use StreamingHttpResponse with async iterator
-            # This fixes the Django warning about synchronous iterators
-            response = StreamingHttpResponse(
-                file_iterator(video_file.path),
-                content_type='application/octet-stream'
+            # For local storage, answer Range / conditional requests (or offload to the web server)
+            response = ranged_file_response(
+                request, video_file, 'application/octet-stream',
+                f'attachment; filename="{localized_title}.{file_extension}"'
             )
-            response['Content-Disposition'] = f'attachment; filename="{localized_title}.{file_extension}"'
             return response
             
     except Exception as e:
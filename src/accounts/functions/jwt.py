@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta
 import jwt
 import hashlib
+import uuid
 from django.core.cache import cache
 from django.utils import timezone
 from django.conf import settings
 from accounts.selectors import user_exists
 from core.settings import ACCESS_TTL, JWT_SECRET, REFRESH_TTL
+from accounts.functions.token_cache import invalidate_token
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,10 +26,12 @@ def __gen_tokens(user_id):
         "user_id": user_id,
         "created_at": timezone.now().strftime("%Y-%m-%d %H:%M:%S %z"),
         "type": "access",
+        "jti": uuid.uuid4().hex,
     }
     access_token = gen_token(data=data)
     data["type"] = "refresh"
     data["access"] = access_token
+    data["jti"] = uuid.uuid4().hex
     refresh_token = gen_token(data=data)
     # Use SHA256 hash of token as cache key to avoid length issues
     access_key = hashlib.sha256(access_token.encode()).hexdigest()
@@ -130,10 +134,12 @@ def refresh(token):
     # Use SHA256 hash for cache keys
     refresh_key = hashlib.sha256(token.encode()).hexdigest()
     cache.delete(f"jwt_refresh_{refresh_key}")
+    invalidate_token(token)
     data_access = jwt_data.get("access")
     if data_access:
         access_key = hashlib.sha256(data_access.encode()).hexdigest()
         cache.delete(f"jwt_access_{access_key}")
+        invalidate_token(data_access)
     user_id = jwt_data.get("user_id")
     return __gen_tokens(user_id=user_id)
 
@@ -144,6 +150,8 @@ def expire(token):
         token_key = hashlib.sha256(token.encode()).hexdigest()
         cache.delete(f"jwt_access_{token_key}")
         cache.delete(f"jwt_refresh_{token_key}")
+        # Cached WebSocket user snapshot of this token
+        invalidate_token(token)
         return True
     except Exception:
         return False
@@ -0,0 +1,143 @@
+"""
+Short-lived cache of validated JWT -> user snapshot
+
+WebSocket dashboards reconnect in bursts (deploys, network blips). Every
+connect used to validate the token (user lookup) and load the user again.
+Here a validated token maps, for WS_AUTH_CACHE_TTL seconds, to a snapshot of
+the user's fields, so repeated connects with the same token skip the database.
+
+Cache key: the token's `jti` claim (SHA-256 of the token for tokens issued
+before tokens carried a jti).
+
+Invalidation:
+✅ expire(token) - logout / account deletion drops the token's snapshot
+✅ invalidate_user(user_id) - password change, deactivation and deletion bump
+   a per-user version that every cached snapshot is checked against
+"""
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'ws_auth:token:{token_id}'
+VERSION_KEY = 'ws_auth:user_version:{user_id}'
+
+# Never cached: the snapshot must not carry credentials
+EXCLUDED_FIELDS = ('password',)
+
+
+def get_token_id(token: str, payload: Optional[dict] = None) -> str:
+    """jti claim of the token, or its SHA-256 for tokens without one"""
+    if payload and payload.get('jti'):
+        return str(payload['jti'])
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _snapshot(user) -> dict:
+    return {
+        field.attname: field.get_prep_value(getattr(user, field.attname))
+        for field in user._meta.concrete_fields
+        if field.attname not in EXCLUDED_FIELDS
+    }
+
+
+def _from_snapshot(fields: dict):
+    from accounts.models import User
+    # Missing fields (password) become deferred and load lazily if accessed
+    return User.from_db('default', list(fields), list(fields.values()))
+
+
+def _get_ttl(payload: dict) -> int:
+    """Configured TTL, capped at the token's remaining lifetime"""
+    ttl = settings.WS_AUTH_CACHE_TTL
+    try:
+        created_at = datetime.strptime(payload['created_at'], "%Y-%m-%d %H:%M:%S %z")
+        lifetime = settings.REFRESH_TTL if payload.get('type') == 'refresh' else settings.ACCESS_TTL
+        remaining = (created_at + timedelta(days=lifetime) - timezone.now()).total_seconds()
+        return max(0, min(ttl, int(remaining)))
+    except (KeyError, TypeError, ValueError):
+        return ttl
+
+
+def get_user_for_token(token: str, check_time: bool = True):
+    """
+    Validate a JWT and return its (active) user, using the snapshot cache
+
+    Synchronous - wrap with database_sync_to_async in async code. A cache hit
+    does not touch the database.
+
+    Returns:
+        User instance or None if the token is invalid or the user is inactive
+    """
+    from accounts.functions.jwt import claim_token, validate_token
+    from accounts.models import User
+
+    try:
+        payload = claim_token(token)
+    except jwt.InvalidTokenError:
+        return None
+
+    user_id = payload.get('user_id')
+    if not user_id:
+        return None
+
+    snapshot_key = SNAPSHOT_KEY.format(token_id=get_token_id(token, payload))
+    version_key = VERSION_KEY.format(user_id=user_id)
+    try:
+        cached = cache.get_many([snapshot_key, version_key])
+    except Exception as e:
+        logger.warning(f"⚠️ Token cache unavailable: {e}")
+        cached = {}
+
+    snapshot = cached.get(snapshot_key)
+    if snapshot and snapshot['version'] == cached.get(version_key):
+        return _from_snapshot(snapshot['fields'])
+
+    # Cache miss: full validation + user lookup
+    if not validate_token(token, check_time=check_time):
+        return None
+    user = User.objects.filter(id=user_id, is_active=True).first()
+    if user is None:
+        return None
+
+    ttl = _get_ttl(payload)
+    if ttl > 0:
+        try:
+            cache.set(
+                snapshot_key,
+                {'version': cached.get(version_key), 'fields': _snapshot(user)},
+                timeout=ttl
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not cache token snapshot: {e}")
+    return user
+
+
+def invalidate_token(token: str):
+    """Drop the cached snapshot of a single token (logout)"""
+    try:
+        payload = jwt.decode(token, options={'verify_signature': False})
+    except jwt.InvalidTokenError:
+        payload = None
+    cache.delete(SNAPSHOT_KEY.format(token_id=get_token_id(token, payload)))
+
+
+def invalidate_user(user_id):
+    """Invalidate every cached snapshot of a user (password change, deactivation)"""
+    try:
+        # Outlives every snapshot taken under the previous version
+        cache.set(
+            VERSION_KEY.format(user_id=user_id),
+            uuid.uuid4().hex,
+            timeout=settings.WS_AUTH_CACHE_TTL * 2
+        )
+    except Exception as e:
+        logger.error(f"❌ Could not invalidate cached tokens of user {user_id}: {e}")
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_add_userpass_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GlobalDashboardCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('conversations', models.PositiveIntegerField(default=0)),
+                ('customers', models.PositiveIntegerField(default=0)),
+                ('channels', models.PositiveIntegerField(default=0)),
+                ('workflows', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': '📈 Global Dashboard Counters',
+                'verbose_name_plural': '📈 Global Dashboard Counters',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserDashboardCounters',
+            fields=[
+                ('conversations', models.PositiveIntegerField(default=0)),
+                ('customers', models.PositiveIntegerField(default=0)),
+                ('channels', models.PositiveIntegerField(default=0)),
+                ('workflows', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('incoming_messages_30d', models.PositiveIntegerField(default=0, help_text='Customer messages in the last 30 days (at reconcile time)')),
+                ('answered_messages_30d', models.PositiveIntegerField(default=0, help_text='Of those, messages marked answered')),
+                ('ai_tokens_used', models.BigIntegerField(default=0, help_text='Successful AI tokens since ai_tokens_since')),
+                ('ai_tokens_since', models.DateTimeField(blank=True, help_text='Subscription start ai_tokens_used counts from', null=True)),
+            ],
+            options={
+                'verbose_name': '📈 Dashboard Counters',
+                'verbose_name_plural': '📈 Dashboard Counters',
+            },
+        ),
+    ]
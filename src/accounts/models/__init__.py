@@ -1 +1 @@
-from accounts.models.user import User, Plan, PasswordResetToken, EmailConfirmationToken, OTPToken, AffiliateUserSummary, UserPass
\ No newline at end of file
+from accounts.models.user import User, Plan, PasswordResetToken, EmailConfirmationToken, OTPToken, AffiliateUserSummary, UserPass, UserDashboardCounters, GlobalDashboardCounters
\ No newline at end of file
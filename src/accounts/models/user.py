@@ -218,3 +218,46 @@ class UserPass(models.Model):
     def __str__(self):
         return f"Password for {self.user.email}"
 
+
+
+class DashboardCountersBase(models.Model):
+    """
+    Precomputed dashboard counts, written by the reconcile_dashboard_counters
+    task (see accounts.services.dashboard_counters)
+    """
+    conversations = models.PositiveIntegerField(default=0)
+    customers = models.PositiveIntegerField(default=0)
+    channels = models.PositiveIntegerField(default=0)
+    workflows = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+
+class UserDashboardCounters(DashboardCountersBase):
+    """Per-tenant counters behind the dashboard overview, also adjusted on create/delete"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='dashboard_counters')
+    incoming_messages_30d = models.PositiveIntegerField(default=0, help_text="Customer messages in the last 30 days (at reconcile time)")
+    answered_messages_30d = models.PositiveIntegerField(default=0, help_text="Of those, messages marked answered")
+    ai_tokens_used = models.BigIntegerField(default=0, help_text="Successful AI tokens since ai_tokens_since")
+    ai_tokens_since = models.DateTimeField(null=True, blank=True, help_text="Subscription start ai_tokens_used counts from")
+
+    class Meta:
+        verbose_name = "📈 Dashboard Counters"
+        verbose_name_plural = "📈 Dashboard Counters"
+
+    def __str__(self):
+        return f"Dashboard counters for {self.user_id}"
+
+
+class GlobalDashboardCounters(DashboardCountersBase):
+    """Single platform-wide counters row (pk=1), refreshed by the reconcile task only"""
+
+    class Meta:
+        verbose_name = "📈 Global Dashboard Counters"
+        verbose_name_plural = "📈 Global Dashboard Counters"
+
+    def __str__(self):
+        return "Global dashboard counters"
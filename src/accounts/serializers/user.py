@@ -288,6 +288,7 @@ class UserOverviewSerializer(serializers.ModelSerializer):
     all_customers_count = serializers.SerializerMethodField()
     all_channels_count = serializers.SerializerMethodField()
     all_workflows_count = serializers.SerializerMethodField()
+    counters_updated_at = serializers.SerializerMethodField()
     
     class Meta:
         model = get_user_model()
@@ -296,7 +297,8 @@ class UserOverviewSerializer(serializers.ModelSerializer):
             'subscription_remaining', 'token_usage_remaining', 'response_rate_with_comparison',
             'current_subscription',
             'user_conversations_count', 'user_customers_count', 'user_channels_count', 'user_workflows_count',
-            'all_conversations_count', 'all_customers_count', 'all_channels_count', 'all_workflows_count'
+            'all_conversations_count', 'all_customers_count', 'all_channels_count', 'all_workflows_count',
+            'counters_updated_at'
         )
 
     current_subscription = serializers.SerializerMethodField()
@@ -354,29 +356,10 @@ class UserOverviewSerializer(serializers.ModelSerializer):
     def get_token_usage_remaining(self, obj):
         """Get token usage remaining as percentage (0-100) based on actual AI usage"""
         try:
-            from AI_model.models import AIUsageLog
-            from django.db.models import Sum
-            
             subscription = obj.subscription
             if subscription.is_subscription_active():
-                # Calculate original tokens from the plan
-                original_tokens = 0
-                if subscription.token_plan:
-                    original_tokens = subscription.token_plan.tokens_included
-                elif subscription.full_plan:
-                    original_tokens = subscription.full_plan.tokens_included
-                
-                # Calculate actual AI tokens used since subscription started
-                ai_tokens_used = AIUsageLog.objects.filter(
-                    user=obj,
-                    created_at__gte=subscription.start_date,
-                    success=True
-                ).aggregate(
-                    total=Sum('total_tokens')
-                )['total'] or 0
-                
-                # Calculate actual remaining tokens
-                actual_tokens_remaining = max(0, original_tokens - ai_tokens_used)
+                # AI tokens used since subscription started come from the counters row
+                original_tokens, _, actual_tokens_remaining = self._tokens_remaining(obj)
                 
                 if original_tokens > 0:
                     percentage = (actual_tokens_remaining / original_tokens) * 100
@@ -401,46 +384,18 @@ class UserOverviewSerializer(serializers.ModelSerializer):
                 return 0
     
     def get_response_rate_with_comparison(self, obj):
-        """Get response rate with comparison to previous period.
+        """Get response rate over the last 30 days.
         Response rate = (Number of messages that received a response) / (Total incoming messages) × 100
         - Incoming message: A user message from social media (type='customer')
         - Response message: An AI-generated or human reply (is_answered=True)
+        Counts are refreshed by the reconcile_dashboard_counters task (see counters_updated_at).
         """
         try:
-            from django.utils import timezone
-            from datetime import timedelta
-            from message.models import Message
-            
-            # Current period: last 30 days
-            current_period_end = timezone.now()
-            current_period_start = current_period_end - timedelta(days=30)
-            
-            # Get total incoming messages (customer messages) for current period
-            current_incoming = Message.objects.filter(
-                conversation__user=obj,
-                type='customer',
-                created_at__gte=current_period_start,
-                created_at__lte=current_period_end
-            ).count()
-            
-            # Get customer messages that received a response
-            current_answered = Message.objects.filter(
-                conversation__user=obj,
-                type='customer',
-                is_answered=True,
-                created_at__gte=current_period_start,
-                created_at__lte=current_period_end
-            ).count()
-            
-            # Calculate current response rate
-            if current_incoming > 0:
-                current_rate = round((current_answered / current_incoming) * 100, 1)
-            else:
-                current_rate = 0.0
-            
-            return current_rate
-            
-        except Exception as e:
+            counters = self._user_counters(obj)
+            if counters.incoming_messages_30d > 0:
+                return round((counters.answered_messages_30d / counters.incoming_messages_30d) * 100, 1)
+            return 0.0
+        except Exception:
             return 0.0
 
 
@@ -451,14 +406,13 @@ class UserOverviewSerializer(serializers.ModelSerializer):
         """
         try:
             from billing.serializers import SubscriptionSerializer
-            from billing.utils import get_accurate_tokens_remaining
             
             subscription = obj.subscription
             serializer = SubscriptionSerializer(subscription)
             data = serializer.data
             
-            # Use centralized accurate token calculation
-            original_tokens, consumed_tokens, tokens_remaining = get_accurate_tokens_remaining(obj)
+            # Same calculation as get_accurate_tokens_remaining, usage read from the counters row
+            original_tokens, consumed_tokens, tokens_remaining = self._tokens_remaining(obj)
             
             # Add AI usage information to the response
             data['ai_usage'] = {
@@ -475,65 +429,84 @@ class UserOverviewSerializer(serializers.ModelSerializer):
         except Exception:
             return None
 
+    # --- Precomputed counters (accounts.services.dashboard_counters) ---
+    def _user_counters(self, obj):
+        if not hasattr(self, '_user_counters_row'):
+            from accounts.services.dashboard_counters import DashboardCounterService
+            self._user_counters_row = DashboardCounterService.get_user_counters(obj)
+        return self._user_counters_row
+
+    def _global_counters(self):
+        if not hasattr(self, '_global_counters_row'):
+            from accounts.services.dashboard_counters import DashboardCounterService
+            self._global_counters_row = DashboardCounterService.get_global_counters()
+        return self._global_counters_row
+
+    def _tokens_remaining(self, obj):
+        if not hasattr(self, '_tokens_remaining_value'):
+            from accounts.services.dashboard_counters import DashboardCounterService
+            self._tokens_remaining_value = DashboardCounterService.get_tokens_remaining(obj, self._user_counters(obj))
+        return self._tokens_remaining_value
+
     # --- Count fields ---
     def get_user_conversations_count(self, obj):
         try:
-            from message.models import Conversation
-            return Conversation.objects.filter(user=obj).count()
+            return self._user_counters(obj).conversations
         except Exception:
             return 0
 
     def get_user_customers_count(self, obj):
         try:
-            from message.models import Customer
-            return Customer.objects.filter(conversations__user=obj).distinct().count()
+            return self._user_counters(obj).customers
         except Exception:
             return 0
 
     def get_user_channels_count(self, obj):
-        # Derive channels from Conversation.source values for this user
+        # Distinct Conversation.source values for this user
         try:
-            from message.models import Conversation
-            return Conversation.objects.filter(user=obj).values_list('source', flat=True).distinct().count()
+            return self._user_counters(obj).channels
         except Exception:
             return 0
 
     def get_user_workflows_count(self, obj):
         try:
-            from workflow.models import Workflow
-            return Workflow.objects.filter(created_by=obj).count()
+            return self._user_counters(obj).workflows
         except Exception:
             return 0
 
     def get_all_conversations_count(self, obj):
         try:
-            from message.models import Conversation
-            return Conversation.objects.all().count()
+            return self._global_counters().conversations
         except Exception:
             return 0
 
     def get_all_customers_count(self, obj):
         try:
-            from message.models import Customer
-            return Customer.objects.all().count()
+            return self._global_counters().customers
         except Exception:
             return 0
 
     def get_all_channels_count(self, obj):
-        # Derive channels from Conversation.source across all users
+        # Distinct Conversation.source values across all users
         try:
-            from message.models import Conversation
-            return Conversation.objects.values_list('source', flat=True).distinct().count()
+            return self._global_counters().channels
         except Exception:
             return 0
 
     def get_all_workflows_count(self, obj):
         try:
-            from workflow.models import Workflow
-            return Workflow.objects.all().count()
+            return self._global_counters().workflows
         except Exception:
             return 0
 
+    def get_counters_updated_at(self, obj):
+        """Oldest reconciliation of the rows the counts came from (response rate freshness)"""
+        try:
+            timestamps = [t for t in (self._user_counters(obj).reconciled_at, self._global_counters().reconciled_at) if t]
+            return min(timestamps).isoformat() if timestamps else None
+        except Exception:
+            return None
+
 
 class UserProfilePictureSerializer(serializers.ModelSerializer):
     class Meta:
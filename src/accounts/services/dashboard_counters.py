@@ -0,0 +1,270 @@
+"""
+Dashboard Counter Service
+
+The dashboard overview used to count conversations, customers (distinct via
+conversations), channels and workflows for the tenant and for the whole
+platform, scan 30 days of messages twice and SUM AI usage on every load.
+
+Counts now live in UserDashboardCounters (one row per tenant, created on first
+read) and GlobalDashboardCounters (one row). Tenant rows are adjusted by
+signals when conversations, workflows and AI usage logs are created or
+deleted. The global row is only written by the reconcile_dashboard_counters
+task: adjusting it on every create would make one row every tenant's writes
+queue on. The task also refreshes the 30-day response rate (from the message
+stats rollups) and corrects drift from bulk operations.
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, Tuple
+
+from django.db.models import Count, Exists, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from accounts.models import GlobalDashboardCounters, UserDashboardCounters
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardCounterService:
+    """Read, adjust and reconcile the dashboard overview counters"""
+
+    RESPONSE_RATE_DAYS = 30
+    RECONCILE_CHUNK_SIZE = 500
+    GLOBAL_PK = 1
+
+    # ==========================================
+    #  Reads
+    # ==========================================
+
+    @classmethod
+    def get_user_counters(cls, user) -> UserDashboardCounters:
+        try:
+            return UserDashboardCounters.objects.get(user=user)
+        except UserDashboardCounters.DoesNotExist:
+            return cls.reconcile_user(user)
+
+    @classmethod
+    def get_global_counters(cls) -> GlobalDashboardCounters:
+        try:
+            return GlobalDashboardCounters.objects.get(pk=cls.GLOBAL_PK)
+        except GlobalDashboardCounters.DoesNotExist:
+            return cls.reconcile_global()
+
+    @classmethod
+    def get_tokens_remaining(cls, user, counters: UserDashboardCounters = None) -> Tuple[int, int, int]:
+        """
+        Same result as billing.utils.get_accurate_tokens_remaining, with usage
+        read from the counters row (recomputed once when the subscription
+        period changes)
+
+        Returns:
+            Tuple of (original_tokens, consumed_tokens, remaining_tokens)
+        """
+        from billing.models import Subscription
+        from AI_model.models import AIUsageLog
+
+        try:
+            subscription = user.subscription
+        except Subscription.DoesNotExist:
+            return (0, 0, 0)
+
+        original_tokens = 0
+        if subscription.token_plan:
+            original_tokens = subscription.token_plan.tokens_included
+        elif subscription.full_plan:
+            original_tokens = subscription.full_plan.tokens_included
+
+        counters = counters or cls.get_user_counters(user)
+        if counters.ai_tokens_since != subscription.start_date:
+            counters.ai_tokens_used = AIUsageLog.tokens_used(user, subscription.start_date, success_only=True)
+            counters.ai_tokens_since = subscription.start_date
+            UserDashboardCounters.objects.filter(pk=counters.pk).update(
+                ai_tokens_used=counters.ai_tokens_used,
+                ai_tokens_since=counters.ai_tokens_since,
+            )
+
+        return (original_tokens, counters.ai_tokens_used, max(0, original_tokens - counters.ai_tokens_used))
+
+    # ==========================================
+    #  Incremental updates (signals)
+    # ==========================================
+
+    @classmethod
+    def _adjust(cls, queryset, **deltas):
+        updates = {
+            field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items() if delta
+        }
+        if updates:
+            queryset.update(**updates)
+
+    @classmethod
+    def _adjust_user(cls, user_id, **deltas):
+        # Tenants without a row get one, fully computed, on their next dashboard load
+        cls._adjust(UserDashboardCounters.objects.filter(user_id=user_id), **deltas)
+
+    @classmethod
+    def conversation_created(cls, conversation):
+        from message.models import Conversation
+
+        # Both checks in one statement
+        others = Conversation.objects.filter(user_id=conversation.user_id).exclude(pk=conversation.pk)
+        seen = Conversation.objects.filter(pk=conversation.pk).values(
+            customer_seen=Exists(others.filter(customer_id=conversation.customer_id)),
+            source_seen=Exists(others.filter(source=conversation.source)),
+        ).first() or {'customer_seen': False, 'source_seen': False}
+        cls._adjust_user(
+            conversation.user_id,
+            conversations=1,
+            customers=0 if seen['customer_seen'] else 1,
+            channels=0 if seen['source_seen'] else 1,
+        )
+
+    @classmethod
+    def conversation_deleted(cls, conversation):
+        from message.models import Conversation
+
+        remaining = Conversation.objects.filter(user_id=conversation.user_id)
+        cls._adjust_user(
+            conversation.user_id,
+            conversations=-1,
+            customers=0 if remaining.filter(customer_id=conversation.customer_id).exists() else -1,
+            channels=0 if remaining.filter(source=conversation.source).exists() else -1,
+        )
+
+    @classmethod
+    def workflow_created(cls, workflow):
+        if workflow.created_by_id:
+            cls._adjust_user(workflow.created_by_id, workflows=1)
+
+    @classmethod
+    def workflow_deleted(cls, workflow):
+        if workflow.created_by_id:
+            cls._adjust_user(workflow.created_by_id, workflows=-1)
+
+    @classmethod
+    def ai_usage_logged(cls, usage_log):
+        if usage_log.success and usage_log.total_tokens:
+            UserDashboardCounters.objects.filter(
+                user_id=usage_log.user_id,
+                ai_tokens_since__isnull=False,
+                ai_tokens_since__lte=usage_log.created_at,
+            ).update(ai_tokens_used=F('ai_tokens_used') + usage_log.total_tokens)
+
+    # ==========================================
+    #  Reconciliation
+    # ==========================================
+
+    @classmethod
+    def _compute_user_counts(cls, user_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+        """Live counts for a batch of tenants, a handful of grouped queries"""
+        from message.models import Conversation
+        from message.services.stats_rollup import MessageStatsRollupService
+        from workflow.models import Workflow
+
+        user_ids = list(user_ids)
+        counts = {
+            user_id: {
+                'conversations': 0, 'customers': 0, 'channels': 0, 'workflows': 0,
+                'incoming_messages_30d': 0, 'answered_messages_30d': 0,
+            }
+            for user_id in user_ids
+        }
+
+        conversation_rows = (
+            Conversation.objects.filter(user_id__in=user_ids)
+            .order_by()
+            .values('user_id')
+            .annotate(
+                conversations=Count('id'),
+                customers=Count('customer_id', distinct=True),
+                channels=Count('source', distinct=True),
+            )
+        )
+        for row in conversation_rows:
+            counts[row['user_id']].update(
+                conversations=row['conversations'], customers=row['customers'], channels=row['channels']
+            )
+
+        workflow_rows = (
+            Workflow.objects.filter(created_by_id__in=user_ids)
+            .order_by()
+            .values('created_by_id')
+            .annotate(workflows=Count('id'))
+        )
+        for row in workflow_rows:
+            counts[row['created_by_id']]['workflows'] = row['workflows']
+
+        now = timezone.now()
+        message_totals = MessageStatsRollupService.totals(
+            now - timedelta(days=cls.RESPONSE_RATE_DAYS), now, user_ids=user_ids, group_by='user'
+        )
+        for user_id, totals in message_totals.items():
+            counts[user_id].update(
+                incoming_messages_30d=totals['inbound_messages'], answered_messages_30d=totals['answered_messages']
+            )
+
+        return counts
+
+    @classmethod
+    def reconcile_user(cls, user) -> UserDashboardCounters:
+        values = cls._compute_user_counts([user.pk])[user.pk]
+        counters, _ = UserDashboardCounters.objects.update_or_create(
+            user=user,
+            defaults={**values, 'reconciled_at': timezone.now()},
+        )
+        return counters
+
+    @classmethod
+    def reconcile_global(cls) -> GlobalDashboardCounters:
+        from message.models import Conversation, Customer
+        from workflow.models import Workflow
+
+        counters, _ = GlobalDashboardCounters.objects.update_or_create(
+            pk=cls.GLOBAL_PK,
+            defaults={
+                'conversations': Conversation.objects.count(),
+                'customers': Customer.objects.count(),
+                'channels': Conversation.objects.order_by().values('source').distinct().count(),
+                'workflows': Workflow.objects.count(),
+                'reconciled_at': timezone.now(),
+            },
+        )
+        return counters
+
+    @classmethod
+    def reconcile_all(cls) -> Dict[str, int]:
+        """Recompute the global row and every existing tenant row"""
+        from AI_model.models import AIUsageLog
+
+        cls.reconcile_global()
+
+        fields = ['conversations', 'customers', 'channels', 'workflows',
+                  'incoming_messages_30d', 'answered_messages_30d', 'ai_tokens_used', 'reconciled_at', 'updated_at']
+        user_ids = list(UserDashboardCounters.objects.order_by('user_id').values_list('user_id', flat=True))
+        reconciled = 0
+
+        for start in range(0, len(user_ids), cls.RECONCILE_CHUNK_SIZE):
+            chunk = user_ids[start:start + cls.RECONCILE_CHUNK_SIZE]
+            counts = cls._compute_user_counts(chunk)
+            now = timezone.now()
+
+            rows = list(UserDashboardCounters.objects.filter(user_id__in=chunk))
+            tokens_used = AIUsageLog.tokens_used_by_user(
+                {counters.user_id: counters.ai_tokens_since for counters in rows if counters.ai_tokens_since is not None},
+                success_only=True,
+            )
+            for counters in rows:
+                for field, value in counts[counters.user_id].items():
+                    setattr(counters, field, value)
+                if counters.user_id in tokens_used:
+                    counters.ai_tokens_used = tokens_used[counters.user_id]
+                counters.reconciled_at = now
+                counters.updated_at = now
+
+            UserDashboardCounters.objects.bulk_update(rows, fields, batch_size=cls.RECONCILE_CHUNK_SIZE)
+            reconciled += len(rows)
+
+        logger.info(f"📈 Reconciled dashboard counters for {reconciled} tenants")
+        return {'tenants': reconciled}
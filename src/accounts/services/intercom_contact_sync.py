@@ -9,6 +9,7 @@ import requests
 import logging
 from typing import Dict, Optional, Any, List
 from django.conf import settings
+from settings.services.intercom_http import intercom_request
 from django.contrib.auth import get_user_model
 
 logger = logging.getLogger(__name__)
@@ -102,8 +103,8 @@ class IntercomContactSyncService:
         try:
             contact_data = IntercomContactSyncService.build_contact_data(user)
             
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=contact_data,
                 headers=IntercomContactSyncService.get_headers(),
                 timeout=10
@@ -167,8 +168,8 @@ class IntercomContactSyncService:
             # Remove external_id for updates (it's immutable in Intercom)
             contact_data.pop('external_id', None)
             
-            response = requests.put(
-                url,
+            response = intercom_request(
+                'PUT', url,
                 json=contact_data,
                 headers=IntercomContactSyncService.get_headers(),
                 timeout=10
@@ -207,8 +208,8 @@ class IntercomContactSyncService:
         }
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=search_query,
                 headers=IntercomContactSyncService.get_headers(),
                 timeout=10
@@ -231,12 +232,13 @@ class IntercomContactSyncService:
             return None
     
     @staticmethod
-    def search_contact_by_external_id(user_id: int) -> Optional[Dict[str, Any]]:
+    def search_contact_by_external_id(user_id: int, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
         """
         Search for a contact in Intercom by external_id (Fiko user ID).
         
         Args:
             user_id: Fiko user ID
+            raise_errors: Re-raise request errors instead of returning None
             
         Returns:
             Intercom contact object if found, None otherwise
@@ -252,8 +254,8 @@ class IntercomContactSyncService:
         }
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=search_query,
                 headers=IntercomContactSyncService.get_headers(),
                 timeout=10
@@ -273,6 +275,8 @@ class IntercomContactSyncService:
                 
         except Exception as e:
             logger.error(f"❌ Error searching for contact with user ID {user_id}: {str(e)}")
+            if raise_errors:
+                raise
             return None
     
     @staticmethod
@@ -284,21 +288,22 @@ class IntercomContactSyncService:
             user_id: Fiko user ID
             
         Returns:
-            True if successful, False otherwise
+            True if deleted or there is no contact to delete, False otherwise
         """
         try:
             # First, find the contact
-            contact = IntercomContactSyncService.search_contact_by_external_id(user_id)
+            contact = IntercomContactSyncService.search_contact_by_external_id(user_id, raise_errors=True)
             
             if not contact:
-                logger.warning(f"Cannot delete - contact not found for user ID: {user_id}")
-                return False
+                # Never synced (or already deleted): nothing left to do
+                logger.info(f"No Intercom contact to delete for user ID: {user_id}")
+                return True
             
             contact_id = contact.get('id')
             url = f"{IntercomContactSyncService.BASE_URL}/contacts/{contact_id}"
             
-            response = requests.delete(
-                url,
+            response = intercom_request(
+                'DELETE', url,
                 headers=IntercomContactSyncService.get_headers(),
                 timeout=10
             )
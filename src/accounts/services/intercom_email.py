@@ -9,6 +9,7 @@ import requests
 import logging
 from typing import Dict, Optional, Any, List
 from django.conf import settings
+from settings.services.intercom_http import intercom_request
 
 logger = logging.getLogger(__name__)
 
@@ -81,8 +82,8 @@ class IntercomEmailService:
         message_data = {k: v for k, v in message_data.items() if v is not None}
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=message_data,
                 headers=IntercomEmailService.get_headers(),
                 timeout=10
@@ -145,8 +146,8 @@ class IntercomEmailService:
         message_data = {k: v for k, v in message_data.items() if v is not None}
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=message_data,
                 headers=IntercomEmailService.get_headers(),
                 timeout=10
@@ -251,8 +252,8 @@ class IntercomEmailService:
         message_data = {k: v for k, v in message_data.items() if v is not None}
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=message_data,
                 headers=IntercomEmailService.get_headers(),
                 timeout=10
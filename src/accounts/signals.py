@@ -75,9 +75,10 @@ def sync_user_to_intercom_on_save(sender, instance, created, **kwargs):
     """
     Automatically sync user to Intercom when created or updated.
     
-    This runs asynchronously via Celery to avoid blocking the request.
+    Written to the Intercom outbox in the same transaction; the drain task
+    delivers it (repeated saves of one user collapse into one upsert).
     """
-    from accounts.tasks import sync_user_to_intercom_async
+    from settings.services.intercom_outbox import IntercomOutbox
     from django.conf import settings
     
     # Only sync if Intercom is configured
@@ -90,8 +91,7 @@ def sync_user_to_intercom_on_save(sender, instance, created, **kwargs):
         return
     
     try:
-        # Trigger async sync
-        sync_user_to_intercom_async.delay(instance.id)
+        IntercomOutbox.enqueue('contact_upsert', instance.id, contact_key=instance.id)
         
         if created:
             logger.info(f"🔄 Triggered Intercom sync for new user {instance.id} ({instance.email})")
@@ -107,9 +107,9 @@ def delete_intercom_contact_on_user_delete(sender, instance, **kwargs):
     """
     Automatically delete Intercom contact when user is deleted.
     
-    This runs asynchronously via Celery.
+    Delivered by the Intercom outbox drain task.
     """
-    from accounts.tasks import delete_intercom_contact_async
+    from settings.services.intercom_outbox import IntercomOutbox
     from django.conf import settings
     
     # Only delete if Intercom is configured
@@ -117,14 +117,42 @@ def delete_intercom_contact_on_user_delete(sender, instance, **kwargs):
         return
     
     try:
-        # Trigger async deletion
-        delete_intercom_contact_async.delay(instance.id)
+        IntercomOutbox.enqueue('contact_delete', instance.id, contact_key=instance.id)
         logger.info(f"🗑️ Triggered Intercom contact deletion for user {instance.id}")
         
     except Exception as e:
         logger.error(f"❌ Failed to trigger Intercom contact deletion for user {instance.id}: {str(e)}")
 
 
+# ============================================================================
+# WEBSOCKET TOKEN CACHE INVALIDATION
+# ============================================================================
+
+@receiver(post_save, sender=User, dispatch_uid='invalidate_ws_token_cache_on_save')
+def invalidate_token_cache_on_user_save(sender, instance, created, **kwargs):
+    """
+    Drop cached token -> user snapshots after a password change or deactivation.
+    
+    `_password` is set by set_password() until the save completes.
+    """
+    if created:
+        return
+    if getattr(instance, '_password', None) is None and instance.is_active:
+        return
+    
+    from django.db import transaction
+    from accounts.functions.token_cache import invalidate_user
+    
+    user_id = instance.id
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+@receiver(post_delete, sender=User, dispatch_uid='invalidate_ws_token_cache_on_delete')
+def invalidate_token_cache_on_user_delete(sender, instance, **kwargs):
+    from accounts.functions.token_cache import invalidate_user
+    invalidate_user(instance.id)
+
+
 # ============================================================================
 # WIZARD STATUS WEBSOCKET NOTIFICATIONS
 # ============================================================================
@@ -249,3 +277,44 @@ def notify_wizard_on_telegram_update(sender, instance, **kwargs):
     check_and_complete_wizard(instance.user)
     # Notify WebSocket
     notify_wizard_status(instance.user.id)
+
+
+# ============================================================================
+# DASHBOARD OVERVIEW COUNTERS
+# ============================================================================
+
+def _adjust_dashboard_counters(method_name, instance):
+    """Counters must never break the write that triggered them"""
+    from accounts.services.dashboard_counters import DashboardCounterService
+    try:
+        getattr(DashboardCounterService, method_name)(instance)
+    except Exception as e:
+        logger.warning(f"⚠️ Dashboard counters not adjusted ({method_name}): {e}")
+
+
+@receiver(post_save, sender='message.Conversation', dispatch_uid='dashboard_counters_conversation_created')
+def count_conversation_created(sender, instance, created, **kwargs):
+    if created:
+        _adjust_dashboard_counters('conversation_created', instance)
+
+
+@receiver(post_delete, sender='message.Conversation', dispatch_uid='dashboard_counters_conversation_deleted')
+def count_conversation_deleted(sender, instance, **kwargs):
+    _adjust_dashboard_counters('conversation_deleted', instance)
+
+
+@receiver(post_save, sender='workflow.Workflow', dispatch_uid='dashboard_counters_workflow_created')
+def count_workflow_created(sender, instance, created, **kwargs):
+    if created:
+        _adjust_dashboard_counters('workflow_created', instance)
+
+
+@receiver(post_delete, sender='workflow.Workflow', dispatch_uid='dashboard_counters_workflow_deleted')
+def count_workflow_deleted(sender, instance, **kwargs):
+    _adjust_dashboard_counters('workflow_deleted', instance)
+
+
+@receiver(post_save, sender='AI_model.AIUsageLog', dispatch_uid='dashboard_counters_ai_usage_logged')
+def count_ai_usage_logged(sender, instance, created, **kwargs):
+    if created:
+        _adjust_dashboard_counters('ai_usage_logged', instance)
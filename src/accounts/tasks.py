@@ -206,3 +206,21 @@ def delete_intercom_contact_async(self, user_id: int):
         logger.error(f"❌ Error deleting Intercom contact for user {user_id}: {str(e)}")
         raise
 
+
+@shared_task(name='accounts.reconcile_dashboard_counters')
+def reconcile_dashboard_counters():
+    """
+    Recompute the dashboard overview counters (global row and every tenant row)
+    and refresh the 30-day response rate.
+    
+    Returns:
+        Dictionary with the number of tenants reconciled
+    """
+    from accounts.services.dashboard_counters import DashboardCounterService
+    
+    try:
+        result = DashboardCounterService.reconcile_all()
+        return {'success': True, **result}
+    except Exception as e:
+        logger.error(f"❌ Error reconciling dashboard counters: {str(e)}")
+        return {'success': False, 'error': str(e)}
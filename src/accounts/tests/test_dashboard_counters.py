@@ -0,0 +1,129 @@
+"""
+Tests for the precomputed dashboard overview counters
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.forms.models import model_to_dict
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from unittest.mock import MagicMock, patch
+
+from accounts.models import GlobalDashboardCounters, UserDashboardCounters
+from accounts.serializers import UserOverviewSerializer
+from accounts.services.dashboard_counters import DashboardCounterService
+from message.models import Conversation, Customer, Message
+from workflow.models import Workflow
+
+User = get_user_model()
+
+
+class DashboardCounterAdjustTestCase(SimpleTestCase):
+
+    def test_decrements_never_go_below_zero(self):
+        queryset = MagicMock()
+        DashboardCounterService._adjust(queryset, conversations=1, customers=-1, channels=0)
+
+        updates = queryset.update.call_args.kwargs
+        self.assertEqual(set(updates), {'conversations', 'customers'})
+        self.assertEqual(updates['conversations'], F('conversations') + 1)
+        self.assertIsInstance(updates['customers'], Greatest)
+
+    def test_nothing_to_adjust_skips_the_update(self):
+        queryset = MagicMock()
+        DashboardCounterService._adjust(queryset, channels=0)
+        queryset.update.assert_not_called()
+
+
+class DashboardCounterSignalsTestCase(SimpleTestCase):
+
+    @patch.object(DashboardCounterService, '_adjust')
+    @patch('message.models.Conversation.objects')
+    def test_conversation_created_checks_customer_and_channel_in_one_query(self, objects, adjust):
+        objects.filter.return_value.values.return_value.first.return_value = {
+            'customer_seen': True, 'source_seen': False,
+        }
+        conversation = SimpleNamespace(pk='c1', user_id=7, customer_id=3, source='telegram')
+
+        DashboardCounterService.conversation_created(conversation)
+
+        objects.filter.return_value.values.return_value.first.assert_called_once_with()
+        adjust.assert_called_once()
+        self.assertEqual(adjust.call_args.kwargs, {'conversations': 1, 'customers': 0, 'channels': 1})
+
+    @patch.object(DashboardCounterService, '_adjust')
+    def test_workflow_without_owner_adjusts_nothing(self, adjust):
+        DashboardCounterService.workflow_created(SimpleNamespace(created_by_id=None))
+        adjust.assert_not_called()
+
+
+class DashboardCountersReconcileTestCase(TestCase):
+
+    def _tenants(self, count):
+        for _ in range(count):
+            index = User.objects.count()
+            user = User.objects.create_user(email=f'tenant-{index}@example.com', password='securepassword123',
+                                            username=f'tenant-{index}')
+            DashboardCounterService.reconcile_user(user)
+        UserDashboardCounters.objects.update(ai_tokens_since=timezone.now() - timedelta(days=3))
+
+    def test_reconcile_costs_constant_queries_per_chunk(self):
+        self._tenants(1)
+        DashboardCounterService.reconcile_all()  # creates the global row
+        with CaptureQueriesContext(connection) as one:
+            DashboardCounterService.reconcile_all()
+        self._tenants(3)
+        with CaptureQueriesContext(connection) as four:
+            self.assertEqual(DashboardCounterService.reconcile_all(), {'tenants': 4})
+
+        self.assertEqual(len(four), len(one))
+
+    def test_global_row_is_not_written_on_create(self):
+        user = User.objects.create_user(email='counters@example.com', password='securepassword123',
+                                        username='counters')
+        tenant = DashboardCounterService.reconcile_user(user)
+        before = model_to_dict(DashboardCounterService.reconcile_global())
+
+        User.objects.create_user(email='counters-2@example.com', password='securepassword123',
+                                 username='counters-2')
+        customer = Customer.objects.create(first_name='Sara', source='telegram', source_id='tg-counters')
+        conversation = Conversation.objects.create(user=user, customer=customer, source='telegram')
+        Message.objects.create(conversation=conversation, customer=customer, type='customer', content='hello')
+        Workflow.objects.create(name='Welcome', created_by=user)
+
+        self.assertEqual(model_to_dict(GlobalDashboardCounters.objects.get()), before)
+        tenant.refresh_from_db()
+        self.assertEqual((tenant.conversations, tenant.customers, tenant.workflows), (1, 1, 1))
+
+
+class UserOverviewCountersTestCase(SimpleTestCase):
+
+    @patch.object(DashboardCounterService, 'get_global_counters')
+    @patch.object(DashboardCounterService, 'get_user_counters')
+    def test_counts_are_read_from_counter_rows(self, get_user_counters, get_global_counters):
+        get_user_counters.return_value = SimpleNamespace(
+            conversations=12, customers=9, channels=2, workflows=3,
+            incoming_messages_30d=40, answered_messages_30d=30,
+            reconciled_at=datetime(2026, 1, 2, tzinfo=dt_timezone.utc),
+        )
+        get_global_counters.return_value = SimpleNamespace(
+            conversations=1000, customers=800, channels=3, workflows=50,
+            reconciled_at=datetime(2026, 1, 1, tzinfo=dt_timezone.utc),
+        )
+        serializer = UserOverviewSerializer()
+        user = object()
+
+        self.assertEqual(serializer.get_user_conversations_count(user), 12)
+        self.assertEqual(serializer.get_user_customers_count(user), 9)
+        self.assertEqual(serializer.get_all_customers_count(user), 800)
+        self.assertEqual(serializer.get_all_workflows_count(user), 50)
+        self.assertEqual(serializer.get_response_rate_with_comparison(user), 75.0)
+        self.assertEqual(serializer.get_counters_updated_at(user), '2026-01-01T00:00:00+00:00')
+
+        get_user_counters.assert_called_once_with(user)
+        get_global_counters.assert_called_once_with()
@@ -0,0 +1,62 @@
+"""
+Tests for the cached JWT -> user resolution used by WebSocket connections
+"""
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from accounts.functions import token_cache
+from accounts.functions.jwt import gen_token
+from accounts.models import User
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, WS_AUTH_CACHE_TTL=60)
+class TokenCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.user = User(id=42, email='user@example.com', username='user', is_active=True, password='secret-hash')
+        self.token = gen_token({
+            'user_id': '42',
+            'created_at': timezone.now().strftime("%Y-%m-%d %H:%M:%S %z"),
+            'type': 'access',
+            'jti': 'token-jti',
+        })
+        from django.core.cache import cache
+        cache.clear()
+
+    def _resolve(self):
+        queryset = patch.object(User.objects, 'filter')
+        with patch('accounts.functions.jwt.validate_token', return_value=True) as validate, \
+                queryset as filter_mock:
+            filter_mock.return_value.first.return_value = self.user
+            user = token_cache.get_user_for_token(self.token)
+        return user, validate
+
+    def test_second_lookup_is_served_from_cache(self):
+        first, validate = self._resolve()
+        self.assertEqual(validate.call_count, 1)
+
+        second, validate = self._resolve()
+        self.assertEqual(validate.call_count, 0)
+        self.assertEqual(second.pk, 42)
+        self.assertEqual(second.email, 'user@example.com')
+        self.assertNotIn('password', second.__dict__)
+
+    def test_logout_invalidates_token(self):
+        self._resolve()
+        token_cache.invalidate_token(self.token)
+        _, validate = self._resolve()
+        self.assertEqual(validate.call_count, 1)
+
+    def test_user_invalidation_drops_all_snapshots(self):
+        self._resolve()
+        token_cache.invalidate_user('42')
+        _, validate = self._resolve()
+        self.assertEqual(validate.call_count, 1)
+
+    def test_token_id_falls_back_to_hash(self):
+        self.assertEqual(token_cache.get_token_id('abc', {'jti': 'x'}), 'x')
+        self.assertEqual(len(token_cache.get_token_id('abc', {})), 64)
@@ -298,13 +298,7 @@ class UserSubscriptionOverviewSerializer(serializers.ModelSerializer):
         today = timezone.now().date()
         today_start = timezone.make_aware(timezone.datetime.combine(today, timezone.datetime.min.time()))
         
-        return AIUsageLog.objects.filter(
-            user=obj,
-            created_at__gte=today_start,
-            success=True
-        ).aggregate(
-            total=Sum('total_tokens')
-        )['total'] or 0
+        return AIUsageLog.tokens_used(obj, today_start)
     
     def get_ai_tokens_used_this_month(self, obj):
         """Get actual AI tokens used this month from AIUsageLog"""
@@ -313,13 +307,7 @@ class UserSubscriptionOverviewSerializer(serializers.ModelSerializer):
         now = timezone.now()
         start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         
-        return AIUsageLog.objects.filter(
-            user=obj,
-            created_at__gte=start_of_month,
-            success=True
-        ).aggregate(
-            total=Sum('total_tokens')
-        )['total'] or 0
+        return AIUsageLog.tokens_used(obj, start_of_month)
     
     def get_ai_tokens_total(self, obj):
         """Get total AI tokens used since subscription started"""
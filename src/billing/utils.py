@@ -4,7 +4,6 @@ Billing utility functions for subscription and token validation
 import logging
 from typing import Dict, Any, Tuple
 from django.utils import timezone
-from django.db.models import Sum
 
 logger = logging.getLogger(__name__)
 
@@ -49,13 +48,12 @@ def get_accurate_tokens_remaining(user) -> Tuple[int, int, int]:
         original_tokens = subscription.full_plan.tokens_included
     
     # Calculate total AI tokens used by this user since subscription started
-    ai_tokens_used = AIUsageLog.objects.filter(
-        user=user,
-        created_at__gte=subscription.start_date,
-        success=True  # Only count successful requests
-    ).aggregate(
-        total=Sum('total_tokens')
-    )['total'] or 0
+    # (archived days come from AIUsageDailySummary, see AIUsageLog.tokens_used)
+    ai_tokens_used = AIUsageLog.tokens_used(
+        user,
+        subscription.start_date,
+        success_only=True  # Only count successful requests
+    )
     
     # Calculate actual remaining tokens
     actual_tokens_remaining = max(0, original_tokens - ai_tokens_used)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ProxySetting
+from .models import ProxySetting, RetentionWatermark
 
 
 @admin.register(ProxySetting)
@@ -52,3 +52,8 @@ class ProxySettingAdmin(admin.ModelAdmin):
         )
     deactivate_proxy.short_description = "❌ غیرفعال کردن پروکسی"
 
+
+@admin.register(RetentionWatermark)
+class RetentionWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('policy', 'archived_before', 'updated_at')
+    readonly_fields = ('updated_at',)
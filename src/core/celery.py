@@ -39,6 +39,14 @@ app.conf.task_queues = [
           routing_key='low.#',
           priority=1,
           queue_arguments={'x-max-priority': 10}),
+    
+    # 📮 Outbound platform sends - یک Queue جدا برای هر کانال (rate limit جداگانه)
+    Queue('outbound_instagram',
+          Exchange('outbound_instagram'),
+          routing_key='outbound.instagram'),
+    Queue('outbound_telegram',
+          Exchange('outbound_telegram'),
+          routing_key='outbound.telegram'),
 ]
 
 # تنظیم routing: کدوم task به کدوم queue بره
@@ -122,6 +130,22 @@ app.conf.task_routes = {
         'queue': 'low_priority',
         'routing_key': 'low.maintenance',
     },
+    'message.ensure_message_partitions': {
+        'queue': 'low_priority',
+        'routing_key': 'low.maintenance',
+    },
+    'message.rollup_message_stats': {
+        'queue': 'low_priority',
+        'routing_key': 'low.maintenance',
+    },
+    'message.purge_customer_exports': {
+        'queue': 'low_priority',
+        'routing_key': 'low.maintenance',
+    },
+    'message.recover_outbound_sends': {
+        'queue': 'low_priority',
+        'routing_key': 'low.maintenance',
+    },
     
     # ⚡ Workflow Tasks → Default Priority (user triggered)
     'workflow.tasks.process_event': {
@@ -140,6 +164,10 @@ app.conf.task_routes = {
         'queue': 'default',
         'routing_key': 'default.workflow',
     },
+    'workflow.tasks.process_tag_batch_event': {
+        'queue': 'default',
+        'routing_key': 'default.workflow',
+    },
     
     # 📊 Scheduled Workflow Tasks → Low Priority
     'workflow.tasks.process_scheduled_triggers': {
@@ -162,6 +190,10 @@ app.conf.task_routes = {
         'queue': 'low_priority',
         'routing_key': 'low.workflow',
     },
+    'workflow.tasks.checkpoint_execution_state': {
+        'queue': 'low_priority',
+        'routing_key': 'low.workflow',
+    },
     
     # 💰 Billing Tasks → Low Priority
     'billing.activate_queued_plans': {
@@ -182,6 +214,14 @@ app.conf.task_routes = {
         'queue': 'low_priority',
         'routing_key': 'low.sync',
     },
+    'settings.drain_intercom_outbox': {
+        'queue': 'low_priority',
+        'routing_key': 'low.sync',
+    },
+    'accounts.reconcile_dashboard_counters': {
+        'queue': 'low_priority',
+        'routing_key': 'low.maintenance',
+    },
     
     # 📝 Web Knowledge Tasks → Default Priority (user-triggered)
     'web_knowledge.tasks.generate_prompt_async_task': {
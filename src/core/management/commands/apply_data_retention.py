@@ -0,0 +1,50 @@
+"""
+Django management command for the data retention policies (core.retention).
+
+Archives days older than settings.DATA_RETENTION_DAYS into the daily summary
+tables and deletes the archived rows in batches. Safe to run repeatedly; the
+Celery Beat cleanup tasks run the same policies daily. Use it to work through
+a large backlog after first deploying the policies.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.retention import DataRetentionService
+
+
+class Command(BaseCommand):
+    help = 'Roll old log rows into daily summaries and delete them in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policy',
+            action='append',
+            choices=sorted(DataRetentionService.POLICIES),
+            help='Policy to apply (repeatable, default: all)',
+        )
+        parser.add_argument(
+            '--archive-only',
+            action='store_true',
+            help='Build summaries and advance the watermark without deleting rows',
+        )
+
+    def handle(self, *args, **options):
+        policies = options['policy'] or list(DataRetentionService.POLICIES)
+
+        for policy in policies:
+            days = DataRetentionService.get_retention_days(policy)
+            if days < 1:
+                raise CommandError(f'Retention for {policy} must be at least 1 day')
+
+            self.stdout.write(f'📦 {policy}: keeping {days} day(s) of raw rows...')
+            if options['archive_only']:
+                archived_days = DataRetentionService.archive(policy)
+                self.stdout.write(self.style.SUCCESS(f'✅ {policy}: archived {archived_days} day(s)'))
+                continue
+
+            result = DataRetentionService.apply(policy)
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {policy}: archived {result['archived_days']} day(s), "
+                f"deleted {result['deleted_rows']} row(s), "
+                f"watermark {result['archived_before']}"
+            ))
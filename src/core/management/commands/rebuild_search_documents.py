@@ -0,0 +1,73 @@
+"""
+Django management command to (re)build full-text search documents.
+
+Rows created before the search columns existed (or written with bulk_create /
+queryset.update(), which bypass Model.save()) have an empty search document.
+This command recomputes search_title / search_body in batches; Postgres then
+regenerates the search_vector column automatically.
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.search import SearchDocumentMixin
+
+SEARCHABLE_MODELS = (
+    'message.Conversation',
+    'message.Customer',
+    'web_knowledge.Product',
+    'web_knowledge.QAPair',
+)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild normalized full-text search documents for searchable models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            choices=SEARCHABLE_MODELS,
+            help='Only rebuild this model (can be repeated)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk_update batch',
+        )
+        parser.add_argument(
+            '--only-empty',
+            action='store_true',
+            help='Only rebuild rows whose search document is empty',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size must be positive')
+
+        for label in options['model'] or SEARCHABLE_MODELS:
+            model = apps.get_model(label)
+            if not issubclass(model, SearchDocumentMixin):
+                raise CommandError(f'{label} is not searchable')
+
+            queryset = model.objects.all()
+            if options['only_empty']:
+                queryset = queryset.filter(search_title='', search_body='')
+
+            self.stdout.write(f'🔎 Rebuilding search documents for {label}...')
+            updated = 0
+            batch = []
+            for obj in queryset.iterator(chunk_size=batch_size):
+                obj.refresh_search_document()
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    model.objects.bulk_update(batch, ['search_title', 'search_body'])
+                    updated += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_update(batch, ['search_title', 'search_body'])
+                updated += len(batch)
+
+            self.stdout.write(self.style.SUCCESS(f'✅ {label}: {updated} rows updated'))
@@ -54,3 +54,33 @@ class ProxySetting(models.Model):
             ProxySetting.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
 
+        from .utils import invalidate_proxy_cache
+        invalidate_proxy_cache()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+
+        from .utils import invalidate_proxy_cache
+        invalidate_proxy_cache()
+        return result
+
+
+
+class RetentionWatermark(models.Model):
+    """
+    Boundary of archived data for a retention policy (core.retention)
+
+    Rows created before `archived_before` have been rolled into the policy's
+    daily summary table; readers use the summaries for those days and the raw
+    rows from this date on.
+    """
+    policy = models.CharField(max_length=50, unique=True)
+    archived_before = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Retention watermark"
+        verbose_name_plural = "Retention watermarks"
+
+    def __str__(self):
+        return f"{self.policy} < {self.archived_before}"
@@ -0,0 +1,231 @@
+"""
+Data retention for high-volume log tables
+
+Each policy keeps raw rows for a configurable number of days
+(settings.DATA_RETENTION_DAYS). Older days are:
+
+✅ Rolled into a compact daily summary table (one transaction per day,
+   together with the watermark advance)
+✅ Deleted in small primary-key batches afterwards, so no long-running
+   DELETE holds locks on the table
+
+Readers combine both sources: summary rows for dates before the watermark,
+raw rows from the watermark on (see AIUsageLog.tokens_used).
+
+Workflow executions are archived by completion day, so unfinished executions
+are never summarized with a transient status: they stay raw until they
+finish and are archived with the day they finished on.
+
+Usage:
+    DataRetentionService.apply('trigger_event_log')
+    python manage.py apply_data_retention --policy ai_usage_log
+"""
+import logging
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def day_start(day: date) -> datetime:
+    """Aware midnight of `day` in the current time zone"""
+    return timezone.make_aware(datetime.combine(day, dt_time.min))
+
+
+class DataRetentionService:
+    """Summarize-then-purge retention for log tables"""
+
+    POLICIES = {
+        'trigger_event_log': {
+            'model': 'workflow.TriggerEventLog',
+            'summary': 'workflow.TriggerEventDailySummary',
+        },
+        'workflow_execution': {
+            'model': 'workflow.WorkflowExecution',
+            'summary': 'workflow.WorkflowExecutionDailySummary',
+            'date_field': 'completed_at',
+            # Unfinished executions are neither summarized nor deleted
+            'keep': Q(status__in=['PENDING', 'RUNNING', 'WAITING']) | Q(completed_at__isnull=True),
+        },
+        'ai_usage_log': {
+            'model': 'AI_model.AIUsageLog',
+            'summary': 'AI_model.AIUsageDailySummary',
+        },
+    }
+
+    DATE_FIELD = 'created_at'
+    WATERMARK_CACHE_KEY = 'retention_watermark:{policy}'
+    WATERMARK_CACHE_TTL = 300
+
+    # ==========================================
+    #  Configuration
+    # ==========================================
+
+    @classmethod
+    def get_policy(cls, policy: str) -> Dict[str, Any]:
+        if policy not in cls.POLICIES:
+            raise ValueError(f"Unknown retention policy: {policy}")
+        return cls.POLICIES[policy]
+
+    @classmethod
+    def get_retention_days(cls, policy: str) -> int:
+        cls.get_policy(policy)
+        return int(settings.DATA_RETENTION_DAYS[policy])
+
+    @classmethod
+    def get_date_field(cls, policy: str) -> str:
+        """Field whose day a row is archived under"""
+        return cls.get_policy(policy).get('date_field', cls.DATE_FIELD)
+
+    @classmethod
+    def _models(cls, policy: str):
+        config = cls.get_policy(policy)
+        return apps.get_model(config['model']), apps.get_model(config['summary'])
+
+    # ==========================================
+    #  Watermark
+    # ==========================================
+
+    @classmethod
+    def get_watermark(cls, policy: str) -> Optional[date]:
+        """First day that is NOT archived yet (None if nothing was archived)"""
+        cache_key = cls.WATERMARK_CACHE_KEY.format(policy=policy)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached or None
+
+        from core.models import RetentionWatermark
+        watermark = RetentionWatermark.objects.filter(policy=policy).values_list(
+            'archived_before', flat=True
+        ).first()
+        # '' caches "no watermark" without re-querying
+        cache.set(cache_key, watermark or '', cls.WATERMARK_CACHE_TTL)
+        return watermark
+
+    @classmethod
+    def get_watermark_datetime(cls, policy: str) -> Optional[datetime]:
+        watermark = cls.get_watermark(policy)
+        return day_start(watermark) if watermark else None
+
+    @classmethod
+    def unarchived(cls, policy: str, queryset):
+        """Rows of `queryset` that are not counted in the summary table"""
+        watermark = cls.get_watermark_datetime(policy)
+        if watermark is None:
+            return queryset
+        unarchived = Q(**{f'{cls.get_date_field(policy)}__gte': watermark})
+        keep = cls.get_policy(policy).get('keep')
+        return queryset.filter(unarchived | keep if keep is not None else unarchived)
+
+    @classmethod
+    def _set_watermark(cls, policy: str, archived_before: date):
+        from core.models import RetentionWatermark
+        RetentionWatermark.objects.update_or_create(
+            policy=policy, defaults={'archived_before': archived_before}
+        )
+        cache_key = cls.WATERMARK_CACHE_KEY.format(policy=policy)
+        transaction.on_commit(
+            lambda: cache.set(cache_key, archived_before, cls.WATERMARK_CACHE_TTL)
+        )
+
+    # ==========================================
+    #  Actions
+    # ==========================================
+
+    @classmethod
+    def archive(cls, policy: str, days: Optional[int] = None) -> int:
+        """
+        Roll every day older than the retention window into the summary table
+
+        Returns:
+            Number of days archived
+        """
+        model, summary_model = cls._models(policy)
+        days = cls.get_retention_days(policy) if days is None else days
+        cutoff = timezone.localdate() - timedelta(days=days)
+
+        day = cls.get_watermark(policy)
+        if day is None:
+            oldest = model.objects.aggregate(oldest=Min(cls.get_date_field(policy)))['oldest']
+            day = timezone.localtime(oldest).date() if oldest else cutoff
+
+        archived_days = 0
+        while day < cutoff:
+            next_day = day + timedelta(days=1)
+            with transaction.atomic():
+                rows = summary_model.rollup(day_start(day), day_start(next_day), day)
+                cls._set_watermark(policy, next_day)
+            logger.debug(f"📦 {policy}: archived {day} into {rows} summary rows")
+            day = next_day
+            archived_days += 1
+
+        if archived_days == 0 and cls.get_watermark(policy) is None:
+            # Empty table: start the watermark at the cutoff
+            cls._set_watermark(policy, cutoff)
+        return archived_days
+
+    @classmethod
+    def purge(cls, policy: str, batch_size: Optional[int] = None,
+              max_batches: Optional[int] = None) -> int:
+        """
+        Delete archived rows (dated before the watermark) in small batches
+
+        Returns:
+            Number of rows deleted
+        """
+        model, _ = cls._models(policy)
+        watermark = cls.get_watermark_datetime(policy)
+        if watermark is None:
+            return 0
+
+        batch_size = batch_size or settings.DATA_RETENTION_BATCH_SIZE
+        max_batches = max_batches or settings.DATA_RETENTION_MAX_BATCHES
+        pause = settings.DATA_RETENTION_BATCH_PAUSE
+
+        queryset = model.objects.filter(**{f'{cls.get_date_field(policy)}__lt': watermark}).order_by()
+        keep = cls.get_policy(policy).get('keep')
+        if keep is not None:
+            queryset = queryset.exclude(keep)
+
+        deleted = 0
+        for _ in range(max_batches):
+            pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                model.objects.filter(pk__in=pks).delete()
+            deleted += len(pks)
+            if len(pks) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        return deleted
+
+    @classmethod
+    def apply(cls, policy: str, days: Optional[int] = None) -> Dict[str, Any]:
+        """Archive then purge one policy"""
+        archived_days = cls.archive(policy, days=days)
+        deleted = cls.purge(policy)
+        watermark = cls.get_watermark(policy)
+        logger.info(
+            f"🧹 Retention {policy}: archived {archived_days} day(s), "
+            f"deleted {deleted} row(s), watermark {watermark}"
+        )
+        return {
+            'policy': policy,
+            'archived_days': archived_days,
+            'deleted_rows': deleted,
+            'archived_before': watermark.isoformat() if watermark else None,
+        }
+
+    @classmethod
+    def apply_all(cls, policies: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return [cls.apply(policy) for policy in (policies or cls.POLICIES)]
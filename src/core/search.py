@@ -0,0 +1,165 @@
+"""
+Postgres full-text + trigram search helpers
+
+Searchable models keep a Persian-normalized copy of their searchable text
+(search_title / search_body). Postgres derives a weighted tsvector from it in a
+generated column (GIN indexed), and search_title also carries a pg_trgm GIN index
+for fuzzy name/username matching.
+
+Usage:
+    class Product(SearchDocumentMixin, models.Model):
+        SEARCH_TITLE_FIELDS = ('title', 'brand', 'category')
+        SEARCH_BODY_FIELDS = ('short_description', 'description')
+
+    queryset = text_search(Product.objects.filter(user=user), 'گوشی سامسونگ')
+"""
+import logging
+import re
+from typing import Iterable, Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchVector, SearchVectorField
+from django.db import models
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+# Postgres has no Persian text-search configuration: text is normalized in Python
+# and indexed with the language-agnostic 'simple' configuration.
+SEARCH_CONFIG = 'simple'
+
+# Characters with meaning in to_tsquery() syntax
+_TSQUERY_SPECIAL_CHARS = re.compile(r"[&|!():*<>'\\]")
+
+
+def normalize_search_text(text: Optional[str]) -> str:
+    """
+    Normalize text for indexing and querying (same function on both sides)
+
+    Persian text goes through PersianNormalizer (ی/ک unification, half-spaces,
+    diacritics); everything is lower-cased for Latin scripts.
+    """
+    if not text:
+        return ''
+
+    text = str(text)
+    try:
+        from AI_model.services.persian_normalizer import get_normalizer
+        normalizer = get_normalizer()
+        if normalizer.is_persian(text):
+            text = normalizer.normalize_for_search(text)
+    except Exception as e:
+        logger.debug(f"Persian normalization skipped: {e}")
+
+    return ' '.join(text.lower().split())
+
+
+def build_search_query(term: str, weights: str = '') -> Optional[SearchQuery]:
+    """
+    Build a prefix tsquery from user input ("ali rez" → 'ali':* & 'rez':*)
+
+    Args:
+        term: Raw search input
+        weights: Optional weight restriction (e.g. 'A' = title only)
+
+    Returns:
+        SearchQuery or None if the term has no searchable tokens
+    """
+    normalized = normalize_search_text(term)
+    tokens = [
+        token for token in _TSQUERY_SPECIAL_CHARS.sub(' ', normalized).split()
+        if token
+    ]
+    if not tokens:
+        return None
+
+    raw_query = ' & '.join(f"'{token}':*{weights}" for token in tokens)
+    return SearchQuery(raw_query, search_type='raw', config=SEARCH_CONFIG)
+
+
+def text_search(queryset, term: str, weights: str = '', fuzzy: bool = True):
+    """
+    Filter queryset of a SearchDocumentMixin model by full-text + trigram match
+
+    Args:
+        queryset: QuerySet of a model using SearchDocumentMixin
+        term: Raw search input
+        weights: Restrict full-text match to weights ('A' = title, 'AB' = all)
+        fuzzy: Also match misspelled names via pg_trgm word similarity on search_title
+
+    Returns:
+        Filtered queryset (ordering is left to the caller)
+    """
+    if not term or not term.strip():
+        return queryset
+
+    query = build_search_query(term, weights)
+    if query is None:
+        return queryset.none()
+
+    condition = Q(search_vector=query)
+    if fuzzy:
+        condition |= Q(search_title__trigram_word_similar=normalize_search_text(term))
+
+    return queryset.filter(condition)
+
+
+class SearchDocumentMixin(models.Model):
+    """
+    Abstract model adding a normalized search document + generated tsvector
+
+    Subclasses list their searchable fields (or override get_search_title /
+    get_search_body) and add the GIN indexes from search_indexes() to Meta.
+    """
+    SEARCH_TITLE_FIELDS: Iterable[str] = ()
+    SEARCH_BODY_FIELDS: Iterable[str] = ()
+
+    search_title = models.TextField(blank=True, default='', editable=False)
+    search_body = models.TextField(blank=True, default='', editable=False)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('search_title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('search_body', weight='B', config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        abstract = True
+
+    def get_search_title(self) -> str:
+        return ' '.join(str(getattr(self, field) or '') for field in self.SEARCH_TITLE_FIELDS)
+
+    def get_search_body(self) -> str:
+        return ' '.join(str(getattr(self, field) or '') for field in self.SEARCH_BODY_FIELDS)
+
+    def refresh_search_document(self):
+        """Rebuild the normalized search document from source fields"""
+        self.search_title = normalize_search_text(self.get_search_title())
+        self.search_body = normalize_search_text(self.get_search_body())
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        source_fields = set(self.SEARCH_TITLE_FIELDS) | set(self.SEARCH_BODY_FIELDS)
+
+        if update_fields is None or source_fields.intersection(update_fields):
+            self.refresh_search_document()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'search_title', 'search_body'}
+
+        super().save(*args, **kwargs)
+
+
+def search_indexes(prefix: str):
+    """
+    GIN indexes for a SearchDocumentMixin model
+
+    Args:
+        prefix: Short table prefix for index names (max 30 chars total)
+    """
+    from django.contrib.postgres.indexes import GinIndex
+
+    return [
+        GinIndex(fields=['search_vector'], name=f'{prefix}_search_vec_gin'),
+        GinIndex(fields=['search_title'], name=f'{prefix}_search_trgm_gin', opclasses=['gin_trgm_ops']),
+    ]
@@ -23,6 +23,7 @@ DJANGO_APPS = (
     "django.contrib.admin",
     "django.contrib.admindocs",
     "django.contrib.sites",
+    "django.contrib.postgres",
 )
 THIRD_PARTY_APPS = (
     "rest_framework",
@@ -210,6 +211,9 @@ STORAGES = {
     "staticfiles": {
         "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",  # استاتیک روی VPS
     },
+    "exports": {
+        "BACKEND": "core.settings.storage_backends.PrivateExportStorage",  # Customer exports: private ACL, signed URLs
+    },
 }
 
 # ✅ STATIC files → سرو محلی از VPS
@@ -244,6 +248,7 @@ OTP_TTL = int(os.getenv("OTP_TTL", default="120"))
 JWT_SECRET = "jango-insecure-_#2hxi#d@7!6bg((p@tmy-)#y3i_ad=n!pm4@_h2c60+1m9gty"
 ACCESS_TTL = int(os.getenv("ACCESS_TTL", default="7"))  # days
 REFRESH_TTL = int(os.getenv("REFRESH_TTL", default="15"))  # days
+WS_AUTH_CACHE_TTL = int(os.getenv("WS_AUTH_CACHE_TTL", default="120"))  # seconds a validated token -> user snapshot is reused
 # END JWT SETTINGS
 
 
@@ -460,14 +465,48 @@ CELERY_BEAT_SCHEDULE = {
     },
     'cleanup-old-workflow-executions': {
         'task': 'workflow.tasks.cleanup_old_executions',
-        'schedule': crontab(hour=4, minute=0),  # Every day at 4:00 AM
-        'kwargs': {'days': 30},  # Keep 30 days of data
+        'schedule': crontab(hour=4, minute=0),  # Every day at 4:00 AM (days: DATA_RETENTION_DAYS)
+    },
+    # Message table partitions (no-op unless partitioned)
+    'ensure-message-partitions': {
+        'task': 'message.ensure_message_partitions',
+        'schedule': crontab(hour=0, minute=30),  # Every day at 0:30 AM
     },
     # New: run scheduled When nodes every minute
     'process-scheduled-when-nodes': {
         'task': 'workflow.tasks.process_scheduled_when_nodes',
         'schedule': crontab(minute='*'),
     },
+    # Dashboard overview counters: global counts, tenant drift, 30-day response rate
+    'reconcile-dashboard-counters': {
+        'task': 'accounts.reconcile_dashboard_counters',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+    },
+    # Flush in-flight workflow execution state (Redis) to the database
+    'checkpoint-workflow-execution-state': {
+        'task': 'workflow.tasks.checkpoint_execution_state',
+        'schedule': 15.0,  # Every 15 seconds
+    },
+    # Hourly/daily activity rollups read by analytics endpoints
+    'rollup-message-stats': {
+        'task': 'message.rollup_message_stats',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+    },
+    # Re-queue outbound messages left in `sending` by a dead worker
+    'recover-outbound-sends': {
+        'task': 'message.recover_outbound_sends',
+        'schedule': 60.0,  # Every minute
+    },
+    # Delete background customer exports after CUSTOMER_EXPORT_RETENTION_HOURS
+    'purge-customer-exports': {
+        'task': 'message.purge_customer_exports',
+        'schedule': crontab(minute=20),  # Every hour
+    },
+    # Intercom outbox backstop (saves also kick a drain after commit)
+    'drain-intercom-outbox': {
+        'task': 'settings.drain_intercom_outbox',
+        'schedule': 30.0,  # Every 30 seconds
+    },
 }
 
 STRIPE_WEBHOOK_SECRET = environ.get("STRIPE_WEBHOOK_SECRET")
@@ -496,3 +535,124 @@ KAVENEGAR_SENDER = environ.get("KAVENEGAR_SENDER", "10008663")  # Default sender
 OTP_EXPIRY_TIME = int(environ.get("OTP_EXPIRY_TIME", "300"))  # 5 minutes in seconds
 OTP_MAX_ATTEMPTS = int(environ.get("OTP_MAX_ATTEMPTS", "3"))  # Maximum verification attempts
 OTP_RESEND_WAIT_TIME = int(environ.get("OTP_RESEND_WAIT_TIME", "300"))  # 5 minutes wait before resend
+
+# ============================================================================
+# OUTBOUND HTTP CONFIGURATION (core.utils.make_request_with_proxy)
+# ============================================================================
+OUTBOUND_HTTP_POOL_CONNECTIONS = int(environ.get("OUTBOUND_HTTP_POOL_CONNECTIONS", "20"))  # Cached per-host pools
+OUTBOUND_HTTP_POOL_MAXSIZE = int(environ.get("OUTBOUND_HTTP_POOL_MAXSIZE", "20"))  # Keep-alive connections per host
+OUTBOUND_HTTP_CONNECT_TIMEOUT = float(environ.get("OUTBOUND_HTTP_CONNECT_TIMEOUT", "5"))
+OUTBOUND_HTTP_READ_TIMEOUT = float(environ.get("OUTBOUND_HTTP_READ_TIMEOUT", "30"))  # Used when caller passes no timeout
+OUTBOUND_HTTP_RETRIES = int(environ.get("OUTBOUND_HTTP_RETRIES", "2"))
+OUTBOUND_HTTP_BACKOFF_FACTOR = float(environ.get("OUTBOUND_HTTP_BACKOFF_FACTOR", "0.5"))
+PROXY_CIRCUIT_FAILURE_THRESHOLD = int(environ.get("PROXY_CIRCUIT_FAILURE_THRESHOLD", "3"))  # Consecutive failures
+PROXY_CIRCUIT_COOLDOWN = int(environ.get("PROXY_CIRCUIT_COOLDOWN", "60"))  # Seconds to skip an unhealthy proxy
+PROXY_CONFIG_CACHE_TTL = int(environ.get("PROXY_CONFIG_CACHE_TTL", "30"))  # Seconds to reuse ProxySetting lookup
+
+# ============================================================================
+# OUTBOUND MESSAGE QUEUE (message.services.outbound_queue)
+# ============================================================================
+# Token bucket per channel account: sustained sends/second and burst size
+OUTBOUND_RATE_LIMITS = {
+    'instagram': {
+        'rate': float(environ.get("OUTBOUND_INSTAGRAM_RATE", "10")),
+        'burst': int(environ.get("OUTBOUND_INSTAGRAM_BURST", "20")),
+    },
+    'telegram': {
+        'rate': float(environ.get("OUTBOUND_TELEGRAM_RATE", "25")),  # Bot API: ~30 msg/s per bot
+        'burst': int(environ.get("OUTBOUND_TELEGRAM_BURST", "30")),
+    },
+}
+OUTBOUND_SENDING_LEASE_SECONDS = int(environ.get("OUTBOUND_SENDING_LEASE_SECONDS", "180"))  # A `sending` row older than this is re-queued (send timeouts incl. fallback stay below)
+
+# ============================================================================
+# DATA RETENTION (core.retention)
+# ============================================================================
+# Days of raw rows kept per table; older days live on as daily summaries
+DATA_RETENTION_DAYS = {
+    'trigger_event_log': int(environ.get("RETENTION_TRIGGER_EVENT_LOG_DAYS", "30")),
+    'workflow_execution': int(environ.get("RETENTION_WORKFLOW_EXECUTION_DAYS", "30")),
+    'ai_usage_log': int(environ.get("RETENTION_AI_USAGE_LOG_DAYS", "400")),  # Keep > longest billing period
+}
+DATA_RETENTION_BATCH_SIZE = int(environ.get("DATA_RETENTION_BATCH_SIZE", "2000"))  # Rows per DELETE
+DATA_RETENTION_MAX_BATCHES = int(environ.get("DATA_RETENTION_MAX_BATCHES", "500"))  # Per policy per run
+DATA_RETENTION_BATCH_PAUSE = float(environ.get("DATA_RETENTION_BATCH_PAUSE", "0.05"))  # Seconds between batches
+
+# ============================================================================
+# WEBSOCKET NOTIFICATION COALESCING (message.services.notification_coalescer)
+# ============================================================================
+# Events for conversation/customer list groups are merged per conversation and
+# sent as one frame per window. 0 sends every event immediately.
+WEBSOCKET_COALESCE_WINDOW_MS = int(environ.get("WEBSOCKET_COALESCE_WINDOW_MS", "50"))
+
+# ============================================================================
+# INCOMING MEDIA PIPELINE (message.services.media_pipeline)
+# ============================================================================
+MEDIA_MAX_DOWNLOAD_BYTES = int(environ.get("MEDIA_MAX_DOWNLOAD_BYTES", str(25 * 1024 * 1024)))  # Larger attachments are rejected
+MEDIA_ANALYSIS_MAX_IMAGE_SIDE = int(environ.get("MEDIA_ANALYSIS_MAX_IMAGE_SIDE", "1536"))  # Longest side sent to the vision model
+MEDIA_ANALYSIS_JPEG_QUALITY = int(environ.get("MEDIA_ANALYSIS_JPEG_QUALITY", "85"))
+MEDIA_ANALYSIS_CACHE_TTL = int(environ.get("MEDIA_ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))  # Reuse analysis of identical media (by SHA-256)
+
+# ============================================================================
+# WORKFLOW CUSTOM CODE SANDBOX (workflow.utils.code_sandbox)
+# ============================================================================
+WORKFLOW_CODE_SANDBOX_ENABLED = environ.get("WORKFLOW_CODE_SANDBOX_ENABLED", "true").lower() == "true"  # Off = custom code nodes fail (never run in-process)
+WORKFLOW_CODE_SANDBOX_WORKERS = int(environ.get("WORKFLOW_CODE_SANDBOX_WORKERS", "2"))  # Pre-forked workers per process
+WORKFLOW_CODE_TIMEOUT = float(environ.get("WORKFLOW_CODE_TIMEOUT", "2.0"))  # Wall-clock seconds per run
+WORKFLOW_CODE_MEMORY_MB = int(environ.get("WORKFLOW_CODE_MEMORY_MB", "64"))  # Extra address space per worker
+WORKFLOW_CODE_MAX_TASKS_PER_WORKER = int(environ.get("WORKFLOW_CODE_MAX_TASKS_PER_WORKER", "500"))  # Recycle after N runs
+WORKFLOW_CODE_CACHE_SIZE = int(environ.get("WORKFLOW_CODE_CACHE_SIZE", "512"))  # Compiled code objects kept per process
+
+# ============================================================================
+# WORKFLOW EXECUTION STATE (workflow.services.execution_state)
+# ============================================================================
+# In-flight status/context live in Redis; rows are checkpointed on completion,
+# when they start or stop WAITING, and by the checkpoint beat task below.
+WORKFLOW_STATE_CHECKPOINT_INTERVAL = int(environ.get("WORKFLOW_STATE_CHECKPOINT_INTERVAL", "120"))  # Max seconds a change stays Redis-only
+WORKFLOW_STATE_WAIT_CHECKPOINT_SECONDS = int(environ.get("WORKFLOW_STATE_WAIT_CHECKPOINT_SECONDS", "30"))  # Waits longer than this are checkpointed
+WORKFLOW_STATE_TTL = int(environ.get("WORKFLOW_STATE_TTL", str(14 * 24 * 3600)))  # Idle state expires; the row is the checkpoint
+
+# ============================================================================
+# MESSAGE STATS ROLLUPS (message.services.stats_rollup)
+# ============================================================================
+# Analytics endpoints read hourly/daily totals filled by rollup_message_stats.
+MESSAGE_STATS_RECOMPUTE_HOURS = int(environ.get("MESSAGE_STATS_RECOMPUTE_HOURS", "2"))  # Hours before the watermark re-aggregated each run (late answers/statuses)
+MESSAGE_STATS_MAX_HOURS_PER_RUN = int(environ.get("MESSAGE_STATS_MAX_HOURS_PER_RUN", "168"))  # Backfill window per run
+MESSAGE_STATS_HOURLY_RETENTION_DAYS = int(environ.get("MESSAGE_STATS_HOURLY_RETENTION_DAYS", "40"))  # Daily rows are kept forever
+
+# ============================================================================
+# ACADEMY VIDEO DELIVERY (academy.streaming)
+# ============================================================================
+# Local-storage videos answer Range/If-Range/If-None-Match requests. With an
+# offload mode Django only checks permissions and the web server sends the file.
+ACADEMY_VIDEO_CHUNK_SIZE = int(environ.get("ACADEMY_VIDEO_CHUNK_SIZE", str(512 * 1024)))  # Aligned read size when Django streams the file
+ACADEMY_VIDEO_OFFLOAD = environ.get("ACADEMY_VIDEO_OFFLOAD", "").lower()  # '', 'x-accel' (nginx) or 'x-sendfile' (Apache/lighttpd)
+ACADEMY_VIDEO_ACCEL_PREFIX = environ.get("ACADEMY_VIDEO_ACCEL_PREFIX", "/protected-media/")  # nginx `internal` location aliased to MEDIA_ROOT
+
+# ============================================================================
+# ACADEMY LEARNING STATISTICS (academy.services.learning_stats)
+# ============================================================================
+ACADEMY_STATS_CACHE_TTL = int(environ.get("ACADEMY_STATS_CACHE_TTL", "300"))  # Per-user cache; progress updates invalidate it, video edits show after the TTL
+
+# ============================================================================
+# INTERCOM OUTBOX (settings.services.intercom_outbox)
+# ============================================================================
+# User/ticket/message saves write an IntercomOutboxEvent row; the drain task
+# delivers them per contact on the pooled session and pauses on rate limits.
+INTERCOM_OUTBOX_BATCH_SIZE = int(environ.get("INTERCOM_OUTBOX_BATCH_SIZE", "200"))  # Events claimed per drain run
+INTERCOM_OUTBOX_LEASE_SECONDS = int(environ.get("INTERCOM_OUTBOX_LEASE_SECONDS", "300"))  # Claimed events reappear after this if a worker dies
+INTERCOM_OUTBOX_DRAIN_BUDGET_SECONDS = int(environ.get("INTERCOM_OUTBOX_DRAIN_BUDGET_SECONDS", "120"))  # No new contacts after this; keep well below the lease
+INTERCOM_OUTBOX_MAX_ATTEMPTS = int(environ.get("INTERCOM_OUTBOX_MAX_ATTEMPTS", "8"))  # Then the event is kept as `failed`
+INTERCOM_OUTBOX_BACKOFF_BASE = int(environ.get("INTERCOM_OUTBOX_BACKOFF_BASE", "30"))  # Retry delay doubles from this
+INTERCOM_OUTBOX_BACKOFF_MAX = int(environ.get("INTERCOM_OUTBOX_BACKOFF_MAX", "3600"))
+INTERCOM_OUTBOX_DRAIN_INTERVAL = int(environ.get("INTERCOM_OUTBOX_DRAIN_INTERVAL", "30"))  # Matches the beat entry; sooner work is re-queued directly
+INTERCOM_RATE_LIMIT_RESERVE = int(environ.get("INTERCOM_RATE_LIMIT_RESERVE", "5"))  # Pause when X-RateLimit-Remaining drops to this
+INTERCOM_RATE_LIMIT_DEFAULT_WAIT = int(environ.get("INTERCOM_RATE_LIMIT_DEFAULT_WAIT", "10"))  # Pause when a 429 has no X-RateLimit-Reset
+
+# ============================================================================
+# CUSTOMER EXPORTS (message.services.customer_export)
+# ============================================================================
+# Background exports are written to STORAGES['exports'] (private objects) and
+# handed out as signed URLs; customers/exports/<filename>/ re-signs for the owner.
+CUSTOMER_EXPORT_URL_TTL = int(environ.get("CUSTOMER_EXPORT_URL_TTL", "900"))  # Seconds a signed download URL stays valid
+CUSTOMER_EXPORT_RETENTION_HOURS = int(environ.get("CUSTOMER_EXPORT_RETENTION_HOURS", "24"))  # Files are deleted after this
@@ -38,6 +38,15 @@ class MediaStorage(S3Boto3Storage):
     querystring_auth = False
     custom_domain = False
 
+# Tenant data exports (customer CSVs): never public, only reachable through short-lived signed URLs
+class PrivateExportStorage(S3Boto3Storage):
+    location = 'private'
+    default_acl = 'private'
+    object_parameters = {'ACL': 'private', 'CacheControl': 'private, no-store'}
+    file_overwrite = False
+    querystring_auth = True
+    custom_domain = False
+
 # Alternative MediaStorage using pre-signed URLs (use this if ACL issues persist)
 class MediaStoragePresigned(S3Boto3Storage):
     location = 'media'
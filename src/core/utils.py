@@ -1,9 +1,23 @@
 """
 Utility functions برای مدیریت پروکسی در درخواست‌های HTTP
+
+✅ Shared requests.Session per process (keep-alive, per-host connection pools)
+✅ Default timeouts + retries with backoff for idempotent requests
+✅ Proxy circuit breaker (shared via cache) - an unhealthy proxy is skipped for a cooldown
+✅ Per-host latency/error metrics (monitoring.metrics)
 """
+import hashlib
 import logging
-import requests
+import os
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
 from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -29,23 +43,68 @@ def setup_ai_proxy():
     return False
 
 
-def _get_active_proxy_sync() -> Dict[str, str]:
+def _normalize_proxy_url(proxy_url: Optional[str]) -> Optional[str]:
+    # ✅ Fix: تبدیل به lowercase برای سازگاری با requests library
+    if proxy_url and proxy_url.startswith(('HTTP://', 'HTTPS://')):
+        return proxy_url.lower()
+    return proxy_url
+
+
+# ProxySetting lookup is reused for a few seconds instead of hitting the DB on every request
+_proxy_config_cache: Dict = {'expires_at': 0.0, 'value': None}
+_proxy_config_lock = threading.Lock()
+
+
+def invalidate_proxy_cache():
+    """Drop the cached ProxySetting lookup (called when a ProxySetting is saved/deleted)"""
+    with _proxy_config_lock:
+        _proxy_config_cache['expires_at'] = 0.0
+        _proxy_config_cache['value'] = None
+
+
+def _get_proxy_config_sync() -> Dict[str, Dict[str, str]]:
     """
-    Internal synchronous function to get active proxy
+    Load primary + fallback proxy of the active ProxySetting (cached in-process)
+
+    Returns:
+        {'name': str, 'primary': {...}, 'fallback': {...}} - empty dicts if not configured
     """
+    from django.conf import settings
     from .models import ProxySetting
-    
+
+    now = time.monotonic()
+    with _proxy_config_lock:
+        if _proxy_config_cache['value'] is not None and _proxy_config_cache['expires_at'] > now:
+            return _proxy_config_cache['value']
+
+    config = {'name': None, 'primary': {}, 'fallback': {}}
     proxy = ProxySetting.objects.filter(is_active=True).first()
     if proxy:
-        logger.debug(f"🔒 Using proxy: {proxy.name}")
-        # ✅ Fix: تبدیل به lowercase برای سازگاری با requests library
-        http_proxy = proxy.http_proxy.lower() if proxy.http_proxy.startswith(('HTTP://', 'HTTPS://')) else proxy.http_proxy
-        https_proxy = proxy.https_proxy.lower() if proxy.https_proxy.startswith(('HTTP://', 'HTTPS://')) else proxy.https_proxy
-        
-        return {
-            "http": http_proxy,
-            "https": https_proxy
+        config['name'] = proxy.name
+        config['primary'] = {
+            "http": _normalize_proxy_url(proxy.http_proxy),
+            "https": _normalize_proxy_url(proxy.https_proxy)
         }
+        if proxy.fallback_http_proxy:
+            config['fallback'] = {
+                "http": _normalize_proxy_url(proxy.fallback_http_proxy),
+                "https": _normalize_proxy_url(proxy.fallback_https_proxy)
+            }
+
+    with _proxy_config_lock:
+        _proxy_config_cache['value'] = config
+        _proxy_config_cache['expires_at'] = now + getattr(settings, 'PROXY_CONFIG_CACHE_TTL', 30)
+    return config
+
+
+def _get_active_proxy_sync() -> Dict[str, str]:
+    """
+    Internal synchronous function to get active proxy
+    """
+    config = _get_proxy_config_sync()
+    if config['primary']:
+        logger.debug(f"🔒 Using proxy: {config['name']}")
+        return dict(config['primary'])
     
     logger.debug("⚠️ No active proxy found - direct connection will be used")
     return {}
@@ -77,19 +136,10 @@ def _get_fallback_proxy_sync() -> Dict[str, str]:
     """
     Internal synchronous function to get fallback proxy
     """
-    from .models import ProxySetting
-    
-    proxy = ProxySetting.objects.filter(is_active=True).first()
-    if proxy and proxy.fallback_http_proxy:
-        logger.info(f"🔄 Using fallback proxy: {proxy.name}")
-        # ✅ Fix: تبدیل به lowercase برای سازگاری با requests library
-        fallback_http = proxy.fallback_http_proxy.lower() if proxy.fallback_http_proxy.startswith(('HTTP://', 'HTTPS://')) else proxy.fallback_http_proxy
-        fallback_https = proxy.fallback_https_proxy.lower() if proxy.fallback_https_proxy and proxy.fallback_https_proxy.startswith(('HTTP://', 'HTTPS://')) else proxy.fallback_https_proxy
-        
-        return {
-            "http": fallback_http,
-            "https": fallback_https
-        }
+    config = _get_proxy_config_sync()
+    if config['fallback']:
+        logger.info(f"🔄 Using fallback proxy: {config['name']}")
+        return dict(config['fallback'])
     
     logger.debug("⚠️ No fallback proxy configured")
     return {}
@@ -119,10 +169,218 @@ def get_fallback_proxy() -> Dict[str, str]:
         return {}
 
 
+# ==========================================
+#  Shared HTTP session
+# ==========================================
+
+_http_session: Optional[requests.Session] = None
+_http_session_pid: Optional[int] = None
+_http_session_lock = threading.Lock()
+
+
+def _build_http_session() -> requests.Session:
+    from django.conf import settings
+
+    retries = getattr(settings, 'OUTBOUND_HTTP_RETRIES', 2)
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        status=retries,
+        status_forcelist=(502, 503, 504),
+        # POST (message sends) is never re-sent after a read error or 5xx - only connect errors are retried
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        backoff_factor=getattr(settings, 'OUTBOUND_HTTP_BACKOFF_FACTOR', 0.5),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=getattr(settings, 'OUTBOUND_HTTP_POOL_CONNECTIONS', 20),
+        pool_maxsize=getattr(settings, 'OUTBOUND_HTTP_POOL_MAXSIZE', 20),
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # Session is shared by all tenants - never carry cookies between requests
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the process-wide HTTP session (rebuilt after fork, e.g. Celery prefork workers)
+
+    Usage:
+        response = get_http_session().get(url, timeout=get_default_timeout())
+    """
+    global _http_session, _http_session_pid
+
+    pid = os.getpid()
+    if _http_session is None or _http_session_pid != pid:
+        with _http_session_lock:
+            if _http_session is None or _http_session_pid != pid:
+                _http_session = _build_http_session()
+                _http_session_pid = pid
+    return _http_session
+
+
+def get_default_timeout():
+    """(connect, read) timeout used when the caller passes none"""
+    from django.conf import settings
+    return (
+        getattr(settings, 'OUTBOUND_HTTP_CONNECT_TIMEOUT', 5),
+        getattr(settings, 'OUTBOUND_HTTP_READ_TIMEOUT', 30),
+    )
+
+
+# ==========================================
+#  Proxy circuit breaker
+# ==========================================
+
+class ProxyCircuitBreaker:
+    """
+    Remember unhealthy proxies across workers (Django cache)
+
+    After PROXY_CIRCUIT_FAILURE_THRESHOLD consecutive transport failures the proxy
+    is skipped for PROXY_CIRCUIT_COOLDOWN seconds; the first request after the
+    cooldown probes it again.
+    """
+
+    FAILURES_KEY = 'proxy_circuit:{proxy_hash}:failures'
+    OPEN_KEY = 'proxy_circuit:{proxy_hash}:open'
+
+    # Errors that indicate the proxy (not the upstream API) is broken
+    FAILURE_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    FAILURE_STATUS_CODES = (407,)
+
+    @classmethod
+    def _hash(cls, proxies: Dict[str, str]) -> str:
+        proxy_url = proxies.get('https') or proxies.get('http') or ''
+        return hashlib.sha1(proxy_url.encode()).hexdigest()[:16]
+
+    @classmethod
+    def is_proxy_failure(cls, error: Exception) -> bool:
+        if isinstance(error, cls.FAILURE_EXCEPTIONS):
+            return True
+        response = getattr(error, 'response', None)
+        return response is not None and response.status_code in cls.FAILURE_STATUS_CODES
+
+    @classmethod
+    def is_open(cls, proxies: Dict[str, str]) -> bool:
+        from django.core.cache import cache
+        try:
+            return bool(cache.get(cls.OPEN_KEY.format(proxy_hash=cls._hash(proxies))))
+        except Exception:
+            return False
+
+    @classmethod
+    def record_failure(cls, proxies: Dict[str, str], route: str):
+        from django.conf import settings
+        from django.core.cache import cache
+
+        cooldown = getattr(settings, 'PROXY_CIRCUIT_COOLDOWN', 60)
+        threshold = getattr(settings, 'PROXY_CIRCUIT_FAILURE_THRESHOLD', 3)
+        proxy_hash = cls._hash(proxies)
+        failures_key = cls.FAILURES_KEY.format(proxy_hash=proxy_hash)
+
+        try:
+            cache.add(failures_key, 0, cooldown)
+            failures = cache.incr(failures_key)
+            if failures >= threshold:
+                cache.set(cls.OPEN_KEY.format(proxy_hash=proxy_hash), 1, cooldown)
+                cache.delete(failures_key)
+                _set_circuit_metric(route, 1)
+                logger.warning(f"🔌 {route.capitalize()} proxy marked unhealthy for {cooldown}s after {failures} failures")
+        except Exception as e:
+            logger.debug(f"Proxy circuit breaker update skipped: {e}")
+
+    @classmethod
+    def record_success(cls, proxies: Dict[str, str], route: str):
+        from django.core.cache import cache
+        try:
+            cache.delete(cls.FAILURES_KEY.format(proxy_hash=cls._hash(proxies)))
+            _set_circuit_metric(route, 0)
+        except Exception as e:
+            logger.debug(f"Proxy circuit breaker update skipped: {e}")
+
+
+# ==========================================
+#  Metrics
+# ==========================================
+
+def _set_circuit_metric(route: str, value: int):
+    try:
+        from monitoring import metrics
+        metrics.outbound_proxy_circuit_open.labels(route=route).set(value)
+    except Exception:
+        pass
+
+
+def _record_metrics(method: str, url: str, route: str, duration: float,
+                    response: Optional[requests.Response] = None, error: Optional[Exception] = None):
+    try:
+        from monitoring import metrics
+        host = urlparse(url).hostname or 'unknown'
+        metrics.outbound_http_request_duration_seconds.labels(host=host, route=route).observe(duration)
+        if response is not None:
+            metrics.outbound_http_requests_total.labels(
+                host=host, method=method.upper(), status=str(response.status_code), route=route
+            ).inc()
+        if error is not None:
+            metrics.outbound_http_errors_total.labels(
+                host=host, route=route, error_type=type(error).__name__
+            ).inc()
+    except Exception:
+        pass
+
+
+def is_unsent_error(error: Exception) -> bool:
+    """
+    True when a request failed before it could reach the server (no connection,
+    DNS, proxy or TLS failure) - the only failures after which a POST may be re-sent
+    """
+    from urllib3.exceptions import NewConnectionError
+
+    if isinstance(error, (requests.exceptions.ConnectTimeout, requests.exceptions.ProxyError,
+                          requests.exceptions.SSLError)):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        # "Connection aborted" / reset mid-request may have been delivered
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+def _send(method: str, url: str, route: str, proxies: Dict[str, str], **kwargs) -> requests.Response:
+    """Send through the shared session, record metrics and update the circuit breaker"""
+    if proxies:
+        kwargs['proxies'] = proxies
+    else:
+        kwargs.pop('proxies', None)
+    kwargs.setdefault('timeout', get_default_timeout())
+
+    started = time.monotonic()
+    response = None
+    try:
+        response = get_http_session().request(method, url, **kwargs)
+        response.raise_for_status()
+    except Exception as e:
+        _record_metrics(method, url, route, time.monotonic() - started, response=response, error=e)
+        if proxies and ProxyCircuitBreaker.is_proxy_failure(e):
+            ProxyCircuitBreaker.record_failure(proxies, route)
+        raise
+
+    _record_metrics(method, url, route, time.monotonic() - started, response=response)
+    if proxies:
+        ProxyCircuitBreaker.record_success(proxies, route)
+    return response
+
+
 def make_request_with_proxy(
     method: str, 
     url: str, 
     use_fallback: bool = True,
+    fallback_after_send: bool = True,
     **kwargs
 ) -> requests.Response:
     """
@@ -132,6 +390,8 @@ def make_request_with_proxy(
         method: نوع درخواست (get, post, put, delete, etc.)
         url: آدرس URL
         use_fallback: استفاده از fallback در صورت خرابی (پیش‌فرض: True)
+        fallback_after_send: False = only retry on the fallback proxy when the request
+            never reached the server (is_unsent_error) - for sends that must not be duplicated
         **kwargs: پارامترهای دیگه برای requests (params, json, headers, timeout, etc.)
     
     Returns:
@@ -147,15 +407,17 @@ def make_request_with_proxy(
         # POST request
         response = make_request_with_proxy('post', url, json=data, timeout=30)
     """
+    proxies = get_active_proxy()
+    fallback_proxies = get_fallback_proxy() if use_fallback and proxies else {}
+
+    # پروکسی اصلی در حالت cooldown است - مستقیم سراغ fallback برو
+    if proxies and fallback_proxies and ProxyCircuitBreaker.is_open(proxies):
+        logger.info(f"🔌 Primary proxy in cooldown, using fallback for {method.upper()} {url[:80]}...")
+        return _send(method, url, 'fallback', fallback_proxies, **kwargs)
+
     # اول با پروکسی اصلی امتحان کن
     try:
-        proxies = get_active_proxy()
-        if proxies:
-            kwargs['proxies'] = proxies
-            
-        response = requests.request(method, url, **kwargs)
-        response.raise_for_status()
-        return response
+        return _send(method, url, 'primary' if proxies else 'direct', proxies, **kwargs)
         
     except Exception as primary_error:
         logger.warning(f"⚠️ Primary proxy failed for {method.upper()} {url[:80]}...")
@@ -163,25 +425,20 @@ def make_request_with_proxy(
         logger.warning(f"    Error message: {str(primary_error)[:200]}")
         
         # اگر fallback فعال باشه، با fallback proxy امتحان کن
-        if use_fallback:
-            try:
-                fallback_proxies = get_fallback_proxy()
-                logger.info(f"🔍 Fallback proxies retrieved: {bool(fallback_proxies)}")
-                if fallback_proxies:
+        if use_fallback and not fallback_after_send and not is_unsent_error(primary_error):
+            logger.warning("⚠️ Request may have been delivered, not retrying on the fallback proxy")
+        elif use_fallback:
+            if fallback_proxies:
+                try:
                     logger.info(f"🔄 Retrying {method.upper()} {url[:80]}... with fallback proxy")
-                    kwargs['proxies'] = fallback_proxies
-                    
-                    response = requests.request(method, url, **kwargs)
-                    response.raise_for_status()
+                    response = _send(method, url, 'fallback', fallback_proxies, **kwargs)
                     logger.info(f"✅ Fallback proxy SUCCESS for {method.upper()} {url[:80]}...")
                     return response
-                else:
-                    logger.warning("⚠️ No fallback proxy configured, raising original error")
-                    
-            except Exception as fallback_error:
-                logger.error(f"❌ Fallback proxy FAILED for {method.upper()} {url[:80]}...")
-                logger.error(f"    Fallback error: {type(fallback_error).__name__}: {str(fallback_error)[:200]}")
+                except Exception as fallback_error:
+                    logger.error(f"❌ Fallback proxy FAILED for {method.upper()} {url[:80]}...")
+                    logger.error(f"    Fallback error: {type(fallback_error).__name__}: {str(fallback_error)[:200]}")
+            else:
+                logger.warning("⚠️ No fallback proxy configured, raising original error")
         
         # اگر fallback هم fail شد یا غیرفعال بود، error اصلی رو raise کن
         raise primary_error
-
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0003_wordpresscontent_wordpresscontenteventlog_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='woocommerceeventlog',
+            name='event_type',
+            field=models.CharField(choices=[('product.created', 'Product Created'), ('product.updated', 'Product Updated'), ('product.deleted', 'Product Deleted'), ('product.batch', 'Product Batch Sync')], max_length=30),
+        ),
+        migrations.AlterField(
+            model_name='wordpresscontenteventlog',
+            name='event_type',
+            field=models.CharField(choices=[('page.created', 'Page Created'), ('page.updated', 'Page Updated'), ('page.deleted', 'Page Deleted'), ('post.created', 'Post Created'), ('post.updated', 'Post Updated'), ('post.deleted', 'Post Deleted'), ('content.batch', 'Content Batch Sync')], max_length=30),
+        ),
+    ]
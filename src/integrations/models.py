@@ -88,6 +88,7 @@ class WooCommerceEventLog(models.Model):
         ('product.created', 'Product Created'),
         ('product.updated', 'Product Updated'),
         ('product.deleted', 'Product Deleted'),
+        ('product.batch', 'Product Batch Sync'),
     ]
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -239,6 +240,7 @@ class WordPressContentEventLog(models.Model):
         ('post.created', 'Post Created'),
         ('post.updated', 'Post Updated'),
         ('post.deleted', 'Post Deleted'),
+        ('content.batch', 'Content Batch Sync'),
     ]
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
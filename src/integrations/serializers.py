@@ -152,3 +152,75 @@ class WordPressContentWebhookSerializer(serializers.Serializer):
                 raise serializers.ValidationError(f"Missing required field: {field}")
         return value
 
+
+class WooCommerceBatchSerializer(serializers.Serializer):
+    """Serializer for batch product sync (full sync pages from the plugin)"""
+    
+    MAX_BATCH_SIZE = 500
+    
+    batch_id = serializers.CharField(max_length=100, required=True)
+    products = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        default=list,
+        max_length=MAX_BATCH_SIZE
+    )
+    deleted_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        default=list,
+        max_length=MAX_BATCH_SIZE
+    )
+    
+    def validate_products(self, value):
+        """Validate each product like the single-event webhook"""
+        for index, product in enumerate(value):
+            for field in ['id', 'name']:
+                if field not in product:
+                    raise serializers.ValidationError(f"Product #{index}: missing required field: {field}")
+        return value
+    
+    def validate(self, attrs):
+        if not attrs['products'] and not attrs['deleted_ids']:
+            raise serializers.ValidationError("Batch is empty")
+        return attrs
+
+
+class WordPressContentBatchSerializer(serializers.Serializer):
+    """Serializer for batch pages/posts sync (full sync pages from the plugin)"""
+    
+    MAX_BATCH_SIZE = 100
+    
+    batch_id = serializers.CharField(max_length=100, required=True)
+    contents = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        default=list,
+        max_length=MAX_BATCH_SIZE
+    )
+    deleted = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        default=list,
+        max_length=MAX_BATCH_SIZE,
+        help_text="List of {id, post_type} to unpublish"
+    )
+    
+    def validate_contents(self, value):
+        """Validate each item like the single-event webhook"""
+        for index, content in enumerate(value):
+            for field in ['id', 'title', 'post_type']:
+                if field not in content:
+                    raise serializers.ValidationError(f"Content #{index}: missing required field: {field}")
+        return value
+    
+    def validate_deleted(self, value):
+        for index, item in enumerate(value):
+            if 'id' not in item:
+                raise serializers.ValidationError(f"Deleted #{index}: missing required field: id")
+        return value
+    
+    def validate(self, attrs):
+        if not attrs['contents'] and not attrs['deleted']:
+            raise serializers.ValidationError("Batch is empty")
+        return attrs
@@ -1,5 +1,6 @@
 import hashlib
-from typing import Dict, Any
+import json
+from typing import Dict, Any, List
 from decimal import Decimal, InvalidOperation
 from django.utils import timezone
 import logging
@@ -10,6 +11,17 @@ logger = logging.getLogger(__name__)
 class WooCommerceProcessor:
     """Process WooCommerce webhook events"""
     
+    BATCH_UPSERT_SIZE = 200
+    
+    # Fields overwritten on conflict in batch mode (WooCommerce is the source of truth)
+    BATCH_UPDATE_FIELDS = [
+        'title', 'description', 'short_description', 'price', 'currency',
+        'stock_quantity', 'in_stock', 'link', 'external_source', 'is_active',
+        'tags', 'category', 'extraction_method', 'extraction_metadata',
+        'main_image', 'images', 'original_price', 'discount_amount',
+        'search_title', 'search_body', 'updated_at',
+    ]
+    
     def __init__(self, user=None, token=None):
         self.user = user
         self.token = token
@@ -33,6 +45,107 @@ class WooCommerceProcessor:
         else:
             raise ValueError(f"Unknown event type: {event_type}")
     
+    def process_batch(self, products: List[Dict], deleted_ids: List[int] = None) -> Dict[str, Any]:
+        """
+        Upsert a page of products in one statement (full sync)
+        
+        - Duplicates inside the batch are collapsed (last one wins)
+        - Products whose payload hash is unchanged are skipped entirely
+        - Signals are bypassed; changed IDs are returned for a single re-chunk job
+        
+        Args:
+            products: List of product payloads (same shape as webhook 'product')
+            deleted_ids: WooCommerce product IDs to soft-delete
+            
+        Returns:
+            Counts + changed/removed Product IDs
+        """
+        from web_knowledge.models import Product
+        
+        # Deduplicate by external ID (last occurrence wins)
+        incoming = {}
+        for product_data in products:
+            incoming[f"woo_{product_data['id']}"] = product_data
+        
+        existing = {
+            row['external_id']: row
+            for row in Product.objects.filter(
+                user=self.user,
+                external_id__in=list(incoming.keys())
+            ).values('external_id', 'is_active', 'extraction_metadata')
+        }
+        
+        to_upsert = []
+        created_count = 0
+        unchanged_count = 0
+        
+        for external_id, product_data in incoming.items():
+            sync_hash = self._calculate_sync_hash(product_data)
+            content_hash = self._calculate_content_hash(product_data)
+            old = existing.get(external_id)
+            old_metadata = (old or {}).get('extraction_metadata') or {}
+            
+            if old and old['is_active'] and old_metadata.get('sync_hash') == sync_hash:
+                unchanged_count += 1
+                continue
+            
+            if not old:
+                created_count += 1
+            
+            needs_embedding = old_metadata.get('content_hash') != content_hash
+            defaults = self._build_product_defaults(product_data, content_hash, needs_embedding)
+            defaults['extraction_metadata']['sync_hash'] = sync_hash
+            
+            product = Product(user=self.user, external_id=external_id, **defaults)
+            product.refresh_search_document()  # bulk_create() bypasses save()
+            to_upsert.append(product)
+        
+        if to_upsert:
+            Product.objects.bulk_create(
+                to_upsert,
+                batch_size=self.BATCH_UPSERT_SIZE,
+                update_conflicts=True,
+                unique_fields=['user', 'external_id'],
+                update_fields=self.BATCH_UPDATE_FIELDS,
+            )
+        
+        # UUID primary keys are not returned on conflict - read back real IDs
+        changed_ids = [
+            str(pk) for pk in Product.objects.filter(
+                user=self.user,
+                external_id__in=[product.external_id for product in to_upsert]
+            ).values_list('id', flat=True)
+        ] if to_upsert else []
+        
+        # Soft delete
+        removed_ids = []
+        if deleted_ids:
+            removed = Product.objects.filter(
+                user=self.user,
+                external_id__in=[f"woo_{woo_id}" for woo_id in deleted_ids],
+                is_active=True
+            )
+            removed_ids = [str(pk) for pk in removed.values_list('id', flat=True)]
+            removed.update(is_active=False, updated_at=timezone.now())
+        
+        result = {
+            'received': len(products),
+            'created': created_count,
+            'updated': len(to_upsert) - created_count,
+            'unchanged': unchanged_count,
+            'deleted': len(removed_ids),
+            'changed_ids': changed_ids,
+            'removed_ids': removed_ids,
+        }
+        
+        logger.info(
+            f"✅ Product batch upserted for user {self.user.id}: "
+            f"{result['created']} created, {result['updated']} updated, "
+            f"{result['unchanged']} unchanged, {result['deleted']} deleted"
+        )
+        
+        return result
+    
     def _handle_product_upsert(self, payload: Dict) -> Dict:
         """Create or update product"""
         from web_knowledge.models import Product
@@ -59,6 +172,29 @@ class WooCommerceProcessor:
                 logger.info(f"📝 Content unchanged, updating metadata only")
         
         # Prepare product data
+        product_defaults = self._build_product_defaults(product_data, content_hash, needs_embedding)
+        
+        # Create or Update
+        product, created = Product.objects.update_or_create(
+            user=self.user,
+            external_id=external_id,
+            defaults=product_defaults
+        )
+        
+        # Signal will auto-chunk (web_knowledge/signals.py)
+        
+        action = "created" if created else "updated"
+        logger.info(f"✅ Product {action}: {product.title} (ID: {product.id})")
+        
+        return {
+            'status': 'success',
+            'action': action,
+            'product_id': str(product.id),
+            'needs_embedding': needs_embedding
+        }
+    
+    def _build_product_defaults(self, product_data: Dict, content_hash: str, needs_embedding: bool) -> Dict:
+        """Map WooCommerce product payload to Product fields"""
         product_defaults = {
             'title': product_data['name'][:255],  # Max 255 chars
             'description': product_data.get('description', ''),
@@ -105,24 +241,7 @@ class WooCommerceProcessor:
                 product_defaults['price'] = sale
                 product_defaults['discount_amount'] = regular - sale
         
-        # Create or Update
-        product, created = Product.objects.update_or_create(
-            user=self.user,
-            external_id=external_id,
-            defaults=product_defaults
-        )
-        
-        # Signal will auto-chunk (web_knowledge/signals.py)
-        
-        action = "created" if created else "updated"
-        logger.info(f"✅ Product {action}: {product.title} (ID: {product.id})")
-        
-        return {
-            'status': 'success',
-            'action': action,
-            'product_id': str(product.id),
-            'needs_embedding': needs_embedding
-        }
+        return product_defaults
     
     def _handle_product_delete(self, payload: Dict) -> Dict:
         """Soft delete product"""
@@ -160,6 +279,11 @@ class WooCommerceProcessor:
         content = '|'.join(critical_fields)
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
     
+    def _calculate_sync_hash(self, product_data: Dict) -> str:
+        """Calculate hash of the whole payload (any change → upsert)"""
+        content = json.dumps(product_data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
     def _safe_decimal(self, value) -> Decimal:
         """
         Safely convert to Decimal with overflow protection
@@ -1,5 +1,6 @@
 import hashlib
-from typing import Dict, Any
+import json
+from typing import Dict, Any, List
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 import logging
@@ -10,6 +11,15 @@ logger = logging.getLogger(__name__)
 class WordPressContentProcessor:
     """Process WordPress Pages/Posts webhook events"""
     
+    BATCH_UPSERT_SIZE = 100
+    
+    # Fields overwritten on conflict in batch mode
+    BATCH_UPDATE_FIELDS = [
+        'content_type', 'title', 'content', 'excerpt', 'permalink', 'author',
+        'categories', 'tags', 'featured_image', 'is_published', 'modified_date',
+        'content_hash', 'metadata', 'last_synced_at', 'updated_at',
+    ]
+    
     def __init__(self, user=None, token=None):
         self.user = user
         self.token = token
@@ -25,6 +35,111 @@ class WordPressContentProcessor:
         else:
             raise ValueError(f"Unknown event type: {event_type}")
     
+    def process_batch(self, contents: List[Dict], deleted: List[Dict] = None) -> Dict[str, Any]:
+        """
+        Upsert a page of pages/posts in one statement (full sync)
+        
+        - Duplicates inside the batch are collapsed (last one wins)
+        - Published items whose payload hash is unchanged are skipped entirely
+          (unpublished ones are re-sent to be republished)
+        - Signals are bypassed; changed IDs are returned for a single re-chunk job
+        
+        Args:
+            contents: List of content payloads (same shape as webhook 'content')
+            deleted: List of {'id': wp_post_id, 'post_type': slug} to unpublish
+            
+        Returns:
+            Counts + changed/removed WordPressContent IDs
+        """
+        from integrations.models import WordPressContent
+        
+        # Deduplicate by (wp_post_id, post_type) - last occurrence wins
+        incoming = {}
+        for content_data in contents:
+            incoming[(int(content_data['id']), content_data.get('post_type', 'page'))] = content_data
+        
+        existing = {
+            (row['wp_post_id'], row['post_type_slug']): row
+            for row in WordPressContent.objects.filter(
+                user=self.user,
+                wp_post_id__in={wp_post_id for wp_post_id, _ in incoming}
+            ).values('wp_post_id', 'post_type_slug', 'is_published', 'content_hash', 'metadata')
+        }
+        
+        to_upsert = []
+        created_count = 0
+        unchanged_count = 0
+        
+        for (wp_post_id, post_type), content_data in incoming.items():
+            sync_hash = self._calculate_sync_hash(content_data)
+            content_hash = self._calculate_content_hash(content_data)
+            old = existing.get((wp_post_id, post_type))
+            
+            if old and old['is_published'] and (old['metadata'] or {}).get('sync_hash') == sync_hash:
+                unchanged_count += 1
+                continue
+            
+            if not old:
+                created_count += 1
+            
+            needs_embedding = not old or old['content_hash'] != content_hash
+            defaults = self._build_content_defaults(content_data, content_hash, needs_embedding)
+            defaults['metadata']['sync_hash'] = sync_hash
+            
+            to_upsert.append(WordPressContent(user=self.user, wp_post_id=wp_post_id, **defaults))
+        
+        if to_upsert:
+            WordPressContent.objects.bulk_create(
+                to_upsert,
+                batch_size=self.BATCH_UPSERT_SIZE,
+                update_conflicts=True,
+                unique_fields=['user', 'wp_post_id', 'post_type_slug'],
+                update_fields=self.BATCH_UPDATE_FIELDS,
+            )
+        
+        # UUID primary keys are not returned on conflict - read back real IDs
+        changed_ids = []
+        if to_upsert:
+            changed_keys = {(content.wp_post_id, content.post_type_slug) for content in to_upsert}
+            changed_ids = [
+                str(row['id']) for row in WordPressContent.objects.filter(
+                    user=self.user,
+                    wp_post_id__in={wp_post_id for wp_post_id, _ in changed_keys}
+                ).values('id', 'wp_post_id', 'post_type_slug')
+                if (row['wp_post_id'], row['post_type_slug']) in changed_keys
+            ]
+        
+        # Soft delete (unpublish)
+        removed_ids = []
+        for item in deleted or []:
+            removed = WordPressContent.objects.filter(
+                user=self.user,
+                wp_post_id=item['id'],
+                post_type_slug=item.get('post_type', 'page'),
+                is_published=True
+            )
+            ids = [str(pk) for pk in removed.values_list('id', flat=True)]
+            removed.update(is_published=False, updated_at=timezone.now())
+            removed_ids.extend(ids)
+        
+        result = {
+            'received': len(contents),
+            'created': created_count,
+            'updated': len(to_upsert) - created_count,
+            'unchanged': unchanged_count,
+            'deleted': len(removed_ids),
+            'changed_ids': changed_ids,
+            'removed_ids': removed_ids,
+        }
+        
+        logger.info(
+            f"✅ WordPress content batch upserted for user {self.user.id}: "
+            f"{result['created']} created, {result['updated']} updated, "
+            f"{result['unchanged']} unchanged, {result['deleted']} deleted"
+        )
+        
+        return result
+    
     def _handle_content_upsert(self, payload: Dict) -> Dict:
         """Create or update WordPress content"""
         from integrations.models import WordPressContent
@@ -33,15 +148,7 @@ class WordPressContentProcessor:
         
         # Calculate content hash
         content_hash = self._calculate_content_hash(content_data)
-        
-        # Determine content_type
         post_type = content_data.get('post_type', 'page')
-        if post_type == 'page':
-            content_type = 'page'
-        elif post_type == 'post':
-            content_type = 'post'
-        else:
-            content_type = 'custom'
         
         # Check existing
         existing = WordPressContent.objects.filter(
@@ -55,13 +162,46 @@ class WordPressContentProcessor:
             needs_embedding = False
             logger.info(f"📝 Content unchanged, skipping re-embed")
         
+        # Prepare data
+        content_defaults = self._build_content_defaults(content_data, content_hash, needs_embedding)
+        
+        # Create or Update
+        content, created = WordPressContent.objects.update_or_create(
+            user=self.user,
+            wp_post_id=content_data['id'],
+            post_type_slug=post_type,
+            defaults=content_defaults
+        )
+        
+        # Signal will auto-chunk
+        
+        action = "created" if created else "updated"
+        logger.info(f"✅ WordPress content {action}: {content.title}")
+        
+        return {
+            'status': 'success',
+            'action': action,
+            'content_id': str(content.id),
+            'needs_embedding': needs_embedding
+        }
+    
+    def _build_content_defaults(self, content_data: Dict, content_hash: str, needs_embedding: bool) -> Dict:
+        """Map WordPress content payload to WordPressContent fields"""
+        # Determine content_type
+        post_type = content_data.get('post_type', 'page')
+        if post_type == 'page':
+            content_type = 'page'
+        elif post_type == 'post':
+            content_type = 'post'
+        else:
+            content_type = 'custom'
+        
         # Parse modified date
         modified_date = parse_datetime(content_data.get('modified_date', ''))
         if not modified_date:
             modified_date = timezone.now()
         
-        # Prepare data
-        content_defaults = {
+        return {
             'content_type': content_type,
             'post_type_slug': post_type,
             'title': content_data['title'][:500],
@@ -82,26 +222,6 @@ class WordPressContentProcessor:
                 'last_sync_at': str(timezone.now()),
             }
         }
-        
-        # Create or Update
-        content, created = WordPressContent.objects.update_or_create(
-            user=self.user,
-            wp_post_id=content_data['id'],
-            post_type_slug=post_type,
-            defaults=content_defaults
-        )
-        
-        # Signal will auto-chunk
-        
-        action = "created" if created else "updated"
-        logger.info(f"✅ WordPress content {action}: {content.title}")
-        
-        return {
-            'status': 'success',
-            'action': action,
-            'content_id': str(content.id),
-            'needs_embedding': needs_embedding
-        }
     
     def _handle_content_delete(self, payload: Dict) -> Dict:
         """Soft delete WordPress content"""
@@ -136,4 +256,8 @@ class WordPressContentProcessor:
         ]
         content = '|'.join(critical_fields)
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
-
+    
+    def _calculate_sync_hash(self, content_data: Dict) -> str:
+        """Calculate hash of the whole payload (any change → upsert)"""
+        content = json.dumps(content_data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
@@ -121,3 +121,81 @@ def process_wordpress_content(self, payload: dict, user_id: int, event_log_id: s
         
         raise self.retry(exc=e, countdown=countdown)
 
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=60)
+def rechunk_woocommerce_batch(self, user_id: int, changed_ids: list, removed_ids: list = None):
+    """
+    Re-chunk products changed by one batch upsert (bulk_create bypasses signals)
+    
+    Args:
+        user_id: User ID
+        changed_ids: Product IDs created/updated by the batch
+        removed_ids: Product IDs soft-deleted by the batch
+        
+    Queue: default
+    """
+    from AI_model.services.incremental_chunker import IncrementalChunker
+    from web_knowledge.models import Product
+    from accounts.models import User
+    
+    start_time = time.time()
+    user = User.objects.get(id=user_id)
+    chunker = IncrementalChunker(user)
+    
+    chunked = 0
+    failed = 0
+    for product in Product.objects.filter(user=user, id__in=changed_ids, is_active=True).iterator(chunk_size=100):
+        try:
+            if chunker.chunk_product(product):
+                chunked += 1
+            else:
+                failed += 1
+        except Exception as e:
+            failed += 1
+            logger.error(f"❌ Failed to chunk product {product.id}: {e}")
+    
+    removed = 0
+    for product_id in removed_ids or []:
+        removed += chunker.delete_chunks_for_source(product_id, 'product')
+    
+    processing_time = int((time.time() - start_time) * 1000)
+    logger.info(
+        f"✅ WooCommerce batch re-chunked for user {user_id}: "
+        f"{chunked} chunked, {failed} failed, {removed} chunks removed ({processing_time}ms)"
+    )
+    
+    return {'chunked': chunked, 'failed': failed, 'removed_chunks': removed}
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=60)
+def rechunk_wordpress_batch(self, user_id: int, changed_ids: list, removed_ids: list = None):
+    """
+    Re-chunk WordPress content changed by one batch upsert (bulk_create bypasses signals)
+    
+    Args:
+        user_id: User ID
+        changed_ids: WordPressContent IDs created/updated by the batch
+        removed_ids: WordPressContent IDs unpublished by the batch
+        
+    Queue: default
+    """
+    from integrations.models import WordPressContent
+    from integrations.signals import sync_wordpress_content_to_knowledge_base
+    
+    start_time = time.time()
+    ids = list(changed_ids) + list(removed_ids or [])
+    
+    processed = 0
+    for content in WordPressContent.objects.filter(user_id=user_id, id__in=ids).select_related('user').iterator(chunk_size=50):
+        # Same path as post_save (handles both publish and unpublish)
+        sync_wordpress_content_to_knowledge_base(WordPressContent, content, created=False)
+        processed += 1
+    
+    processing_time = int((time.time() - start_time) * 1000)
+    logger.info(
+        f"✅ WordPress batch re-chunked for user {user_id}: "
+        f"{processed} items ({processing_time}ms)"
+    )
+    
+    return {'processed': processed}
@@ -0,0 +1 @@
+# Integrations tests
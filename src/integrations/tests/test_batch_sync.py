@@ -0,0 +1,61 @@
+"""
+Tests for the WordPress pages/posts batch sync (unchanged skip, idempotent retries)
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from integrations.models import WordPressContent, WordPressContentEventLog
+from integrations.services import WordPressContentProcessor
+from integrations.views import WordPressContentBatchSyncView
+
+User = get_user_model()
+
+PAGE = {'id': 7, 'post_type': 'page', 'title': 'About', 'content': 'About us', 'permalink': 'https://example.com/about'}
+
+
+@mock.patch('integrations.tasks.rechunk_wordpress_batch.apply_async')
+class WordPressContentBatchTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='wp@example.com', password='securepassword123', username='wp')
+
+    def _post(self, batch_id, **data):
+        request = APIRequestFactory().post('/', {'batch_id': batch_id, **data}, format='json')
+        force_authenticate(request, user=self.user)
+        return WordPressContentBatchSyncView.as_view()(request)
+
+    def test_unchanged_content_is_skipped_until_unpublished(self, _rechunk):
+        processor = WordPressContentProcessor(user=self.user)
+        self.assertEqual(processor.process_batch([PAGE])['created'], 1)
+        self.assertEqual(processor.process_batch([PAGE])['unchanged'], 1)
+
+        processor.process_batch([], deleted=[{'id': 7, 'post_type': 'page'}])
+        result = processor.process_batch([PAGE])
+
+        self.assertEqual((result['updated'], result['unchanged']), (1, 0))
+        self.assertTrue(WordPressContent.objects.get(user=self.user, wp_post_id=7).is_published)
+
+    def test_concurrent_retry_is_reported_as_processed(self, _rechunk):
+        self.assertEqual(self._post('batch-1', contents=[PAGE]).data['status'], 'success')
+
+        # The retry passed the duplicate check before the first request committed
+        real_exists = QuerySet.exists
+        checks = []
+
+        def exists(queryset):
+            if queryset.model is WordPressContentEventLog and not checks:
+                checks.append(queryset)
+                return False
+            return real_exists(queryset)
+
+        with mock.patch.object(QuerySet, 'exists', autospec=True, side_effect=exists):
+            response = self._post('batch-1', contents=[PAGE])
+
+        self.assertEqual(len(checks), 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'skipped')
+        self.assertEqual(WordPressContentEventLog.objects.filter(event_id='batch-1').count(), 1)
@@ -11,10 +11,12 @@ router.register(r'wordpress-content', views.WordPressContentViewSet, basename='w
 urlpatterns = [
     # WooCommerce webhook endpoints
     path('woocommerce/webhook/', views.WooCommerceWebhookView.as_view(), name='woocommerce-webhook'),
+    path('woocommerce/batch/', views.WooCommerceBatchSyncView.as_view(), name='woocommerce-batch'),
     path('woocommerce/health/', views.WooCommerceHealthCheckView.as_view(), name='woocommerce-health'),
     
     # WordPress content webhook endpoints (استاندارد با Plugin)
     path('wordpress-content/webhook/', views.WordPressContentWebhookView.as_view(), name='wordpress-content-webhook'),
+    path('wordpress-content/batch/', views.WordPressContentBatchSyncView.as_view(), name='wordpress-content-batch'),
     path('wordpress-content/health/', views.WordPressContentHealthCheckView.as_view(), name='wordpress-content-health'),
     
     # Admin endpoints (via router)
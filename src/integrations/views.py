@@ -3,6 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.decorators import action
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from integrations.models import (
     IntegrationToken, WooCommerceEventLog,
@@ -15,7 +16,9 @@ from integrations.serializers import (
     WooCommerceEventLogSerializer,
     WooCommerceWebhookSerializer,
     WordPressContentSerializer,
-    WordPressContentWebhookSerializer
+    WordPressContentWebhookSerializer,
+    WooCommerceBatchSerializer,
+    WordPressContentBatchSerializer
 )
 from integrations.services import TokenGenerator, WooCommerceProcessor, WordPressContentProcessor
 import logging
@@ -24,6 +27,16 @@ import time
 logger = logging.getLogger(__name__)
 
 
+def _duplicate_batch_response(batch_id):
+    """Response for a batch whose event log already exists (idempotent retry)"""
+    logger.info(f"⏭️ Duplicate batch skipped: {batch_id}")
+    return Response({
+        'status': 'skipped',
+        'message': 'این دسته قبلاً پردازش شده است',
+        'batch_id': batch_id
+    }, status=status.HTTP_200_OK)
+
+
 class IntegrationTokenViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing Integration Tokens
@@ -196,6 +209,88 @@ class WooCommerceWebhookView(APIView):
         return ip
 
 
+class WooCommerceBatchSyncView(APIView):
+    """
+    Receive a page of WooCommerce products (full sync)
+    
+    POST /api/integrations/woocommerce/batch/
+    
+    Products are deduplicated by payload hash and upserted in one statement;
+    a single re-chunk job is queued for the whole batch.
+    """
+    authentication_classes = [IntegrationTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        start_time = time.time()
+        
+        serializer = WooCommerceBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        payload = serializer.validated_data
+        batch_id = payload['batch_id']
+        
+        # Check for duplicate (idempotency)
+        if WooCommerceEventLog.objects.filter(event_id=batch_id).exists():
+            return _duplicate_batch_response(batch_id)
+        
+        from integrations.tasks import rechunk_woocommerce_batch
+        
+        processor = WooCommerceProcessor(user=request.user, token=request.auth)
+        try:
+            with transaction.atomic():
+                result = processor.process_batch(payload['products'], payload['deleted_ids'])
+            
+                processing_time = int((time.time() - start_time) * 1000)
+                WooCommerceEventLog.objects.create(
+                    event_id=batch_id,
+                    event_type='product.batch',
+                    user=request.user,
+                    token=request.auth,
+                    woo_product_id=0,
+                    payload={
+                        'batch_id': batch_id,
+                        'product_ids': [product['id'] for product in payload['products']],
+                        'deleted_ids': payload['deleted_ids'],
+                    },
+                    processing_time_ms=processing_time,
+                    source_ip=self._get_client_ip(request),
+                    user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
+                )
+            
+                # One re-chunk job per batch (after commit so the worker sees the rows)
+                if result['changed_ids'] or result['removed_ids']:
+                    transaction.on_commit(lambda: rechunk_woocommerce_batch.apply_async(
+                        args=[request.user.id, result['changed_ids'], result['removed_ids']],
+                        countdown=2
+                    ))
+        except IntegrityError:
+            # A concurrent retry of the same batch committed its event log first
+            if not WooCommerceEventLog.objects.filter(event_id=batch_id).exists():
+                raise
+            return _duplicate_batch_response(batch_id)
+        
+        logger.info(
+            f"✅ Batch accepted: {batch_id} with {result['received']} products "
+            f"(user: {request.user.email}, time: {processing_time}ms)"
+        )
+        
+        return Response({
+            'status': 'success',
+            'message': 'دسته محصولات همگام‌سازی شد',
+            'batch_id': batch_id,
+            'received': result['received'],
+            'created': result['created'],
+            'updated': result['updated'],
+            'unchanged': result['unchanged'],
+            'deleted': result['deleted'],
+            'processing_time_ms': processing_time
+        }, status=status.HTTP_200_OK)
+    
+    _get_client_ip = WooCommerceWebhookView._get_client_ip
+
+
 class WooCommerceHealthCheckView(APIView):
     """
     Test connection from WordPress plugin
@@ -356,6 +451,81 @@ class WordPressContentWebhookView(APIView):
         }, status=status.HTTP_202_ACCEPTED)
 
 
+class WordPressContentBatchSyncView(APIView):
+    """
+    Receive a page of WordPress pages/posts (full sync)
+    
+    POST /api/integrations/wordpress-content/batch/
+    """
+    authentication_classes = [IntegrationTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        start_time = time.time()
+        
+        serializer = WordPressContentBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        payload = serializer.validated_data
+        batch_id = payload['batch_id']
+        
+        # Check for duplicate
+        if WordPressContentEventLog.objects.filter(event_id=batch_id).exists():
+            return _duplicate_batch_response(batch_id)
+        
+        from integrations.tasks import rechunk_wordpress_batch
+        
+        processor = WordPressContentProcessor(user=request.user, token=request.auth)
+        try:
+            with transaction.atomic():
+                result = processor.process_batch(payload['contents'], payload['deleted'])
+            
+                processing_time = int((time.time() - start_time) * 1000)
+                WordPressContentEventLog.objects.create(
+                    event_id=batch_id,
+                    event_type='content.batch',
+                    user=request.user,
+                    token=request.auth,
+                    wp_post_id=0,
+                    payload={
+                        'batch_id': batch_id,
+                        'content_ids': [content['id'] for content in payload['contents']],
+                        'deleted': payload['deleted'],
+                    },
+                    processing_time_ms=processing_time
+                )
+            
+                # One re-chunk job per batch (after commit so the worker sees the rows)
+                if result['changed_ids'] or result['removed_ids']:
+                    transaction.on_commit(lambda: rechunk_wordpress_batch.apply_async(
+                        args=[request.user.id, result['changed_ids'], result['removed_ids']],
+                        countdown=2
+                    ))
+        except IntegrityError:
+            # A concurrent retry of the same batch committed its event log first
+            if not WordPressContentEventLog.objects.filter(event_id=batch_id).exists():
+                raise
+            return _duplicate_batch_response(batch_id)
+        
+        logger.info(
+            f"✅ WordPress content batch accepted: {batch_id} with {result['received']} items "
+            f"(user: {request.user.email}, time: {processing_time}ms)"
+        )
+        
+        return Response({
+            'status': 'success',
+            'message': 'دسته محتوا همگام‌سازی شد',
+            'batch_id': batch_id,
+            'received': result['received'],
+            'created': result['created'],
+            'updated': result['updated'],
+            'unchanged': result['unchanged'],
+            'deleted': result['deleted'],
+            'processing_time_ms': processing_time
+        }, status=status.HTTP_200_OK)
+
+
 class WordPressContentHealthCheckView(APIView):
     """
     Test connection for WordPress pages/posts
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from message.models import Conversation,Tag,Customer,Message
+from message.models import Conversation,Tag,Customer,Message,MessageStatsRollup
 
 class ConversationAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'title', 'created_at', 'status')
@@ -105,4 +105,12 @@ class MessageAdmin(admin.ModelAdmin):
         return "😐 No feedback"
     feedback_display.short_description = "Feedback Status"
 
-admin.site.register(Message, MessageAdmin)
\ No newline at end of file
+admin.site.register(Message, MessageAdmin)
+class MessageStatsRollupAdmin(admin.ModelAdmin):
+    """Hourly/daily activity totals (message.services.stats_rollup)"""
+    list_display = ('bucket_start', 'granularity', 'user', 'channel', 'section',
+                    'inbound_messages', 'answered_messages', 'ai_requests', 'workflow_runs')
+    list_filter = ('granularity', 'channel', 'section')
+    search_fields = ('user__username', 'user__email')
+    date_hierarchy = 'bucket_start'
+admin.site.register(MessageStatsRollup, MessageStatsRollupAdmin)
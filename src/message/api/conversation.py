@@ -1,51 +1,145 @@
+import hashlib
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from message.serializers import ConversationSerializer
+from message.serializers import ConversationSerializer, ConversationListSerializer, CustomerWithConversationSerializer
 from rest_framework import status, filters
-from message.models import Conversation
+from message.models import Conversation, Customer, Message
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import AllowAny,IsAuthenticated
 from rest_framework.generics import GenericAPIView
-from rest_framework.pagination import PageNumberPagination
+from message.pagination import CURSOR_PARAMETER, KeysetPageNumberPagination
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from core.search import text_search
 
-class CustomPagination(PageNumberPagination):
+class CustomPagination(KeysetPageNumberPagination):
+    """Page-number pagination; ?cursor= switches to keyset pagination"""
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 500
 
-class FullUserConversationsAPIView(GenericAPIView):
-    permission_classes = [IsAuthenticated]
+
+SEARCH_PARAMETER = openapi.Parameter(
+    'search', openapi.IN_QUERY,
+    description="Search conversation titles (full-text prefix + fuzzy match)",
+    type=openapi.TYPE_STRING
+)
+INCLUDE_PARAMETER = openapi.Parameter(
+    'include', openapi.IN_QUERY,
+    description="Comma-separated optional fields: last_message, unread_count",
+    type=openapi.TYPE_STRING
+)
+PAGE_PARAMETER = openapi.Parameter(
+    'page', openapi.IN_QUERY,
+    description="Return a paginated envelope (page-number pages; ?cursor= for keyset pages) instead of the full list",
+    type=openapi.TYPE_INTEGER
+)
+
+
+class ConversationListMixin:
+    """
+    Shared behaviour of the conversation list endpoints
+
+    ✅ Newest activity first: (user, updated_at, id) index, keyset pages with ?cursor=
+    ✅ Optional last_message / unread_count (?include=) come from subquery annotations
+    ✅ ETag from the tenant's conversations (latest updated_at, count), their customers'
+       latest updated_at (tag changes bump it) and, for ?include=, the tenant's latest
+       message and unread count: If-None-Match gets a 304 without running the list query.
+    """
     pagination_class = CustomPagination
-    serializer_class = ConversationSerializer
-    #queryset = Conversation.objects.filter(user=self.request.user)
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title',]
+    serializer_class = ConversationListSerializer
+    cursor_ordering = ('-updated_at', '-id')
+    # When False, only ?page= / ?cursor= requests get the paginated envelope (otherwise the bare list)
+    paginate_by_default = True
+
+    def get_includes(self):
+        requested = self.request.query_params.get('include', '')
+        return tuple(
+            name for name in (part.strip() for part in requested.split(','))
+            if name in ConversationListSerializer.OPTIONAL_FIELDS
+        )
+
+    def get_queryset(self):
+        queryset = (
+            Conversation.objects.filter(user=self.request.user)
+            .select_related('customer')
+            .prefetch_related(Customer.user_tags_prefetch('customer__tag'))
+        )
+        search = self.request.query_params.get('search')
+        if search:
+            queryset = text_search(queryset, search)
+        if self.get_includes():
+            queryset = CustomerWithConversationSerializer.annotate_conversation_summaries(queryset)
+        return queryset.order_by(*self.cursor_ordering)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include'] = self.get_includes()
+        return context
+
+    def wants_pagination(self):
+        params = self.request.query_params
+        paginator = self.paginator
+        return (self.paginate_by_default or paginator.page_query_param in params
+                or paginator.cursor_query_param in params)
+
+    def get_list_etag(self, request):
+        state = Conversation.objects.filter(user=request.user).aggregate(
+            latest=Max('updated_at'), total=Count('id'), customers=Max('customer__updated_at')
+        )
+        parts = [request.user.pk, state['total']] + [
+            state[name].isoformat() if state[name] else '' for name in ('latest', 'customers')
+        ]
+        includes = self.get_includes()
+        if includes:
+            # Replies and read receipts don't touch Conversation.updated_at
+            messages = Message.objects.filter(conversation__user=request.user)
+            parts.append(messages.order_by('-created_at', '-id').values_list('id', flat=True).first() or '')
+            if 'unread_count' in includes:
+                parts.append(messages.filter(type='customer', is_answered=False).count())
+        raw = ':'.join(str(part) for part in parts + [request.get_full_path()])
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def list_response(self, request):
+        etag = self.get_list_etag(request)
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            query = self.filter_queryset(self.get_queryset())
+            if self.wants_pagination():
+                page = self.paginate_queryset(query)
+                serializer = self.get_serializer(page, many=True)
+                response = self.get_paginated_response(serializer.data)
+            else:
+                response = Response(self.get_serializer(query, many=True).data)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class FullUserConversationsAPIView(ConversationListMixin, GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     ordering_fields = ['created_at','updated_at','priority']
     filterset_fields = ['created_at','updated_at','priority','status','is_active','source']
-    @swagger_auto_schema()
+    @swagger_auto_schema(manual_parameters=[CURSOR_PARAMETER, SEARCH_PARAMETER, INCLUDE_PARAMETER])
     def get(self, request, format=None):
-        query = self.filter_queryset(Conversation.objects.filter(user=self.request.user))
-        page = self.paginate_queryset(query)
-        if page is not None:
-            serializer = self.serializer_class(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.serializer_class(query, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.list_response(request)
 
 
 
-class UserConversationsAPIView(APIView):
-    serializer_class = ConversationSerializer
+class UserConversationsAPIView(ConversationListMixin, GenericAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, *args, **kwargs):
-        try:
-            conv = Conversation.objects.filter(user=self.request.user)
-            serializer = self.serializer_class(conv, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Exception as e:
-            return Response(f"Error: {str(e)}", status=status.HTTP_400_BAD_REQUEST)
+    filter_backends = []
+    paginate_by_default = False
+    @swagger_auto_schema(manual_parameters=[PAGE_PARAMETER, CURSOR_PARAMETER, INCLUDE_PARAMETER])
+    def get(self, request, *args, **kwargs):
+        return self.list_response(request)
 
 
 
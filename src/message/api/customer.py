@@ -9,10 +9,9 @@ from rest_framework.generics import GenericAPIView
 from rest_framework.pagination import PageNumberPagination
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from django.http import HttpResponse
-import csv
-from io import StringIO
-from django.utils import timezone
+from django.http import FileResponse, Http404, HttpResponseRedirect, StreamingHttpResponse
+from message.services.customer_export import CustomerExportService
+from message.services.customer_tagging import BulkCustomerTagService
 
 
 class CustomPagination(PageNumberPagination):
@@ -32,6 +31,8 @@ class CustomersListAPIView(GenericAPIView):
     @swagger_auto_schema()
     def get(self, request, format=None):
         query = self.filter_queryset(Customer.objects.filter(conversations__user=self.request.user).distinct())
+        # Tags of the whole page in one query (system tags filtered in the prefetch)
+        query = query.prefetch_related(Customer.user_tags_prefetch())
         page = self.paginate_queryset(query)
         if page is not None:
             serializer = self.serializer_class(page, many=True)
@@ -278,6 +279,10 @@ class CustomerBulkExportAPIView(GenericAPIView):
                     type=openapi.TYPE_ARRAY,
                     items=openapi.Schema(type=openapi.TYPE_INTEGER),
                     description='List of customer IDs to export. If empty, all filtered customers will be exported.'
+                ),
+                'background': openapi.Schema(
+                    type=openapi.TYPE_BOOLEAN,
+                    description='Generate the file in background, store it and notify over WebSocket (recommended for large exports)'
                 )
             },
             required=[]
@@ -286,8 +291,9 @@ class CustomerBulkExportAPIView(GenericAPIView):
             200: openapi.Schema(
                 type=openapi.TYPE_STRING,
                 format=openapi.FORMAT_BINARY,
-                description='CSV file download'
+                description='CSV file download (streamed)'
             ),
+            202: "Background export started",
             400: "Bad request",
             403: "Permission denied"
         }
@@ -320,61 +326,181 @@ class CustomerBulkExportAPIView(GenericAPIView):
             
             filtered_queryset = filtered_queryset.filter(id__in=customer_ids)
         
-        # Prefetch related tags for efficiency
-        customers = filtered_queryset.prefetch_related('tag').order_by('-created_at')
-        
-        if not customers.exists():
+        if not filtered_queryset.exists():
             return Response(
                 {"error": "No customers found matching the criteria"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Create CSV content
-        output = StringIO()
-        writer = csv.writer(output)
+        # Background mode: write file to storage and notify over WebSocket when ready
+        background = request.data.get('background', request.query_params.get('background'))
+        if background in ['true', True, 1, '1']:
+            from message.tasks import export_customers_csv_task
+            task = export_customers_csv_task.delay(
+                request.user.id,
+                CustomerExportService.query_params_to_dict(request.query_params),
+                customer_ids or None
+            )
+            return Response(
+                {
+                    "message": "Export started. You will be notified when the file is ready.",
+                    "task_id": task.id
+                },
+                status=status.HTTP_202_ACCEPTED
+            )
         
-        # Write headers
-        headers = [
-            'ID', 'First Name', 'Last Name', 'Username', 'Email', 'Phone Number',
-            'Description', 'Source', 'Source ID', 'Tags', 'Created At', 'Updated At'
-        ]
-        writer.writerow(headers)
+        # Stream CSV rows straight from the database cursor
+        response = StreamingHttpResponse(
+            CustomerExportService.iter_csv(filtered_queryset),
+            content_type='text/csv'
+        )
+        filename = CustomerExportService.generate_filename()
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
         
-        # Write customer data
-        for customer in customers:
-            # Get tags as comma-separated string
-            tags = ', '.join([tag.name for tag in customer.tag.all()])
-            
-            row = [
-                customer.id,
-                customer.first_name or '',
-                customer.last_name or '',
-                customer.username or '',
-                customer.email or '',
-                customer.phone_number or '',
-                customer.description or '',
-                customer.source,
-                customer.source_id or '',
-                tags,
-                customer.created_at.strftime('%Y-%m-%d %H:%M:%S') if customer.created_at else '',
-                customer.updated_at.strftime('%Y-%m-%d %H:%M:%S') if customer.updated_at else ''
-            ]
-            writer.writerow(row)
+        return response
+
+
+class CustomerExportDownloadAPIView(APIView):
+    """Download a background export of the requesting user (fresh signed URL or streamed file)"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Download a finished background customer export (only the owner's own files)",
+        responses={302: "Redirect to a short-lived signed URL", 200: "CSV file", 404: "Export not found or expired"}
+    )
+    def get(self, request, filename):
+        if not CustomerExportService.STORED_NAME_RE.match(filename):
+            raise Http404
+        path = CustomerExportService.stored_path(request.user.id, filename)
+        storage = CustomerExportService.storage()
+        if not storage.exists(path):
+            raise Http404
+
+        url = CustomerExportService.signed_url(path)
+        if url:
+            return HttpResponseRedirect(url)
+        return FileResponse(storage.open(path, 'rb'), as_attachment=True, filename=filename,
+                            content_type='text/csv')
+
+
+class CustomerBulkTagAPIView(GenericAPIView):
+    """API for adding/removing tags on many customers (IDs or filters) in one request"""
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['first_name','last_name','phone_number','description']
+    ordering_fields = ['created_at','updated_at']
+    filterset_fields = ['created_at','updated_at','source','email','tag__name']
+    
+    @staticmethod
+    def _int_list(value, name):
+        """Validate a list of integer IDs from the request body; returns (ids, error_response)"""
+        if not isinstance(value, list):
+            return None, Response(
+                {"error": f"{name} must be a list of integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            return [int(id) for id in value], None
+        except (ValueError, TypeError):
+            return None, Response(
+                {"error": f"All {name} must be valid integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    @swagger_auto_schema(
+        operation_description="Bulk add/remove tags on customers by IDs with optional filtering. "
+                              "Sends one summarized WebSocket notification and one batched workflow event.",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'customer_ids': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description='List of customer IDs to tag. If empty, all filtered customers will be tagged.'
+                ),
+                'add_tag_ids': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description='Tag IDs to add (customers that already have a tag are skipped)'
+                ),
+                'remove_tag_ids': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                    description='Tag IDs to remove. System tags cannot be added or removed.'
+                )
+            },
+            required=[]
+        ),
+        responses={
+            200: openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'customers': openapi.Schema(type=openapi.TYPE_INTEGER, description='Customers matched'),
+                    'changed_customers': openapi.Schema(type=openapi.TYPE_INTEGER, description='Customers whose tags changed'),
+                    'added': openapi.Schema(type=openapi.TYPE_OBJECT, description='Tag name -> customers that received it'),
+                    'removed': openapi.Schema(type=openapi.TYPE_OBJECT, description='Tag name -> customers that lost it'),
+                }
+            ),
+            400: "Bad request - Invalid customer or tag IDs",
+            403: "Permission denied"
+        }
+    )
+    def post(self, request):
+        customer_ids, error_response = self._int_list(request.data.get('customer_ids', []), 'customer_ids')
+        if error_response:
+            return error_response
+        add_tag_ids, error_response = self._int_list(request.data.get('add_tag_ids', []), 'add_tag_ids')
+        if error_response:
+            return error_response
+        remove_tag_ids, error_response = self._int_list(request.data.get('remove_tag_ids', []), 'remove_tag_ids')
+        if error_response:
+            return error_response
+        
+        if not add_tag_ids and not remove_tag_ids:
+            return Response(
+                {"error": "add_tag_ids or remove_tag_ids is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if set(add_tag_ids) & set(remove_tag_ids):
+            return Response(
+                {"error": "A tag cannot be added and removed in the same request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Prepare response
-        output.seek(0)
-        csv_content = output.getvalue()
-        output.close()
+        try:
+            add_tags = BulkCustomerTagService.validate_tags(add_tag_ids)
+            remove_tags = BulkCustomerTagService.validate_tags(remove_tag_ids)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create HTTP response with CSV
-        response = HttpResponse(
-            csv_content,
-            content_type='text/csv'
-        )
+        # Start with base queryset filtered by user's customers
+        queryset = Customer.objects.filter(conversations__user=request.user).distinct()
         
-        # Generate filename with timestamp
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'customers_export_{timestamp}.csv'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Apply filters (search, ordering, filterset)
+        filtered_queryset = self.filter_queryset(queryset)
         
-        return response
\ No newline at end of file
+        # If specific IDs provided, filter further by those IDs
+        if customer_ids:
+            filtered_queryset = filtered_queryset.filter(id__in=customer_ids)
+        
+        matched_ids = list(filtered_queryset.order_by().values_list('id', flat=True))
+        if not matched_ids:
+            return Response(
+                {"message": "No customers found matching the criteria", "customers": 0, "changed_customers": 0,
+                 "added": {}, "removed": {}},
+                status=status.HTTP_200_OK
+            )
+        
+        summary = BulkCustomerTagService.apply(request.user, matched_ids, add_tags, remove_tags)
+        
+        return Response(
+            {
+                "message": f"Successfully updated tags on {summary['changed_customers']} customer(s)",
+                "customers": summary['customers'],
+                "changed_customers": summary['changed_customers'],
+                "added": summary['added'],
+                "removed": summary['removed'],
+            },
+            status=status.HTTP_200_OK
+        )
@@ -90,7 +90,7 @@ class CustomerTagsAPIView(APIView):
             return error_response
         
         # Exclude system tags (Instagram, Telegram, Whatsapp)
-        tags = customer.tag.exclude(name__in=["Telegram", "Whatsapp", "Instagram"])
+        tags = customer.tag.filter(is_system=False)
         
         # Apply search filter if provided
         search = request.query_params.get('search', None)
@@ -181,7 +181,7 @@ class CustomerTagsAPIView(APIView):
         # Allow empty list to clear all tags (except system tags)
         if not tag_ids:
             # Keep system tags (Instagram, Telegram, Whatsapp)
-            system_tags = customer.tag.filter(name__in=["Telegram", "Whatsapp", "Instagram"])
+            system_tags = customer.tag.filter(is_system=True)
             customer.tag.set(system_tags)
             
             # Send websocket notification
@@ -221,7 +221,7 @@ class CustomerTagsAPIView(APIView):
         notify_customer_updated(customer)
         
         # Get updated tags (excluding system tags)
-        updated_tags = customer.tag.exclude(name__in=["Telegram", "Whatsapp", "Instagram"]).order_by('name')
+        updated_tags = customer.tag.filter(is_system=False).order_by('name')
         serializer = TagSerializer(updated_tags, many=True)
         
         return Response({
@@ -298,7 +298,7 @@ class CustomerTagsAPIView(APIView):
         # If empty list, clear all tags
         if not tag_ids:
             # Keep system tags (Instagram, Telegram, Whatsapp)
-            system_tags = customer.tag.filter(name__in=["Telegram", "Whatsapp", "Instagram"])
+            system_tags = customer.tag.filter(is_system=True)
             customer.tag.set(system_tags)
             
             # Send websocket notification
@@ -331,7 +331,7 @@ class CustomerTagsAPIView(APIView):
             )
         
         # Keep system tags and add new tags
-        system_tags = customer.tag.filter(name__in=["Telegram", "Whatsapp", "Instagram"])
+        system_tags = customer.tag.filter(is_system=True)
         all_tags = list(tags) + list(system_tags)
         customer.tag.set(all_tags)
         
@@ -340,7 +340,7 @@ class CustomerTagsAPIView(APIView):
         notify_customer_updated(customer)
         
         # Get updated tags (excluding system tags)
-        updated_tags = customer.tag.exclude(name__in=["Telegram", "Whatsapp", "Instagram"]).order_by('name')
+        updated_tags = customer.tag.filter(is_system=False).order_by('name')
         serializer = TagSerializer(updated_tags, many=True)
         
         return Response({
@@ -434,7 +434,7 @@ class CustomerTagsAPIView(APIView):
             )
         
         # Don't allow removing system tags
-        system_tags_to_remove = tags.filter(name__in=["Telegram", "Whatsapp", "Instagram"])
+        system_tags_to_remove = tags.filter(is_system=True)
         if system_tags_to_remove.exists():
             return Response(
                 {"error": "Cannot remove system tags (Telegram, Whatsapp, Instagram)"},
@@ -449,7 +449,7 @@ class CustomerTagsAPIView(APIView):
         notify_customer_updated(customer)
         
         # Get updated tags (excluding system tags)
-        updated_tags = customer.tag.exclude(name__in=["Telegram", "Whatsapp", "Instagram"]).order_by('name')
+        updated_tags = customer.tag.filter(is_system=False).order_by('name')
         serializer = TagSerializer(updated_tags, many=True)
         
         return Response({
@@ -604,7 +604,7 @@ class CustomerSingleTagAPIView(APIView):
             )
         
         # Check if it's a system tag
-        if tag.name in ["Telegram", "Whatsapp", "Instagram"]:
+        if tag.is_system:
             return Response(
                 {"error": "Cannot remove system tags (Telegram, Whatsapp, Instagram)"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -6,14 +6,15 @@ from message.models import Message
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import AllowAny,IsAuthenticated
 from rest_framework.generics import GenericAPIView
-from rest_framework.pagination import PageNumberPagination
+from message.pagination import CURSOR_PARAMETER, KeysetPageNumberPagination
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.utils import timezone
 from web_knowledge.models import QAPair
 
 
-class CustomPagination(PageNumberPagination):
+class CustomPagination(KeysetPageNumberPagination):
+    """Page-number pagination; ?cursor= switches to keyset pagination"""
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 500
@@ -27,7 +28,7 @@ class UserMessagesAPIView(GenericAPIView):
     search_fields = ['content',]
     ordering_fields = ['created_at',]
     filterset_fields = ['created_at','is_answered','is_ai_response','conversation','type']
-    @swagger_auto_schema()
+    @swagger_auto_schema(manual_parameters=[CURSOR_PARAMETER])
     def get(self, request, format=None):
         query = self.filter_queryset(Message.objects.filter(conversation__user=self.request.user))
         page = self.paginate_queryset(query)
@@ -65,7 +65,7 @@ class TagsAPIView(GenericAPIView):
             # Get tags created by the user, excluding system tags
             queryset = Tag.objects.filter(
                 created_by=request.user
-            ).exclude(name__in=["Telegram", "Whatsapp", "Instagram"])
+            ).filter(is_system=False)
             
             # Apply filters (search, ordering, filterset)
             filtered_queryset = self.filter_queryset(queryset)
@@ -117,8 +117,9 @@ class TagsAPIView(GenericAPIView):
             if serializer.is_valid():
                 # Set created_by when creating new tags
                 if isinstance(serializer.validated_data, list):
-                    # For list of tags
-                    tags = [Tag(created_by=request.user, **item) for item in serializer.validated_data]
+                    # For list of tags (bulk_create skips Tag.save(), which derives is_system)
+                    tags = [Tag(created_by=request.user, is_system=item['name'] in Tag.SYSTEM_TAG_NAMES, **item)
+                            for item in serializer.validated_data]
                     Tag.objects.bulk_create(tags, ignore_conflicts=True)
                     return Response(TagSerializer(tags, many=True).data, status=status.HTTP_201_CREATED)
                 else:
@@ -147,7 +148,7 @@ class TagItemAPIView(APIView):
                 )
             
             # Prevent modification of system tags
-            if tag.name in ["Telegram", "Whatsapp", "Instagram"]:
+            if tag.is_system:
                 return None, Response(
                     {"error": "System tags cannot be modified or deleted"}, 
                     status=status.HTTP_403_FORBIDDEN
@@ -311,9 +312,8 @@ class TagBulkDeleteAPIView(APIView):
         )
         
         # Separate system tags and user tags
-        system_tag_names = ["Telegram", "Whatsapp", "Instagram"]
-        deletable_tags = tags.exclude(name__in=system_tag_names)
-        system_tags = tags.filter(name__in=system_tag_names)
+        deletable_tags = tags.filter(is_system=False)
+        system_tags = tags.filter(is_system=True)
         
         # Track what was deleted and what was skipped
         deleted_tag_names = list(deletable_tags.values_list('name', flat=True))
@@ -3,7 +3,7 @@ import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
-from accounts.functions.jwt import validate_token, claim_token
+from accounts.functions.token_cache import get_user_for_token
 from message.models import Conversation, Message, Customer
 from message.serializers import WSConversationSerializer, WSMessageSerializer, CustomerSerializer
 from accounts.models import User
@@ -13,8 +13,6 @@ from django.utils import timezone
 import shortuuid
 from django.conf import settings
 from django.db import models
-from message.services.telegram_service import TelegramService
-from message.services.instagram_service import InstagramService
 from message.websocket_pagination import WebSocketPagination
 
 logger = logging.getLogger(__name__)
@@ -206,57 +204,21 @@ class ChatConsumer(AsyncWebsocketConsumer):
             logger.error(f"Timeout notifying conversation update for {self.conversation_id}")
 
     async def send_to_external_platform(self, message):
-        """Send support message to external platform (Telegram/Instagram)"""
+        """Queue support message for delivery to external platform (Telegram/Instagram)"""
         try:
-            conversation = await self.get_conversation()
-            if not conversation:
-                return {'success': False, 'error': 'Conversation not found'}
-            
-            customer = conversation.customer
-            source = conversation.source
-            
-            if source == 'telegram':
-                return await self.send_telegram_message(conversation, customer, message.content)
-            elif source == 'instagram':
-                return await self.send_instagram_message(conversation, customer, message.content)
-            else:
-                return {'success': False, 'error': 'Unknown conversation source'}
-                
+            return await self.queue_external_message(message)
         except Exception as e:
-            logger.error(f"Error sending to external platform: {e}")
+            logger.error(f"Error queueing message for external platform: {e}")
             return {'success': False, 'error': str(e)}
 
     @database_sync_to_async
-    def send_telegram_message(self, conversation, customer, message_text):
-        """Send message via Telegram API"""
-        try:
-            telegram_service = TelegramService.get_service_for_conversation(conversation)
-            if not telegram_service:
-                return {'success': False, 'error': 'Telegram service not available'}
-            
-            result = telegram_service.send_message_to_customer(customer, message_text)
-            logger.info(f"Telegram send result: {result}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error sending Telegram message: {e}")
-            return {'success': False, 'error': str(e)}
-
-    @database_sync_to_async 
-    def send_instagram_message(self, conversation, customer, message_text):
-        """Send message via Instagram API"""
-        try:
-            instagram_service = InstagramService.get_service_for_conversation(conversation)
-            if not instagram_service:
-                return {'success': False, 'error': 'Instagram service not available'}
-            
-            result = instagram_service.send_message_to_customer(customer, message_text)
-            logger.info(f"Instagram send result: {result}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error sending Instagram message: {e}")
-            return {'success': False, 'error': str(e)}
+    def queue_external_message(self, message):
+        """Enqueue on the outbound queue - delivery status is written back to the message"""
+        from message.services.outbound_queue import OutboundMessageQueue
+        
+        if not OutboundMessageQueue.enqueue(message):
+            return {'success': False, 'error': 'Unknown conversation source'}
+        return {'success': True, 'queued': True, 'delivery_status': message.delivery_status}
 
     # REMOVED: handle_customer_message_ai_trigger method
     # AI response processing is now handled exclusively by Django signals to prevent duplicate responses
@@ -449,16 +411,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
             if not token:
                 return None
                 
-            # Validate JWT token
-            if not validate_token(token):
-                return None
-                
-            payload = claim_token(token)
-            user_id = payload.get('user_id')
-            if not user_id:
-                return None
-                
-            return User.objects.get(id=user_id)
+            # Validate JWT token (cached token -> user snapshot)
+            return get_user_for_token(token)
             
         except Exception:
             return None
@@ -547,12 +501,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
             # Get messages for this conversation, ordered by creation time (newest first)
             messages_query = Message.objects.filter(
                 conversation_id=self.conversation_id
-            ).order_by('-created_at')
+            ).order_by('-created_at', '-id')
             
-            # Use WebSocket pagination
+            # Use WebSocket pagination ("cursor" filter = messages before that cursor)
             paginated_data = paginator.paginate_data(
                 messages_query,
-                WSMessageSerializer
+                WSMessageSerializer,
+                cursor_ordering=('-created_at', '-id')
             )
             
             # Reverse the data to get chronological order (oldest first) for chat display
@@ -909,6 +864,15 @@ class ConversationListConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             logger.error(f"Error handling customer deletion: {e}")
 
+    async def batched_events(self, event):
+        # Coalesced window of list events (see message.services.notification_coalescer):
+        # every event type here only triggers a list refresh, so refresh once
+        logger.debug(f"{len(event.get('events', []))} batched conversation events for user {self.user.id}")
+        try:
+            await self.send_conversations()
+        except Exception as e:
+            logger.error(f"Error handling batched conversation events: {e}")
+
     def _merge_query_params_with_filters(self, filters):
         """
         Merge query string parameters with message filters.
@@ -959,16 +923,8 @@ class ConversationListConsumer(AsyncWebsocketConsumer):
             if not token:
                 return None
                 
-            # Validate JWT token
-            if not validate_token(token):
-                return None
-                
-            payload = claim_token(token)
-            user_id = payload.get('user_id')
-            if not user_id:
-                return None
-                
-            return User.objects.get(id=user_id)
+            # Validate JWT token (cached token -> user snapshot)
+            return get_user_for_token(token)
             
         except Exception:
             return None
@@ -1001,7 +957,7 @@ class ConversationListConsumer(AsyncWebsocketConsumer):
             conversations_query = Conversation.objects.filter(
                 user=self.user
             ).select_related('customer').prefetch_related(
-                'customer__tag', 'messages'
+                Customer.user_tags_prefetch('customer__tag'), 'messages'
             )
             
             # Apply search filter
@@ -1058,15 +1014,22 @@ class ConversationListConsumer(AsyncWebsocketConsumer):
                 'created_at', '-created_at', 'updated_at', '-updated_at', 
                 'title', '-title', 'status', '-status', 'priority', '-priority'
             ]
-            if order_by in valid_orders:
-                conversations_query = conversations_query.order_by(order_by)
+            if order_by not in valid_orders:
+                order_by = '-updated_at'
+            
+            # Timestamp orderings support cursor pagination (id breaks ties)
+            cursor_ordering = None
+            if order_by.lstrip('-') in ('created_at', 'updated_at'):
+                cursor_ordering = (order_by, '-id' if order_by.startswith('-') else 'id')
+                conversations_query = conversations_query.order_by(*cursor_ordering)
             else:
-                conversations_query = conversations_query.order_by('-updated_at')
+                conversations_query = conversations_query.order_by(order_by)
             
             # Use WebSocket pagination
             paginated_data = paginator.paginate_data(
                 conversations_query,
-                WSConversationSerializer
+                WSConversationSerializer,
+                cursor_ordering=cursor_ordering
             )
             
             return paginated_data
@@ -1454,6 +1417,48 @@ class CustomerListConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             logger.error(f"Error handling customer deletion: {e}")
 
+    async def customer_export_ready(self, event):
+        # Background CSV export finished - forward download info to client
+        try:
+            await self.send(text_data=json.dumps({
+                'type': 'customer_export_ready',
+                'export': event['export'],
+                'timestamp': event.get('timestamp')
+            }))
+        except Exception as e:
+            logger.error(f"Error sending customer export notification: {e}")
+
+    async def customers_tagged(self, event):
+        # Bulk tag change: forward the summary, then refresh the list once
+        try:
+            await self.send(text_data=json.dumps({
+                'type': 'customers_tagged',
+                'summary': event['summary'],
+                'timestamp': event.get('timestamp')
+            }))
+            await self.send_customers()
+        except Exception as e:
+            logger.error(f"Error sending bulk tag notification: {e}")
+
+    async def batched_events(self, event):
+        # Coalesced window of list events: forward exports and tag summaries, refresh the list once
+        events = event.get('events', [])
+        logger.debug(f"{len(events)} batched customer events for user {self.user.id}")
+        for item in events:
+            if item.get('type') == 'customer_export_ready':
+                await self.customer_export_ready(item)
+            elif item.get('type') == 'customers_tagged':
+                await self.send(text_data=json.dumps({
+                    'type': 'customers_tagged',
+                    'summary': item['summary'],
+                    'timestamp': item.get('timestamp')
+                }))
+        if any(item.get('type') != 'customer_export_ready' for item in events):
+            try:
+                await self.send_customers()
+            except Exception as e:
+                logger.error(f"Error handling batched customer events: {e}")
+
     def _merge_query_params_with_filters(self, filters):
         """
         Merge query string parameters with message filters.
@@ -1504,16 +1509,8 @@ class CustomerListConsumer(AsyncWebsocketConsumer):
             if not token:
                 return None
                 
-            # Validate JWT token
-            if not validate_token(token):
-                return None
-                
-            payload = claim_token(token)
-            user_id = payload.get('user_id')
-            if not user_id:
-                return None
-                
-            return User.objects.get(id=user_id)
+            # Validate JWT token (cached token -> user snapshot)
+            return get_user_for_token(token)
             
         except Exception:
             return None
@@ -1553,13 +1550,9 @@ class CustomerListConsumer(AsyncWebsocketConsumer):
             # Apply search filter
             search_term = filters.get('search', '')
             if search_term:
-                filtered_query = filtered_query.filter(
-                    models.Q(first_name__icontains=search_term) |
-                    models.Q(last_name__icontains=search_term) |
-                    models.Q(username__icontains=search_term) |
-                    models.Q(email__icontains=search_term) |
-                    models.Q(phone_number__icontains=search_term)
-                )
+                # Full-text (name/username/email/phone) + trigram match on names
+                from core.search import text_search
+                filtered_query = text_search(filtered_query, search_term)
             
             # Apply source filter
             source = filters.get('source')
@@ -1643,15 +1636,14 @@ class CustomerListConsumer(AsyncWebsocketConsumer):
             else:
                 customers_query = filtered_query.order_by('-created_at')
             
-            # Optimize query with select_related and prefetch_related for conversations and messages
-            customers_query = customers_query.select_related().prefetch_related(
-                'tag',  # Include tags for each customer
-                'conversations__messages',
-                'conversations'
+            # One query per page each for tags and conversation summaries (last message + unread count annotated)
+            from message.serializers import CustomerWithConversationSerializer
+            customers_query = customers_query.prefetch_related(
+                Customer.user_tags_prefetch(),  # Non-system tags for each customer
+                CustomerWithConversationSerializer.conversations_prefetch(self.user),
             )
             
             # Use enhanced serializer that includes conversation data and WebSocket pagination
-            from message.serializers import CustomerWithConversationSerializer
             paginated_data = paginator.paginate_data(
                 customers_query,
                 CustomerWithConversationSerializer,
@@ -0,0 +1,105 @@
+"""
+Django management command to measure the websocket customer list page.
+
+Compares the previous per-conversation queries (last message + unread COUNT
+for every conversation) with the annotated, prefetched summaries used by
+CustomerWithConversationSerializer, and checks both render the same JSON:
+
+    python manage.py benchmark_customer_list --user 42 --page-size 50
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import User
+from message.models import Customer
+from message.serializers import CustomerWithConversationSerializer
+
+
+def legacy_conversations(customer, user):
+    """Conversation summaries as built before the annotations (1 + 2 queries per conversation)"""
+    data = []
+    for conversation in customer.conversations.filter(user=user).order_by('-updated_at'):
+        last_message = conversation.messages.order_by('-created_at').first()
+        last_message_data = None
+        if last_message:
+            last_message_data = {
+                'id': last_message.id,
+                'content': last_message.content,
+                'type': last_message.type,
+                'is_ai_response': getattr(last_message, 'is_ai_response', False),
+                'created_at': last_message.created_at.isoformat() if last_message.created_at else None,
+                'feedback': last_message.feedback,
+                'feedback_comment': last_message.feedback_comment,
+                'feedback_at': last_message.feedback_at.isoformat() if last_message.feedback_at else None
+            }
+        data.append({
+            'id': conversation.id,
+            'title': conversation.title,
+            'status': conversation.status,
+            'source': conversation.source,
+            'priority': conversation.priority,
+            'is_active': conversation.is_active,
+            'created_at': conversation.created_at.isoformat() if conversation.created_at else None,
+            'updated_at': conversation.updated_at.isoformat() if conversation.updated_at else None,
+            'last_message': last_message_data,
+            'unread_count': conversation.messages.filter(type='customer', is_answered=False).count()
+        })
+    return data
+
+
+class Command(BaseCommand):
+    help = 'Query count and time of one websocket customer list page, before and after summary annotations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Tenant user ID (default: the user with most conversations)')
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def run(self, label, build):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            payload = JSONRenderer().render(build())
+            elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f'{label:<8} {len(queries):>6} queries {elapsed:>10.1f} ms')
+        return payload
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(id=options['user']).first()
+        else:
+            user = User.objects.annotate(total=Count('conversations')).order_by('-total').first()
+        if not user:
+            raise CommandError('No user found')
+
+        page = Customer.objects.filter(conversations__user=user).distinct().order_by('-created_at')
+        page_ids = list(page.values_list('id', flat=True)[:options['page_size']])
+        self.stdout.write(f'🔍 User {user.id}: {len(page_ids)} customers on the page')
+
+        def before():
+            customers = list(Customer.objects.filter(id__in=page_ids).order_by('-created_at'))
+            # No user in the context: conversations are filled in by the legacy code below
+            data = CustomerWithConversationSerializer(customers, many=True, context={}).data
+            for customer, row in zip(customers, data):
+                row['conversations'] = legacy_conversations(customer, user)
+            return data
+
+        def after():
+            customers = list(
+                Customer.objects.filter(id__in=page_ids).order_by('-created_at').prefetch_related(
+                    Customer.user_tags_prefetch(),
+                    CustomerWithConversationSerializer.conversations_prefetch(user),
+                )
+            )
+            return CustomerWithConversationSerializer(customers, many=True, context={'user': user}).data
+
+        legacy_payload = self.run('before', before)
+        payload = self.run('after', after)
+
+        if payload == legacy_payload:
+            self.stdout.write(self.style.SUCCESS('✅ Output identical'))
+        else:
+            raise CommandError('Output differs between the two implementations')
@@ -0,0 +1,74 @@
+"""
+Django management command to capture query plans of the hottest message queries.
+
+Run before and after index / partitioning changes and keep the output:
+
+    python manage.py explain_message_queries --analyze > plans_before.txt
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from message.models import Conversation, Message
+
+
+class Command(BaseCommand):
+    help = 'Print EXPLAIN plans for the top message queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--conversation',
+            help='Conversation ID to use (default: the conversation with most messages)',
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Run EXPLAIN ANALYZE with BUFFERS (executes the queries)',
+        )
+
+    def get_queries(self, conversation):
+        return [
+            (
+                'Last message (WSConversationSerializer.get_last_message, _build_prompt)',
+                Message.objects.filter(conversation=conversation).order_by('-created_at')[:1],
+            ),
+            (
+                'Unread count (WSConversationSerializer.get_unread_count)',
+                Message.objects.filter(conversation=conversation, type='customer', is_answered=False)
+                .values('conversation').annotate(total=Count('id')),
+            ),
+            (
+                'Last customer message (_build_prompt)',
+                Message.objects.filter(conversation=conversation, type='customer').order_by('-created_at')[:1],
+            ),
+            (
+                'History page (ChatConsumer websocket pagination)',
+                Message.objects.filter(conversation_id=conversation.id).order_by('-created_at')[:20],
+            ),
+            (
+                'Full history (SessionMemoryManagerV2)',
+                Message.objects.filter(conversation=conversation).order_by('created_at'),
+            ),
+            (
+                'Customer timeline',
+                Message.objects.filter(customer_id=conversation.customer_id).order_by('-created_at')[:20],
+            ),
+        ]
+
+    def handle(self, *args, **options):
+        if options['conversation']:
+            conversation = Conversation.objects.filter(id=options['conversation']).first()
+        else:
+            conversation = Conversation.objects.annotate(
+                message_total=Count('messages')
+            ).order_by('-message_total').first()
+        if not conversation:
+            raise CommandError('No conversation found')
+
+        self.stdout.write(f'🔍 Conversation {conversation.id}')
+        explain_options = {'analyze': True, 'buffers': True} if options['analyze'] else {}
+
+        for title, queryset in self.get_queries(conversation):
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {title}'))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
@@ -0,0 +1,83 @@
+"""
+Django management command for the optional monthly partitioning of messages.
+
+Without flags it prints the current state. --dry-run prints the SQL that
+--migrate would run. --migrate converts the table (maintenance window: inserts
+block until the copy commits). --ensure creates the upcoming monthly
+partitions and is safe to run repeatedly (also scheduled daily in Celery Beat).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from message.services.message_partitioning import MessagePartitionService
+
+
+class Command(BaseCommand):
+    help = 'Convert the message table to monthly range partitions and maintain them'
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the migration SQL without running it',
+        )
+        action.add_argument(
+            '--migrate',
+            action='store_true',
+            help='Partition the table and copy existing rows (single transaction)',
+        )
+        action.add_argument(
+            '--ensure',
+            action='store_true',
+            help='Create partitions for the current and upcoming months',
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=MessagePartitionService.DEFAULT_MONTHS_AHEAD,
+            help='Number of future monthly partitions to create',
+        )
+
+    def handle(self, *args, **options):
+        months_ahead = options['months_ahead']
+        if months_ahead < 0:
+            raise CommandError('--months-ahead must not be negative')
+
+        table = MessagePartitionService.table_name()
+        partitioned = MessagePartitionService.is_partitioned()
+
+        if options['dry_run']:
+            if partitioned:
+                raise CommandError(f'{table} is already partitioned')
+            for sql in MessagePartitionService.build_migration_sql(months_ahead):
+                self.stdout.write(f'{sql};')
+            return
+
+        if options['migrate']:
+            self.stdout.write(f'🗂️ Partitioning {table} (writes are blocked until the copy commits)...')
+            try:
+                result = MessagePartitionService.migrate(months_ahead)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {result['rows']} rows copied into {result['partitions']} partitions. "
+                f"Old table kept as {table}{MessagePartitionService.LEGACY_SUFFIX} - drop it after verification."
+            ))
+            return
+
+        if options['ensure']:
+            partitions = MessagePartitionService.ensure_partitions(months_ahead)
+            if partitions is None:
+                self.stdout.write(f'ℹ️ {table} is not partitioned - nothing to do')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✅ {len(partitions)} partitions: {", ".join(partitions)}'))
+            return
+
+        if partitioned:
+            partitions = MessagePartitionService.list_partitions()
+            self.stdout.write(f'🗂️ {table} is partitioned ({len(partitions)} partitions)')
+            for name in partitions:
+                self.stdout.write(f'   {name}')
+        else:
+            self.stdout.write(f'ℹ️ {table} is not partitioned (use --dry-run to review the migration)')
@@ -5,8 +5,7 @@ from django.core.cache import cache
 from django.utils import timezone
 from django.conf import settings
 from channels.db import database_sync_to_async
-from accounts.functions.jwt import validate_token, claim_token
-from accounts.models import User
+from accounts.functions.token_cache import get_user_for_token
 
 logger = logging.getLogger(__name__)
 
@@ -79,32 +78,21 @@ class WebSocketAuthMiddleware:
     async def get_user_from_token(self, token):
         """
         Authenticate user from JWT token with proper async/sync handling
+        
+        Validated tokens are cached briefly (accounts.functions.token_cache), so
+        reconnect storms after deploys do not hit the database per connect.
         """
         try:
             # Validate JWT token with more flexible cache checking in development
-            # These JWT functions are typically synchronous, so we need to wrap them
             check_cache = not getattr(settings, 'DEBUG', False)
             
-            # Wrap synchronous JWT operations
-            is_valid = await database_sync_to_async(validate_token)(token, check_time=check_cache)
-            if not is_valid:
+            user = await database_sync_to_async(get_user_for_token)(token, check_time=check_cache)
+            if user is None:
                 logger.debug(f"Token validation failed for token: {token[:20]}...")
                 return None
-                
-            payload = await database_sync_to_async(claim_token)(token)
-            user_id = payload.get('user_id')
-            if not user_id:
-                logger.debug("No user_id in token payload")
-                return None
-                
-            # Get user from database using async wrapper
-            try:
-                user = await database_sync_to_async(User.objects.get)(id=user_id)
-                logger.debug(f"Successfully authenticated user: {user.id} ({user.email})")
-                return user
-            except User.DoesNotExist:
-                logger.debug(f"User {user_id} not found in database")
-                return None
+            
+            logger.debug(f"Successfully authenticated user: {user.id} ({user.email})")
+            return user
                 
         except Exception as e:
             logger.error(f"Error authenticating WebSocket token: {e}")
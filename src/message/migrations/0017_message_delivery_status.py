@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message', '0016_customer_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='delivery_attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Number of platform delivery attempts'),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='delivery_error',
+            field=models.TextField(blank=True, help_text='Last platform delivery error', null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='delivery_status',
+            field=models.CharField(blank=True, choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], help_text='Platform delivery status for outgoing messages (null = not sent to a platform)', max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, help_text='When the platform accepted the message', null=True),
+        ),
+    ]
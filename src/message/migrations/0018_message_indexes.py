@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:11
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY - the message table stays writable while indexes build
+    atomic = False
+
+    dependencies = [
+        ('message', '0017_message_delivery_status'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'created_at'], name='msg_conv_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'type', 'is_answered'], include=('created_at',), name='msg_conv_type_answered_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['customer', 'created_at'], name='msg_customer_created_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message', '0018_message_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'hour'), ('day', 'day')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('channel', models.CharField(blank=True, default='', max_length=90)),
+                ('section', models.CharField(blank=True, default='', max_length=50)),
+                ('inbound_messages', models.PositiveIntegerField(default=0)),
+                ('answered_messages', models.PositiveIntegerField(default=0)),
+                ('ai_replies', models.PositiveIntegerField(default=0)),
+                ('ai_requests', models.PositiveIntegerField(default=0)),
+                ('ai_failed_requests', models.PositiveIntegerField(default=0)),
+                ('ai_tokens', models.BigIntegerField(default=0)),
+                ('ai_prompt_tokens', models.BigIntegerField(default=0)),
+                ('ai_completion_tokens', models.BigIntegerField(default=0)),
+                ('ai_response_time_ms', models.BigIntegerField(default=0)),
+                ('workflow_runs', models.PositiveIntegerField(default=0)),
+                ('workflow_completed', models.PositiveIntegerField(default=0)),
+                ('workflow_failures', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Message Stats Rollup',
+                'verbose_name_plural': 'Message Stats Rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='MessageStatsWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('covered_from', models.DateTimeField(help_text='First hour rolled up (older data only exists in retention summaries)')),
+                ('processed_until', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Message Stats Watermark',
+                'verbose_name_plural': 'Message Stats Watermark',
+            },
+        ),
+        migrations.AddField(
+            model_name='messagestatsrollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='message_stats_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='messagestatsrollup',
+            index=models.Index(fields=['user', 'granularity', 'bucket_start'], name='msg_stats_user_bucket_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagestatsrollup',
+            index=models.Index(fields=['granularity', 'bucket_start'], name='msg_stats_bucket_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='messagestatsrollup',
+            constraint=models.UniqueConstraint(fields=('granularity', 'bucket_start', 'user', 'channel', 'section'), name='msg_stats_rollup_bucket_uniq'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:41
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY - the message table stays writable while the index builds
+    atomic = False
+
+    dependencies = [
+        ('message', '0019_message_stats_rollup'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['created_at'], name='msg_created_idx'),
+        ),
+    ]
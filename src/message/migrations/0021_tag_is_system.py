@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:48
+
+from django.db import migrations, models
+
+
+def mark_system_tags(apps, schema_editor):
+    """Flag existing channel tags (previously recognised by name on every read)"""
+    Tag = apps.get_model('message', 'Tag')
+    Tag.objects.filter(name__in=["Telegram", "Whatsapp", "Instagram"]).update(is_system=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message', '0020_message_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='is_system',
+            field=models.BooleanField(db_index=True, default=False, editable=False, help_text='Set from the name on save (see SYSTEM_TAG_NAMES)'),
+        ),
+        migrations.RunPython(mark_system_tags, migrations.RunPython.noop),
+    ]
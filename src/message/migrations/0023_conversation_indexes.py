@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:52
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY - the conversation table stays writable while the indexes build
+    atomic = False
+
+    dependencies = [
+        ('message', '0022_conversation_search_document'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='conversation',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='msg_conv_user_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='conversation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='msg_conv_search_vec_gin'),
+        ),
+        AddIndexConcurrently(
+            model_name='conversation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_title'], name='msg_conv_search_trgm_gin', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-18 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message', '0023_conversation_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='delivery_claimed_at',
+            field=models.DateTimeField(blank=True, help_text="When a worker started the current send (stale 'sending' rows are re-queued)", null=True),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('delivery_status', 'sending')), fields=['delivery_claimed_at'], name='msg_delivery_sending_idx'),
+        ),
+    ]
@@ -1,20 +1,33 @@
 from django.db import models
 import shortuuid
 from accounts.models import User
+from core.search import SearchDocumentMixin, search_indexes
 
 
 def generate_short_uuid():
     return shortuuid.uuid()[:6]
 
 class Tag(models.Model):
+    # Channel tags attached automatically to customers; hidden from tag lists and never user-editable
+    SYSTEM_TAG_NAMES = ("Telegram", "Whatsapp", "Instagram")
+
     name = models.CharField(max_length=100)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tags', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    is_system = models.BooleanField(default=False, db_index=True, editable=False,
+                                    help_text="Set from the name on save (see SYSTEM_TAG_NAMES)")
+    
+    def save(self, *args, **kwargs):
+        self.is_system = self.name in self.SYSTEM_TAG_NAMES
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'is_system'}
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return self.name
 
-class Customer(models.Model):
+class Customer(SearchDocumentMixin, models.Model):
     SOURCE_CHOICES = [
         ('unknown', 'unknown'),
         ('telegram', 'telegram'),
@@ -55,6 +68,41 @@ class Customer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search document (see core.search)
+    SEARCH_TITLE_FIELDS = ('first_name', 'last_name', 'username')
+    SEARCH_BODY_FIELDS = ('email', 'phone_number')
+
+    class Meta:
+        indexes = search_indexes('msg_customer')
+
+    # Prefetch target for user_tags_prefetch() (system tags excluded)
+    USER_TAGS_ATTR = 'prefetched_user_tags'
+
+    @classmethod
+    def user_tags_prefetch(cls, lookup='tag'):
+        """
+        Prefetch of non-system tags for customer lists - one query per page
+
+        Args:
+            lookup: Path to the tag relation, e.g. 'customer__tag' from conversations
+        """
+        return models.Prefetch(lookup, queryset=Tag.objects.filter(is_system=False), to_attr=cls.USER_TAGS_ATTR)
+
+    def get_user_tags(self):
+        """Non-system tags, from user_tags_prefetch() when it was applied"""
+        if hasattr(self, self.USER_TAGS_ATTR):
+            return getattr(self, self.USER_TAGS_ATTR)
+        return list(self.tag.filter(is_system=False))
+
+    def get_search_body(self):
+        """Email (whole + local part) and phone number (as typed + digits only)"""
+        parts = []
+        if self.email:
+            parts += [self.email, self.email.split('@')[0]]
+        if self.phone_number:
+            parts += [self.phone_number, ''.join(ch for ch in self.phone_number if ch.isdigit())]
+        return ' '.join(parts)
+
     def __str__(self):
         name = f"{self.first_name or ''} {self.last_name or ''}".strip()
         username_part = f"@{self.username}" if self.username else ""
@@ -67,7 +115,7 @@ class Customer(models.Model):
         else:
             return f"Customer {self.id} | {self.source}"
 
-class Conversation(models.Model):
+class Conversation(SearchDocumentMixin, models.Model):
     STATUS_CHOICES = [
         ('active', 'active'),
         ('support_active', 'support_active'),
@@ -90,6 +138,15 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    SEARCH_TITLE_FIELDS = ('title',)
+
+    class Meta:
+        indexes = [
+            # Conversation lists: WHERE user_id = ? ORDER BY updated_at DESC, id DESC (keyset pages, ETag max)
+            models.Index(fields=['user', '-updated_at', '-id'], name='msg_conv_user_updated_idx'),
+            *search_indexes('msg_conv'),
+        ]
+
     def save(self, *args, **kwargs):
         # Automatically set title if not manually set
         if not self.title:
@@ -125,6 +182,12 @@ class Message(models.Model):
         ('processing', 'Processing'),
         ('failed', 'Failed'),
     ]
+    DELIVERY_STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
     
     type = models.CharField(max_length=60, choices=TYPE_CHOICES, default='customer')
     id = models.CharField(primary_key=True, max_length=10, default=generate_short_uuid, editable=False)
@@ -225,11 +288,125 @@ class Message(models.Model):
         blank=True,
         help_text="Processing time in milliseconds"
     )
+    
+    # ============== Outbound Delivery (message.services.outbound_queue) ==============
+    delivery_status = models.CharField(
+        max_length=10,
+        choices=DELIVERY_STATUS_CHOICES,
+        null=True,
+        blank=True,
+        help_text="Platform delivery status for outgoing messages (null = not sent to a platform)"
+    )
+    
+    delivery_attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of platform delivery attempts"
+    )
+    
+    delivery_error = models.TextField(
+        null=True,
+        blank=True,
+        help_text="Last platform delivery error"
+    )
+    
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the platform accepted the message"
+    )
+    
+    delivery_claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a worker started the current send (stale 'sending' rows are re-queued)"
+    )
+
+    class Meta:
+        indexes = [
+            # History / last message / pagination: WHERE conversation_id = ? ORDER BY created_at
+            models.Index(fields=['conversation', 'created_at'], name='msg_conv_created_idx'),
+            # Unread count / mark answered: covers the filter without touching the heap
+            models.Index(
+                fields=['conversation', 'type', 'is_answered'],
+                include=['created_at'],
+                name='msg_conv_type_answered_idx'
+            ),
+            models.Index(fields=['customer', 'created_at'], name='msg_customer_created_idx'),
+            # Incremental stats rollup: WHERE created_at >= watermark
+            models.Index(fields=['created_at'], name='msg_created_idx'),
+            # Outbound recovery sweep: WHERE delivery_status = 'sending' AND delivery_claimed_at < lease
+            models.Index(fields=['delivery_claimed_at'], condition=models.Q(delivery_status='sending'),
+                         name='msg_delivery_sending_idx'),
+        ]
 
     def __str__(self):
         return f"{self.content} | {self.content}"
 
 
+class MessageStatsRollup(models.Model):
+    """
+    Hourly and daily activity totals per tenant and channel, filled
+    incrementally from Message, AIUsageLog and WorkflowExecution rows
+    (see message.services.stats_rollup)
+
+    Message and workflow rows carry the conversation's channel; AI usage rows
+    have no channel and carry the AIUsageLog section instead.
+    """
+    GRANULARITY_CHOICES = [
+        ('hour', 'hour'),
+        ('day', 'day'),
+    ]
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='message_stats_rollups')
+    channel = models.CharField(max_length=90, blank=True, default='')
+    section = models.CharField(max_length=50, blank=True, default='')
+
+    inbound_messages = models.PositiveIntegerField(default=0)
+    answered_messages = models.PositiveIntegerField(default=0)
+    ai_replies = models.PositiveIntegerField(default=0)
+    ai_requests = models.PositiveIntegerField(default=0)
+    ai_failed_requests = models.PositiveIntegerField(default=0)
+    ai_tokens = models.BigIntegerField(default=0)
+    ai_prompt_tokens = models.BigIntegerField(default=0)
+    ai_completion_tokens = models.BigIntegerField(default=0)
+    ai_response_time_ms = models.BigIntegerField(default=0)
+    workflow_runs = models.PositiveIntegerField(default=0)
+    workflow_completed = models.PositiveIntegerField(default=0)
+    workflow_failures = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Message Stats Rollup"
+        verbose_name_plural = "Message Stats Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket_start', 'user', 'channel', 'section'],
+                name='msg_stats_rollup_bucket_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'granularity', 'bucket_start'], name='msg_stats_user_bucket_idx'),
+            models.Index(fields=['granularity', 'bucket_start'], name='msg_stats_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start:%Y-%m-%d %H:00} {self.user_id} {self.channel or self.section}"
+
+
+class MessageStatsWatermark(models.Model):
+    """Single row: raw rows created in [covered_from, processed_until) are in the hourly rollups"""
+    covered_from = models.DateTimeField(help_text="First hour rolled up (older data only exists in retention summaries)")
+    processed_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Message Stats Watermark"
+        verbose_name_plural = "Message Stats Watermark"
+
+    def __str__(self):
+        return f"Message stats rolled up until {self.processed_until}"
+
+
 class CustomerData(models.Model):
     """
     Model to store custom key-value data for customers.
@@ -0,0 +1,142 @@
+"""
+Keyset (cursor) pagination for message history and conversation lists
+
+Offset pagination makes Postgres count and skip every earlier row, so deep
+pages of a long conversation get slower and slower. Keyset pagination asks for
+"rows after (timestamp, id) of the last row seen" instead: every page is a
+constant-cost index range scan, and rows inserted meanwhile never shift pages.
+
+The cursor is opaque to clients (urlsafe base64 of the sort key of the last
+row). Requests without a cursor keep using page/page_size (offset) pagination.
+"""
+import base64
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Optional, Sequence, Tuple
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from drf_yasg import openapi
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+logger = logging.getLogger(__name__)
+
+
+CURSOR_PARAMETER = openapi.Parameter(
+    'cursor', openapi.IN_QUERY,
+    description="next_cursor of the previous page (keyset pagination; empty value starts at the newest row)",
+    type=openapi.TYPE_STRING
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetCursor:
+    """Encode, decode and apply (timestamp, id) cursors for a fixed ordering"""
+
+    def __init__(self, ordering: Sequence[str] = ('-created_at', '-id')):
+        # e.g. ('-created_at', '-id'): timestamp field first, unique tie-breaker last
+        self.ordering = tuple(ordering)
+        self.field = self.ordering[0].lstrip('-')
+        self.tiebreaker = self.ordering[1].lstrip('-')
+        self.descending = self.ordering[0].startswith('-')
+
+    def encode(self, obj) -> str:
+        value = getattr(obj, self.field)
+        position = [value.isoformat() if value is not None else None, str(getattr(obj, self.tiebreaker))]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+    def decode(self, cursor: str) -> Tuple[Any, str]:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            value, key = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            timestamp = parse_datetime(value)
+        except (TypeError, ValueError, UnicodeDecodeError) as e:
+            raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+        if timestamp is None:
+            raise InvalidCursor(f"Invalid cursor: {cursor}")
+        return timestamp, key
+
+    def filter(self, queryset: QuerySet, cursor: Optional[str]) -> QuerySet:
+        """Order the queryset and keep only rows after the cursor position"""
+        queryset = queryset.order_by(*self.ordering)
+        if not cursor:
+            return queryset
+
+        timestamp, key = self.decode(cursor)
+        lookup = 'lt' if self.descending else 'gt'
+        return queryset.filter(
+            Q(**{f'{self.field}__{lookup}': timestamp})
+            | Q(**{self.field: timestamp, f'{self.tiebreaker}__{lookup}': key})
+        )
+
+    def page(self, queryset: QuerySet, cursor: Optional[str], page_size: int):
+        """
+        Fetch one page after the cursor
+
+        Returns:
+            (rows, next_cursor) - next_cursor is None on the last page
+        """
+        rows = list(self.filter(queryset, cursor)[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = self.encode(rows[-1]) if has_next and rows else None
+        return rows, next_cursor
+
+
+class KeysetPageNumberPagination(PageNumberPagination):
+    """
+    Page-number pagination that switches to keyset pagination when the
+    request carries ?cursor=...
+
+    Views can set `cursor_ordering` (default: newest first by created_at, id).
+    Cursor responses omit `count` - counting is what keyset pagination avoids.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        if self.cursor is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        ordering = getattr(view, 'cursor_ordering', self.cursor_ordering)
+        try:
+            rows, self.next_cursor = KeysetCursor(ordering).page(queryset, self.cursor, page_size)
+        except InvalidCursor as e:
+            raise NotFound(str(e))
+        return rows
+
+    def get_next_link(self):
+        if getattr(self, 'cursor', None) is None:
+            return super().get_next_link()
+        if not self.next_cursor:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if getattr(self, 'cursor', None) is None:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('next_cursor', self.next_cursor),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['next_cursor'] = {'type': 'string', 'nullable': True}
+        return response_schema
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
 from message.models import Conversation,Tag,Customer,Message,CustomerData
 import json
 
@@ -115,13 +117,12 @@ class CustomerSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Customer
-        fields = '__all__'
+        exclude = ['search_title', 'search_body', 'search_vector']
     
     def get_tag(self, obj):
         """Filter out system tags (Instagram, Telegram, Whatsapp) from customer tags"""
-        # Exclude system tags from display
-        user_tags = obj.tag.exclude(name__in=["Telegram", "Whatsapp", "Instagram"])
-        return TagSerializer(user_tags, many=True).data
+        # Exclude system tags from display (prefetched by list endpoints)
+        return TagSerializer(obj.get_user_tags(), many=True).data
 
 
 class FlexibleJSONField(serializers.Field):
@@ -196,8 +197,7 @@ class CustomerUpdateSerializer(serializers.ModelSerializer):
         """Customize output representation to show tag details instead of IDs"""
         representation = super().to_representation(instance)
         # Replace tag IDs with tag objects (excluding system tags)
-        user_tags = instance.tag.exclude(name__in=["Telegram", "Whatsapp", "Instagram"])
-        representation['tag'] = TagSerializer(user_tags, many=True).data
+        representation['tag'] = TagSerializer(instance.get_user_tags(), many=True).data
         # Ensure data is always a dict
         representation['data'] = instance.data or {}
         return representation
@@ -224,7 +224,7 @@ class CustomerUpdateSerializer(serializers.ModelSerializer):
         # Check if tag is NOT the sentinel value (meaning it was provided)
         if tag_ids is not self._TAG_NOT_PROVIDED:
             # Get system tags that should always be preserved
-            system_tags = instance.tag.filter(name__in=["Telegram", "Whatsapp", "Instagram"])
+            system_tags = instance.tag.filter(is_system=True)
             system_tag_ids = list(system_tags.values_list('id', flat=True))
             logger.info(f"🔄 System tag IDs to preserve: {system_tag_ids}")
             
@@ -249,7 +249,39 @@ class ConversationSerializer(serializers.ModelSerializer):
     customer = CustomerSerializer(read_only=True)
     class Meta:
         model = Conversation
-        fields = '__all__'
+        exclude = ['search_title', 'search_body', 'search_vector']
+
+
+class ConversationListSerializer(ConversationSerializer):
+    """
+    Conversation list item; last_message / unread_count are only included when
+    requested (context['include']) and read from
+    CustomerWithConversationSerializer.annotate_conversation_summaries()
+    """
+    OPTIONAL_FIELDS = ('last_message', 'unread_count')
+    
+    last_message = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        include = self.context.get('include', ())
+        for name in self.OPTIONAL_FIELDS:
+            if name not in include:
+                fields.pop(name)
+        return fields
+    
+    def get_last_message(self, obj):
+        if obj.last_message_id is None:
+            return None
+        data = {field: getattr(obj, f'last_message_{field}')
+                for field in CustomerWithConversationSerializer.LAST_MESSAGE_FIELDS}
+        for field in ('created_at', 'feedback_at'):
+            data[field] = data[field].isoformat() if data[field] else None
+        return data
+    
+    def get_unread_count(self, obj):
+        return obj.unread_count
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -280,8 +312,7 @@ class WSCustomerSerializer(serializers.ModelSerializer):
     
     def get_tag(self, obj):
         """Filter out system tags (Instagram, Telegram, Whatsapp) from customer tags"""
-        user_tags = obj.tag.exclude(name__in=["Telegram", "Whatsapp", "Instagram"])
-        return TagSerializer(user_tags, many=True).data
+        return TagSerializer(obj.get_user_tags(), many=True).data
     
     def get_data(self, obj):
         """Return customer data as dict, default to empty dict"""
@@ -350,41 +381,74 @@ class CustomerWithConversationSerializer(serializers.ModelSerializer):
     def get_tags(self, obj):
         """Get customer tags (excluding system tags: Instagram, Telegram, Whatsapp)"""
         # Filter out system tags from display
-        user_tags = obj.tag.exclude(name__in=["Telegram", "Whatsapp", "Instagram"])
-        return [{'id': tag.id, 'name': tag.name} for tag in user_tags]
+        return [{'id': tag.id, 'name': tag.name} for tag in obj.get_user_tags()]
     
     def get_data(self, obj):
         """Return customer data as dict, default to empty dict"""
         return obj.data or {}
     
+    # Prefetch target for conversations_prefetch()
+    CONVERSATIONS_ATTR = 'user_conversations'
+    LAST_MESSAGE_FIELDS = ('id', 'content', 'type', 'is_ai_response', 'created_at',
+                           'feedback', 'feedback_comment', 'feedback_at')
+    
+    @classmethod
+    def annotate_conversation_summaries(cls, queryset):
+        """
+        Annotate last message fields (last_message_<field>) and unread_count with
+        correlated subqueries - the summaries cost no extra query per conversation
+        """
+        latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-created_at', '-id')
+        unread = (
+            Message.objects.filter(conversation=OuterRef('pk'), type='customer', is_answered=False)
+            .order_by()
+            .values('conversation')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        return queryset.annotate(
+            **{f'last_message_{field}': Subquery(latest.values(field)[:1]) for field in cls.LAST_MESSAGE_FIELDS},
+            unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0)),
+        )
+    
+    @classmethod
+    def conversations_prefetch(cls, user):
+        """Prefetch of the user's annotated conversations for a page of customers (one query)"""
+        queryset = Conversation.objects.filter(user=user).order_by('-updated_at')
+        return Prefetch('conversations', queryset=cls.annotate_conversation_summaries(queryset),
+                        to_attr=cls.CONVERSATIONS_ATTR)
+    
     def get_conversations(self, obj):
         """Get conversations for this customer filtered by the current user"""
         user = self.context.get('user')
         if not user:
             return []
         
-        conversations = obj.conversations.filter(user=user).order_by('-updated_at')
+        if hasattr(obj, self.CONVERSATIONS_ATTR):
+            conversations = getattr(obj, self.CONVERSATIONS_ATTR)
+        else:
+            conversations = self.annotate_conversation_summaries(
+                obj.conversations.filter(user=user).order_by('-updated_at')
+            )
         conversation_data = []
         
         for conversation in conversations:
-            # Get last message
-            last_message = conversation.messages.order_by('-created_at').first()
+            # Last message (annotated)
             last_message_data = None
-            if last_message:
+            if conversation.last_message_id is not None:
+                created_at = conversation.last_message_created_at
+                feedback_at = conversation.last_message_feedback_at
                 last_message_data = {
-                    'id': last_message.id,
-                    'content': last_message.content,
-                    'type': last_message.type,
-                    'is_ai_response': getattr(last_message, 'is_ai_response', False),
-                    'created_at': last_message.created_at.isoformat() if last_message.created_at else None,
-                    'feedback': last_message.feedback,
-                    'feedback_comment': last_message.feedback_comment,
-                    'feedback_at': last_message.feedback_at.isoformat() if last_message.feedback_at else None
+                    'id': conversation.last_message_id,
+                    'content': conversation.last_message_content,
+                    'type': conversation.last_message_type,
+                    'is_ai_response': conversation.last_message_is_ai_response,
+                    'created_at': created_at.isoformat() if created_at else None,
+                    'feedback': conversation.last_message_feedback,
+                    'feedback_comment': conversation.last_message_feedback_comment,
+                    'feedback_at': feedback_at.isoformat() if feedback_at else None
                 }
             
-            # Get unread count
-            unread_count = conversation.messages.filter(type='customer', is_answered=False).count()
-            
             conversation_data.append({
                 'id': conversation.id,
                 'title': conversation.title,
@@ -395,7 +459,7 @@ class CustomerWithConversationSerializer(serializers.ModelSerializer):
                 'created_at': conversation.created_at.isoformat() if conversation.created_at else None,
                 'updated_at': conversation.updated_at.isoformat() if conversation.updated_at else None,
                 'last_message': last_message_data,
-                'unread_count': unread_count
+                'unread_count': conversation.unread_count
             })
         
         return conversation_data
@@ -0,0 +1,197 @@
+"""
+Customer CSV export
+Shared by the streaming export endpoint and the background export task.
+
+✅ Rows are produced from queryset.iterator(chunk_size) - constant memory per worker
+✅ Tags are prefetched per chunk (no N+1)
+✅ Background mode writes the file to the private `exports` storage and notifies
+   over WebSocket with a short-lived signed URL; files expire after
+   CUSTOMER_EXPORT_RETENTION_HOURS (purge_customer_exports)
+"""
+import csv
+import logging
+import re
+import secrets
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class _Echo:
+    """File-like object whose write() returns the value instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+class CustomerExportService:
+    """
+    Build customer CSV exports without materializing the whole queryset
+
+    Usage:
+        rows = CustomerExportService.iter_csv(queryset)
+        return StreamingHttpResponse(rows, content_type='text/csv')
+    """
+
+    CHUNK_SIZE = 2000
+
+    STORAGE_DIR = 'exports/customers'
+
+    # Stored names carry a random token: paths cannot be guessed from the timestamp
+    STORED_NAME_RE = re.compile(r'^customers_export_\d{8}_\d{6}_[A-Za-z0-9_-]{16,}\.csv$')
+
+    HEADERS = [
+        'ID', 'First Name', 'Last Name', 'Username', 'Email', 'Phone Number',
+        'Description', 'Source', 'Source ID', 'Tags', 'Created At', 'Updated At'
+    ]
+
+    EXPORT_FIELDS = [
+        'id', 'first_name', 'last_name', 'username', 'email', 'phone_number',
+        'description', 'source', 'source_id', 'created_at', 'updated_at',
+    ]
+
+    @classmethod
+    def prepare_queryset(cls, queryset):
+        """Restrict columns, prefetch tags and apply the export ordering"""
+        return queryset.only(*cls.EXPORT_FIELDS).prefetch_related('tag').order_by('-created_at')
+
+    @classmethod
+    def build_row(cls, customer) -> List:
+        tags = ', '.join(tag.name for tag in customer.tag.all())
+        return [
+            customer.id,
+            customer.first_name or '',
+            customer.last_name or '',
+            customer.username or '',
+            customer.email or '',
+            customer.phone_number or '',
+            customer.description or '',
+            customer.source,
+            customer.source_id or '',
+            tags,
+            customer.created_at.strftime('%Y-%m-%d %H:%M:%S') if customer.created_at else '',
+            customer.updated_at.strftime('%Y-%m-%d %H:%M:%S') if customer.updated_at else ''
+        ]
+
+    @classmethod
+    def iter_rows(cls, queryset, chunk_size: int = None) -> Iterator[List]:
+        """Yield header + one row per customer (prefetch runs once per chunk)"""
+        yield cls.HEADERS
+        for customer in cls.prepare_queryset(queryset).iterator(chunk_size=chunk_size or cls.CHUNK_SIZE):
+            yield cls.build_row(customer)
+
+    @classmethod
+    def iter_csv(cls, queryset, chunk_size: int = None) -> Iterator[str]:
+        """Yield CSV-encoded lines for StreamingHttpResponse"""
+        writer = csv.writer(_Echo())
+        for row in cls.iter_rows(queryset, chunk_size):
+            yield writer.writerow(row)
+
+    @classmethod
+    def generate_filename(cls) -> str:
+        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+        return f'customers_export_{timestamp}.csv'
+
+    @classmethod
+    def storage(cls):
+        return storages['exports']
+
+    @classmethod
+    def stored_path(cls, user_id, filename: str) -> str:
+        return f'{cls.STORAGE_DIR}/{user_id}/{filename}'
+
+    @classmethod
+    def signed_url(cls, path: str) -> Optional[str]:
+        """Short-lived download URL (None when the storage cannot sign: use the download endpoint)"""
+        storage = cls.storage()
+        if not getattr(storage, 'querystring_auth', False):
+            return None
+        return storage.url(path, expire=settings.CUSTOMER_EXPORT_URL_TTL)
+
+    @classmethod
+    def write_to_storage(cls, queryset, user_id, filename: str = None) -> dict:
+        """
+        Write export to the private exports storage through a temporary spool file
+
+        Returns:
+            {'path': str, 'url': str | None, 'expires_at': str, 'filename': str, 'row_count': int}
+        """
+        import tempfile
+        from django.core.files import File
+
+        filename = filename or cls.generate_filename()
+        stored_name = f'{filename[:-len(".csv")]}_{secrets.token_urlsafe(16)}.csv'
+        row_count = 0
+
+        with tempfile.TemporaryFile(mode='w+b') as tmp:
+            for line in cls.iter_csv(queryset):
+                tmp.write(line.encode('utf-8'))
+                row_count += 1
+            tmp.seek(0)
+            path = cls.storage().save(cls.stored_path(user_id, stored_name), File(tmp, name=stored_name))
+
+        return {
+            'path': path,
+            'url': cls.signed_url(path),
+            'expires_at': (timezone.now() + timedelta(seconds=settings.CUSTOMER_EXPORT_URL_TTL)).isoformat(),
+            'filename': path.rsplit('/', 1)[-1],
+            'row_count': max(row_count - 1, 0),  # exclude header
+        }
+
+    @classmethod
+    def purge_expired(cls) -> int:
+        """Delete stored exports older than CUSTOMER_EXPORT_RETENTION_HOURS"""
+        storage = cls.storage()
+        cutoff = timezone.now() - timedelta(hours=settings.CUSTOMER_EXPORT_RETENTION_HOURS)
+        deleted = 0
+        try:
+            user_dirs, _ = storage.listdir(cls.STORAGE_DIR)
+        except FileNotFoundError:
+            return 0
+        for user_dir in user_dirs:
+            _, files = storage.listdir(f'{cls.STORAGE_DIR}/{user_dir}')
+            for name in files:
+                path = f'{cls.STORAGE_DIR}/{user_dir}/{name}'
+                if storage.get_modified_time(path) < cutoff:
+                    storage.delete(path)
+                    deleted += 1
+        return deleted
+
+    @classmethod
+    def query_params_to_dict(cls, query_params) -> dict:
+        """Serialize a QueryDict (multi-value) for a Celery task"""
+        return {key: values for key, values in query_params.lists()}
+
+    @classmethod
+    def filter_for_user(cls, user, query_params: dict, customer_ids: Iterable[int] = None):
+        """
+        Rebuild the export queryset outside of a request (background mode)
+
+        Applies the same filter backends as CustomerBulkExportAPIView.
+        """
+        from django.http import HttpRequest, QueryDict
+        from rest_framework.request import Request
+        from message.api.customer import CustomerBulkExportAPIView
+        from message.models import Customer
+
+        http_request = HttpRequest()
+        http_request.GET = QueryDict(mutable=True)
+        for key, values in (query_params or {}).items():
+            http_request.GET.setlist(key, values)
+        http_request.user = user
+
+        view = CustomerBulkExportAPIView()
+        view.request = Request(http_request)
+        view.format_kwarg = None
+
+        queryset = view.filter_queryset(
+            Customer.objects.filter(conversations__user=user).distinct()
+        )
+        if customer_ids:
+            queryset = queryset.filter(id__in=customer_ids)
+        return queryset
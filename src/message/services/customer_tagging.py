@@ -0,0 +1,133 @@
+"""
+Bulk customer tagging
+Used by the bulk tag endpoint (customers/bulk-tags/).
+
+Tagging a selection one customer at a time meant a customer.tag.add() per
+customer, a WebSocket customer_updated (with a full serialization) per
+customer and, for workflows, one TAG_ADDED event per customer and tag.
+
+✅ Tags are written set-based on the Customer.tag through-table: one
+   bulk_create (ignore_conflicts) for additions, one DELETE for removals
+✅ The pairs that actually changed are computed up front, so the summary
+   and the workflow event only mention real changes
+✅ Changed customers get updated_at bumped (no m2m_changed fires for the
+   through-table writes; conversation list ETags read it)
+✅ One summarized WebSocket notification per affected owner
+✅ One TAG_BATCH workflow event (see workflow.signals.trigger_tag_batch_event)
+
+Usage:
+    result = BulkCustomerTagService.apply(user, customer_ids, add_tags, remove_tags)
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.utils import timezone
+
+from message.models import Conversation, Customer, Tag
+
+logger = logging.getLogger(__name__)
+
+
+class BulkCustomerTagService:
+    """Add and remove tags on many customers at once"""
+
+    # Rows per INSERT for the through-table
+    BATCH_SIZE = 2000
+
+    @classmethod
+    def validate_tags(cls, tag_ids: List[int]) -> List[Tag]:
+        """
+        Tags for `tag_ids`
+
+        Raises:
+            ValueError: unknown tag ids or system tags (never user-editable)
+        """
+        tags = list(Tag.objects.filter(id__in=tag_ids))
+        if len(tags) != len(set(tag_ids)):
+            invalid_ids = set(tag_ids) - {tag.id for tag in tags}
+            raise ValueError(f"Invalid tag IDs: {sorted(invalid_ids)}")
+        if any(tag.is_system for tag in tags):
+            raise ValueError("Cannot add or remove system tags (Telegram, Whatsapp, Instagram)")
+        return tags
+
+    @classmethod
+    def apply(cls, user, customer_ids: Iterable[int], add_tags: List[Tag], remove_tags: List[Tag]) -> Dict:
+        """
+        Apply tag additions and removals to the customers
+
+        Args:
+            user: Owner performing the change (workflow events are scoped to them)
+            customer_ids: Customers already restricted to the owner's customers
+            add_tags: Tags to add (customers that already have them are skipped)
+            remove_tags: Tags to remove (customers without them are skipped)
+
+        Returns:
+            Summary dict: customers, added / removed counts per tag name
+        """
+        customer_ids = list(customer_ids)
+        Through = Customer.tag.through
+
+        added: Dict[int, List[int]] = defaultdict(list)
+        removed: Dict[int, List[int]] = defaultdict(list)
+
+        with transaction.atomic():
+            if add_tags:
+                existing = set(Through.objects.filter(
+                    customer_id__in=customer_ids, tag_id__in=[tag.id for tag in add_tags]
+                ).values_list('customer_id', 'tag_id'))
+                rows = []
+                for tag in add_tags:
+                    for customer_id in customer_ids:
+                        if (customer_id, tag.id) not in existing:
+                            rows.append(Through(customer_id=customer_id, tag_id=tag.id))
+                            added[tag.id].append(customer_id)
+                # ignore_conflicts: a concurrent add of the same pair is not an error
+                Through.objects.bulk_create(rows, batch_size=cls.BATCH_SIZE, ignore_conflicts=True)
+
+            if remove_tags:
+                to_remove = Through.objects.filter(
+                    customer_id__in=customer_ids, tag_id__in=[tag.id for tag in remove_tags]
+                )
+                for customer_id, tag_id in to_remove.values_list('customer_id', 'tag_id'):
+                    removed[tag_id].append(customer_id)
+                to_remove.delete()
+
+            changed_ids = sorted({cid for ids in [*added.values(), *removed.values()] for cid in ids})
+            if changed_ids:
+                from message.signals import touch_tagged_customers
+                touch_tagged_customers(customer_ids=changed_ids)
+
+        tag_names = {tag.id: tag.name for tag in [*add_tags, *remove_tags]}
+        added_by_name = {tag_names[tag_id]: ids for tag_id, ids in added.items()}
+        removed_by_name = {tag_names[tag_id]: ids for tag_id, ids in removed.items()}
+
+        summary = {
+            'customers': len(customer_ids),
+            'changed_customers': len(changed_ids),
+            'added': {name: len(ids) for name, ids in added_by_name.items()},
+            'removed': {name: len(ids) for name, ids in removed_by_name.items()},
+            'timestamp': timezone.now().isoformat(),
+        }
+        logger.info(f"🏷️ Bulk tagging by user {user.id}: {summary['changed_customers']}/{len(customer_ids)} "
+                    f"customers changed, added={summary['added']} removed={summary['removed']}")
+
+        if changed_ids:
+            transaction.on_commit(lambda: cls._notify(user, changed_ids, summary, added_by_name, removed_by_name))
+        return summary
+
+    @classmethod
+    def _notify(cls, user, changed_ids: List[int], summary: Dict, added_by_name: Dict, removed_by_name: Dict):
+        from message.websocket_utils import notify_customers_tagged
+        from workflow.signals import trigger_tag_batch_event
+
+        # Customers can be shared with other owners: each gets one summary
+        owner_ids = set(Conversation.objects.filter(
+            customer_id__in=changed_ids
+        ).order_by().values_list('user_id', flat=True).distinct())
+        owner_ids.add(user.id)
+        for owner_id in owner_ids:
+            notify_customers_tagged(owner_id, summary)
+
+        trigger_tag_batch_event(user.id, added_by_name, removed_by_name, changed_by=str(user.id))
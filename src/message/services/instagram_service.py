@@ -1,8 +1,9 @@
 import logging
+import requests
 from typing import Optional, Dict, Any
 from settings.models import InstagramChannel
 from message.models import Message, Conversation, Customer
-from core.utils import make_request_with_proxy
+from core.utils import is_unsent_error, make_request_with_proxy
 
 logger = logging.getLogger(__name__)
 
@@ -81,7 +82,9 @@ class InstagramService:
         
         try:
             # ✅ Send Instagram message with automatic fallback proxy
-            response = make_request_with_proxy('post', url, json=payload, headers=headers, timeout=30)
+            # A timed-out send may have been delivered: only re-send on the fallback proxy if it never left
+            response = make_request_with_proxy('post', url, json=payload, headers=headers, timeout=30,
+                                               fallback_after_send=False)
             
             # Log the response for debugging
             logger.info(f"Instagram API response status: {response.status_code}")
@@ -110,9 +113,24 @@ class InstagramService:
                 
         except Exception as e:
             logger.error(f"Error sending message to Instagram user {recipient_id}: {e}")
+            # Instagram answered with an error status - report it (429/5xx are retried by the outbound queue)
+            error_response = getattr(e, 'response', None)
+            if error_response is not None:
+                return {
+                    'success': False,
+                    'error': self._format_http_error(error_response),
+                    'status_code': error_response.status_code,
+                    'retry_after': error_response.headers.get('Retry-After'),
+                }
+            unsent = is_unsent_error(e)
+            if not unsent:
+                # Timed out / dropped after the request went out: Instagram may have delivered it
+                return {'success': False, 'error': 'Request timeout', 'status_code': None, 'unsent': False}
             # ✅ make_request_with_proxy already handles fallback automatically
             try:
-                response = make_request_with_proxy('post', url, json=payload, headers=headers, timeout=30, use_fallback=True)
+                response = make_request_with_proxy('post', url, json=payload, headers=headers, timeout=30,
+                                                   use_fallback=True, fallback_after_send=False)
+                unsent = False
                 response.raise_for_status()
                 result = response.json()
                 if 'message_id' in result or 'recipient_id' in result:
@@ -125,7 +143,8 @@ class InstagramService:
                     }
             except Exception as fallback_error:
                 logger.error(f"Fallback proxy also failed: {fallback_error}")
-            return {'success': False, 'error': 'Request timeout'}
+                unsent = is_unsent_error(fallback_error)
+            return {'success': False, 'error': 'Request timeout', 'status_code': None, 'unsent': unsent}
             
         except requests.exceptions.HTTPError as e:
             error_msg = f"{e.response.status_code} {e.response.reason}"
@@ -167,6 +186,20 @@ class InstagramService:
             logger.error(f"Unexpected error sending message to Instagram user {recipient_id}: {e}")
             return {'success': False, 'error': str(e)}
     
+    @staticmethod
+    def _format_http_error(response) -> str:
+        """Build a readable error from an Instagram Graph API error response"""
+        error_msg = f"{response.status_code} {response.reason}"
+        try:
+            error_detail = response.json().get('error')
+            if isinstance(error_detail, dict):
+                error_msg = f"{error_msg}: {error_detail.get('message', 'Unknown error')}"
+            elif error_detail:
+                error_msg = f"{error_msg}: {error_detail}"
+        except Exception:
+            pass
+        return error_msg
+    
     def send_message_to_customer(self, customer: Customer, message_text: str, buttons=None) -> Dict[str, Any]:
         """
         Send message to a customer via their Instagram ID
@@ -9,6 +9,7 @@ import requests
 import logging
 from typing import Dict, Optional, Any, List
 from django.conf import settings
+from settings.services.intercom_http import intercom_request
 
 logger = logging.getLogger(__name__)
 
@@ -64,8 +65,8 @@ class IntercomConversationSyncService:
             conversation_data["subject"] = subject
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=conversation_data,
                 headers=IntercomConversationSyncService.get_headers(),
                 timeout=10
@@ -122,8 +123,8 @@ class IntercomConversationSyncService:
             message_data["admin_id"] = admin_id
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=message_data,
                 headers=IntercomConversationSyncService.get_headers(),
                 timeout=10
@@ -163,8 +164,8 @@ class IntercomConversationSyncService:
             close_data["admin_id"] = admin_id
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=close_data,
                 headers=IntercomConversationSyncService.get_headers(),
                 timeout=10
@@ -193,8 +194,8 @@ class IntercomConversationSyncService:
         url = f"{IntercomConversationSyncService.BASE_URL}/conversations/{conversation_id}"
         
         try:
-            response = requests.get(
-                url,
+            response = intercom_request(
+                'GET', url,
                 headers=IntercomConversationSyncService.get_headers(),
                 timeout=10
             )
@@ -232,8 +233,8 @@ class IntercomConversationSyncService:
         }
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=search_query,
                 headers=IntercomConversationSyncService.get_headers(),
                 timeout=10
@@ -278,8 +279,8 @@ class IntercomConversationSyncService:
         }
         
         try:
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 json=assignment_data,
                 headers=IntercomConversationSyncService.get_headers(),
                 timeout=10
@@ -0,0 +1,235 @@
+"""
+Streamed media pipeline for incoming image/voice attachments
+
+Media tasks used to hold the whole attachment in memory (response.content),
+save it, write it again to a temp file and hand the full-size file to Gemini.
+Here:
+
+✅ Downloads stream to an on-disk spool file in chunks, hashed on the fly and
+   capped at MEDIA_MAX_DOWNLOAD_BYTES (Content-Length is checked up front)
+✅ Images are decoded at reduced size, downscaled to MEDIA_ANALYSIS_MAX_IMAGE_SIDE
+   and re-encoded as JPEG before analysis
+✅ Audio is transcoded to mono Opus/OGG with ffmpeg (original file if ffmpeg
+   is not installed)
+✅ Analysis results are cached per owner by SHA-256 of the original bytes, so the
+   same photo/voice forwarded again is not sent to Gemini (or billed) twice; the
+   subscription/token check still runs before the cache is consulted
+
+Usage:
+    with MediaPipeline.download(url, 'image', via_proxy=True) as media:
+        message.media_file.save(filename, media.open(), save=True)
+        result = MediaPipeline.analyze(media, user=user)
+"""
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Any, Dict, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MediaTooLarge(Exception):
+    pass
+
+
+class SpooledMedia:
+    """Downloaded attachment on disk; deletes its files on exit"""
+
+    SUFFIXES = {'image': '.jpg', 'voice': '.ogg'}
+
+    def __init__(self, kind: str, suffix: Optional[str] = None):
+        self.kind = kind
+        fd, self.path = tempfile.mkstemp(suffix=suffix or self.SUFFIXES.get(kind, ''), prefix='media_')
+        os.close(fd)
+        self.sha256 = None
+        self.size = 0
+        self._paths = [self.path]
+        self._files = []
+
+    def open(self) -> File:
+        """Django File over the spool file, for FileField.save() (closed on exit)"""
+        handle = File(open(self.path, 'rb'), name=os.path.basename(self.path))
+        self._files.append(handle)
+        return handle
+
+    def temp_path(self, suffix: str) -> str:
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix='media_')
+        os.close(fd)
+        self._paths.append(path)
+        return path
+
+    def cleanup(self):
+        for handle in self._files:
+            handle.close()
+        for path in self._paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+        return False
+
+
+class MediaPipeline:
+    """Download -> normalize -> analyze (cached by content hash)"""
+
+    CACHE_KEY = 'media_analysis:{owner}:{kind}:{analysis_type}:{sha256}'
+
+    # ==========================================
+    #  Download
+    # ==========================================
+
+    @classmethod
+    def download(cls, url: str, kind: str, via_proxy: bool = False, timeout: int = 30,
+                 suffix: Optional[str] = None) -> SpooledMedia:
+        """
+        Stream a URL to a spool file
+
+        Raises:
+            MediaTooLarge: the attachment exceeds MEDIA_MAX_DOWNLOAD_BYTES
+            requests.RequestException: download failed
+        """
+        max_bytes = settings.MEDIA_MAX_DOWNLOAD_BYTES
+        media = SpooledMedia(kind, suffix=suffix)
+        digest = hashlib.sha256()
+
+        try:
+            if via_proxy:
+                from core.utils import make_request_with_proxy
+                response = make_request_with_proxy('get', url, timeout=timeout, stream=True)
+            else:
+                response = requests.get(url, timeout=timeout, stream=True)
+
+            with response:
+                response.raise_for_status()
+                declared = response.headers.get('Content-Length')
+                if declared and declared.isdigit() and int(declared) > max_bytes:
+                    raise MediaTooLarge(f"{kind} is {int(declared)} bytes (limit {max_bytes})")
+
+                with open(media.path, 'wb') as spool:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if not chunk:
+                            continue
+                        media.size += len(chunk)
+                        if media.size > max_bytes:
+                            raise MediaTooLarge(f"{kind} exceeds {max_bytes} bytes")
+                        digest.update(chunk)
+                        spool.write(chunk)
+        except Exception:
+            media.cleanup()
+            raise
+
+        media.sha256 = digest.hexdigest()
+        logger.debug(f"📥 Spooled {kind}: {media.size} bytes, sha256 {media.sha256[:12]}")
+        return media
+
+    # ==========================================
+    #  Normalization
+    # ==========================================
+
+    @classmethod
+    def prepare_image(cls, media: SpooledMedia) -> str:
+        """Path of a downscaled JPEG copy (the original on decode errors)"""
+        from PIL import Image, ImageOps
+
+        max_side = settings.MEDIA_ANALYSIS_MAX_IMAGE_SIDE
+        try:
+            with Image.open(media.path) as img:
+                # JPEG: let the decoder skip detail we are about to throw away
+                img.draft('RGB', (max_side, max_side))
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail((max_side, max_side))
+                if img.mode != 'RGB':
+                    img = img.convert('RGB')
+                path = media.temp_path('.jpg')
+                img.save(path, 'JPEG', quality=settings.MEDIA_ANALYSIS_JPEG_QUALITY, optimize=True)
+                return path
+        except Exception as e:
+            logger.warning(f"⚠️ Could not downscale image, analysing original: {e}")
+            return media.path
+
+    @classmethod
+    def prepare_audio(cls, media: SpooledMedia) -> str:
+        """Path of a mono Opus/OGG copy (the original without ffmpeg)"""
+        ffmpeg = shutil.which('ffmpeg')
+        if not ffmpeg:
+            logger.debug("ffmpeg not installed - analysing original audio")
+            return media.path
+
+        path = media.temp_path('.ogg')
+        command = [
+            ffmpeg, '-y', '-loglevel', 'error', '-i', media.path,
+            '-vn', '-ac', '1', '-ar', '16000', '-c:a', 'libopus', '-b:a', '24k', path,
+        ]
+        try:
+            subprocess.run(command, check=True, capture_output=True, timeout=60)
+            return path
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.warning(f"⚠️ Audio transcode failed, analysing original: {e}")
+            return media.path
+
+    # ==========================================
+    #  Analysis
+    # ==========================================
+
+    @classmethod
+    def analyze(cls, media: SpooledMedia, user=None, analysis_type: str = 'comprehensive') -> Dict[str, Any]:
+        """
+        Describe an image / transcribe a voice message, reusing earlier results
+        for identical bytes
+
+        Returns:
+            MediaProcessorService result dict ('description' or 'transcription'),
+            with 'cached': True on a hash hit
+        """
+        from AI_model.services.media_processor import MediaProcessorService
+
+        text_field = 'description' if media.kind == 'image' else 'transcription'
+
+        # A cached result is still an AI feature: same access check as the processor
+        denied = MediaProcessorService.access_denial(user, media.kind)
+        if denied:
+            return denied
+
+        # Results never cross tenants
+        owner = user.id if user else 'anonymous'
+        cache_key = cls.CACHE_KEY.format(owner=owner, kind=media.kind, analysis_type=analysis_type,
+                                         sha256=media.sha256)
+        try:
+            cached = cache.get(cache_key) if media.sha256 else None
+        except Exception:
+            cached = None
+        if cached:
+            logger.info(f"♻️ Reusing {media.kind} analysis for sha256 {media.sha256[:12]}")
+            return {'success': True, text_field: cached, 'duration_ms': 0, 'cached': True}
+
+        processor = MediaProcessorService(user=user)
+        if not processor.is_ready():
+            raise Exception("MediaProcessorService not ready")
+
+        if media.kind == 'image':
+            result = processor.process_image(cls.prepare_image(media), analysis_type=analysis_type)
+        else:
+            result = processor.process_voice(cls.prepare_audio(media))
+
+        if result.get('success') and media.sha256:
+            try:
+                cache.set(cache_key, result[text_field], settings.MEDIA_ANALYSIS_CACHE_TTL)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not cache media analysis: {e}")
+        return result
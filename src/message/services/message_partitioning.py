@@ -0,0 +1,302 @@
+"""
+Optional monthly range partitioning for the message table
+
+The message table can be converted into a table partitioned by created_at
+(one partition per month + a DEFAULT partition). Old months can then be
+detached/archived cheaply and per-conversation queries only touch the
+indexes of recent partitions.
+
+⚠️ Postgres requires the partition key in the primary key, so the table
+primary key becomes (id, created_at). Django keeps treating `id` as the
+primary key. Short random ids do collide, so uniqueness of `id` alone is
+enforced by <table>_ids (one row per message id, its own primary key) kept
+in sync by a row trigger: an insert reusing an id fails as before.
+
+Usage:
+    python manage.py partition_messages --dry-run
+    python manage.py partition_messages --migrate
+    python manage.py partition_messages --ensure          # create upcoming partitions
+"""
+import logging
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + (month.month - 1) + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class MessagePartitionService:
+    """Inspect, migrate and maintain the monthly partitions of the message table"""
+
+    DEFAULT_MONTHS_AHEAD = 3
+    LEGACY_SUFFIX = '_legacy'
+
+    @classmethod
+    def table_name(cls) -> str:
+        from message.models import Message
+        return Message._meta.db_table
+
+    @classmethod
+    def id_table_name(cls) -> str:
+        return f"{cls.table_name()}_ids"
+
+    @classmethod
+    def partition_name(cls, month: date) -> str:
+        return f"{cls.table_name()}_p{month:%Y%m}"
+
+    # ==========================================
+    #  Inspection
+    # ==========================================
+
+    @classmethod
+    def is_partitioned(cls) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+                [cls.table_name()]
+            )
+            row = cursor.fetchone()
+        return bool(row) and row[0] == 'p'
+
+    @classmethod
+    def list_partitions(cls) -> List[str]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.oid = to_regclass(%s)
+                ORDER BY child.relname
+                """,
+                [cls.table_name()]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @classmethod
+    def referencing_foreign_keys(cls) -> List[Tuple[str, str]]:
+        """FKs from other tables to message - not supported by the migration"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT conrelid::regclass::text, conname
+                FROM pg_constraint
+                WHERE contype = 'f' AND confrelid = to_regclass(%s)
+                """,
+                [cls.table_name()]
+            )
+            return cursor.fetchall()
+
+    @classmethod
+    def month_range(cls, months_ahead: int) -> List[date]:
+        """Months from the oldest message to `months_ahead` months from now"""
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT MIN(created_at) FROM "{cls.table_name()}"')
+            oldest = cursor.fetchone()[0]
+
+        current = timezone.now().date().replace(day=1)
+        first = oldest.date().replace(day=1) if oldest else current
+        last = _add_months(current, months_ahead)
+
+        months = []
+        month = first
+        while month <= last:
+            months.append(month)
+            month = _add_months(month, 1)
+        return months
+
+    # ==========================================
+    #  SQL plan
+    # ==========================================
+
+    @classmethod
+    def _partition_sql(cls, parent: str, month: date) -> str:
+        return (
+            f'CREATE TABLE IF NOT EXISTS "{cls.partition_name(month)}" PARTITION OF "{parent}" '
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+        )
+
+    @classmethod
+    def _id_guard_sql(cls, table: str) -> List[str]:
+        """Trigger keeping <table>_ids in step with the partitioned table"""
+        ids = cls.id_table_name()
+        return [
+            f'''CREATE OR REPLACE FUNCTION "{ids}_sync"() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM "{ids}" WHERE id = OLD.id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO "{ids}" (id) VALUES (NEW.id);
+    END IF;
+    RETURN NULL;
+END
+$$''',
+            # Rows moving between partitions fire DELETE + INSERT
+            f'CREATE TRIGGER "{ids}_sync" AFTER INSERT OR DELETE OR UPDATE OF id ON "{table}" '
+            f'FOR EACH ROW EXECUTE FUNCTION "{ids}_sync"()',
+        ]
+
+    @classmethod
+    def build_migration_sql(cls, months_ahead: int = DEFAULT_MONTHS_AHEAD) -> List[str]:
+        """
+        SQL statements converting the message table into a partitioned table
+
+        The original table is renamed to <table>_legacy (kept for verification,
+        drop it manually) and its rows are copied month by month. The id
+        registry is filled from the legacy table (unique by its primary key)
+        before the copy; the trigger guards every write after it.
+        """
+        table = cls.table_name()
+        legacy = f"{table}{cls.LEGACY_SUFFIX}"
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s",
+                [table]
+            )
+            indexes = cursor.fetchall()
+            cursor.execute(
+                """
+                SELECT conname, pg_get_constraintdef(oid)
+                FROM pg_constraint
+                WHERE conrelid = to_regclass(%s) AND contype = 'f'
+                """,
+                [table]
+            )
+            foreign_keys = cursor.fetchall()
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+                [table]
+            )
+            pkey_row = cursor.fetchone()
+            cursor.execute(
+                "SELECT format_type(atttypid, atttypmod) FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'id'",
+                [table]
+            )
+            id_type = cursor.fetchone()[0]
+
+        pkey_name = pkey_row[0] if pkey_row else f"{table}_pkey"
+        statements = [
+            # Writers wait, readers continue, for the duration of the copy
+            f'LOCK TABLE "{table}" IN EXCLUSIVE MODE',
+            f'ALTER TABLE "{table}" RENAME TO "{legacy}"',
+        ]
+
+        # Index names are schema-wide: move the legacy ones out of the way
+        for index_name, _ in indexes:
+            statements.append(
+                f'ALTER INDEX "{index_name}" RENAME TO "{index_name[:63 - len(cls.LEGACY_SUFFIX)]}{cls.LEGACY_SUFFIX}"'
+            )
+
+        statements += [
+            f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+            f'INCLUDING GENERATED INCLUDING STORAGE) PARTITION BY RANGE (created_at)',
+            f'ALTER TABLE "{table}" ADD CONSTRAINT "{pkey_name}" PRIMARY KEY (id, created_at)',
+        ]
+        for constraint_name, definition in foreign_keys:
+            statements.append(f'ALTER TABLE "{table}" ADD CONSTRAINT "{constraint_name}" {definition}')
+
+        # Partitioned indexes cascade to every partition
+        for index_name, index_def in indexes:
+            if index_name == pkey_name:
+                continue
+            if ' UNIQUE ' in index_def.upper():
+                logger.warning(f"⚠️ Skipping unique index {index_name}: not supported without partition key")
+                continue
+            statements.append(index_def)
+
+        months = cls.month_range(months_ahead)
+        for month in months:
+            statements.append(cls._partition_sql(table, month))
+        statements.append(f'CREATE TABLE IF NOT EXISTS "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+        statements += [
+            f'CREATE TABLE "{cls.id_table_name()}" (id {id_type} PRIMARY KEY)',
+            f'INSERT INTO "{cls.id_table_name()}" (id) SELECT id FROM "{legacy}"',
+        ]
+
+        for month in months:
+            statements.append(
+                f'INSERT INTO "{table}" SELECT * FROM "{legacy}" '
+                f"WHERE created_at >= '{month:%Y-%m-%d}' AND created_at < '{_add_months(month, 1):%Y-%m-%d}'"
+            )
+        statements.append(f'INSERT INTO "{table}" SELECT * FROM "{legacy}" WHERE created_at >= \'{_add_months(months[-1], 1):%Y-%m-%d}\'')
+        statements += cls._id_guard_sql(table)
+        statements.append(f'ANALYZE "{table}"')
+        return statements
+
+    # ==========================================
+    #  Actions
+    # ==========================================
+
+    @classmethod
+    def migrate(cls, months_ahead: int = DEFAULT_MONTHS_AHEAD) -> Dict[str, int]:
+        """
+        Convert the message table to monthly partitions (single transaction)
+
+        Requires a maintenance window: inserts into message block until commit.
+
+        Returns:
+            {'rows': int, 'partitions': int}
+        """
+        if cls.is_partitioned():
+            raise ValueError(f"{cls.table_name()} is already partitioned")
+
+        references = cls.referencing_foreign_keys()
+        if references:
+            raise ValueError(
+                "Tables reference the message table with foreign keys: "
+                + ', '.join(f"{table}.{name}" for table, name in references)
+            )
+
+        table = cls.table_name()
+        legacy = f"{table}{cls.LEGACY_SUFFIX}"
+
+        with transaction.atomic():
+            statements = cls.build_migration_sql(months_ahead)
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    logger.debug(f"partition_messages: {sql}")
+                    cursor.execute(sql)
+
+                cursor.execute(f'SELECT COUNT(*) FROM "{legacy}"')
+                legacy_rows = cursor.fetchone()[0]
+                cursor.execute(f'SELECT COUNT(*) FROM "{table}"')
+                copied_rows = cursor.fetchone()[0]
+                cursor.execute(f'SELECT COUNT(*) FROM "{cls.id_table_name()}"')
+                registered_ids = cursor.fetchone()[0]
+                if not legacy_rows == copied_rows == registered_ids:
+                    raise RuntimeError(
+                        f"Row count mismatch: {legacy_rows} legacy vs {copied_rows} copied, {registered_ids} ids"
+                    )
+
+        partitions = len(cls.list_partitions())
+        logger.info(f"✅ {table} partitioned: {copied_rows} rows in {partitions} partitions")
+        return {'rows': copied_rows, 'partitions': partitions}
+
+    @classmethod
+    def ensure_partitions(cls, months_ahead: int = DEFAULT_MONTHS_AHEAD) -> Optional[List[str]]:
+        """
+        Create partitions for the current and upcoming months
+
+        Returns:
+            Names of partitions that exist afterwards, or None if the table is not partitioned
+        """
+        if not cls.is_partitioned():
+            return None
+
+        table = cls.table_name()
+        current = timezone.now().date().replace(day=1)
+        with connection.cursor() as cursor:
+            for offset in range(months_ahead + 1):
+                cursor.execute(cls._partition_sql(table, _add_months(current, offset)))
+        return cls.list_partitions()
@@ -0,0 +1,176 @@
+"""
+Coalescing WebSocket fan-out for conversation/customer list groups
+
+Every notify_* call used to do one channel_layer.group_send, and every event
+made ConversationListConsumer re-query and re-send the whole conversation
+list. A burst of messages (AI reply + workflow node + status change) meant a
+burst of identical list refreshes.
+
+Here events for list groups (`user_{id}_conversations`, `user_{id}_customers`)
+are buffered per group for WEBSOCKET_COALESCE_WINDOW_MS and merged by
+conversation id (customer id for customer events): the latest event per id
+wins, deletions are never overwritten. Each window ends in ONE group_send:
+
+    {'type': 'batched_events', 'events': [...], 'timestamp': ...}
+
+(a window holding a single event sends it unchanged). Chat room groups
+(`chat_{id}`) carry every message in order and are sent immediately.
+
+Metrics (monitoring.metrics, labelled by group kind - never by user id):
+✅ django_websocket_group_events_total - events handed to the coalescer
+✅ django_websocket_group_sends_total - frames actually sent (send rate)
+✅ django_websocket_group_batch_size - events per sent frame
+
+Usage:
+    from message.services.notification_coalescer import group_send
+    group_send(f'user_{user_id}_conversations', {'type': 'conversation_updated', 'conversation_id': cid})
+"""
+import atexit
+import itertools
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BATCH_EVENT_TYPE = 'batched_events'
+
+GROUP_KINDS = (
+    ('conversations', re.compile(r'^user_\d+_conversations$')),
+    ('customers', re.compile(r'^user_\d+_customers$')),
+    ('chat', re.compile(r'^chat_')),
+)
+COALESCED_KINDS = {'conversations', 'customers'}
+
+# Terminal events: a later update for the same id must not replace them
+STICKY_EVENT_TYPES = {'conversation_deleted', 'customer_deleted'}
+
+
+def get_group_kind(group: str) -> str:
+    for kind, pattern in GROUP_KINDS:
+        if pattern.match(group):
+            return kind
+    return 'other'
+
+
+def _record(metric_name: str, kind: str, value: Optional[float] = None):
+    try:
+        from monitoring import metrics
+        metric = getattr(metrics, metric_name).labels(group_kind=kind)
+        metric.inc() if value is None else metric.observe(value)
+    except Exception:
+        pass
+
+
+class NotificationCoalescer:
+    """Per-process buffer of pending list-group events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffers: Dict[str, OrderedDict] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self._unmerged = itertools.count()
+
+    @property
+    def window(self) -> float:
+        return getattr(settings, 'WEBSOCKET_COALESCE_WINDOW_MS', 50) / 1000.0
+
+    @staticmethod
+    def get_merge_key(event: Dict[str, Any], counter) -> Any:
+        """Conversation id, else customer id; events without either never merge"""
+        for field in ('conversation_id', 'customer_id'):
+            if event.get(field) is not None:
+                return field, str(event[field])
+        conversation = event.get('conversation')
+        if isinstance(conversation, dict) and conversation.get('id') is not None:
+            return 'conversation_id', str(conversation['id'])
+        return 'unmerged', next(counter)
+
+    @classmethod
+    def merge(cls, buffer: OrderedDict, event: Dict[str, Any], counter) -> bool:
+        """
+        Add an event to a group buffer
+
+        Returns:
+            True if it merged into a pending event for the same id
+        """
+        key = cls.get_merge_key(event, counter)
+        pending = buffer.get(key)
+        if pending is None:
+            buffer[key] = event
+            return False
+        if pending.get('type') not in STICKY_EVENT_TYPES:
+            buffer[key] = event
+        return True
+
+    def send(self, group: str, event: Dict[str, Any]):
+        kind = get_group_kind(group)
+        _record('websocket_group_events_total', kind)
+
+        window = self.window
+        if kind not in COALESCED_KINDS or window <= 0:
+            self._send(group, kind, [event])
+            return
+
+        with self._lock:
+            buffer = self._buffers.setdefault(group, OrderedDict())
+            if self.merge(buffer, event, self._unmerged):
+                _record('websocket_group_events_coalesced_total', kind)
+            if group not in self._timers:
+                timer = threading.Timer(window, self.flush, args=(group,))
+                timer.daemon = True
+                self._timers[group] = timer
+                timer.start()
+
+    def flush(self, group: str):
+        with self._lock:
+            self._timers.pop(group, None)
+            buffer = self._buffers.pop(group, None)
+        if buffer:
+            self._send(group, get_group_kind(group), list(buffer.values()))
+
+    def flush_all(self):
+        with self._lock:
+            groups = list(self._buffers)
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+        for group in groups:
+            self.flush(group)
+
+    @staticmethod
+    def _send(group: str, kind: str, events):
+        if len(events) == 1:
+            frame = events[0]
+        else:
+            frame = {
+                'type': BATCH_EVENT_TYPE,
+                'events': events,
+                'timestamp': timezone.now().isoformat()
+            }
+        try:
+            channel_layer = get_channel_layer()
+            if channel_layer is None:
+                return
+            async_to_sync(channel_layer.group_send)(group, frame)
+            _record('websocket_group_sends_total', kind)
+            _record('websocket_group_batch_size', kind, len(events))
+        except Exception as e:
+            logger.error(f"❌ WebSocket group send to {group} failed ({len(events)} event(s)): {e}")
+
+
+coalescer = NotificationCoalescer()
+# Do not lose the last window when a worker shuts down
+atexit.register(coalescer.flush_all)
+
+
+def group_send(group: str, event: Dict[str, Any]):
+    """Drop-in for async_to_sync(channel_layer.group_send) from sync code"""
+    coalescer.send(group, event)
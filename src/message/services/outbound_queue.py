@@ -0,0 +1,439 @@
+"""
+Outbound message queue
+Platform sends (Instagram/Telegram) are enqueued and delivered by a Celery task
+on a dedicated queue per channel instead of being called inline.
+
+✅ Token bucket per channel account (Redis) - bursts never exceed platform rate limits
+✅ Retries with exponential backoff for 429 / 500-503 and for transport errors that
+   prove the request never left (connect/DNS/proxy/TLS). A timeout after the send
+   went out is not retried: the platform has often delivered it already
+✅ Delivery status written back to the Message row (queued → sending → sent / failed);
+   a row left in `sending` by a dead worker is re-queued after OUTBOUND_SENDING_LEASE_SECONDS
+✅ Per-conversation order: a message waits while an earlier one of its conversation
+   is still queued/sending, so retries never overtake later messages
+"""
+import hashlib
+import logging
+import random
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundRateLimiter:
+    """
+    Token bucket per (channel, account) shared by all workers
+
+    Bucket state lives in a Redis hash and is updated atomically by a Lua script.
+    If Redis is unreachable the limiter fails open (sends are never blocked by it).
+    """
+
+    KEY = 'outbound_bucket:{channel}:{account_id}'
+
+    # Returns seconds to wait before a token is available (0 = token taken)
+    SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+    _client = None
+    _script = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_script(cls):
+        if cls._script is None:
+            with cls._lock:
+                if cls._script is None:
+                    import redis
+                    location = settings.CACHES['default']['LOCATION']
+                    cls._client = redis.Redis.from_url(location, socket_timeout=2)
+                    cls._script = cls._client.register_script(cls.SCRIPT)
+        return cls._script
+
+    @classmethod
+    def get_limits(cls, channel: str) -> Dict[str, float]:
+        limits = getattr(settings, 'OUTBOUND_RATE_LIMITS', {}).get(channel) or {}
+        return {
+            'rate': float(limits.get('rate', 5)),
+            'burst': float(limits.get('burst', 10)),
+        }
+
+    @classmethod
+    def acquire(cls, channel: str, account_id: str) -> float:
+        """
+        Take one token for the account
+
+        Returns:
+            0 if the message may be sent now, otherwise seconds to wait
+        """
+        limits = cls.get_limits(channel)
+        try:
+            wait = cls._get_script()(
+                keys=[cls.KEY.format(channel=channel, account_id=account_id)],
+                args=[limits['rate'], limits['burst'], time.time()],
+            )
+            return float(wait)
+        except Exception as e:
+            logger.warning(f"⚠️ Outbound rate limiter unavailable, sending without limit: {e}")
+            return 0.0
+
+
+class OutboundMessageQueue:
+    """
+    Enqueue platform sends for a Message and deliver them from Celery
+
+    Usage:
+        OutboundMessageQueue.enqueue(ai_message, buttons=ai_message.buttons)
+    """
+
+    CHANNELS = ('instagram', 'telegram')
+    QUEUE_NAME = 'outbound_{channel}'
+
+    MAX_ATTEMPTS = 5
+    BACKOFF_BASE = 5        # seconds, doubled per attempt
+    BACKOFF_MAX = 300
+    # 504 is left out: the gateway gave up, the platform may still have sent it
+    RETRYABLE_STATUS_CODES = (429, 500, 502, 503)
+
+    # A message waits this long between checks for an earlier one of its conversation
+    ORDER_WAIT = 2
+    # Earlier messages older than this no longer hold later ones back (lost task, stuck row)
+    ORDER_WINDOW = timedelta(minutes=10)
+
+    # Minimum delay for AI replies so the Instagram typing indicator is visible
+    TYPING_DELAY = 1
+
+    # ==========================================
+    #  Enqueue
+    # ==========================================
+
+    @classmethod
+    def enqueue(cls, message, buttons: Optional[List[Dict]] = None,
+                typing_off: bool = False, countdown: float = 0) -> bool:
+        """
+        Queue a Message for delivery to its conversation's platform
+
+        The task is published after the current transaction commits so the
+        worker always sees the Message row.
+
+        Args:
+            message: Message instance (conversation.source decides the channel)
+            buttons: Optional CTA buttons (Instagram Button Template)
+            typing_off: Turn off the Instagram typing indicator after delivery
+            countdown: Delay before first delivery attempt (seconds)
+
+        Returns:
+            True if queued, False if the conversation has no supported channel
+        """
+        from message.models import Message
+
+        channel = message.conversation.source
+        if channel not in cls.CHANNELS:
+            logger.debug(f"Outbound queue skipped for message {message.id}: unsupported source '{channel}'")
+            return False
+
+        # Claim the message - a message already queued/sent is never published twice
+        claimed = Message.objects.filter(id=message.id).filter(
+            Q(delivery_status__isnull=True) | Q(delivery_status='failed')
+        ).update(delivery_status='queued', delivery_error=None)
+        if not claimed:
+            logger.debug(f"Message {message.id} already queued for delivery")
+            message.refresh_from_db(fields=['delivery_status'])
+            return True
+        message.delivery_status = 'queued'
+        message.delivery_error = None
+
+        message_id = message.id
+        transaction.on_commit(lambda: cls.schedule(
+            message_id, channel,
+            buttons=buttons, typing_off=typing_off, countdown=countdown, attempt=1
+        ))
+        logger.info(f"📮 Message {message_id} queued for {channel} delivery")
+        return True
+
+    @classmethod
+    def schedule(cls, message_id: str, channel: str, buttons=None, typing_off: bool = False,
+                 countdown: float = 0, attempt: int = 1):
+        """Publish a delivery attempt on the channel's queue"""
+        from message.tasks import deliver_outbound_message
+
+        deliver_outbound_message.apply_async(
+            args=[message_id],
+            kwargs={'buttons': buttons, 'typing_off': typing_off, 'attempt': attempt},
+            queue=cls.QUEUE_NAME.format(channel=channel),
+            countdown=max(countdown, 0),
+        )
+
+    # ==========================================
+    #  Delivery (Celery worker)
+    # ==========================================
+
+    @classmethod
+    def deliver(cls, message_id: str, buttons=None, typing_off: bool = False, attempt: int = 1) -> Dict[str, Any]:
+        """
+        Deliver one queued Message (called by the deliver_outbound_message task)
+
+        Rate-limited and retryable failures are re-published with a countdown,
+        so a worker never sleeps waiting for a token or a backoff.
+
+        Returns:
+            {'status': 'sent' | 'failed' | 'deferred' | 'retrying' | 'skipped', ...}
+        """
+        from message.models import Message
+
+        message = Message.objects.select_related(
+            'conversation', 'conversation__customer'
+        ).filter(id=message_id).first()
+        if not message:
+            logger.warning(f"⚠️ Outbound message {message_id} no longer exists")
+            return {'status': 'skipped', 'reason': 'message_not_found'}
+
+        lease_expired = Q(delivery_status='sending', delivery_claimed_at__lt=cls._lease_start())
+        if message.delivery_status != 'queued' and not (
+            message.delivery_status == 'sending' and message.delivery_claimed_at
+            and message.delivery_claimed_at < cls._lease_start()
+        ):
+            return {'status': 'skipped', 'reason': f'delivery_status={message.delivery_status}'}
+
+        conversation = message.conversation
+        channel = conversation.source
+
+        if cls._earlier_message_pending(message):
+            # Not an attempt - the conversation's earlier message goes first
+            cls.schedule(message_id, channel, buttons=buttons, typing_off=typing_off,
+                         countdown=cls.ORDER_WAIT, attempt=attempt)
+            return {'status': 'deferred', 'reason': 'earlier_message_pending'}
+
+        service = cls._get_service(conversation)
+        if not service:
+            cls._mark_failed(message, f'{channel} service not available', attempt)
+            return {'status': 'failed', 'error': 'service_not_available'}
+
+        wait = OutboundRateLimiter.acquire(channel, cls._account_id(channel, service))
+        if wait > 0:
+            # Not an attempt - just wait for a token
+            cls.schedule(message_id, channel, buttons=buttons, typing_off=typing_off,
+                         countdown=wait, attempt=attempt)
+            return {'status': 'deferred', 'wait': wait}
+
+        # Claim the attempt - a duplicate task for the same message backs off here
+        claimed = Message.objects.filter(Q(delivery_status='queued') | lease_expired, id=message_id).update(
+            delivery_status='sending', delivery_attempts=attempt, delivery_claimed_at=timezone.now()
+        )
+        if not claimed:
+            return {'status': 'skipped', 'reason': 'claimed_by_another_worker'}
+
+        result = cls._send(channel, service, conversation.customer, message.content, buttons)
+
+        if result.get('success'):
+            cls._mark_sent(message, channel, result)
+            if typing_off and channel == 'instagram':
+                cls._typing_off(service, conversation)
+            return {'status': 'sent', 'external_message_id': result.get('message_id')}
+
+        error = str(result.get('error') or 'Unknown error')[:1000]
+        if cls.is_retryable(result) and attempt < cls.MAX_ATTEMPTS:
+            countdown = cls.get_backoff(attempt, result.get('retry_after'))
+            Message.objects.filter(id=message_id).update(delivery_status='queued', delivery_error=error)
+            cls.schedule(message_id, channel, buttons=buttons, typing_off=typing_off,
+                         countdown=countdown, attempt=attempt + 1)
+            logger.warning(
+                f"🔁 {channel} delivery of message {message_id} failed "
+                f"(attempt {attempt}/{cls.MAX_ATTEMPTS}, status {result.get('status_code')}), "
+                f"retrying in {countdown:.0f}s"
+            )
+            return {'status': 'retrying', 'countdown': countdown, 'error': error}
+
+        cls._mark_failed(message, error, attempt)
+        if typing_off and channel == 'instagram':
+            cls._typing_off(service, conversation)
+        return {'status': 'failed', 'error': error}
+
+    # ==========================================
+    #  Retry policy
+    # ==========================================
+
+    @classmethod
+    def is_retryable(cls, result: Dict[str, Any]) -> bool:
+        """
+        Retry on 429 / 500-503 and on transport errors before the request went out
+
+        Services report 'status_code' on request failures (None = no HTTP response)
+        and 'unsent' when the failure proves nothing reached the platform
+        (core.utils.is_unsent_error). A timeout without 'unsent' may have been
+        delivered and is not retried. Results without 'status_code' are API-level
+        rejections (invalid recipient, blocked...) and are not retried.
+        """
+        if 'status_code' not in result:
+            return False
+        status_code = result['status_code']
+        if status_code is None:
+            return result.get('unsent') is True
+        return status_code in cls.RETRYABLE_STATUS_CODES
+
+    @classmethod
+    def get_backoff(cls, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with jitter; platform Retry-After wins if longer"""
+        backoff = min(cls.BACKOFF_BASE * (2 ** (attempt - 1)), cls.BACKOFF_MAX)
+        backoff += random.uniform(0, backoff * 0.2)
+        if retry_after:
+            try:
+                backoff = max(backoff, float(retry_after))
+            except (TypeError, ValueError):
+                pass
+        return backoff
+
+    # ==========================================
+    #  Ordering and recovery
+    # ==========================================
+
+    @classmethod
+    def _lease_start(cls):
+        return timezone.now() - timedelta(seconds=settings.OUTBOUND_SENDING_LEASE_SECONDS)
+
+    @classmethod
+    def _earlier_message_pending(cls, message) -> bool:
+        """An earlier message of the conversation is still waiting for delivery"""
+        from message.models import Message
+
+        if not message.created_at:
+            return False
+        return Message.objects.filter(
+            conversation_id=message.conversation_id,
+            delivery_status__in=('queued', 'sending'),
+            created_at__lt=message.created_at,
+            created_at__gte=timezone.now() - cls.ORDER_WINDOW,
+        ).exists()
+
+    @classmethod
+    def recover_stalled(cls) -> Dict[str, int]:
+        """
+        Re-queue messages left in `sending` past the lease (worker died mid-send)
+
+        The send may or may not have reached the platform; it counts as an
+        attempt, and messages out of attempts are marked failed.
+        """
+        from message.models import Message
+
+        stalled = list(
+            Message.objects.filter(delivery_status='sending', delivery_claimed_at__lt=cls._lease_start())
+            .select_related('conversation')
+            .only('id', 'buttons', 'delivery_attempts', 'conversation__source')[:500]
+        )
+        requeued = failed = 0
+        for message in stalled:
+            still_stalled = Message.objects.filter(
+                id=message.id, delivery_status='sending', delivery_claimed_at__lt=cls._lease_start()
+            )
+            if message.delivery_attempts >= cls.MAX_ATTEMPTS:
+                failed += still_stalled.update(delivery_status='failed',
+                                               delivery_error='Worker lost during delivery')
+                continue
+            if still_stalled.update(delivery_status='queued', delivery_error='Worker lost during delivery'):
+                requeued += 1
+                cls.schedule(message.id, message.conversation.source, buttons=message.buttons,
+                             attempt=message.delivery_attempts + 1)
+
+        if requeued or failed:
+            logger.warning(f"🔁 Recovered stalled outbound messages: {requeued} re-queued, {failed} failed")
+        return {'requeued': requeued, 'failed': failed}
+
+    # ==========================================
+    #  Helpers
+    # ==========================================
+
+    @classmethod
+    def _get_service(cls, conversation):
+        if conversation.source == 'instagram':
+            from message.services.instagram_service import InstagramService
+            return InstagramService.get_service_for_conversation(conversation)
+        if conversation.source == 'telegram':
+            from message.services.telegram_service import TelegramService
+            return TelegramService.get_service_for_conversation(conversation)
+        return None
+
+    @classmethod
+    def _account_id(cls, channel: str, service) -> str:
+        if channel == 'instagram':
+            return str(service.instagram_user_id)
+        # Bot token is "<bot_id>:<secret>" - never put the secret in a Redis key
+        return hashlib.sha1(service.bot_token.encode()).hexdigest()[:16]
+
+    @classmethod
+    def _send(cls, channel: str, service, customer, text: str, buttons=None) -> Dict[str, Any]:
+        try:
+            if channel == 'instagram':
+                return service.send_message_to_customer(customer, text, buttons=buttons)
+            return service.send_message_to_customer(customer, text)
+        except Exception as e:
+            logger.error(f"❌ Unexpected error delivering {channel} message: {e}")
+            return {'success': False, 'error': str(e), 'status_code': None}
+
+    @classmethod
+    def _mark_sent(cls, message, channel: str, result: Dict[str, Any]):
+        from message.models import Message
+
+        metadata = message.metadata or {}
+        if result.get('message_id'):
+            # ✅ Store external message_id in metadata to prevent webhook duplicates
+            metadata['external_message_id'] = str(result.get('message_id'))
+            metadata['sent_from_app'] = True
+
+        Message.objects.filter(id=message.id).update(
+            delivery_status='sent',
+            delivery_error=None,
+            sent_at=timezone.now(),
+            metadata=metadata,
+        )
+
+        if channel == 'instagram':
+            from django.core.cache import cache
+            message_hash = hashlib.md5(
+                f"{message.conversation_id}:{message.content}".encode()
+            ).hexdigest()
+            cache.set(f"instagram_sent_msg_{message_hash}", True, timeout=60)
+
+        logger.info(f"✅ Message {message.id} delivered to {channel} (external id: {result.get('message_id')})")
+
+    @classmethod
+    def _mark_failed(cls, message, error: str, attempt: int):
+        from message.models import Message
+
+        Message.objects.filter(id=message.id).update(
+            delivery_status='failed',
+            delivery_error=error,
+            delivery_attempts=attempt,
+        )
+        logger.error(f"❌ Delivery of message {message.id} failed after {attempt} attempt(s): {error}")
+
+    @classmethod
+    def _typing_off(cls, service, conversation):
+        try:
+            from django.core.cache import cache
+            service.send_typing_indicator_to_customer(conversation.customer, 'typing_off')
+            cache.delete(f"typing_start_{conversation.id}")
+        except Exception as e:
+            logger.debug(f"Error sending typing_off: {e}")
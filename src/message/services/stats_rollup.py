@@ -0,0 +1,310 @@
+"""
+Message statistics rollups
+
+Response rate, AI usage analytics and workflow statistics used to aggregate
+raw Message / AIUsageLog / WorkflowExecution rows over their whole window on
+every request. MessageStatsRollup keeps hourly and daily totals per tenant and
+channel (AI usage per section), so a report reads at most a few rows per day
+of its window regardless of traffic.
+
+✅ Incremental: each run aggregates only rows created since the watermark,
+   plus MESSAGE_STATS_RECOMPUTE_HOURS before it so late changes (a message
+   marked answered, an execution that finished) are picked up
+✅ Idempotent: the hour buckets of a run are replaced, then the touched days
+   are re-summed from their hours
+✅ First run backfills from the oldest raw row, MESSAGE_STATS_MAX_HOURS_PER_RUN
+   at a time
+✅ Hourly rows older than MESSAGE_STATS_HOURLY_RETENTION_DAYS are dropped;
+   daily rows are kept. While backfilling, hours are kept from the first day
+   the next run re-sums, so a daily row is never rebuilt from a partial day
+
+Usage:
+    MessageStatsRollupService.aggregate_pending()      # rollup_message_stats task
+    MessageStatsRollupService.totals(start, end, user=user, group_by='day')
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncHour
+from django.utils import timezone
+
+from message.models import Conversation, Message, MessageStatsRollup, MessageStatsWatermark
+
+logger = logging.getLogger(__name__)
+
+METRICS = (
+    'inbound_messages', 'answered_messages', 'ai_replies',
+    'ai_requests', 'ai_failed_requests', 'ai_tokens', 'ai_prompt_tokens', 'ai_completion_tokens',
+    'ai_response_time_ms',
+    'workflow_runs', 'workflow_completed', 'workflow_failures',
+)
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+
+def floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_day(value: datetime) -> datetime:
+    start = floor_day(value)
+    return start if start == value else start + DAY
+
+
+class MessageStatsRollupService:
+    """Fill and read the hourly/daily activity rollups"""
+
+    WATERMARK_PK = 1
+
+    # ==========================================
+    #  Aggregation
+    # ==========================================
+
+    @classmethod
+    def _collect(cls, start: datetime, end: datetime) -> Dict[Tuple, Dict[str, int]]:
+        """Hourly totals of raw rows created in [start, end), keyed (hour, user, channel, section)"""
+        from AI_model.models import AIUsageLog
+        from workflow.models import WorkflowExecution
+
+        buckets = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+
+        messages = (
+            Message.objects.filter(created_at__gte=start, created_at__lt=end)
+            .order_by()
+            .values(bucket=TruncHour('created_at'), tenant=F('conversation__user_id'),
+                    channel_name=F('conversation__source'))
+            .annotate(
+                inbound=Count('id', filter=Q(type='customer')),
+                answered=Count('id', filter=Q(type='customer', is_answered=True)),
+                replies=Count('id', filter=Q(type='AI')),
+            )
+        )
+        for row in messages:
+            totals = buckets[(row['bucket'], row['tenant'], row['channel_name'] or '', '')]
+            totals['inbound_messages'] += row['inbound']
+            totals['answered_messages'] += row['answered']
+            totals['ai_replies'] += row['replies']
+
+        usage = (
+            AIUsageLog.objects.filter(created_at__gte=start, created_at__lt=end)
+            .order_by()
+            .values(bucket=TruncHour('created_at'), tenant=F('user_id'), section_name=F('section'))
+            .annotate(
+                requests=Count('id'),
+                failed=Count('id', filter=Q(success=False)),
+                tokens=Sum('total_tokens'),
+                prompt=Sum('prompt_tokens'),
+                completion=Sum('completion_tokens'),
+                response_time=Sum('response_time_ms'),
+            )
+        )
+        for row in usage:
+            totals = buckets[(row['bucket'], row['tenant'], '', row['section_name'] or '')]
+            totals['ai_requests'] += row['requests']
+            totals['ai_failed_requests'] += row['failed']
+            totals['ai_tokens'] += row['tokens'] or 0
+            totals['ai_prompt_tokens'] += row['prompt'] or 0
+            totals['ai_completion_tokens'] += row['completion'] or 0
+            totals['ai_response_time_ms'] += row['response_time'] or 0
+
+        conversation_source = Conversation.objects.filter(pk=OuterRef('conversation')).values('source')[:1]
+        executions = (
+            WorkflowExecution.objects.filter(created_at__gte=start, created_at__lt=end,
+                                             workflow__created_by__isnull=False)
+            .order_by()
+            .values(bucket=TruncHour('created_at'), tenant=F('workflow__created_by_id'),
+                    channel_name=Coalesce(Subquery(conversation_source), Value('')))
+            .annotate(
+                runs=Count('id'),
+                completed=Count('id', filter=Q(status='COMPLETED')),
+                failed=Count('id', filter=Q(status='FAILED')),
+            )
+        )
+        for row in executions:
+            totals = buckets[(row['bucket'], row['tenant'], row['channel_name'], '')]
+            totals['workflow_runs'] += row['runs']
+            totals['workflow_completed'] += row['completed']
+            totals['workflow_failures'] += row['failed']
+
+        return buckets
+
+    @classmethod
+    def _oldest_raw_row(cls) -> Optional[datetime]:
+        from AI_model.models import AIUsageLog
+        from workflow.models import WorkflowExecution
+
+        candidates = [
+            model.objects.aggregate(oldest=Min('created_at'))['oldest']
+            for model in (Message, AIUsageLog, WorkflowExecution)
+        ]
+        candidates = [value for value in candidates if value]
+        return min(candidates) if candidates else None
+
+    @classmethod
+    def _rebuild_days(cls, first_day: datetime, last_day: datetime):
+        """Re-sum daily rows for [first_day, last_day] from their hourly rows"""
+        day = first_day
+        while day <= last_day:
+            rows = (
+                MessageStatsRollup.objects.filter(granularity='hour', bucket_start__gte=day,
+                                                  bucket_start__lt=day + DAY)
+                .order_by()
+                .values('user_id', 'channel', 'section')
+                .annotate(**{metric: Sum(metric) for metric in METRICS})
+            )
+            daily = [
+                MessageStatsRollup(granularity='day', bucket_start=day, **row)
+                for row in rows
+            ]
+            MessageStatsRollup.objects.filter(granularity='day', bucket_start=day).delete()
+            MessageStatsRollup.objects.bulk_create(daily, batch_size=1000)
+            day += DAY
+
+    @classmethod
+    def purge_before(cls, now: datetime, processed_until: datetime) -> datetime:
+        """
+        Hourly rows before this can be dropped
+
+        The retention cutoff, but never inside or after the first day the next
+        run rebuilds (it starts MESSAGE_STATS_RECOMPUTE_HOURS before the watermark
+        and re-sums whole days from their hours).
+        """
+        cutoff = floor_day(now) - DAY * settings.MESSAGE_STATS_HOURLY_RETENTION_DAYS
+        next_start = processed_until - HOUR * settings.MESSAGE_STATS_RECOMPUTE_HOURS
+        return min(cutoff, floor_day(next_start))
+
+    @classmethod
+    def aggregate_pending(cls, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Roll up rows created since the watermark (one bounded window per call)
+
+        Returns:
+            Dict with the processed window and number of hourly rows written
+        """
+        now = now or timezone.now()
+        current_hour = floor_hour(now)
+        watermark = MessageStatsWatermark.objects.filter(pk=cls.WATERMARK_PK).first()
+
+        if watermark:
+            covered_from = watermark.covered_from
+            start = max(covered_from, watermark.processed_until - HOUR * settings.MESSAGE_STATS_RECOMPUTE_HOURS)
+        else:
+            oldest = cls._oldest_raw_row()
+            covered_from = start = floor_hour(oldest) if oldest else current_hour
+        end = min(current_hour + HOUR, start + HOUR * settings.MESSAGE_STATS_MAX_HOURS_PER_RUN)
+
+        buckets = cls._collect(start, end)
+        hourly = [
+            MessageStatsRollup(granularity='hour', bucket_start=bucket, user_id=user_id,
+                               channel=channel, section=section, **totals)
+            for (bucket, user_id, channel, section), totals in buckets.items()
+            if user_id is not None
+        ]
+
+        with transaction.atomic():
+            MessageStatsRollup.objects.filter(
+                granularity='hour', bucket_start__gte=start, bucket_start__lt=end
+            ).delete()
+            MessageStatsRollup.objects.bulk_create(hourly, batch_size=1000)
+            cls._rebuild_days(floor_day(start), floor_day(end - HOUR))
+            # The current hour is still filling up - it is re-read next run
+            MessageStatsWatermark.objects.update_or_create(
+                pk=cls.WATERMARK_PK,
+                defaults={'covered_from': covered_from, 'processed_until': min(end, current_hour)},
+            )
+
+        purged, _ = MessageStatsRollup.objects.filter(
+            granularity='hour', bucket_start__lt=cls.purge_before(now, min(end, current_hour))
+        ).delete()
+
+        logger.info(f"📊 Message stats rolled up for {start:%Y-%m-%d %H:00} → {end:%Y-%m-%d %H:00}: "
+                    f"{len(hourly)} hourly rows, {purged} expired")
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'hourly_rows': len(hourly),
+            'caught_up': end > current_hour,
+        }
+
+    # ==========================================
+    #  Reads
+    # ==========================================
+
+    @classmethod
+    def get_covered_from(cls) -> Optional[datetime]:
+        """First hour in the rollups (None before the first run)"""
+        return MessageStatsWatermark.objects.filter(pk=cls.WATERMARK_PK).values_list(
+            'covered_from', flat=True
+        ).first()
+
+    @classmethod
+    def _segments(cls, start: datetime, end: datetime):
+        """Split [start, end) into daily rows for whole days and hourly rows for the edges"""
+        hourly_cutoff = floor_day(timezone.now()) - DAY * settings.MESSAGE_STATS_HOURLY_RETENTION_DAYS
+        if start < hourly_cutoff:
+            # Hours are gone - count the whole first day
+            start = floor_day(start)
+
+        first_day, last_day = ceil_day(start), floor_day(end)
+        if first_day >= last_day:
+            segments = [('hour', floor_hour(start), end)]
+        else:
+            segments = [('hour', floor_hour(start), first_day), ('day', first_day, last_day), ('hour', last_day, end)]
+        return [(granularity, lo, hi) for granularity, lo, hi in segments if lo < hi]
+
+    @classmethod
+    def totals(cls, start: datetime, end: datetime, user=None, user_ids: Optional[Iterable[int]] = None,
+               channel: Optional[str] = None, section: Optional[str] = None,
+               group_by: Optional[str] = None) -> Dict[Any, Dict[str, int]]:
+        """
+        Activity totals for [start, end), optionally grouped by 'day', 'user',
+        'channel' or 'section'
+
+        Returns:
+            {group value: {metric: int}} - the single key is None without group_by
+        """
+        group_field = {'day': 'bucket_start', 'user': 'user_id', 'channel': 'channel', 'section': 'section'}.get(group_by)
+        results = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+
+        for granularity, lo, hi in cls._segments(start, end):
+            rows = MessageStatsRollup.objects.filter(granularity=granularity, bucket_start__gte=lo, bucket_start__lt=hi)
+            if user is not None:
+                rows = rows.filter(user=user)
+            if user_ids is not None:
+                rows = rows.filter(user_id__in=list(user_ids))
+            if channel is not None:
+                rows = rows.filter(channel=channel)
+            if section is not None:
+                rows = rows.filter(section=section)
+
+            sums = {metric: Sum(metric) for metric in METRICS}
+            if group_field:
+                grouped = rows.order_by().values(group_field).annotate(**sums)
+            else:
+                grouped = [rows.aggregate(**sums)]
+
+            for row in grouped:
+                key = row[group_field] if group_field else None
+                if group_by == 'day':
+                    key = key.date()
+                totals = results[key]
+                for metric in METRICS:
+                    totals[metric] += row[metric] or 0
+
+        return dict(results)
+
+    @staticmethod
+    def response_rate(totals: Dict[str, int]) -> float:
+        """Answered / inbound customer messages, in percent"""
+        inbound = totals.get('inbound_messages', 0)
+        return round(totals.get('answered_messages', 0) / inbound * 100, 1) if inbound else 0.0
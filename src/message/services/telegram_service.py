@@ -1,10 +1,11 @@
 import logging
+import requests
 from typing import Optional, Dict, Any
 from io import BytesIO
 from django.core.files.base import ContentFile
 from settings.models import TelegramChannel
 from message.models import Message, Conversation, Customer
-from core.utils import make_request_with_proxy
+from core.utils import is_unsent_error, make_request_with_proxy
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +41,8 @@ class TelegramService:
         
         try:
             # ✅ Send Telegram message with automatic fallback proxy
-            response = make_request_with_proxy('post', url, json=payload, timeout=30)
+            # A timed-out send may have been delivered: only re-send on the fallback proxy if it never left
+            response = make_request_with_proxy('post', url, json=payload, timeout=30, fallback_after_send=False)
             response.raise_for_status()
             
             result = response.json()
@@ -58,13 +60,31 @@ class TelegramService:
                     'error': result.get('description', 'Unknown error')
                 }
                 
-        except requests.exceptions.Timeout:
+        except requests.exceptions.Timeout as e:
             logger.error(f"Timeout sending message to chat {chat_id}")
-            return {'success': False, 'error': 'Request timeout'}
+            return {'success': False, 'error': 'Request timeout', 'status_code': None, 'unsent': is_unsent_error(e)}
+            
+        except requests.exceptions.HTTPError as e:
+            # Telegram reports flood control as 429 with parameters.retry_after
+            error_msg = str(e)
+            retry_after = None
+            try:
+                error_body = e.response.json()
+                error_msg = error_body.get('description', error_msg)
+                retry_after = (error_body.get('parameters') or {}).get('retry_after')
+            except Exception:
+                pass
+            logger.error(f"HTTP error sending message to chat {chat_id}: {error_msg}")
+            return {
+                'success': False,
+                'error': error_msg,
+                'status_code': e.response.status_code,
+                'retry_after': retry_after,
+            }
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error sending message to chat {chat_id}: {e}")
-            return {'success': False, 'error': str(e)}
+            return {'success': False, 'error': str(e), 'status_code': None, 'unsent': is_unsent_error(e)}
             
         except Exception as e:
             logger.error(f"Unexpected error sending message to chat {chat_id}: {e}")
@@ -3,7 +3,7 @@ Django signals for message app
 Handles automatic WebSocket notifications for model updates
 """
 import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_save, pre_delete
 from django.dispatch import receiver
 
 logger = logging.getLogger(__name__)
@@ -34,6 +34,45 @@ def handle_customer_updated(sender, instance, created, **kwargs):
         logger.error(f"Error handling customer update signal for customer {instance.id}: {e}")
 
 
+def touch_tagged_customers(customer_ids=None, tag=None):
+    """
+    Bump updated_at of customers whose tags changed
+
+    Tag membership and tag renames don't save the customer; conversation list
+    ETags read Customer.updated_at to notice nested customer/tag changes.
+    """
+    from django.utils import timezone
+    from message.models import Customer
+
+    customers = Customer.objects.filter(tag=tag) if tag is not None else Customer.objects.filter(id__in=customer_ids)
+    customers.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender='message.Customer_tag', dispatch_uid='customer_tags_touch_customer')
+def handle_customer_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Customer tags added/removed/cleared (from either side of the relation)"""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        touch_tagged_customers(customer_ids=[instance.pk])
+    elif action == 'pre_clear':
+        touch_tagged_customers(tag=instance)
+    elif pk_set:
+        touch_tagged_customers(customer_ids=pk_set)
+
+
+@receiver(post_save, sender='message.Tag', dispatch_uid='tag_saved_touch_customers')
+def handle_tag_saved(sender, instance, created, **kwargs):
+    """Renamed tags show up in every tagged customer"""
+    if not created:
+        touch_tagged_customers(tag=instance)
+
+
+@receiver(pre_delete, sender='message.Tag', dispatch_uid='tag_deleted_touch_customers')
+def handle_tag_deleted(sender, instance, **kwargs):
+    touch_tagged_customers(tag=instance)
+
+
 # ============================================================================
 # INTERCOM INTEGRATION SIGNALS
 # ============================================================================
@@ -58,10 +97,10 @@ def sync_conversation_to_intercom_on_create(sender, instance, created, **kwargs)
         return  # Only sync if explicitly enabled
     
     try:
-        from message.tasks import sync_conversation_to_intercom_async
+        from settings.services.intercom_outbox import IntercomOutbox
         
-        # Trigger async sync
-        sync_conversation_to_intercom_async.delay(instance.id)
+        # Delivered by the outbox drain task after commit
+        IntercomOutbox.enqueue('conversation_create', instance.id, contact_key=instance.user_id)
         
         logger.info(f"🔄 Triggered Intercom sync for conversation {instance.id}")
         
@@ -98,10 +137,10 @@ def sync_message_to_intercom_on_create(sender, instance, created, **kwargs):
         return
     
     try:
-        from message.tasks import sync_message_to_intercom_async
+        from settings.services.intercom_outbox import IntercomOutbox
         
-        # Trigger async sync
-        sync_message_to_intercom_async.delay(instance.id)
+        # Delivered by the outbox drain task after commit
+        IntercomOutbox.enqueue('conversation_message', instance.id, contact_key=instance.conversation.user_id)
         
         logger.info(f"🔄 Triggered Intercom sync for message {instance.id}")
         
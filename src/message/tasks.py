@@ -2,7 +2,6 @@ import logging
 import time
 from celery import shared_task
 from django.utils import timezone
-from django.core.files.base import ContentFile
 from datetime import timedelta
 from settings.models import InstagramChannel
 from typing import Dict, Any
@@ -495,7 +494,7 @@ def process_telegram_voice(self, message_id: str, file_id: str, bot_token: str)
     try:
         from message.models import Message
         from message.services.telegram_service import TelegramService
-        from AI_model.services.media_processor import MediaProcessorService
+        from message.services.media_pipeline import MediaPipeline
         
         # Get message
         try:
@@ -518,39 +517,19 @@ def process_telegram_voice(self, message_id: str, file_id: str, bot_token: str)
             raise Exception(f"Failed to get download URL: {file_result.get('error')}")
         
         download_url = file_result['download_url']
-        response = requests.get(download_url, timeout=30)
-        response.raise_for_status()
         
-        # Save media file to S3
-        filename = f"telegram_voice_{message_id}.ogg"
-        message.media_file.save(filename, ContentFile(response.content), save=False)
-        message.media_url = download_url  # Store for reference
-        message.save(update_fields=['media_file', 'media_url'])
-        
-        # Process with AI - create temporary local file
-        import tempfile
-        import os
-        
-        # Get user from message conversation
-        user = message.conversation.user if message.conversation else None
-        processor = MediaProcessorService(user=user)
-        
-        if not processor.is_ready():
-            raise Exception("MediaProcessorService not ready")
-        
-        # Save to temporary file for processing
-        with tempfile.NamedTemporaryFile(suffix='.ogg', delete=False) as tmp_file:
-            tmp_file.write(response.content)
-            tmp_path = tmp_file.name
+        # Stream to disk (size-capped) instead of buffering the whole file
+        with MediaPipeline.download(download_url, 'voice', suffix='.ogg') as media:
+            # Save media file to S3
+            filename = f"telegram_voice_{message_id}.ogg"
+            message.media_file.save(filename, media.open(), save=False)
+            message.media_url = download_url  # Store for reference
+            message.save(update_fields=['media_file', 'media_url'])
+            
+            # Process with AI (transcoded copy, reused for identical media)
+            user = message.conversation.user if message.conversation else None
+            result = MediaPipeline.analyze(media, user=user)
         
-        try:
-            result = processor.process_voice(tmp_path)
-        finally:
-            # Clean up temp file
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
         if result['success']:
             message.content = result['transcription']
             message.transcription = result['transcription']
@@ -602,8 +581,9 @@ def process_telegram_voice(self, message_id: str, file_id: str, bot_token: str)
         except:
             pass
         
-        # Retry if not last attempt
-        if self.request.retries < self.max_retries:
+        # Retry if not last attempt (oversized media will not shrink)
+        from message.services.media_pipeline import MediaTooLarge
+        if not isinstance(e, MediaTooLarge) and self.request.retries < self.max_retries:
             logger.info(f"🔄 Retrying voice processing (attempt {self.request.retries + 1}/{self.max_retries})")
             raise self.retry(exc=e)
         
@@ -633,7 +613,7 @@ def process_telegram_image(self, message_id: str, file_id: str, bot_token: str,
     try:
         from message.models import Message
         from message.services.telegram_service import TelegramService
-        from AI_model.services.media_processor import MediaProcessorService
+        from message.services.media_pipeline import MediaPipeline
         
         # Get message
         try:
@@ -659,40 +639,19 @@ def process_telegram_image(self, message_id: str, file_id: str, bot_token: str,
             raise Exception(f"Failed to get download URL: {file_result.get('error')}")
         
         download_url = file_result['download_url']
-        response = requests.get(download_url, timeout=30)
-        response.raise_for_status()
-        
-        # Save media file to S3/storage
-        filename = f"telegram_image_{message_id}.jpg"
-        message.media_file.save(filename, ContentFile(response.content), save=False)
-        message.media_url = download_url  # Store for reference
-        message.save(update_fields=['media_file', 'media_url'])
-        
-        # Process with AI - create temporary local file
-        import tempfile
-        import os
         
-        # Get user from message conversation
-        user = message.conversation.user if message.conversation else None
-        processor = MediaProcessorService(user=user)
-        
-        if not processor.is_ready():
-            raise Exception("MediaProcessorService not ready")
-        
-        # Save to temporary file for processing
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-            tmp_file.write(response.content)
-            tmp_path = tmp_file.name
+        # Stream to disk (size-capped) instead of buffering the whole file
+        with MediaPipeline.download(download_url, 'image', suffix='.jpg') as media:
+            # Save media file to S3/storage
+            filename = f"telegram_image_{message_id}.jpg"
+            message.media_file.save(filename, media.open(), save=False)
+            message.media_url = download_url  # Store for reference
+            message.save(update_fields=['media_file', 'media_url'])
+            
+            # Process with AI (downscaled copy, reused for identical media)
+            user = message.conversation.user if message.conversation else None
+            result = MediaPipeline.analyze(media, user=user)
         
-        try:
-            result = processor.process_image(tmp_path, analysis_type='comprehensive')
-        finally:
-            # Clean up temp file
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-                
         if result['success']:
             # Combine caption (if any) with image description
             if caption:
@@ -748,8 +707,9 @@ def process_telegram_image(self, message_id: str, file_id: str, bot_token: str,
         except:
             pass
         
-        # Retry if not last attempt
-        if self.request.retries < self.max_retries:
+        # Retry if not last attempt (oversized media will not shrink)
+        from message.services.media_pipeline import MediaTooLarge
+        if not isinstance(e, MediaTooLarge) and self.request.retries < self.max_retries:
             logger.info(f"🔄 Retrying image processing (attempt {self.request.retries + 1}/{self.max_retries})")
             raise self.retry(exc=e)
         
@@ -758,3 +718,132 @@ def process_telegram_image(self, message_id: str, file_id: str, bot_token: str,
             'error': error_msg,
             'message_id': message_id
         }
+
+
+# ============================================================================
+# CUSTOMER EXPORT
+# ============================================================================
+
+@shared_task(name='message.export_customers_csv', bind=True, max_retries=1, default_retry_delay=30)
+def export_customers_csv_task(self, user_id: int, query_params: dict = None, customer_ids: list = None) -> Dict[str, Any]:
+    """
+    Generate a customer CSV export in background, store it and notify the user.
+
+    Args:
+        user_id: Owner of the customers
+        query_params: Filter/search query params of the original request
+        customer_ids: Optional explicit customer IDs
+
+    Returns:
+        Dictionary with export result (path, url, row_count)
+    """
+    from django.urls import reverse
+    from accounts.models import User
+    from message.services.customer_export import CustomerExportService
+    from message.websocket_utils import notify_customer_export_ready
+
+    start_time = time.time()
+    try:
+        user = User.objects.get(id=user_id)
+        queryset = CustomerExportService.filter_for_user(user, query_params, customer_ids)
+        result = CustomerExportService.write_to_storage(queryset, user_id)
+        # Owner-only endpoint that re-signs the URL once the short-lived one expires
+        result['download_url'] = reverse('message:customers-export-download', args=[result['filename']])
+        result['duration_ms'] = int((time.time() - start_time) * 1000)
+
+        logger.info(
+            f"✅ Customer export ready for user {user_id}: "
+            f"{result['row_count']} rows in {result['duration_ms']}ms"
+        )
+        notify_customer_export_ready(user_id, {'status': 'completed', **result})
+        return {'success': True, **result}
+
+    except Exception as e:
+        logger.error(f"❌ Customer export failed for user {user_id}: {e}")
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+
+        notify_customer_export_ready(user_id, {'status': 'failed', 'error': str(e)})
+        return {'success': False, 'error': str(e)}
+
+
+@shared_task(name='message.purge_customer_exports')
+def purge_customer_exports() -> Dict[str, Any]:
+    """
+    Delete background customer exports older than CUSTOMER_EXPORT_RETENTION_HOURS (hourly via beat).
+    """
+    from message.services.customer_export import CustomerExportService
+
+    deleted = CustomerExportService.purge_expired()
+    if deleted:
+        logger.info(f"🧹 Deleted {deleted} expired customer export(s)")
+    return {'deleted': deleted}
+
+
+# ============================================================================
+# OUTBOUND PLATFORM DELIVERY
+# ============================================================================
+
+@shared_task(name='message.deliver_outbound_message', acks_late=True)
+def deliver_outbound_message(message_id: str, buttons: list = None, typing_off: bool = False, attempt: int = 1) -> Dict[str, Any]:
+    """
+    Deliver a queued Message to Instagram/Telegram.
+
+    Published on the outbound_<channel> queue by OutboundMessageQueue. Rate limiting
+    and retries re-publish the task with a countdown (see OutboundMessageQueue.deliver).
+
+    Args:
+        message_id: Message to deliver
+        buttons: Optional CTA buttons (Instagram)
+        typing_off: Turn off Instagram typing indicator after delivery
+        attempt: Delivery attempt number (1-based)
+
+    Returns:
+        Delivery outcome dictionary
+    """
+    from message.services.outbound_queue import OutboundMessageQueue
+
+    return OutboundMessageQueue.deliver(message_id, buttons=buttons, typing_off=typing_off, attempt=attempt)
+
+
+@shared_task(name='message.recover_outbound_sends')
+def recover_outbound_sends() -> Dict[str, Any]:
+    """
+    Re-queue outbound messages stuck in `sending` after a worker died (every minute via beat).
+    """
+    from message.services.outbound_queue import OutboundMessageQueue
+
+    return OutboundMessageQueue.recover_stalled()
+
+
+@shared_task(name='message.ensure_message_partitions')
+def ensure_message_partitions() -> Dict[str, Any]:
+    """
+    Create upcoming monthly partitions of the message table.
+
+    No-op unless the table was converted with `manage.py partition_messages --migrate`.
+    """
+    from message.services.message_partitioning import MessagePartitionService
+
+    partitions = MessagePartitionService.ensure_partitions()
+    if partitions is None:
+        return {'success': True, 'partitioned': False}
+
+    logger.info(f"🗂️ Message partitions ensured: {len(partitions)} partitions")
+    return {'success': True, 'partitioned': True, 'partitions': len(partitions)}
+
+
+@shared_task(name='message.rollup_message_stats')
+def rollup_message_stats() -> Dict[str, Any]:
+    """
+    Roll message, AI usage and workflow activity created since the last run
+    into the hourly/daily MessageStatsRollup rows read by analytics endpoints.
+    """
+    from message.services.stats_rollup import MessageStatsRollupService
+
+    result = MessageStatsRollupService.aggregate_pending()
+    if not result['caught_up']:
+        # Backfill: keep going until the current hour is reached
+        rollup_message_stats.apply_async(countdown=5)
+    return {'success': True, **result}
@@ -7,7 +7,6 @@ import requests
 from typing import Dict, Any
 from celery import shared_task
 from django.utils import timezone
-from django.core.files.base import ContentFile
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +28,7 @@ def process_instagram_image(self, message_id: str, media_url: str, access_token:
     
     try:
         from message.models import Message
-        from AI_model.services.media_processor import MediaProcessorService
+        from message.services.media_pipeline import MediaPipeline
         
         # Get message
         try:
@@ -44,38 +43,15 @@ def process_instagram_image(self, message_id: str, media_url: str, access_token:
         
         logger.info(f"🔄 Processing Instagram image: {message_id}")
         
-        # Download image from Instagram URL (with proxy support)
-        from core.utils import make_request_with_proxy
-        response = make_request_with_proxy('get', media_url, timeout=30)
-        response.raise_for_status()
-        
-        # Save media file
-        filename = f"instagram_image_{message_id}.jpg"
-        message.media_file.save(filename, ContentFile(response.content), save=True)
-        
-        # Process with AI
-        import tempfile
-        import os
-        
-        # Get user from message conversation
-        user = message.conversation.user if message.conversation else None
-        processor = MediaProcessorService(user=user)
-        
-        if not processor.is_ready():
-            raise Exception("MediaProcessorService not ready")
-        
-        # Save to temporary file for processing
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-            tmp_file.write(response.content)
-            tmp_path = tmp_file.name
-        
-        try:
-            result = processor.process_image(tmp_path, analysis_type='comprehensive')
-        finally:
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
+        # Stream image from Instagram URL to disk (with proxy support, size-capped)
+        with MediaPipeline.download(media_url, 'image', via_proxy=True, suffix='.jpg') as media:
+            # Save media file
+            filename = f"instagram_image_{message_id}.jpg"
+            message.media_file.save(filename, media.open(), save=True)
+            
+            # Process with AI (downscaled copy, reused for identical media)
+            user = message.conversation.user if message.conversation else None
+            result = MediaPipeline.analyze(media, user=user)
                 
         if result['success']:
             message.content = result['description']
@@ -125,7 +101,8 @@ def process_instagram_image(self, message_id: str, media_url: str, access_token:
         except:
             pass
         
-        if self.request.retries < self.max_retries:
+        from message.services.media_pipeline import MediaTooLarge
+        if not isinstance(e, MediaTooLarge) and self.request.retries < self.max_retries:
             logger.info(f"🔄 Retrying Instagram image (attempt {self.request.retries + 1}/{self.max_retries})")
             raise self.retry(exc=e)
         
@@ -153,7 +130,7 @@ def process_instagram_voice(self, message_id: str, media_url: str, access_token:
     
     try:
         from message.models import Message
-        from AI_model.services.media_processor import MediaProcessorService
+        from message.services.media_pipeline import MediaPipeline
         
         # Get message
         try:
@@ -168,38 +145,15 @@ def process_instagram_voice(self, message_id: str, media_url: str, access_token:
         
         logger.info(f"🔄 Processing Instagram voice: {message_id}")
         
-        # Download voice from Instagram URL (with proxy support)
-        from core.utils import make_request_with_proxy
-        response = make_request_with_proxy('get', media_url, timeout=30)
-        response.raise_for_status()
-        
-        # Save media file
-        filename = f"instagram_voice_{message_id}.m4a"
-        message.media_file.save(filename, ContentFile(response.content), save=True)
-        
-        # Process with AI
-        import tempfile
-        import os
-        
-        # Get user from message conversation
-        user = message.conversation.user if message.conversation else None
-        processor = MediaProcessorService(user=user)
-        
-        if not processor.is_ready():
-            raise Exception("MediaProcessorService not ready")
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.m4a', delete=False) as tmp_file:
-            tmp_file.write(response.content)
-            tmp_path = tmp_file.name
-        
-        try:
-            result = processor.process_voice(tmp_path)
-        finally:
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
+        # Stream voice from Instagram URL to disk (with proxy support, size-capped)
+        with MediaPipeline.download(media_url, 'voice', via_proxy=True, suffix='.m4a') as media:
+            # Save media file
+            filename = f"instagram_voice_{message_id}.m4a"
+            message.media_file.save(filename, media.open(), save=True)
+            
+            # Process with AI (transcoded copy, reused for identical media)
+            user = message.conversation.user if message.conversation else None
+            result = MediaPipeline.analyze(media, user=user)
                 
         if result['success']:
             message.content = result['transcription']
@@ -249,7 +203,8 @@ def process_instagram_voice(self, message_id: str, media_url: str, access_token:
         except:
             pass
         
-        if self.request.retries < self.max_retries:
+        from message.services.media_pipeline import MediaTooLarge
+        if not isinstance(e, MediaTooLarge) and self.request.retries < self.max_retries:
             logger.info(f"🔄 Retrying Instagram voice (attempt {self.request.retries + 1}/{self.max_retries})")
             raise self.retry(exc=e)
         
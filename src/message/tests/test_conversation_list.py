@@ -0,0 +1,111 @@
+"""
+Tests for the conversation list endpoints (annotated fields, conditional GET, response shape)
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from message.api.conversation import FullUserConversationsAPIView, UserConversationsAPIView
+from message.models import Conversation, Customer, Message, Tag
+from message.services.customer_tagging import BulkCustomerTagService
+
+User = get_user_model()
+
+
+class ConversationListTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='list@example.com', password='securepassword123', username='list')
+        cls.customer = Customer.objects.create(first_name='Sara', source='telegram', source_id='tg-1')
+        cls.conversation = Conversation.objects.create(user=cls.user, customer=cls.customer, source='telegram')
+        cls.message = Message.objects.create(conversation=cls.conversation, customer=cls.customer,
+                                             type='customer', content='hello')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.url = reverse('message:user-conversation')
+
+    def test_bare_list_unless_pagination_is_requested(self):
+        self.assertIsInstance(self.client.get(self.url).data, list)
+
+        self.assertEqual(self.client.get(self.url, {'page': 1}).data['count'], 1)
+        self.assertIn('next_cursor', self.client.get(self.url, {'cursor': ''}).data)
+
+        full = self.client.get(reverse('message:user-conversation-full'), {'ordering': 'created_at'})
+        self.assertEqual(full.data['count'], 1)
+
+    def test_optional_fields_are_annotated(self):
+        response = self.client.get(self.url, {'include': 'last_message,unread_count'})
+
+        self.assertEqual(response.status_code, 200)
+        item = response.data[0]
+        self.assertEqual(item['last_message']['content'], 'hello')
+        self.assertEqual(item['unread_count'], 1)
+        self.assertNotIn('search_title', item)
+        self.assertNotIn('unread_count', self.client.get(self.url).data[0])
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.conversation.save(update_fields=['updated_at'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_replies_and_read_receipts_change_the_etag(self):
+        params = {'include': 'last_message,unread_count'}
+        etag = self.client.get(self.url, params)['ETag']
+
+        Message.objects.filter(id=self.message.id).update(is_answered=True)
+        self.assertEqual(self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(self.url, params)['ETag']
+        Message.objects.bulk_create([Message(conversation=self.conversation, type='AI', content='hi')])
+        self.assertEqual(self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_customer_tag_changes_change_the_etag(self):
+        tag = Tag.objects.create(name='vip', created_by=self.user)
+        etag = self.client.get(self.url)['ETag']
+
+        self.customer.tag.add(tag)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        tag.name = 'gold'
+        tag.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @mock.patch('message.services.customer_tagging.BulkCustomerTagService._notify')
+    def test_bulk_tagging_changes_the_etag(self, _notify):
+        tag = Tag.objects.create(name='vip', created_by=self.user)
+        etag = self.client.get(self.url)['ETag']
+
+        BulkCustomerTagService.apply(self.user, [self.customer.id], [tag], [])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        BulkCustomerTagService.apply(self.user, [self.customer.id], [], [tag])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ConversationListShapeTest(SimpleTestCase):
+
+    def _wants_pagination(self, view_class, query_string=''):
+        view = view_class()
+        view.request = Request(APIRequestFactory().get(f'/conversations?{query_string}'))
+        return view.wants_pagination()
+
+    def test_user_conversation_opts_into_the_envelope(self):
+        self.assertFalse(self._wants_pagination(UserConversationsAPIView))
+        self.assertFalse(self._wants_pagination(UserConversationsAPIView, 'include=unread_count'))
+        self.assertTrue(self._wants_pagination(UserConversationsAPIView, 'page=2'))
+        self.assertTrue(self._wants_pagination(UserConversationsAPIView, 'cursor='))
+
+    def test_full_endpoint_is_always_paginated(self):
+        self.assertTrue(self._wants_pagination(FullUserConversationsAPIView))
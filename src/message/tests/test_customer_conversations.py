@@ -0,0 +1,56 @@
+"""
+Tests for the annotated conversation summaries of CustomerWithConversationSerializer
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from message.management.commands.benchmark_customer_list import legacy_conversations
+from message.models import Conversation, Customer, Message
+from message.serializers import CustomerWithConversationSerializer
+
+User = get_user_model()
+
+
+class CustomerConversationSummariesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='summaries@example.com', password='securepassword123',
+                                            username='summaries')
+        other = User.objects.create_user(email='other@example.com', password='securepassword123', username='other')
+
+        for i in range(20):
+            customer = Customer.objects.create(first_name=f'Customer {i}', source='telegram', source_id=f'tg-{i}')
+            for owner in (cls.user, cls.user, other):
+                conversation = Conversation.objects.create(user=owner, customer=customer, source='telegram')
+                for j, (kind, answered) in enumerate([('customer', True), ('AI', False), ('customer', False)][:i % 4]):
+                    Message.objects.create(conversation=conversation, customer=customer, type=kind,
+                                           is_answered=answered, content=f'message {j}')
+
+    def _page(self, **prefetch):
+        return list(Customer.objects.filter(conversations__user=self.user).distinct().order_by('id').prefetch_related(
+            *prefetch.values()
+        ))
+
+    def test_output_matches_the_per_conversation_queries(self):
+        customers = self._page(conversations=CustomerWithConversationSerializer.conversations_prefetch(self.user))
+        data = CustomerWithConversationSerializer(customers, many=True, context={'user': self.user}).data
+
+        expected = [legacy_conversations(customer, self.user) for customer in customers]
+        self.assertEqual(
+            JSONRenderer().render([row['conversations'] for row in data]),
+            JSONRenderer().render(expected),
+        )
+        self.assertTrue(any(row['conversations'][0]['unread_count'] for row in data))
+
+    def test_page_costs_constant_queries(self):
+        with self.assertNumQueries(3):
+            customers = self._page(
+                tags=Customer.user_tags_prefetch(),
+                conversations=CustomerWithConversationSerializer.conversations_prefetch(self.user),
+            )
+            data = CustomerWithConversationSerializer(customers, many=True, context={'user': self.user}).data
+
+        self.assertEqual(len(data), 20)
+        self.assertTrue(all(len(row['conversations']) == 2 for row in data))
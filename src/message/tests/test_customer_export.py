@@ -0,0 +1,67 @@
+"""
+Tests for background customer exports (private storage, owner-only download, expiry)
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.settings.storage_backends import PrivateExportStorage
+from message.api.customer import CustomerExportDownloadAPIView
+from message.services.customer_export import CustomerExportService
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'exports': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+}
+
+
+@override_settings(STORAGES=STORAGES, CUSTOMER_EXPORT_URL_TTL=900, CUSTOMER_EXPORT_RETENTION_HOURS=24)
+class CustomerExportStorageTest(SimpleTestCase):
+
+    def _export(self, user_id=7):
+        rows = iter(['ID,Email\r\n', '1,a@example.com\r\n'])
+        with mock.patch.object(CustomerExportService, 'iter_csv', return_value=rows):
+            return CustomerExportService.write_to_storage(None, user_id)
+
+    def _download(self, user_id, filename):
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=SimpleNamespace(id=user_id, is_authenticated=True))
+        return CustomerExportDownloadAPIView.as_view()(request, filename=filename)
+
+    def test_stored_name_is_not_guessable(self):
+        result = self._export()
+        self.assertTrue(result['path'].startswith('exports/customers/7/customers_export_'))
+        self.assertRegex(result['filename'], CustomerExportService.STORED_NAME_RE)
+        self.assertNotEqual(self._export()['filename'], result['filename'])
+        self.assertEqual(result['row_count'], 1)
+
+    def test_only_the_owner_can_download(self):
+        filename = self._export(user_id=7)['filename']
+
+        response = self._download(7, filename)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'ID,Email\r\n1,a@example.com\r\n')
+
+        self.assertEqual(self._download(8, filename).status_code, 404)
+        self.assertEqual(self._download(7, '../8/' + filename).status_code, 404)
+
+    def test_expired_exports_are_purged(self):
+        path = self._export()['path']
+        self.assertEqual(CustomerExportService.purge_expired(), 0)
+
+        with override_settings(CUSTOMER_EXPORT_RETENTION_HOURS=0):
+            self.assertEqual(CustomerExportService.purge_expired(), 1)
+        self.assertFalse(CustomerExportService.storage().exists(path))
+
+    def test_private_storage_signs_urls(self):
+        storage = PrivateExportStorage(bucket_name='fiko', access_key='key', secret_key='secret',
+                                       endpoint_url='https://s3.example.com')
+        with mock.patch.object(CustomerExportService, 'storage', return_value=storage):
+            url = CustomerExportService.signed_url('exports/customers/7/customers_export.csv')
+
+        self.assertIn('/private/exports/customers/7/', url)
+        self.assertIn('X-Amz-Signature=', url)
+        self.assertIn('X-Amz-Expires=900', url)
+        self.assertEqual(storage.default_acl, 'private')
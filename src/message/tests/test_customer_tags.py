@@ -0,0 +1,143 @@
+"""
+Tests for system tag flagging, prefetched customer tags and bulk tagging
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from message.models import Conversation, Customer, Tag
+from message.serializers import WSCustomerSerializer
+
+User = get_user_model()
+
+
+class CustomerTagPrefetchTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='tags@example.com', password='securepassword123', username='tags')
+        cls.system_tag = Tag.objects.create(name='Telegram')
+        cls.vip_tag = Tag.objects.create(name='VIP', created_by=cls.user)
+        cls.lead_tag = Tag.objects.create(name='Lead', created_by=cls.user)
+
+        customers = Customer.objects.bulk_create(
+            Customer(first_name=f'Customer {i}', source='telegram', source_id=f'tg-{i}') for i in range(500)
+        )
+        Conversation.objects.bulk_create(
+            Conversation(user=cls.user, customer=customer, source='telegram') for customer in customers
+        )
+        Through = Customer.tag.through
+        Through.objects.bulk_create(
+            Through(customer_id=customer.id, tag_id=tag.id)
+            for customer in customers
+            for tag in (cls.system_tag, cls.vip_tag, cls.lead_tag)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _list_queries(self, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('message:customers'), {'page_size': page_size})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), page_size)
+        return response, len(queries)
+
+    def test_system_flag_follows_the_name(self):
+        self.assertTrue(self.system_tag.is_system)
+        self.assertFalse(self.vip_tag.is_system)
+
+        self.vip_tag.name = 'Instagram'
+        self.vip_tag.save(update_fields=['name'])
+        self.vip_tag.refresh_from_db()
+        self.assertTrue(self.vip_tag.is_system)
+
+    def test_bulk_created_tags_are_flagged(self):
+        response = self.client.post(reverse('message:tags'), {'names': ['Whatsapp', 'Premium']}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        flags = dict(Tag.objects.filter(name__in=['Whatsapp', 'Premium']).values_list('name', 'is_system'))
+        self.assertEqual(flags, {'Whatsapp': True, 'Premium': False})
+
+    def test_customer_list_page_costs_constant_queries(self):
+        _, small_page = self._list_queries(10)
+        response, full_page = self._list_queries(500)
+
+        self.assertEqual(full_page, small_page)
+        tag_names = {tag['name'] for tag in response.data['results'][0]['tag']}
+        self.assertEqual(tag_names, {'VIP', 'Lead'})
+
+    def test_websocket_customers_use_the_prefetch(self):
+        customers = Customer.objects.filter(conversations__user=self.user).prefetch_related(
+            Customer.user_tags_prefetch()
+        )
+        with self.assertNumQueries(2):
+            data = WSCustomerSerializer(customers, many=True).data
+
+        self.assertEqual(len(data), 500)
+        self.assertTrue(all(len(customer['tag']) == 2 for customer in data))
+
+
+class CustomerBulkTagTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='bulk-tags@example.com', password='securepassword123',
+                                            username='bulk-tags')
+        cls.system_tag = Tag.objects.create(name='Telegram')
+        cls.vip_tag = Tag.objects.create(name='VIP', created_by=cls.user)
+        cls.lead_tag = Tag.objects.create(name='Lead', created_by=cls.user)
+
+        cls.customers = Customer.objects.bulk_create(
+            Customer(first_name=f'Customer {i}', source='telegram', source_id=f'tg-{i}') for i in range(60)
+        )
+        Conversation.objects.bulk_create(
+            Conversation(user=cls.user, customer=customer, source='telegram') for customer in cls.customers
+        )
+        # Half of the customers are leads already
+        Customer.tag.through.objects.bulk_create(
+            Customer.tag.through(customer_id=customer.id, tag_id=cls.lead_tag.id) for customer in cls.customers[::2]
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _bulk_tag(self, **data):
+        return self.client.post(reverse('message:customers-bulk-tags'), data, format='json')
+
+    @mock.patch('workflow.signals.trigger_tag_batch_event')
+    @mock.patch('message.websocket_utils.notify_customers_tagged')
+    def test_applies_only_real_changes_with_one_notification(self, notify, trigger_batch):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._bulk_tag(add_tag_ids=[self.vip_tag.id], remove_tag_ids=[self.lead_tag.id])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['customers'], 60)
+        self.assertEqual(response.data['added'], {'VIP': 60})
+        self.assertEqual(response.data['removed'], {'Lead': 30})
+        self.assertEqual(self.vip_tag.customers.count(), 60)
+        self.assertEqual(self.lead_tag.customers.count(), 0)
+
+        notify.assert_called_once()
+        trigger_batch.assert_called_once()
+        _, added, removed = trigger_batch.call_args.args
+        self.assertEqual(sorted(removed['Lead']), [customer.id for customer in self.customers[::2]])
+
+    @mock.patch('message.services.customer_tagging.BulkCustomerTagService._notify')
+    def test_costs_constant_queries(self, _notify):
+        with CaptureQueriesContext(connection) as few:
+            self._bulk_tag(customer_ids=[customer.id for customer in self.customers[:4]],
+                           add_tag_ids=[self.vip_tag.id], remove_tag_ids=[self.lead_tag.id])
+        with CaptureQueriesContext(connection) as many:
+            response = self._bulk_tag(add_tag_ids=[self.vip_tag.id], remove_tag_ids=[self.lead_tag.id])
+
+        self.assertEqual(response.data['changed_customers'], 56)
+        self.assertEqual(len(many), len(few))
+
+    def test_rejects_system_tags(self):
+        response = self._bulk_tag(remove_tag_ids=[self.system_tag.id])
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,107 @@
+"""
+Tests for the streamed media pipeline (spooling, size cap, downscaling, reuse)
+"""
+import hashlib
+import os
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import MagicMock, patch
+
+from message.services.media_pipeline import MediaPipeline, MediaTooLarge, SpooledMedia
+
+
+def _response(body: bytes, headers=None):
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.headers = headers or {}
+    response.iter_content.return_value = [body[i:i + 1000] for i in range(0, len(body), 1000)]
+    return response
+
+
+@override_settings(
+    MEDIA_MAX_DOWNLOAD_BYTES=5000,
+    MEDIA_ANALYSIS_MAX_IMAGE_SIDE=64,
+    MEDIA_ANALYSIS_JPEG_QUALITY=80,
+    MEDIA_ANALYSIS_CACHE_TTL=60,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class MediaPipelineTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @patch('message.services.media_pipeline.requests.get')
+    def test_download_spools_to_disk_and_hashes(self, get):
+        body = os.urandom(3500)
+        get.return_value = _response(body)
+        with MediaPipeline.download('https://example.com/a', 'voice') as media:
+            with open(media.path, 'rb') as f:
+                self.assertEqual(f.read(), body)
+            self.assertEqual(media.sha256, hashlib.sha256(body).hexdigest())
+            path = media.path
+        self.assertFalse(os.path.exists(path))
+
+    @patch('message.services.media_pipeline.requests.get')
+    def test_download_over_the_cap_is_rejected(self, get):
+        get.return_value = _response(os.urandom(6000))
+        with self.assertRaises(MediaTooLarge):
+            MediaPipeline.download('https://example.com/a', 'voice')
+
+        get.return_value = _response(b'', headers={'Content-Length': '999999'})
+        with self.assertRaises(MediaTooLarge):
+            MediaPipeline.download('https://example.com/a', 'voice')
+
+    def test_images_are_downscaled(self):
+        from PIL import Image
+
+        with SpooledMedia('image', suffix='.png') as media:
+            Image.new('RGBA', (400, 200), (255, 0, 0, 128)).save(media.path, 'PNG')
+            with Image.open(MediaPipeline.prepare_image(media)) as img:
+                self.assertEqual(img.format, 'JPEG')
+                self.assertEqual(img.size, (64, 32))
+
+    @patch('AI_model.services.media_processor.MediaProcessorService')
+    def test_identical_media_reuses_analysis(self, processor_class):
+        processor_class.access_denial.return_value = None
+        processor = processor_class.return_value
+        processor.process_voice.return_value = {'success': True, 'transcription': 'hello'}
+
+        with SpooledMedia('voice') as media:
+            media.sha256 = 'abc'
+            with patch.object(MediaPipeline, 'prepare_audio', return_value=media.path):
+                first = MediaPipeline.analyze(media)
+                second = MediaPipeline.analyze(media)
+
+        processor.process_voice.assert_called_once()
+        self.assertEqual(second['transcription'], 'hello')
+        self.assertTrue(second['cached'])
+        self.assertNotIn('cached', first)
+
+    @patch('billing.utils.check_ai_access_for_user')
+    @patch('AI_model.services.media_processor.MediaProcessorService.process_image')
+    @patch('AI_model.services.media_processor.MediaProcessorService.__init__', return_value=None)
+    @patch('AI_model.services.media_processor.MediaProcessorService.is_ready', return_value=True)
+    def test_cached_analysis_is_per_owner_and_access_checked(self, _ready, _init, process_image, check_access):
+        owner = MagicMock(id=1, username='owner')
+        other = MagicMock(id=2, username='other')
+        check_access.return_value = {'has_access': True}
+        process_image.return_value = {'success': True, 'description': 'a cat'}
+
+        with SpooledMedia('image') as media:
+            media.sha256 = 'abc'
+            with patch.object(MediaPipeline, 'prepare_image', return_value=media.path):
+                MediaPipeline.analyze(media, user=owner)
+                self.assertTrue(MediaPipeline.analyze(media, user=owner)['cached'])
+
+                # Another tenant's identical upload is analysed (and billed) for that tenant
+                self.assertNotIn('cached', MediaPipeline.analyze(media, user=other))
+                self.assertEqual(process_image.call_count, 2)
+
+                # No subscription: the cached result is not handed out
+                check_access.return_value = {'has_access': False, 'reason': 'no_subscription', 'message': 'No plan',
+                                             'tokens_remaining': 0, 'days_remaining': 0}
+                denied = MediaPipeline.analyze(media, user=owner)
+        self.assertFalse(denied['success'])
+        self.assertEqual(denied['error_code'], 'no_subscription')
+        self.assertNotEqual(denied['description'], 'a cat')
@@ -0,0 +1,67 @@
+"""
+Tests for the monthly partitioning of the message table (Postgres)
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from message.models import Conversation, Customer, Message
+from message.services.message_partitioning import MessagePartitionService
+
+User = get_user_model()
+
+
+class MessagePartitioningTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(email='partition@example.com', password='securepassword123',
+                                        username='partition')
+        cls.customer = Customer.objects.create(first_name='Sara', source='telegram', source_id='tg-9')
+        cls.conversation = Conversation.objects.create(user=user, customer=cls.customer, source='telegram')
+        cls.old = Message.objects.create(conversation=cls.conversation, customer=cls.customer,
+                                         type='customer', content='before')
+        cls.old_created_at = timezone.now() - timedelta(days=70)
+        Message.objects.filter(id=cls.old.id).update(created_at=cls.old_created_at)
+
+    def setUp(self):
+        MessagePartitionService.migrate(months_ahead=1)
+
+    def _create(self, **fields):
+        return Message.objects.create(conversation=self.conversation, customer=self.customer, type='customer', **fields)
+
+    def _partition_of(self, message_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT tableoid::regclass::text FROM "{MessagePartitionService.table_name()}" WHERE id = %s',
+                [message_id]
+            )
+            return cursor.fetchone()[0]
+
+    def test_partitioned_insert_and_lookup(self):
+        self.assertTrue(MessagePartitionService.is_partitioned())
+
+        message = self._create(content='after')
+
+        self.assertEqual(Message.objects.get(id=message.id).content, 'after')
+        self.assertEqual(Message.objects.get(id=self.old.id).content, 'before')
+        self.assertEqual(
+            list(Message.objects.filter(conversation=self.conversation).order_by('created_at')
+                 .values_list('content', flat=True)),
+            ['before', 'after']
+        )
+        self.assertEqual(self._partition_of(message.id),
+                         MessagePartitionService.partition_name(timezone.now().date().replace(day=1)))
+        self.assertEqual(self._partition_of(self.old.id),
+                         MessagePartitionService.partition_name(self.old_created_at.date().replace(day=1)))
+
+    def test_ids_stay_unique_across_partitions(self):
+        # Lands in a different partition than the copied row
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._create(id=self.old.id, content='duplicate')
+
+        Message.objects.filter(id=self.old.id).delete()
+        self.assertEqual(self._create(id=self.old.id, content='reused').content, 'reused')
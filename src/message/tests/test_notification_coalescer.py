@@ -0,0 +1,65 @@
+"""
+Tests for the WebSocket notification coalescer
+"""
+
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+from message.services.notification_coalescer import BATCH_EVENT_TYPE, NotificationCoalescer
+
+
+@override_settings(WEBSOCKET_COALESCE_WINDOW_MS=10000)
+class NotificationCoalescerTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.coalescer = NotificationCoalescer()
+        patcher = patch.object(NotificationCoalescer, '_send')
+        self.sent = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.coalescer.flush_all)
+
+    def test_events_for_same_conversation_merge_into_one_batch(self):
+        group = 'user_1_conversations'
+        self.coalescer.send(group, {'type': 'new_customer_message', 'conversation_id': 'a'})
+        self.coalescer.send(group, {'type': 'conversation_updated', 'conversation_id': 'a'})
+        self.coalescer.send(group, {'type': 'conversation_updated', 'conversation_id': 'b'})
+        self.sent.assert_not_called()
+
+        self.coalescer.flush(group)
+        self.sent.assert_called_once()
+        _, kind, events = self.sent.call_args.args
+        self.assertEqual(kind, 'conversations')
+        self.assertEqual([e['conversation_id'] for e in events], ['a', 'b'])
+        self.assertEqual(events[0]['type'], 'conversation_updated')
+
+    def test_deletion_is_not_overwritten(self):
+        group = 'user_1_conversations'
+        self.coalescer.send(group, {'type': 'conversation_deleted', 'conversation_id': 'a'})
+        self.coalescer.send(group, {'type': 'conversation_updated', 'conversation_id': 'a'})
+        self.coalescer.flush(group)
+        _, _, events = self.sent.call_args.args
+        self.assertEqual([e['type'] for e in events], ['conversation_deleted'])
+
+    def test_chat_groups_are_sent_immediately(self):
+        self.coalescer.send('chat_a', {'type': 'chat_message', 'message': {}})
+        self.coalescer.send('chat_a', {'type': 'chat_message', 'message': {}})
+        self.assertEqual(self.sent.call_count, 2)
+
+    def test_window_zero_disables_coalescing(self):
+        with self.settings(WEBSOCKET_COALESCE_WINDOW_MS=0):
+            self.coalescer.send('user_1_conversations', {'type': 'conversation_updated', 'conversation_id': 'a'})
+        self.sent.assert_called_once()
+
+
+class NotificationFrameTestCase(SimpleTestCase):
+
+    @patch('message.services.notification_coalescer.get_channel_layer')
+    @patch('message.services.notification_coalescer.async_to_sync')
+    def test_single_event_is_sent_unchanged_and_batches_are_wrapped(self, to_sync, get_layer):
+        NotificationCoalescer._send('user_1_customers', 'customers', [{'type': 'customer_updated'}])
+        self.assertEqual(to_sync.return_value.call_args.args[1], {'type': 'customer_updated'})
+
+        NotificationCoalescer._send('user_1_customers', 'customers', [{'type': 'a'}, {'type': 'b'}])
+        frame = to_sync.return_value.call_args.args[1]
+        self.assertEqual(frame['type'], BATCH_EVENT_TYPE)
+        self.assertEqual(len(frame['events']), 2)
@@ -0,0 +1,88 @@
+"""
+Tests for the outbound message queue retry policy
+"""
+
+from datetime import timedelta
+
+import requests
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from unittest.mock import MagicMock, patch
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from core.utils import is_unsent_error
+from message.services.outbound_queue import OutboundMessageQueue, OutboundRateLimiter
+
+
+class OutboundRetryPolicyTestCase(SimpleTestCase):
+
+    def test_rate_limit_and_server_errors_are_retried(self):
+        self.assertTrue(OutboundMessageQueue.is_retryable({'success': False, 'status_code': 429}))
+        self.assertTrue(OutboundMessageQueue.is_retryable({'success': False, 'status_code': 503}))
+
+    def test_only_unsent_transport_errors_are_retried(self):
+        self.assertTrue(OutboundMessageQueue.is_retryable({'success': False, 'status_code': None, 'unsent': True}))
+        # A read timeout on a POST may already have been delivered
+        self.assertFalse(OutboundMessageQueue.is_retryable({'success': False, 'status_code': None, 'unsent': False}))
+        self.assertFalse(OutboundMessageQueue.is_retryable({'success': False, 'status_code': None}))
+        self.assertFalse(OutboundMessageQueue.is_retryable({'success': False, 'status_code': 504}))
+
+    def test_unsent_errors_are_connect_phase_failures(self):
+        refused = NewConnectionError(None, 'Connection refused')
+        self.assertTrue(is_unsent_error(requests.exceptions.ConnectTimeout()))
+        self.assertTrue(is_unsent_error(requests.exceptions.ConnectionError(MaxRetryError(None, '/', reason=refused))))
+        self.assertFalse(is_unsent_error(requests.exceptions.ReadTimeout()))
+        self.assertFalse(is_unsent_error(requests.exceptions.ConnectionError(ProtocolError('Connection aborted.'))))
+
+    def test_client_errors_and_api_rejections_are_not_retried(self):
+        self.assertFalse(OutboundMessageQueue.is_retryable({'success': False, 'status_code': 400}))
+        self.assertFalse(OutboundMessageQueue.is_retryable({'success': False, 'error': 'Forbidden: bot was blocked'}))
+
+    def test_backoff_grows_and_is_capped(self):
+        first = OutboundMessageQueue.get_backoff(1)
+        third = OutboundMessageQueue.get_backoff(3)
+        self.assertGreaterEqual(first, OutboundMessageQueue.BACKOFF_BASE)
+        self.assertGreater(third, first)
+        self.assertLessEqual(OutboundMessageQueue.get_backoff(20), OutboundMessageQueue.BACKOFF_MAX * 1.2)
+
+    def test_retry_after_wins_when_longer(self):
+        self.assertGreaterEqual(OutboundMessageQueue.get_backoff(1, retry_after='42'), 42)
+
+    def test_rate_limiter_fails_open(self):
+        with patch.object(OutboundRateLimiter, '_get_script', side_effect=ConnectionError('redis down')):
+            self.assertEqual(OutboundRateLimiter.acquire('telegram', 'bot'), 0.0)
+
+
+@override_settings(OUTBOUND_SENDING_LEASE_SECONDS=180)
+class OutboundDeliveryOrderTestCase(SimpleTestCase):
+
+    def _message(self, **fields):
+        message = MagicMock(id='m2', delivery_status='queued', delivery_claimed_at=None)
+        message.conversation.source = 'telegram'
+        for name, value in fields.items():
+            setattr(message, name, value)
+        return message
+
+    def _deliver(self, message, earlier_pending=False):
+        objects = MagicMock()
+        objects.select_related.return_value.filter.return_value.first.return_value = message
+        with patch('message.models.Message.objects', objects), \
+                patch.object(OutboundMessageQueue, '_earlier_message_pending', return_value=earlier_pending), \
+                patch.object(OutboundMessageQueue, 'schedule') as schedule, \
+                patch.object(OutboundMessageQueue, '_get_service', return_value=None) as get_service:
+            result = OutboundMessageQueue.deliver('m2')
+        return result, schedule, get_service
+
+    def test_waits_for_earlier_message_of_the_conversation(self):
+        result, schedule, get_service = self._deliver(self._message(), earlier_pending=True)
+        self.assertEqual(result, {'status': 'deferred', 'reason': 'earlier_message_pending'})
+        self.assertEqual(schedule.call_args.kwargs['countdown'], OutboundMessageQueue.ORDER_WAIT)
+        get_service.assert_not_called()
+
+    def test_sending_rows_are_reclaimed_only_after_the_lease(self):
+        fresh = self._message(delivery_status='sending', delivery_claimed_at=timezone.now())
+        self.assertEqual(self._deliver(fresh)[0]['status'], 'skipped')
+
+        stale = self._message(delivery_status='sending', delivery_claimed_at=timezone.now() - timedelta(minutes=5))
+        _, _, get_service = self._deliver(stale)
+        get_service.assert_called_once()
@@ -0,0 +1,43 @@
+"""
+Tests for keyset cursor pagination
+"""
+
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from message.models import Conversation, Message
+from message.pagination import InvalidCursor, KeysetCursor
+
+
+class KeysetCursorTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.cursor = KeysetCursor(('-created_at', '-id'))
+        self.row = SimpleNamespace(
+            created_at=datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=dt_timezone.utc),
+            id='abc123'
+        )
+
+    def test_cursor_round_trip(self):
+        token = self.cursor.encode(self.row)
+        self.assertEqual(self.cursor.decode(token), (self.row.created_at, 'abc123'))
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(InvalidCursor):
+            self.cursor.decode('not-a-cursor')
+
+    def test_filter_seeks_past_cursor_with_tiebreaker(self):
+        queryset = self.cursor.filter(Message.objects.all(), self.cursor.encode(self.row))
+        sql = str(queryset.query)
+        self.assertIn('"created_at" <', sql)
+        self.assertIn('"id" <', sql)
+        self.assertNotIn('OFFSET', sql)
+        self.assertEqual(queryset.query.order_by, ('-created_at', '-id'))
+
+    def test_ascending_ordering_seeks_forward(self):
+        cursor = KeysetCursor(('updated_at', 'id'))
+        row = SimpleNamespace(updated_at=self.row.created_at, id='abc123')
+        sql = str(cursor.filter(Conversation.objects.all(), cursor.encode(row)).query)
+        self.assertIn('"updated_at" >', sql)
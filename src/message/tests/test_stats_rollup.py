@@ -0,0 +1,90 @@
+"""
+Tests for the hourly/daily message stats rollups
+"""
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import MagicMock, patch
+
+from AI_model.services.usage_stats import AIUsageStatsService
+from message.services.stats_rollup import METRICS, MessageStatsRollupService
+
+
+def _at(day, hour=0):
+    return datetime(2026, 3, day, hour, tzinfo=dt_timezone.utc)
+
+
+def _row(**values):
+    return dict(dict.fromkeys(METRICS, 0), **values)
+
+
+@override_settings(MESSAGE_STATS_HOURLY_RETENTION_DAYS=40)
+@patch('message.services.stats_rollup.timezone.now', return_value=_at(20, 12))
+class MessageStatsTotalsTestCase(SimpleTestCase):
+
+    def test_whole_days_read_daily_rows_and_edges_read_hours(self, now):
+        segments = MessageStatsRollupService._segments(_at(3, 9), _at(6, 15))
+        self.assertEqual(segments, [
+            ('hour', _at(3, 9), _at(4)),
+            ('day', _at(4), _at(6)),
+            ('hour', _at(6), _at(6, 15)),
+        ])
+        self.assertEqual(MessageStatsRollupService._segments(_at(3, 9), _at(3, 11)),
+                         [('hour', _at(3, 9), _at(3, 11))])
+
+    def test_ranges_past_hourly_retention_snap_to_days(self, now):
+        segments = MessageStatsRollupService._segments(datetime(2026, 1, 5, 9, tzinfo=dt_timezone.utc), _at(6))
+        self.assertEqual(segments[0][0], 'day')
+        self.assertEqual(segments[0][1], datetime(2026, 1, 5, tzinfo=dt_timezone.utc))
+
+    @patch('message.services.stats_rollup.MessageStatsRollup.objects')
+    def test_segments_are_merged_per_group(self, objects, now):
+        grouped = objects.filter.return_value.filter.return_value.order_by.return_value.values.return_value
+        grouped.annotate.side_effect = [
+            [dict(_row(inbound_messages=2, answered_messages=1), user_id=1)],
+            [dict(_row(inbound_messages=10, answered_messages=9), user_id=1),
+             dict(_row(inbound_messages=4), user_id=2)],
+            [],
+        ]
+
+        totals = MessageStatsRollupService.totals(_at(3, 9), _at(6, 15), user_ids=[1, 2], group_by='user')
+
+        self.assertEqual(totals[1]['inbound_messages'], 12)
+        self.assertEqual(MessageStatsRollupService.response_rate(totals[1]), 83.3)
+        self.assertEqual(totals[2]['answered_messages'], 0)
+
+
+@override_settings(MESSAGE_STATS_HOURLY_RETENTION_DAYS=40, MESSAGE_STATS_RECOMPUTE_HOURS=2)
+class MessageStatsPurgeTestCase(SimpleTestCase):
+
+    def test_backfill_keeps_the_hours_of_the_next_rebuilt_day(self):
+        now = _at(20, 12)
+        # Backfill stopped at Jan 8 12:00: the next run starts at 10:00 and rebuilds Jan 8
+        bound = MessageStatsRollupService.purge_before(now, datetime(2026, 1, 8, 12, tzinfo=dt_timezone.utc))
+        self.assertEqual(bound, datetime(2026, 1, 8, tzinfo=dt_timezone.utc))
+
+        # Just after midnight the recompute window reaches into the previous day
+        bound = MessageStatsRollupService.purge_before(now, datetime(2026, 1, 9, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(bound, datetime(2026, 1, 8, tzinfo=dt_timezone.utc))
+
+    def test_caught_up_purges_at_the_retention_cutoff(self):
+        bound = MessageStatsRollupService.purge_before(_at(20, 12), _at(20, 12))
+        self.assertEqual(bound, datetime(2026, 2, 8, tzinfo=dt_timezone.utc))
+
+
+class AIUsageRollupTotalsTestCase(SimpleTestCase):
+
+    @patch.object(MessageStatsRollupService, 'totals')
+    def test_ai_metrics_are_mapped_and_message_only_rows_dropped(self, totals):
+        totals.return_value = {
+            'support': _row(ai_requests=5, ai_failed_requests=1, ai_tokens=700, ai_response_time_ms=900),
+            '': _row(inbound_messages=30),
+        }
+
+        results = AIUsageStatsService._rollup_totals(date(2026, 3, 1), date(2026, 3, 7), group_by='section')
+
+        self.assertEqual(list(results), ['support'])
+        self.assertEqual(results['support']['successful_requests'], 4)
+        self.assertEqual(results['support']['total_tokens'], 700)
+        start, end = totals.call_args.args
+        self.assertEqual((start.date(), end.date()), (date(2026, 3, 1), date(2026, 3, 8)))
@@ -1,7 +1,8 @@
 from django.urls import path
 from message.api import FullUserConversationsAPIView,UserConversationsAPIView,ConversationItemAPIView,TagsAPIView,\
     CustomersListAPIView,CustomerItemAPIView,UserMessagesAPIView,SupportAnswerAPIView,ActivateAllUserConversationsAPIView,DisableAllUserConversationsAPIView
-from message.api.customer import CustomerBulkDeleteAPIView, CustomerBulkExportAPIView
+from message.api.customer import CustomerBulkDeleteAPIView, CustomerBulkExportAPIView, CustomerBulkTagAPIView, \
+    CustomerExportDownloadAPIView
 from message.api.customer_tags import CustomerTagsAPIView, CustomerSingleTagAPIView
 from message.api.customer_data import (
     CustomerDataListAPIView, 
@@ -42,6 +43,8 @@ urlpatterns = [
     path("customer-item/<int:id>/", CustomerItemAPIView.as_view(), name="customer-item"),
     path("customers/bulk-delete/", CustomerBulkDeleteAPIView.as_view(), name="customers-bulk-delete"),
     path("customers/bulk-export/", CustomerBulkExportAPIView.as_view(), name="customers-bulk-export"),
+    path("customers/exports/<str:filename>/", CustomerExportDownloadAPIView.as_view(), name="customers-export-download"),
+    path("customers/bulk-tags/", CustomerBulkTagAPIView.as_view(), name="customers-bulk-tags"),
     
     # Customer Tags Management
     path("customer/<int:customer_id>/tags/", CustomerTagsAPIView.as_view(), name="customer-tags"),
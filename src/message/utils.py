@@ -59,13 +59,11 @@ def send_ai_message_notification(ai_message):
         )
         
         # Also send to user's conversation list to update conversation summary
-        from channels.layers import get_channel_layer
-        from asgiref.sync import async_to_sync
         from django.utils import timezone
+        from message.services.notification_coalescer import group_send
         
-        channel_layer = get_channel_layer()
         user_group_name = f'user_{conversation.user.id}_conversations'
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             user_group_name,
             {
                 'type': 'ai_response',
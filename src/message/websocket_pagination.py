@@ -1,7 +1,9 @@
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
 from django.db.models import QuerySet
 
+from message.pagination import KeysetCursor
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +18,10 @@ class WebSocketPagination:
     - max_page_size = 500
     
     But adapted for WebSocket filter parameters using limit/offset pattern.
+    
+    When the caller passes `cursor_ordering` to paginate_data, a `cursor`
+    filter switches to keyset pagination (see message.pagination) and offset
+    pages also return `next_cursor` so clients can move over gradually.
     """
     
     default_page_size = 10
@@ -32,8 +38,10 @@ class WebSocketPagination:
                 - page: Page number (1-based, default: 1)
                 - limit: Alternative to page_size (for backward compatibility)
                 - offset: Alternative to page-based pagination
+                - cursor: Opaque `next_cursor` of the previous page (keyset mode)
         """
         self.filters = filters or {}
+        self.cursor = self.filters.get('cursor')
         logger.debug(f"WebSocketPagination initialized with filters: {self.filters}")
         self.page_size = self._get_page_size()
         self.page = self._get_page()
@@ -128,36 +136,76 @@ class WebSocketPagination:
             'limit': self.page_size,  # For backward compatibility
         }
     
-    def paginate_data(self, queryset: QuerySet, serializer_class, **serializer_kwargs) -> Dict[str, Any]:
+    def paginate_data(self, queryset: QuerySet, serializer_class,
+                      cursor_ordering: Optional[Sequence[str]] = None, **serializer_kwargs) -> Dict[str, Any]:
         """
         Complete pagination workflow: paginate queryset and return data with metadata
         
         Args:
             queryset: Django QuerySet to paginate
             serializer_class: Serializer class to use for data serialization
+            cursor_ordering: (timestamp field, unique field) ordering of the queryset,
+                e.g. ('-created_at', '-id') - enables cursor pagination
             **serializer_kwargs: Additional arguments for serializer
             
         Returns:
             Dictionary containing paginated data and metadata
         """
+        if cursor_ordering and self.cursor is not None:
+            return self.paginate_keyset(queryset, serializer_class, cursor_ordering, **serializer_kwargs)
+        
         # Get total count before pagination
         total_count = queryset.count()
         
         # Apply pagination
-        paginated_queryset = self.paginate_queryset(queryset)
+        paginated_items = list(self.paginate_queryset(queryset))
         
         # Serialize data
-        serializer = serializer_class(paginated_queryset, many=True, **serializer_kwargs)
+        serializer = serializer_class(paginated_items, many=True, **serializer_kwargs)
         serialized_data = serializer.data
         
         # Get pagination metadata
         pagination_metadata = self.get_pagination_metadata(total_count, len(serialized_data))
+        if cursor_ordering:
+            pagination_metadata['next_cursor'] = (
+                KeysetCursor(cursor_ordering).encode(paginated_items[-1])
+                if pagination_metadata['has_next'] and paginated_items else None
+            )
         
         return {
             'data': serialized_data,
             'pagination': pagination_metadata
         }
 
+    
+    def paginate_keyset(self, queryset: QuerySet, serializer_class,
+                        cursor_ordering: Sequence[str], **serializer_kwargs) -> Dict[str, Any]:
+        """
+        Keyset pagination: the page after `cursor` at constant cost (no COUNT, no OFFSET)
+        
+        Raises:
+            message.pagination.InvalidCursor: cursor cannot be decoded
+        """
+        items, next_cursor = KeysetCursor(cursor_ordering).page(queryset, self.cursor, self.page_size)
+        serialized_data = serializer_class(items, many=True, **serializer_kwargs).data
+        
+        return {
+            'data': serialized_data,
+            'pagination': {
+                'count': None,  # Not computed in cursor mode
+                'page_count': len(serialized_data),
+                'page_size': self.page_size,
+                'page': None,
+                'total_pages': None,
+                'has_next': next_cursor is not None,
+                'has_previous': bool(self.cursor),
+                'offset': None,
+                'limit': self.page_size,
+                'cursor': self.cursor,
+                'next_cursor': next_cursor,
+            }
+        }
+
 
 def create_websocket_paginator(filters: Optional[Dict[str, Any]] = None) -> WebSocketPagination:
     """
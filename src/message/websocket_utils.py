@@ -1,11 +1,10 @@
 import json
 import logging
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 from django.utils import timezone
 from message.models import Conversation, Message
 from message.serializers import WSMessageSerializer, WSConversationSerializer
 from django.core.cache import cache
+from message.services.notification_coalescer import group_send
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +24,6 @@ def notify_new_customer_message(message):
             cache.set(dedupe_key, True, timeout=10)
         except Exception:
             pass
-        channel_layer = get_channel_layer()
         conversation = message.conversation
         user_id = conversation.user.id
         
@@ -36,7 +34,7 @@ def notify_new_customer_message(message):
         
         # Send to chat room if anyone is connected
         chat_group_name = f'chat_{conversation.id}'
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             chat_group_name,
             {
                 'type': 'chat_message',
@@ -47,7 +45,7 @@ def notify_new_customer_message(message):
         
         # Send to user's conversation list to update conversation summary
         user_group_name = f'user_{user_id}_conversations'
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             user_group_name,
             {
                 'type': 'new_customer_message',
@@ -68,7 +66,6 @@ def notify_conversation_status_change(conversation):
     Notify user about conversation status changes
     """
     try:
-        channel_layer = get_channel_layer()
         user_id = conversation.user.id
         
         # Serialize conversation
@@ -78,7 +75,7 @@ def notify_conversation_status_change(conversation):
         
         # Send to user's conversation list
         user_group_name = f'user_{user_id}_conversations'
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             user_group_name,
             {
                 'type': 'conversation_updated',
@@ -98,13 +95,12 @@ def notify_conversation_deleted(conversation_id, user_id):
     Notify user about conversation deletion via WebSocket
     """
     try:
-        channel_layer = get_channel_layer()
         
         logger.info(f"Notifying conversation deletion: conversation {conversation_id}, user {user_id}")
         
         # Send to user's conversation list
         user_group_name = f'user_{user_id}_conversations'
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             user_group_name,
             {
                 'type': 'conversation_deleted',
@@ -115,7 +111,7 @@ def notify_conversation_deleted(conversation_id, user_id):
         
         # Also notify the specific chat room if anyone is connected
         chat_group_name = f'chat_{conversation_id}'
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             chat_group_name,
             {
                 'type': 'conversation_deleted',
@@ -136,7 +132,6 @@ def notify_customer_updated(customer):
     """
     try:
         from message.serializers import CustomerSerializer
-        channel_layer = get_channel_layer()
         
         # Get all users who have conversations with this customer
         user_ids = customer.conversations.values_list('user_id', flat=True).distinct()
@@ -149,7 +144,7 @@ def notify_customer_updated(customer):
         for user_id in user_ids:
             # Send to user's customer list
             user_customers_group_name = f'user_{user_id}_customers'
-            async_to_sync(channel_layer.group_send)(
+            group_send(
                 user_customers_group_name,
                 {
                     'type': 'customer_updated',
@@ -161,7 +156,7 @@ def notify_customer_updated(customer):
             
             # Also send to conversation list since customer updates affect conversations
             user_conversations_group_name = f'user_{user_id}_conversations'
-            async_to_sync(channel_layer.group_send)(
+            group_send(
                 user_conversations_group_name,
                 {
                     'type': 'conversation_updated',
@@ -182,13 +177,12 @@ def notify_customer_deleted(customer_id, user_id):
     Notify user about customer deletion via WebSocket
     """
     try:
-        channel_layer = get_channel_layer()
         
         logger.info(f"Notifying customer deletion: customer {customer_id}, user {user_id}")
         
         # Send to user's customer list
         user_customers_group_name = f'user_{user_id}_customers'
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             user_customers_group_name,
             {
                 'type': 'customer_deleted',
@@ -199,7 +193,7 @@ def notify_customer_deleted(customer_id, user_id):
         
         # Also send to conversation list since customer deletion affects conversations
         user_conversations_group_name = f'user_{user_id}_conversations'
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             user_conversations_group_name,
             {
                 'type': 'customer_deleted',
@@ -219,12 +213,11 @@ def broadcast_to_chat_room(conversation_id, message_type, data):
     Broadcast a message to a specific chat room
     """
     try:
-        channel_layer = get_channel_layer()
         chat_group_name = f'chat_{conversation_id}'
         
         logger.info(f"Broadcasting to chat room {chat_group_name}: {message_type}")
         
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             chat_group_name,
             {
                 'type': message_type,
@@ -254,12 +247,11 @@ def notify_message_read(conversation_id, user_id):
     Notify that messages have been read
     """
     try:
-        channel_layer = get_channel_layer()
         chat_group_name = f'chat_{conversation_id}'
         
         logger.debug(f"User {user_id} marked messages as read in conversation {conversation_id}")
         
-        async_to_sync(channel_layer.group_send)(
+        group_send(
             chat_group_name,
             {
                 'type': 'messages_read',
@@ -296,4 +288,55 @@ class WebSocketNotificationMixin:
         Notify about model deletion via WebSocket
         """
         if hasattr(self, 'conversation'):
-            notify_conversation_status_change(self.conversation) 
\ No newline at end of file
+            notify_conversation_status_change(self.conversation) 
+
+def notify_customer_export_ready(user_id, result):
+    """
+    Notify user that a background customer export finished (or failed) via WebSocket
+    """
+    try:
+        
+        logger.info(f"Notifying customer export {result.get('status')}: user {user_id}")
+        
+        group_send(
+            f'user_{user_id}_customers',
+            {
+                'type': 'customer_export_ready',
+                'export': result,
+                'timestamp': timezone.now().isoformat()
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"Error notifying customer export: {e}")
+
+
+def notify_customers_tagged(user_id, summary):
+    """
+    Notify user about a bulk tag change with one summary via WebSocket
+    (instead of one customer_updated per tagged customer)
+    """
+    try:
+        
+        logger.info(f"Notifying bulk tag change: user {user_id}, {summary.get('changed_customers')} customers")
+        
+        group_send(
+            f'user_{user_id}_customers',
+            {
+                'type': 'customers_tagged',
+                'summary': summary,
+                'timestamp': timezone.now().isoformat()
+            }
+        )
+        
+        # Customer tags are shown in the conversation list too: refresh it once
+        group_send(
+            f'user_{user_id}_conversations',
+            {
+                'type': 'conversation_updated',
+                'timestamp': timezone.now().isoformat()
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"Error notifying bulk tag change: {e}")
@@ -118,6 +118,31 @@ websocket_connection_duration_seconds = Histogram(
     ['consumer']
 )
 
+websocket_group_events_total = Counter(
+    'django_websocket_group_events_total',
+    'Events published to WebSocket groups (before coalescing)',
+    ['group_kind']
+)
+
+websocket_group_events_coalesced_total = Counter(
+    'django_websocket_group_events_coalesced_total',
+    'Events merged into a pending event for the same conversation/customer',
+    ['group_kind']
+)
+
+websocket_group_sends_total = Counter(
+    'django_websocket_group_sends_total',
+    'Channel layer group_send calls (frames sent to WebSocket groups)',
+    ['group_kind']
+)
+
+websocket_group_batch_size = Histogram(
+    'django_websocket_group_batch_size',
+    'Events per WebSocket group frame',
+    ['group_kind'],
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100)
+)
+
 # Celery Task Metrics
 celery_tasks_total = Counter(
     'django_celery_tasks_total',
@@ -193,6 +218,13 @@ workflow_actions_total = Counter(
     ['action_type', 'status']
 )
 
+workflow_custom_code_duration_seconds = Histogram(
+    'django_workflow_custom_code_duration_seconds',
+    'Workflow custom code execution time in seconds',
+    ['kind', 'outcome'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+)
+
 # User Activity Metrics
 user_registrations_total = Counter(
     'django_user_registrations_total',
@@ -244,3 +276,52 @@ academy_video_completion_rate = Gauge(
     ['video_id']
 )
 
+
+# Outbound HTTP Metrics (core.utils.make_request_with_proxy)
+outbound_http_requests_total = Counter(
+    'django_outbound_http_requests_total',
+    'Total outbound HTTP requests',
+    ['host', 'method', 'status', 'route']
+)
+
+outbound_http_request_duration_seconds = Histogram(
+    'django_outbound_http_request_duration_seconds',
+    'Outbound HTTP request latency',
+    ['host', 'route'],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+outbound_http_errors_total = Counter(
+    'django_outbound_http_errors_total',
+    'Total outbound HTTP transport errors',
+    ['host', 'route', 'error_type']
+)
+
+outbound_proxy_circuit_open = Gauge(
+    'django_outbound_proxy_circuit_open',
+    'Whether the proxy circuit breaker is open (1) or closed (0)',
+    ['route']
+)
+
+
+# Intercom Outbox Metrics (settings.services.intercom_outbox)
+intercom_outbox_events_total = Counter(
+    'django_intercom_outbox_events_total',
+    'Intercom outbox events processed',
+    ['kind', 'outcome']
+)
+
+intercom_outbox_pending = Gauge(
+    'django_intercom_outbox_pending',
+    'Intercom outbox events waiting for delivery'
+)
+
+intercom_outbox_failed = Gauge(
+    'django_intercom_outbox_failed',
+    'Intercom outbox events that exhausted their retries'
+)
+
+intercom_outbox_lag_seconds = Gauge(
+    'django_intercom_outbox_lag_seconds',
+    'Age of the oldest undelivered Intercom outbox event'
+)
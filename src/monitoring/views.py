@@ -49,6 +49,13 @@ def update_system_metrics():
     except Exception:
         pass
 
+    # Intercom outbox lag
+    try:
+        from settings.services.intercom_outbox import IntercomOutbox
+        IntercomOutbox.update_metrics()
+    except Exception:
+        pass
+
 
 def health_check(request):
     """
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from settings.models import Settings, GeneralSettings, TelegramChannel, InstagramChannel, AIPrompts, IntercomTicketType, SupportTicket, SupportMessage, SupportMessageAttachment, BusinessPrompt, BusinessPromptData, UpToPro, AIBehaviorSettings, AffiliationConfig
+from settings.models import Settings, GeneralSettings, TelegramChannel, InstagramChannel, AIPrompts, IntercomTicketType, IntercomOutboxEvent, SupportTicket, SupportMessage, SupportMessageAttachment, BusinessPrompt, BusinessPromptData, UpToPro, AIBehaviorSettings, AffiliationConfig
 
 # =============================================
 # SYSTEM CONFIGURATION
@@ -466,6 +466,25 @@ class IntercomTicketTypeAdmin(admin.ModelAdmin):
         return super().get_queryset(request)
 
 
+@admin.register(IntercomOutboxEvent)
+class IntercomOutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "object_id", "contact_key", "status", "attempts", "available_at", "created_at")
+    list_filter = ("status", "kind")
+    search_fields = ("object_id", "contact_key")
+    readonly_fields = ("kind", "object_id", "contact_key", "attempts", "last_error", "created_at")
+    actions = ["retry_events"]
+    list_per_page = 50
+
+    @admin.action(description="Retry selected events now")
+    def retry_events(self, request, queryset):
+        from django.utils import timezone
+        from settings.services.intercom_outbox import IntercomOutbox
+
+        updated = queryset.update(status='pending', attempts=0, available_at=timezone.now())
+        IntercomOutbox.kick()
+        self.message_user(request, f"{updated} event(s) queued for delivery")
+
+
 class SupportMessageAttachmentInline(admin.TabularInline):
     model = SupportMessageAttachment
     extra = 0
@@ -692,6 +711,17 @@ class AIBehaviorSettingsAdmin(admin.ModelAdmin):
             'classes': ('wide',)
         }),
         
+        ('⚡ کش پاسخ (Answer Cache)', {
+            'fields': (
+                'answer_cache_enabled',
+                'answer_cache_similarity_threshold',
+            ),
+            'description': (
+                '✅ فعال‌سازی: پاسخ سوالات تکراری بدون فراخوانی مجدد Gemini برگردانده می‌شود<br>'
+                '🎯 حداقل شباهت: هرچه بالاتر باشد، فقط سوالات تقریباً یکسان از کش پاسخ می‌گیرند'
+            )
+        }),
+        
         ('🔍 پیش‌نمایش (Preview)', {
             'fields': ('preview_prompt_flags',),
             'description': 'پیش‌نمایش flag های که به AI ارسال می‌شوند',
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:49
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settings', '0021_businesspromptdata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aibehaviorsettings',
+            name='answer_cache_enabled',
+            field=models.BooleanField(default=False, help_text='اگر فعال باشد، پاسخ سوالات مشابه (قیمت، ارسال، آدرس) از کش برگردانده می\u200cشود', verbose_name='کش پاسخ\u200cهای تکراری'),
+        ),
+        migrations.AddField(
+            model_name='aibehaviorsettings',
+            name='answer_cache_similarity_threshold',
+            field=models.FloatField(default=0.95, help_text='حداقل شباهت معنایی سوال جدید با سوال ذخیره\u200cشده (0.8 تا 1.0)', validators=[django.core.validators.MinValueValidator(0.8), django.core.validators.MaxValueValidator(1.0)], verbose_name='حداقل شباهت برای کش'),
+        ),
+    ]
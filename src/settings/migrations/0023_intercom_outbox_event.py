@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-18 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settings', '0022_aibehaviorsettings_answer_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntercomOutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('contact_upsert', 'Contact Upsert'), ('contact_delete', 'Contact Delete'), ('ticket_create', 'Ticket Create'), ('ticket_message', 'Ticket Message'), ('ticket_status', 'Ticket Status'), ('conversation_create', 'Conversation Create'), ('conversation_message', 'Conversation Message')], max_length=30)),
+                ('object_id', models.CharField(help_text='ID of the synced object (user, ticket, message...)', max_length=64)),
+                ('contact_key', models.CharField(help_text='Fiko user whose Intercom contact the event belongs to (batching key)', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('available_at', models.DateTimeField(help_text='Not processed before this time (delay, backoff or worker lease)')),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': '📤 Intercom Outbox Event',
+                'verbose_name_plural': '📤 Intercom Outbox Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='intercom_outbox_due_idx')],
+            },
+        ),
+    ]
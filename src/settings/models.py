@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator, MaxValueValidator
 from accounts.models import User
 
 
@@ -253,6 +254,48 @@ class SupportMessageAttachment(models.Model):
         super().save(*args, **kwargs)
 
 
+
+class IntercomOutboxEvent(models.Model):
+    """
+    Pending Intercom sync (contact, ticket, message) written in the same
+    transaction as the change; drained by settings.drain_intercom_outbox.
+    Rows are deleted once delivered - only pending and failed rows remain.
+    """
+    KIND_CHOICES = [
+        ('contact_upsert', 'Contact Upsert'),
+        ('contact_delete', 'Contact Delete'),
+        ('ticket_create', 'Ticket Create'),
+        ('ticket_message', 'Ticket Message'),
+        ('ticket_status', 'Ticket Status'),
+        ('conversation_create', 'Conversation Create'),
+        ('conversation_message', 'Conversation Message'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('failed', 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=64, help_text='ID of the synced object (user, ticket, message...)')
+    contact_key = models.CharField(max_length=64, help_text='Fiko user whose Intercom contact the event belongs to (batching key)')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(help_text='Not processed before this time (delay, backoff or worker lease)')
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = "📤 Intercom Outbox Event"
+        verbose_name_plural = "📤 Intercom Outbox Events"
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='intercom_outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} ({self.status})"
+
 # Not complete V
 
 class SingletonModel(models.Model):
@@ -760,6 +803,23 @@ class AIBehaviorSettings(models.Model):
         help_text="قوانین اضافی برای AI به زبان انگلیسی (اختیاری، حداکثر 1000 کاراکتر)"
     )
     
+    # ═══════════════════════════════════════════════════
+    # 📌 SECTION 5: Semantic Answer Cache
+    # ═══════════════════════════════════════════════════
+    
+    answer_cache_enabled = models.BooleanField(
+        default=False,
+        verbose_name="کش پاسخ‌های تکراری",
+        help_text="اگر فعال باشد، پاسخ سوالات مشابه (قیمت، ارسال، آدرس) از کش برگردانده می‌شود"
+    )
+    
+    answer_cache_similarity_threshold = models.FloatField(
+        default=0.95,
+        validators=[MinValueValidator(0.8), MaxValueValidator(1.0)],
+        verbose_name="حداقل شباهت برای کش",
+        help_text="حداقل شباهت معنایی سوال جدید با سوال ذخیره‌شده (0.8 تا 1.0)"
+    )
+    
     # ═══════════════════════════════════════════════════
     # 📌 Metadata
     # ═══════════════════════════════════════════════════
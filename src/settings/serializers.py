@@ -307,6 +307,9 @@ class AIBehaviorSettingsSerializer(serializers.ModelSerializer):
             # Response Rules
             'unknown_fallback_text',
             'custom_instructions',
+            # Answer Cache
+            'answer_cache_enabled',
+            'answer_cache_similarity_threshold',
             # Metadata
             'created_at',
             'updated_at',
@@ -0,0 +1,71 @@
+"""
+Intercom HTTP access shared by the contact, ticket, conversation and email services
+
+✅ Requests go through the process-wide pooled session (core.utils.get_http_session):
+   keep-alive connections to api.intercom.io instead of a new TLS handshake per call
+✅ X-RateLimit-Remaining / X-RateLimit-Reset and 429 responses are recorded in the
+   cache, so every worker pauses Intercom traffic until the window resets
+
+Usage:
+    response = intercom_request('POST', f"{settings.INTERCOM_API_BASE_URL}/contacts", json=data, headers=headers)
+    if IntercomRateLimit.blocked_for():
+        ...  # wait before the next call
+"""
+import logging
+import time
+from typing import Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from core.utils import get_default_timeout, get_http_session
+
+logger = logging.getLogger(__name__)
+
+
+class IntercomRateLimit:
+    """Intercom rate-limit window shared by all processes (cache-backed)"""
+
+    KEY = 'intercom:rate_limited_until'
+
+    @classmethod
+    def observe(cls, response: requests.Response):
+        """Pause Intercom calls until the reset time when the window is (nearly) used up"""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        exhausted = response.status_code == 429
+        try:
+            if remaining is not None and int(remaining) <= settings.INTERCOM_RATE_LIMIT_RESERVE:
+                exhausted = True
+        except ValueError:
+            pass
+        if not exhausted:
+            return
+
+        now = time.time()
+        try:
+            until = float(reset) if reset else now + settings.INTERCOM_RATE_LIMIT_DEFAULT_WAIT
+        except ValueError:
+            until = now + settings.INTERCOM_RATE_LIMIT_DEFAULT_WAIT
+        # Reset is an epoch timestamp; never trust a value in the past
+        until = max(until, now + 1)
+        cache.set(cls.KEY, until, timeout=int(until - now) + 1)
+        logger.warning(f"⏳ Intercom rate limit reached (status {response.status_code}, remaining {remaining}); "
+                       f"pausing for {until - now:.0f}s")
+
+    @classmethod
+    def blocked_for(cls) -> float:
+        """Seconds until Intercom calls may resume (0 when not limited)"""
+        until: Optional[float] = cache.get(cls.KEY)
+        if not until:
+            return 0.0
+        return max(0.0, until - time.time())
+
+
+def intercom_request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send an Intercom API request on the pooled session and record rate-limit headers"""
+    kwargs.setdefault('timeout', get_default_timeout())
+    response = get_http_session().request(method, url, **kwargs)
+    IntercomRateLimit.observe(response)
+    return response
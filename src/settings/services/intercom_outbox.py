@@ -0,0 +1,376 @@
+"""
+Intercom outbox
+Intercom sync for users, support tickets and conversations is written to the
+IntercomOutboxEvent table in the same transaction as the change and delivered
+by settings.drain_intercom_outbox. Saving a user, ticket or message no longer
+depends on the broker or on Intercom being reachable.
+
+✅ Durable: a row per change; a crashed worker's claim expires after
+   INTERCOM_OUTBOX_LEASE_SECONDS and the events are picked up again
+✅ A drain stops taking new contacts after INTERCOM_OUTBOX_DRAIN_BUDGET_SECONDS
+   and hands the rest back; each contact's lease (and the drain lock) is
+   renewed before its events are sent, so a slow drain is never overlapped
+✅ Batched per contact: repeated contact upserts collapse into one call and the
+   Intercom contact ID is resolved once for all ticket/message events of a user
+✅ Pooled keep-alive connections and X-RateLimit-* / 429 handling
+   (settings.services.intercom_http) - draining pauses until the window resets
+✅ Exponential backoff per event, `failed` after INTERCOM_OUTBOX_MAX_ATTEMPTS
+✅ django_intercom_outbox_lag_seconds / _pending / _failed gauges (refreshed on scrape)
+
+Usage:
+    IntercomOutbox.enqueue('ticket_create', ticket.id, contact_key=ticket.user_id)
+    IntercomOutbox.drain()
+"""
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from settings.services.intercom_http import IntercomRateLimit
+
+logger = logging.getLogger(__name__)
+
+
+def _record(kind: str, outcome: str):
+    try:
+        from monitoring import metrics
+        metrics.intercom_outbox_events_total.labels(kind=kind, outcome=outcome).inc()
+    except Exception:
+        pass
+
+
+class IntercomContactBatch:
+    """Outbox events of one contact processed together: Intercom contact IDs are resolved once"""
+
+    def __init__(self, contact_key: str):
+        self.contact_key = contact_key
+        self._contact_ids: Dict[int, Optional[str]] = {}
+
+    def remember(self, user_id: int, contact_id: Optional[str]):
+        self._contact_ids[user_id] = contact_id
+
+    def contact_id(self, user) -> Optional[str]:
+        if user.id not in self._contact_ids:
+            from settings.services.intercom_ticket_sync import IntercomTicketSyncService
+            self._contact_ids[user.id] = IntercomTicketSyncService.get_or_create_intercom_user(user)
+        return self._contact_ids[user.id]
+
+
+# ==========================================
+#  Handlers: True = delivered (or nothing left to do), False = retry
+# ==========================================
+
+def _upsert_contact(event, batch: IntercomContactBatch) -> bool:
+    from accounts.models import User
+    from accounts.services.intercom_contact_sync import IntercomContactSyncService
+
+    user = User.objects.filter(id=event.object_id).first()
+    if user is None or not user.email:
+        return True
+    contact = IntercomContactSyncService.create_or_update_contact(user)
+    if contact and contact.get('id'):
+        batch.remember(user.id, contact['id'])
+    return bool(contact)
+
+
+def _delete_contact(event, batch: IntercomContactBatch) -> bool:
+    from accounts.services.intercom_contact_sync import IntercomContactSyncService
+    return IntercomContactSyncService.delete_contact(int(event.object_id))
+
+
+def _create_ticket(event, batch: IntercomContactBatch) -> bool:
+    from settings.models import SupportTicket
+    from settings.services.intercom_ticket_sync import IntercomTicketSyncService
+
+    ticket = SupportTicket.objects.select_related('user').filter(id=event.object_id).first()
+    if ticket is None or ticket.intercom_id:
+        return True
+    return bool(IntercomTicketSyncService.create_ticket(ticket, intercom_contact_id=batch.contact_id(ticket.user)))
+
+
+def _sync_ticket_message(event, batch: IntercomContactBatch) -> bool:
+    from settings.models import SupportMessage
+    from settings.services.intercom_ticket_sync import IntercomTicketSyncService
+
+    message = SupportMessage.objects.select_related('ticket__user', 'sender').filter(id=event.object_id).first()
+    if message is None:
+        return True
+    ticket = message.ticket
+    if ticket.intercom_ticket_id:
+        contact_id = batch.contact_id(message.sender) if message.sender else None
+        return IntercomTicketSyncService.add_message_to_ticket(
+            message, ticket.intercom_ticket_id, intercom_contact_id=contact_id
+        )
+    if ticket.intercom_conversation_id:
+        contact_id = None if message.is_from_support else batch.contact_id(message.sender or ticket.user)
+        return bool(IntercomTicketSyncService.add_message_to_conversation(
+            message, ticket.intercom_conversation_id, intercom_contact_id=contact_id
+        ))
+    return True
+
+
+def _update_ticket_status(event, batch: IntercomContactBatch) -> bool:
+    from settings.models import SupportTicket
+    from settings.services.intercom_ticket_sync import IntercomTicketSyncService
+
+    ticket = SupportTicket.objects.filter(id=event.object_id).first()
+    if ticket is not None and ticket.intercom_ticket_id:
+        IntercomTicketSyncService.update_ticket_status(ticket)
+    # Tickets API state updates are not implemented yet - nothing to retry
+    return True
+
+
+def _sync_conversation(event, batch: IntercomContactBatch) -> bool:
+    from message.tasks import sync_conversation_to_intercom_async
+    return bool(sync_conversation_to_intercom_async.run(event.object_id).get('success'))
+
+
+def _sync_conversation_message(event, batch: IntercomContactBatch) -> bool:
+    from message.tasks import sync_message_to_intercom_async
+    return bool(sync_message_to_intercom_async.run(event.object_id).get('success'))
+
+
+HANDLERS: Dict[str, Callable] = {
+    'contact_upsert': _upsert_contact,
+    'contact_delete': _delete_contact,
+    'ticket_create': _create_ticket,
+    'ticket_message': _sync_ticket_message,
+    'ticket_status': _update_ticket_status,
+    'conversation_create': _sync_conversation,
+    'conversation_message': _sync_conversation_message,
+}
+
+
+class IntercomOutbox:
+    """Write and drain Intercom outbox events"""
+
+    KICK_KEY = 'intercom:outbox:kick'
+    DRAIN_LOCK_KEY = 'intercom:outbox:draining'
+
+    # ==========================================
+    #  Producer side (signals)
+    # ==========================================
+
+    @classmethod
+    def enqueue(cls, kind: str, object_id, contact_key, delay: float = 0):
+        """
+        Record an Intercom sync in the current transaction and start a drain after commit
+
+        Args:
+            kind: One of IntercomOutboxEvent.KIND_CHOICES
+            object_id: ID of the user / ticket / message to sync
+            contact_key: Fiko user ID owning the Intercom contact (batching key)
+            delay: Seconds before the event may be delivered
+        """
+        from settings.models import IntercomOutboxEvent
+
+        IntercomOutboxEvent.objects.create(
+            kind=kind,
+            object_id=str(object_id),
+            contact_key=str(contact_key),
+            available_at=timezone.now() + timedelta(seconds=delay),
+        )
+        transaction.on_commit(lambda: cls.kick(countdown=delay))
+
+    @classmethod
+    def kick(cls, countdown: float = 0):
+        """Queue a drain (at most one per second; the periodic drain covers lost kicks)"""
+        if not cache.add(cls.KICK_KEY, 1, timeout=1):
+            return
+        try:
+            from settings.tasks import drain_intercom_outbox
+            drain_intercom_outbox.apply_async(countdown=countdown)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not queue Intercom outbox drain (periodic drain will deliver): {e}")
+
+    # ==========================================
+    #  Consumer side (Celery)
+    # ==========================================
+
+    @classmethod
+    def claim(cls, limit: int) -> List:
+        """Lease up to `limit` due events (invisible to other drains until the lease expires)"""
+        from settings.models import IntercomOutboxEvent
+
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                IntercomOutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', available_at__lte=now)
+                .order_by('id')
+                .values_list('id', flat=True)[:limit]
+            )
+            IntercomOutboxEvent.objects.filter(id__in=ids).update(
+                available_at=now + timedelta(seconds=settings.INTERCOM_OUTBOX_LEASE_SECONDS),
+                attempts=F('attempts') + 1,
+            )
+        return list(IntercomOutboxEvent.objects.filter(id__in=ids).order_by('id'))
+
+    @classmethod
+    def extend_lease(cls, events: List, token: str):
+        """Renew the claim on `events` and the drain lock for a full lease from now"""
+        from settings.models import IntercomOutboxEvent
+
+        lease = settings.INTERCOM_OUTBOX_LEASE_SECONDS
+        IntercomOutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+            available_at=timezone.now() + timedelta(seconds=lease),
+        )
+        if cache.get(cls.DRAIN_LOCK_KEY) == token:
+            cache.touch(cls.DRAIN_LOCK_KEY, lease)
+
+    @classmethod
+    def release(cls, events: List, delay: float = 0):
+        """Hand claimed but unattempted events back (the claim's attempt is not counted)"""
+        from settings.models import IntercomOutboxEvent
+
+        IntercomOutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+            available_at=timezone.now() + timedelta(seconds=delay), attempts=F('attempts') - 1,
+        )
+
+    @classmethod
+    def backoff(cls, attempts: int) -> float:
+        return min(settings.INTERCOM_OUTBOX_BACKOFF_BASE * (2 ** max(attempts - 1, 0)),
+                   settings.INTERCOM_OUTBOX_BACKOFF_MAX)
+
+    @classmethod
+    def process_batch(cls, contact_key: str, events: List) -> Dict[int, Optional[str]]:
+        """
+        Deliver the events of one contact in order
+
+        Returns:
+            event id -> None when delivered, else the error for the retry
+        """
+        batch = IntercomContactBatch(contact_key)
+        results: Dict[int, Optional[str]] = {}
+
+        upserts = [event for event in events if event.kind == 'contact_upsert']
+        deleted = any(event.kind == 'contact_delete' for event in events)
+        # One upsert reads the current user row: run it first, the others are redundant
+        ordered = ([] if deleted else upserts[-1:]) + [event for event in events if event.kind != 'contact_upsert']
+        for event in upserts:
+            if event not in ordered:
+                results[event.id] = None
+                _record(event.kind, 'collapsed')
+
+        for event in ordered:
+            try:
+                delivered = HANDLERS[event.kind](event, batch)
+                error = None if delivered else 'Intercom sync returned no result'
+            except Exception as e:
+                logger.error(f"❌ Intercom outbox {event.kind} #{event.object_id} failed: {e}")
+                error = str(e) or e.__class__.__name__
+            if error is None:
+                _record(event.kind, 'sent')
+            results[event.id] = error
+        return results
+
+    @classmethod
+    def drain(cls, limit: Optional[int] = None) -> Dict:
+        """Deliver due events, grouped per contact, until done, rate limited or out of time"""
+        from settings.models import IntercomOutboxEvent
+
+        wait = IntercomRateLimit.blocked_for()
+        if wait:
+            cls._reschedule(wait)
+            return {'rate_limited_for': wait}
+        # The token keeps an overrunning drain from releasing a later drain's lock
+        token = uuid.uuid4().hex
+        if not cache.add(cls.DRAIN_LOCK_KEY, token, timeout=settings.INTERCOM_OUTBOX_LEASE_SECONDS):
+            return {'skipped': 'drain in progress'}
+
+        started = time.monotonic()
+        stats = {'delivered': 0, 'retried': 0, 'failed': 0, 'handed_back': 0}
+        try:
+            limit = limit or settings.INTERCOM_OUTBOX_BATCH_SIZE
+            events = cls.claim(limit)
+
+            batches: 'OrderedDict[str, List]' = OrderedDict()
+            for event in events:
+                batches.setdefault(event.contact_key, []).append(event)
+
+            delivered_ids = []
+            contact_batches = list(batches.items())
+            for index, (contact_key, contact_events) in enumerate(contact_batches):
+                wait = IntercomRateLimit.blocked_for()
+                if wait or time.monotonic() - started >= settings.INTERCOM_OUTBOX_DRAIN_BUDGET_SECONDS:
+                    # Not attempted: hand the rest back for when the window resets / the next drain
+                    rest = [event for _, pending in contact_batches[index:] for event in pending]
+                    cls.release(rest, delay=wait)
+                    stats['handed_back'] = len(rest)
+                    break
+
+                cls.extend_lease(contact_events, token)
+                results = cls.process_batch(contact_key, contact_events)
+                for event in contact_events:
+                    error = results[event.id]
+                    if error is None:
+                        delivered_ids.append(event.id)
+                        stats['delivered'] += 1
+                    elif event.attempts >= settings.INTERCOM_OUTBOX_MAX_ATTEMPTS:
+                        IntercomOutboxEvent.objects.filter(id=event.id).update(status='failed', last_error=error)
+                        stats['failed'] += 1
+                        _record(event.kind, 'failed')
+                    else:
+                        delay = max(cls.backoff(event.attempts), IntercomRateLimit.blocked_for())
+                        IntercomOutboxEvent.objects.filter(id=event.id).update(
+                            available_at=timezone.now() + timedelta(seconds=delay), last_error=error,
+                        )
+                        stats['retried'] += 1
+                        _record(event.kind, 'retry')
+
+            IntercomOutboxEvent.objects.filter(id__in=delivered_ids).delete()
+        finally:
+            if cache.get(cls.DRAIN_LOCK_KEY) == token:
+                cache.delete(cls.DRAIN_LOCK_KEY)
+
+        if any(stats.values()):
+            logger.info(f"📤 Intercom outbox: {stats['delivered']} delivered, {stats['retried']} retrying, "
+                        f"{stats['failed']} failed, {stats['handed_back']} handed back ({len(batches)} contacts)")
+
+        # More due now (full claim) or soon: run again instead of waiting for the periodic drain
+        next_due = IntercomOutboxEvent.objects.filter(status='pending').aggregate(next_due=Min('available_at'))['next_due']
+        if next_due is not None:
+            cls._reschedule(max((next_due - timezone.now()).total_seconds(), 0))
+        cls.update_metrics()
+        return stats
+
+    @classmethod
+    def _reschedule(cls, countdown: float):
+        if countdown >= settings.INTERCOM_OUTBOX_DRAIN_INTERVAL:
+            return
+        try:
+            from settings.tasks import drain_intercom_outbox
+            drain_intercom_outbox.apply_async(countdown=countdown)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not reschedule Intercom outbox drain: {e}")
+
+    # ==========================================
+    #  Metrics
+    # ==========================================
+
+    @classmethod
+    def update_metrics(cls):
+        """Refresh the outbox gauges (one aggregate query)"""
+        try:
+            from monitoring import metrics
+            from settings.models import IntercomOutboxEvent
+
+            totals = IntercomOutboxEvent.objects.aggregate(
+                pending=Count('id', filter=Q(status='pending')),
+                failed=Count('id', filter=Q(status='failed')),
+                oldest=Min('created_at', filter=Q(status='pending')),
+            )
+            lag = (timezone.now() - totals['oldest']).total_seconds() if totals['oldest'] else 0
+            metrics.intercom_outbox_pending.set(totals['pending'])
+            metrics.intercom_outbox_failed.set(totals['failed'])
+            metrics.intercom_outbox_lag_seconds.set(lag)
+        except Exception as e:
+            logger.debug(f"Intercom outbox metrics not updated: {e}")
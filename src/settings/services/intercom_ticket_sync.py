@@ -6,6 +6,7 @@ Syncs Support Tickets to Intercom using the official Tickets API
 import logging
 import requests
 from django.conf import settings
+from settings.services.intercom_http import intercom_request
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -98,7 +99,7 @@ class IntercomTicketSyncService:
             return None
     
     @classmethod
-    def create_ticket(cls, ticket) -> Optional[Dict[str, Any]]:
+    def create_ticket(cls, ticket, intercom_contact_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Create a ticket in Intercom using the official Tickets API.
         
@@ -109,6 +110,7 @@ class IntercomTicketSyncService:
         
         Args:
             ticket: SupportTicket instance
+            intercom_contact_id: Already resolved contact ID of ticket.user (outbox batches)
             
         Returns:
             dict: Intercom ticket data if successful, None otherwise
@@ -119,7 +121,7 @@ class IntercomTicketSyncService:
         
         try:
             # 1. Get Intercom Contact ID
-            intercom_contact_id = cls.get_or_create_intercom_user(ticket.user)
+            intercom_contact_id = intercom_contact_id or cls.get_or_create_intercom_user(ticket.user)
             if not intercom_contact_id:
                 logger.error(f"❌ Cannot create ticket {ticket.id} - failed to get Intercom contact ID")
                 return None
@@ -196,8 +198,8 @@ class IntercomTicketSyncService:
             
             # 7. Call Intercom Tickets API
             url = f"{settings.INTERCOM_API_BASE_URL}/tickets"
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 headers=cls.get_headers(),
                 json=payload,
                 timeout=15
@@ -342,13 +344,14 @@ class IntercomTicketSyncService:
         return cls.create_ticket(ticket)
     
     @classmethod
-    def add_message_to_ticket(cls, message, ticket_id: str) -> bool:
+    def add_message_to_ticket(cls, message, ticket_id: str, intercom_contact_id: Optional[str] = None) -> bool:
         """
         Add a message/comment to an existing Intercom Ticket (Tickets API).
         
         Args:
             message: SupportMessage instance
             ticket_id: Intercom ticket ID
+            intercom_contact_id: Already resolved contact ID of message.sender (outbox batches)
             
         Returns:
             bool: True if successful, False otherwise
@@ -380,7 +383,7 @@ class IntercomTicketSyncService:
             # 3. Check if message is from user or support
             if message.sender:
                 # User message - get their Intercom contact ID
-                intercom_contact_id = cls.get_or_create_intercom_user(message.sender)
+                intercom_contact_id = intercom_contact_id or cls.get_or_create_intercom_user(message.sender)
                 
                 if not intercom_contact_id:
                     logger.error(f"❌ Could not get Intercom contact for user {message.sender.id}")
@@ -428,8 +431,8 @@ class IntercomTicketSyncService:
             
             logger.info(f"💬 Adding message to Intercom ticket {ticket_id}")
             
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 headers=cls.get_headers(),
                 json=payload,
                 timeout=10
@@ -453,11 +456,13 @@ class IntercomTicketSyncService:
             return False
     
     @classmethod
-    def add_message_to_conversation(cls, message, conversation_id: str) -> Optional[Dict[str, Any]]:
+    def add_message_to_conversation(cls, message, conversation_id: str,
+                                    intercom_contact_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         [DEPRECATED] Old method for adding messages to conversations.
         
         Kept for backward compatibility with old conversation-based tickets.
+        intercom_contact_id: already resolved contact ID of the author (outbox batches).
         """
         if not settings.INTERCOM_ACCESS_TOKEN:
             logger.warning("⚠️ Intercom access token not configured")
@@ -474,7 +479,7 @@ class IntercomTicketSyncService:
                 }
             else:
                 user = message.sender if message.sender else message.ticket.user
-                intercom_user_id = cls.get_or_create_intercom_user(user)
+                intercom_user_id = intercom_contact_id or cls.get_or_create_intercom_user(user)
                 
                 if not intercom_user_id:
                     logger.error(f"❌ Cannot add message {message.id} - failed to get Intercom user ID")
@@ -488,8 +493,8 @@ class IntercomTicketSyncService:
                 }
             
             url = f"{settings.INTERCOM_API_BASE_URL}/conversations/{conversation_id}/reply"
-            response = requests.post(
-                url,
+            response = intercom_request(
+                'POST', url,
                 headers=cls.get_headers(),
                 json=message_data,
                 timeout=10
@@ -97,18 +97,18 @@ def sync_ticket_to_intercom_on_create(sender, instance, created, **kwargs):
         intercom_id = instance.intercom_ticket_id or instance.intercom_conversation_id
         if instance.status == 'closed' and intercom_id:
             try:
-                from settings.tasks import update_ticket_status_in_intercom_async
-                update_ticket_status_in_intercom_async.delay(instance.id)
+                from settings.services.intercom_outbox import IntercomOutbox
+                IntercomOutbox.enqueue('ticket_status', instance.id, contact_key=instance.user_id)
                 logger.info(f"🔄 Triggered Intercom status update for ticket {instance.id}")
             except Exception as e:
                 logger.error(f"❌ Failed to trigger Intercom status update for ticket {instance.id}: {str(e)}")
         return
     
     try:
-        from settings.tasks import sync_ticket_to_intercom_async
+        from settings.services.intercom_outbox import IntercomOutbox
         
-        # Trigger async sync
-        sync_ticket_to_intercom_async.delay(instance.id)
+        # Delivered by the outbox drain task after commit
+        IntercomOutbox.enqueue('ticket_create', instance.id, contact_key=instance.user_id)
         
         logger.info(f"🔄 Triggered Intercom sync for ticket {instance.id}")
         
@@ -123,9 +123,10 @@ def sync_message_to_intercom_on_create(sender, instance, created, **kwargs):
     
     Adds the message to the existing Intercom conversation or ticket.
     
-    IMPORTANT: Uses 3-second countdown to allow time for attachments to be saved.
-    Django serializers save related objects AFTER the main object is created,
-    so we need this delay to ensure attachments exist before sync.
+    IMPORTANT: The outbox event becomes due 3 seconds later to allow time for
+    attachments to be saved. Django serializers save related objects AFTER the
+    main object is created, so we need this delay to ensure attachments exist
+    before sync.
     """
     # Only sync if Intercom is configured
     if not settings.INTERCOM_ACCESS_TOKEN:
@@ -146,23 +147,14 @@ def sync_message_to_intercom_on_create(sender, instance, created, **kwargs):
         logger.debug(f"ℹ️ Ticket {instance.ticket.id} not synced to Intercom, skipping message {instance.id}")
         return
     
-    # Use transaction.on_commit with countdown to allow attachments to be saved
-    def trigger_sync():
-        try:
-            from settings.tasks import sync_ticket_message_to_intercom_async
-            
-            # Trigger async sync with 3 second countdown
-            # This gives serializer time to save attachments after message creation
-            sync_ticket_message_to_intercom_async.apply_async(
-                args=[instance.id],
-                countdown=3  # Wait 3 seconds for attachments to be saved
-            )
-            
-            logger.info(f"🔄 Scheduled Intercom sync for message {instance.id} (countdown: 3s)")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to schedule Intercom sync for message {instance.id}: {str(e)}")
-    
-    from django.db import transaction
-    transaction.on_commit(trigger_sync)
+    try:
+        from settings.services.intercom_outbox import IntercomOutbox
+        
+        # Due in 3 seconds: gives the serializer time to save attachments after message creation
+        IntercomOutbox.enqueue('ticket_message', instance.id, contact_key=instance.ticket.user_id, delay=3)
+        
+        logger.info(f"🔄 Scheduled Intercom sync for message {instance.id} (countdown: 3s)")
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to schedule Intercom sync for message {instance.id}: {str(e)}")
 
@@ -275,3 +275,14 @@ def update_ticket_status_in_intercom_async(ticket_id: int):
             'error': str(e)
         }
 
+
+@shared_task(name='settings.drain_intercom_outbox')
+def drain_intercom_outbox():
+    """
+    Deliver pending Intercom outbox events (kicked after commit, and every 30s by beat).
+
+    Returns:
+        dict: delivered / retried / failed counts
+    """
+    from settings.services.intercom_outbox import IntercomOutbox
+    return IntercomOutbox.drain()
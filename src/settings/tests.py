@@ -1,3 +1,149 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from settings.models import IntercomOutboxEvent
+from settings.services import intercom_outbox
+from settings.services.intercom_http import IntercomRateLimit
+from settings.services.intercom_outbox import IntercomOutbox
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def _response(status=200, **headers):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers)
+    return response
+
+
+@override_settings(CACHES=LOCMEM, INTERCOM_RATE_LIMIT_RESERVE=5, INTERCOM_RATE_LIMIT_DEFAULT_WAIT=10)
+class IntercomRateLimitTest(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_headroom_does_not_block(self):
+        IntercomRateLimit.observe(_response(**{'X-RateLimit-Remaining': '800'}))
+        self.assertEqual(IntercomRateLimit.blocked_for(), 0)
+
+    def test_low_remaining_blocks_until_reset(self):
+        reset = int(time.time()) + 40
+        IntercomRateLimit.observe(_response(**{'X-RateLimit-Remaining': '3', 'X-RateLimit-Reset': str(reset)}))
+        self.assertAlmostEqual(IntercomRateLimit.blocked_for(), 40, delta=2)
+
+    def test_429_without_reset_uses_default_wait(self):
+        IntercomRateLimit.observe(_response(status=429))
+        self.assertAlmostEqual(IntercomRateLimit.blocked_for(), 10, delta=2)
+
+
+@override_settings(CACHES=LOCMEM, INTERCOM_OUTBOX_MAX_ATTEMPTS=2, INTERCOM_OUTBOX_BACKOFF_BASE=30)
+class IntercomOutboxDrainTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        kick = mock.patch.object(IntercomOutbox, '_reschedule')
+        kick.start()
+        self.addCleanup(kick.stop)
+
+    def _event(self, kind, object_id, contact_key='1'):
+        return IntercomOutboxEvent.objects.create(kind=kind, object_id=str(object_id), contact_key=contact_key,
+                                                  available_at=timezone.now())
+
+    def test_upserts_collapse_and_contact_id_is_resolved_once(self):
+        for _ in range(3):
+            self._event('contact_upsert', 1)
+        self._event('ticket_create', 10)
+        self._event('ticket_message', 11)
+
+        calls = []
+
+        def upsert(event, batch):
+            calls.append(event.kind)
+            batch.remember(1, 'intercom-1')
+            return True
+
+        def ticket(event, batch):
+            calls.append((event.kind, batch._contact_ids.get(1)))
+            return True
+
+        handlers = dict(intercom_outbox.HANDLERS, contact_upsert=upsert, ticket_create=ticket, ticket_message=ticket)
+        with mock.patch.dict(intercom_outbox.HANDLERS, handlers):
+            stats = IntercomOutbox.drain()
+
+        self.assertEqual(calls, ['contact_upsert', ('ticket_create', 'intercom-1'), ('ticket_message', 'intercom-1')])
+        self.assertEqual(stats['delivered'], 5)
+        self.assertFalse(IntercomOutboxEvent.objects.exists())
+
+    def test_failures_back_off_then_fail(self):
+        event = self._event('ticket_create', 10)
+
+        with mock.patch.dict(intercom_outbox.HANDLERS, {'ticket_create': lambda event, batch: False}):
+            IntercomOutbox.drain()
+            event.refresh_from_db()
+            self.assertEqual((event.status, event.attempts), ('pending', 1))
+            self.assertGreater(event.available_at, timezone.now() + timedelta(seconds=25))
+
+            IntercomOutboxEvent.objects.filter(id=event.id).update(available_at=timezone.now())
+            IntercomOutbox.drain()
+            event.refresh_from_db()
+            self.assertEqual((event.status, event.attempts), ('failed', 2))
+
+    def test_drain_hands_back_contacts_after_its_budget(self):
+        self._event('ticket_create', 10, contact_key='1')
+        self._event('ticket_create', 20, contact_key='2')
+
+        clock = [0]
+
+        def slow(event, batch):
+            clock[0] += 130
+            return True
+
+        with override_settings(INTERCOM_OUTBOX_DRAIN_BUDGET_SECONDS=120), \
+                mock.patch('settings.services.intercom_outbox.time.monotonic', side_effect=lambda: clock[0]), \
+                mock.patch.dict(intercom_outbox.HANDLERS, {'ticket_create': slow}):
+            stats = IntercomOutbox.drain()
+
+        self.assertEqual((stats['delivered'], stats['handed_back']), (1, 1))
+        rest = IntercomOutboxEvent.objects.get()
+        self.assertEqual((rest.object_id, rest.attempts), ('20', 0))
+        self.assertLessEqual(rest.available_at, timezone.now())
+
+    def test_lock_is_released_only_by_its_owner(self):
+        self._event('ticket_create', 10)
+
+        def overrun(event, batch):
+            # This drain's lock expired and another drain took it
+            cache.set(IntercomOutbox.DRAIN_LOCK_KEY, 'other-drain')
+            return True
+
+        with mock.patch.dict(intercom_outbox.HANDLERS, {'ticket_create': overrun}):
+            IntercomOutbox.drain()
+
+        self.assertEqual(cache.get(IntercomOutbox.DRAIN_LOCK_KEY), 'other-drain')
+
+    @mock.patch('accounts.services.intercom_contact_sync.IntercomContactSyncService.search_contact_by_external_id',
+                return_value=None)
+    def test_deleting_a_contact_that_was_never_synced_is_delivered(self, search):
+        self._event('contact_delete', 1)
+
+        self.assertEqual(IntercomOutbox.drain()['delivered'], 1)
+        search.assert_called_once_with(1, raise_errors=True)
+
+        self._event('contact_delete', 2)
+        search.side_effect = requests.ConnectionError('Intercom is down')
+        self.assertEqual(IntercomOutbox.drain()['retried'], 1)
+
+    def test_rate_limit_defers_the_drain(self):
+        self._event('ticket_create', 10)
+        cache.set(IntercomRateLimit.KEY, time.time() + 30)
+
+        stats = IntercomOutbox.drain()
+
+        self.assertIn('rate_limited_for', stats)
+        self.assertEqual(IntercomOutboxEvent.objects.get().attempts, 0)
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:54
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web_knowledge', '0002_product_qapair_category_qapair_created_by_ai_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_body',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_title',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('search_title', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('search_body', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='qapair',
+            name='search_body',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='qapair',
+            name='search_title',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='qapair',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('search_title', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('search_body', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='wk_product_search_vec_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_title'], name='wk_product_search_trgm_gin', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='qapair',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='wk_qapair_search_vec_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='qapair',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_title'], name='wk_qapair_search_trgm_gin', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web_knowledge', '0003_product_qapair_search_document'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Empty external IDs would collide once the constraint is no longer partial
+        migrations.RunSQL(
+            "UPDATE web_knowledge_product SET external_id = NULL WHERE external_id = '';",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RemoveConstraint(
+            model_name='product',
+            name='unique_external_product_per_user',
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('user', 'external_id'), name='unique_external_product_per_user', violation_error_message='این محصول خارجی قبلاً برای این کاربر وجود دارد'),
+        ),
+    ]
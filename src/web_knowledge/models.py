@@ -4,6 +4,8 @@ from django.utils import timezone
 from django.conf import settings
 import uuid
 
+from core.search import SearchDocumentMixin, search_indexes
+
 User = get_user_model()
 
 
@@ -157,7 +159,7 @@ class WebsitePage(models.Model):
         super().save(*args, **kwargs)
 
 
-class QAPair(models.Model):
+class QAPair(SearchDocumentMixin, models.Model):
     """
     Model to store AI-generated Q&A pairs based on website content
     """
@@ -221,6 +223,10 @@ class QAPair(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Full-text search document (see core.search)
+    SEARCH_TITLE_FIELDS = ('question',)
+    SEARCH_BODY_FIELDS = ('answer',)
+    
     class Meta:
         verbose_name = "Q&A Pair"
         verbose_name_plural = "Q&A Pairs"
@@ -233,6 +239,7 @@ class QAPair(models.Model):
             models.Index(fields=['question_type']),
             models.Index(fields=['is_approved']),
             models.Index(fields=['created_at']),
+            *search_indexes('wk_qapair'),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -325,7 +332,7 @@ class CrawlJob(models.Model):
         return f"Crawl Job {self.id} - {self.website.name}"
 
 
-class Product(models.Model):
+class Product(SearchDocumentMixin, models.Model):
     """
     Enhanced model to store products and services for the knowledge base
     Supports both manual entry and AI auto-extraction from websites
@@ -560,6 +567,10 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Full-text search document (see core.search)
+    SEARCH_TITLE_FIELDS = ('title', 'brand', 'category')
+    SEARCH_BODY_FIELDS = ('short_description', 'description')
+    
     class Meta:
         verbose_name = "Product/Service"
         verbose_name_plural = "Products/Services"
@@ -571,11 +582,13 @@ class Product(models.Model):
             models.Index(fields=['extraction_method']),
             models.Index(fields=['source_website']),
             models.Index(fields=['user', 'external_source', 'is_active'], name='idx_product_external'),
+            *search_indexes('wk_product'),
         ]
         constraints = [
+            # Not partial: NULL external_ids never conflict in Postgres, and a plain
+            # unique index is required for ON CONFLICT upserts (batch sync)
             models.UniqueConstraint(
                 fields=['user', 'external_id'],
-                condition=models.Q(external_id__isnull=False),
                 name='unique_external_product_per_user',
                 violation_error_message='این محصول خارجی قبلاً برای این کاربر وجود دارد'
             )
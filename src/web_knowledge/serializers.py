@@ -3,10 +3,31 @@ Serializers for web_knowledge app
 """
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Prefetch, Q
 from .models import WebsiteSource, WebsitePage, QAPair, CrawlJob, Product
 
 User = get_user_model()
 
+# Children counted/listed by the page serializers
+COMPLETED_QA_PAIRS = Q(generation_status='completed')
+ACTIVE_PRODUCTS = Q(is_active=True)
+
+
+def annotate_page_counts(queryset):
+    """
+    Annotate completed Q&A pairs and active products per page
+
+    distinct=True: both relations are joined in the same query.
+    """
+    return queryset.annotate(
+        completed_qa_pairs_count=Count(
+            'qa_pairs', filter=Q(qa_pairs__generation_status='completed'), distinct=True
+        ),
+        active_products_count=Count(
+            'extracted_products', filter=Q(extracted_products__is_active=True), distinct=True
+        ),
+    )
+
 
 class WebsiteSourceSerializer(serializers.ModelSerializer):
     """
@@ -58,9 +79,28 @@ class WebsiteSourceSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Crawl depth must be at least 1")
         return value
     
+    # Prefetch target for recent_pages_prefetch()
+    RECENT_PAGES_ATTR = 'recent_completed_pages'
+    RECENT_PAGES_LIMIT = 10
+    
+    @classmethod
+    def recent_pages_prefetch(cls):
+        """Prefetch of the latest completed pages (with Q&A counts) for a list of websites (one query)"""
+        queryset = annotate_page_counts(
+            WebsitePage.objects.filter(processing_status='completed').order_by('-crawled_at').only(
+                'id', 'website_id', 'title', 'url', 'summary', 'word_count', 'crawled_at'
+            )
+        )
+        return Prefetch('pages', queryset=queryset[:cls.RECENT_PAGES_LIMIT], to_attr=cls.RECENT_PAGES_ATTR)
+    
     def get_page_titles(self, obj):
         """Get list of page titles for this website"""
-        pages = obj.pages.filter(processing_status='completed').order_by('-crawled_at')[:10]
+        if hasattr(obj, self.RECENT_PAGES_ATTR):
+            pages = getattr(obj, self.RECENT_PAGES_ATTR)
+        else:
+            pages = annotate_page_counts(
+                obj.pages.filter(processing_status='completed').order_by('-crawled_at')
+            )[:self.RECENT_PAGES_LIMIT]
         return [
             {
                 'id': str(page.id),
@@ -68,7 +108,7 @@ class WebsiteSourceSerializer(serializers.ModelSerializer):
                 'url': page.url,
                 'summary': page.summary,
                 'word_count': page.word_count,
-                'qa_pairs_count': page.qa_pairs.filter(generation_status='completed').count(),
+                'qa_pairs_count': page.completed_qa_pairs_count,
                 'crawled_at': page.crawled_at
             }
             for page in pages
@@ -147,12 +187,16 @@ class WebsitePageSerializer(serializers.ModelSerializer):
         ]
     
     def get_qa_pairs_count(self, obj):
-        """Get number of Q&A pairs for this page"""
-        return obj.qa_pairs.filter(generation_status='completed').count()
+        """Get number of Q&A pairs for this page (annotate_page_counts)"""
+        if hasattr(obj, 'completed_qa_pairs_count'):
+            return obj.completed_qa_pairs_count
+        return obj.qa_pairs.filter(COMPLETED_QA_PAIRS).count()
     
     def get_products_count(self, obj):
-        """Get number of products extracted from this page"""
-        return obj.extracted_products.filter(is_active=True).count()
+        """Get number of products extracted from this page (annotate_page_counts)"""
+        if hasattr(obj, 'active_products_count'):
+            return obj.active_products_count
+        return obj.extracted_products.filter(ACTIVE_PRODUCTS).count()
 
 
 class WebsitePageUpdateSerializer(serializers.ModelSerializer):
@@ -206,14 +250,37 @@ class WebsitePageDetailSerializer(WebsitePageSerializer):
             'cleaned_content', 'links', 'qa_pairs', 'extracted_products'
         ]
     
+    # Prefetch targets for children_prefetches()
+    TOP_QA_PAIRS_ATTR = 'top_qa_pairs'
+    RECENT_PRODUCTS_ATTR = 'recent_products'
+    CHILDREN_LIMIT = 10
+    
+    @classmethod
+    def children_prefetches(cls):
+        """Prefetches of the top Q&A pairs and latest products shown per page (one query each)"""
+        return [
+            Prefetch('qa_pairs',
+                     queryset=QAPair.objects.filter(COMPLETED_QA_PAIRS).order_by('-confidence_score')[:cls.CHILDREN_LIMIT],
+                     to_attr=cls.TOP_QA_PAIRS_ATTR),
+            Prefetch('extracted_products',
+                     queryset=Product.objects.filter(ACTIVE_PRODUCTS).order_by('-created_at')[:cls.CHILDREN_LIMIT],
+                     to_attr=cls.RECENT_PRODUCTS_ATTR),
+        ]
+    
     def get_qa_pairs(self, obj):
         """Get Q&A pairs for this page"""
-        qa_pairs = obj.qa_pairs.filter(generation_status='completed').order_by('-confidence_score')[:10]
+        if hasattr(obj, self.TOP_QA_PAIRS_ATTR):
+            qa_pairs = getattr(obj, self.TOP_QA_PAIRS_ATTR)
+        else:
+            qa_pairs = obj.qa_pairs.filter(COMPLETED_QA_PAIRS).order_by('-confidence_score')[:self.CHILDREN_LIMIT]
         return QAPairSerializer(qa_pairs, many=True).data
     
     def get_extracted_products(self, obj):
         """Get products extracted from this page"""
-        products = obj.extracted_products.filter(is_active=True).order_by('-created_at')[:10]
+        if hasattr(obj, self.RECENT_PRODUCTS_ATTR):
+            products = getattr(obj, self.RECENT_PRODUCTS_ATTR)
+        else:
+            products = obj.extracted_products.filter(ACTIVE_PRODUCTS).order_by('-created_at')[:self.CHILDREN_LIMIT]
         return ProductCompactSerializer(products, many=True).data
 
 
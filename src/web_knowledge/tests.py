@@ -1,3 +1,87 @@
-from django.test import TestCase
+"""
+Query-count regression tests for the website and page endpoints
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from web_knowledge.models import Product, QAPair, WebsitePage, WebsiteSource
+
+User = get_user_model()
+
+
+class WebsiteQueryCountTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='websites@example.com', password='securepassword123',
+                                            username='websites')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _website(self, index, pages=12, children=3):
+        """Website with completed pages, each with Q&A pairs and products (bulk: no crawl/sync signals)"""
+        website = WebsiteSource.objects.create(user=self.user, name=f'Site {index}', url=f'https://site{index}.example')
+        created = WebsitePage.objects.bulk_create(
+            WebsitePage(website=website, url=f'https://site{index}.example/{i}', title=f'Page {i}',
+                        raw_content='<p>content</p>', cleaned_content='content', processing_status='completed')
+            for i in range(pages)
+        )
+        QAPair.objects.bulk_create(
+            QAPair(page=page, user=self.user, question=f'Q{i}?', answer='A', confidence_score=i / 10,
+                   generation_status='completed' if i else 'failed')
+            for page in created for i in range(children)
+        )
+        Product.objects.bulk_create(
+            Product(user=self.user, title=f'Product {i}', description='-', source_website=website, source_page=page,
+                    is_active=bool(i))
+            for page in created for i in range(children)
+        )
+        return website, created
+
+    def _queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_website_list_costs_constant_queries(self):
+        self._website(0)
+        _, one_website = self._queries(reverse('web_knowledge:website-source-list'))
+
+        for index in range(1, 6):
+            self._website(index)
+        response, six_websites = self._queries(reverse('web_knowledge:website-source-list'))
+
+        self.assertEqual(six_websites, one_website)
+        page_titles = response.data['results'][0]['page_titles']
+        self.assertEqual(len(page_titles), 10)
+        self.assertEqual(page_titles[0]['qa_pairs_count'], 2)
+
+    def test_page_list_costs_constant_queries(self):
+        website, _ = self._website(0, pages=2)
+        _, small_page = self._queries(reverse('web_knowledge:website-page-list'), website=website.id)
+
+        website, _ = self._website(1, pages=20)
+        response, full_page = self._queries(reverse('web_knowledge:website-page-list'), website=website.id,
+                                            page_size=20)
+
+        self.assertEqual(full_page, small_page)
+        self.assertEqual(response.data['results'][0]['qa_pairs_count'], 2)
+        self.assertEqual(response.data['results'][0]['products_count'], 2)
+
+    def test_page_detail_does_not_query_per_child(self):
+        _, (few,) = self._website(0, pages=1, children=2)
+        _, (many,) = self._website(1, pages=1, children=15)
+
+        _, few_queries = self._queries(reverse('web_knowledge:website-page-detail', args=[few.id]))
+        response, many_queries = self._queries(reverse('web_knowledge:website-page-detail', args=[many.id]))
+
+        self.assertEqual(many_queries, few_queries)
+        self.assertEqual(len(response.data['qa_pairs']), 10)
+        self.assertEqual(response.data['qa_pairs'][0]['confidence_score'], 1.4)
+        self.assertEqual(len(response.data['extracted_products']), 10)
+        self.assertEqual(response.data['qa_pairs_count'], 14)
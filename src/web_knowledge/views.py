@@ -17,6 +17,7 @@ from drf_yasg import openapi
 from core.utils import setup_ai_proxy
 setup_ai_proxy()
 
+from core.search import build_search_query, normalize_search_text, text_search
 from .models import WebsiteSource, WebsitePage, QAPair, CrawlJob, Product
 from settings.models import GeneralSettings, BusinessPrompt
 from .serializers import (
@@ -27,7 +28,8 @@ from .serializers import (
     QAPairBulkCreateSerializer, WebsiteAnalyticsSerializer,
     QAFeedbackSerializer, ProductSerializer, ProductCreateSerializer,
     ProductUpdateSerializer, QAPairPartialCreateSerializer,
-    GeneratePromptSerializer, ProductCompactSerializer
+    GeneratePromptSerializer, ProductCompactSerializer,
+    annotate_page_counts
 )
 from .tasks import crawl_website_task, crawl_manual_urls_task
 
@@ -59,7 +61,11 @@ class WebsiteSourceViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter to user's websites only"""
-        return WebsiteSource.objects.filter(user=self.request.user).order_by('-created_at')
+        queryset = WebsiteSource.objects.filter(user=self.request.user).order_by('-created_at')
+        if self.action in ('list', 'retrieve'):
+            # page_titles: latest pages with Q&A counts in one extra query
+            queryset = queryset.prefetch_related(WebsiteSourceSerializer.recent_pages_prefetch())
+        return queryset
     
     def create(self, request, *args, **kwargs):
         """Create a new website source and return complete data including ID"""
@@ -268,12 +274,19 @@ class WebsiteSourceViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def pages(self, request, pk=None):
         """Get all pages for a website with complete details"""
-        from django.db import models
-        
         website = self.get_object()
         
-        # Get all pages for this website
-        pages = WebsitePage.objects.filter(website=website).prefetch_related('qa_pairs', 'extracted_products').order_by('-crawled_at')
+        # Get all pages for this website, with Q&A / product stats annotated (no per-page queries)
+        pages = annotate_page_counts(WebsitePage.objects.filter(website=website)).annotate(
+            average_qa_confidence=Avg('qa_pairs__confidence_score', filter=Q(qa_pairs__generation_status='completed')),
+            featured_qa_pairs_count=Count(
+                'qa_pairs', filter=Q(qa_pairs__generation_status='completed', qa_pairs__is_featured=True), distinct=True
+            ),
+            in_stock_products_count=Count(
+                'extracted_products', filter=Q(extracted_products__is_active=True, extracted_products__in_stock=True),
+                distinct=True
+            ),
+        ).order_by('-crawled_at')
         
         # Serialize with detailed information
         pages_data = []
@@ -296,15 +309,13 @@ class WebsiteSourceViewSet(viewsets.ModelViewSet):
                 'created_at': page.created_at,
                 'updated_at': page.updated_at,
                 'qa_pairs': {
-                    'total': page.qa_pairs.filter(generation_status='completed').count(),
-                    'average_confidence': page.qa_pairs.filter(generation_status='completed').aggregate(
-                        avg_confidence=models.Avg('confidence_score')
-                    )['avg_confidence'] or 0,
-                    'featured_count': page.qa_pairs.filter(generation_status='completed', is_featured=True).count()
+                    'total': page.completed_qa_pairs_count,
+                    'average_confidence': page.average_qa_confidence or 0,
+                    'featured_count': page.featured_qa_pairs_count
                 },
                 'products': {
-                    'total': page.extracted_products.filter(is_active=True).count(),
-                    'in_stock': page.extracted_products.filter(is_active=True, in_stock=True).count()
+                    'total': page.active_products_count,
+                    'in_stock': page.in_stock_products_count
                 }
             }
             pages_data.append(page_data)
@@ -381,9 +392,11 @@ class WebsitePageViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter to user's pages only"""
-        queryset = WebsitePage.objects.filter(
+        queryset = annotate_page_counts(WebsitePage.objects.filter(
             website__user=self.request.user
-        ).select_related('website').order_by('-crawled_at')
+        ).select_related('website').order_by('-crawled_at'))
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            queryset = queryset.prefetch_related(*WebsitePageDetailSerializer.children_prefetches())
         
         # Filter by website if specified
         website_id = self.request.query_params.get('website', None)
@@ -1087,13 +1100,18 @@ class QASearchAPIView(APIView):
         if website_id:
             queryset = queryset.filter(page__website_id=website_id)
         
-        # Search in questions and answers
+        # Search in questions and answers (full-text + trigram, see core.search)
+        search_query = build_search_query(query)
+        if search_query is None:
+            return Response([])
+        
         search_filter = (
-            Q(question__icontains=query) |
-            Q(answer__icontains=query) |
-            Q(context__icontains=query) if include_context else 
-            Q(question__icontains=query) | Q(answer__icontains=query)
+            Q(search_vector=search_query) |
+            Q(search_title__trigram_word_similar=normalize_search_text(query))
         )
+        if include_context:
+            # Source context is not part of the search document
+            search_filter |= Q(context__icontains=query)
         
         queryset = queryset.filter(search_filter).select_related(
             'page', 'page__website'
@@ -1236,13 +1254,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         # Search by title, description, or keywords
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(short_description__icontains=search) |
-                Q(category__icontains=search) |
-                Q(brand__icontains=search)
-            )
+            queryset = text_search(queryset, search)
         
         return queryset
     
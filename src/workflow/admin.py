@@ -16,6 +16,8 @@ from workflow.models import (
     WorkflowExecution,
     WorkflowActionExecution,
     TriggerEventLog,
+    TriggerEventDailySummary,
+    WorkflowExecutionDailySummary,
     ActionLog,
     # New node-based models
     WorkflowNode,
@@ -330,6 +332,22 @@ class TriggerEventLogAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(TriggerEventDailySummary)
+class TriggerEventDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ('date', 'event_type', 'user_id', 'events')
+    list_filter = ('event_type', 'date')
+    search_fields = ('event_type', 'user_id')
+    date_hierarchy = 'date'
+
+
+@admin.register(WorkflowExecutionDailySummary)
+class WorkflowExecutionDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ('date', 'workflow', 'status', 'executions', 'total_duration_seconds')
+    list_filter = ('status', 'date')
+    search_fields = ('workflow__name',)
+    date_hierarchy = 'date'
+
+
 @admin.register(ActionLog)
 class ActionLogAdmin(admin.ModelAdmin):
     list_display = ('action_link', 'success', 'duration', 'executed_at')
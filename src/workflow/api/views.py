@@ -3,6 +3,7 @@ API Views for Workflow Management
 """
 
 import logging
+from datetime import timedelta
 from typing import Dict, Any
 
 from rest_framework import viewsets, status, permissions
@@ -14,7 +15,7 @@ from drf_yasg import openapi
 from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import models
-from django.db.models import Count, Q, Avg
+from django.db.models import Count, Q, Avg, Sum
 from django.utils import timezone
 
 from workflow.models import (
@@ -610,18 +611,74 @@ class WorkflowViewSet(viewsets.ModelViewSet):
     def statistics(self, request):
         """Get workflow statistics"""
         try:
+            from core.retention import DataRetentionService
+            from message.services.stats_rollup import MessageStatsRollupService
+            from workflow.models import WorkflowExecutionDailySummary
+            
+            now = timezone.now()
+            covered_from = MessageStatsRollupService.get_covered_from()
+            if covered_from:
+                # Rolled-up hours, plus daily summaries for days archived before the first one
+                rolled_up = MessageStatsRollupService.totals(covered_from, now + timedelta(hours=1))[None]
+                today = MessageStatsRollupService.totals(
+                    now.replace(hour=0, minute=0, second=0, microsecond=0), now + timedelta(hours=1)
+                )[None]
+                archived = dict(
+                    WorkflowExecutionDailySummary.objects.filter(date__lt=covered_from.date())
+                    .order_by()
+                    .values('status')
+                    .annotate(total=Sum('executions'))
+                    .values_list('status', 'total')
+                )
+                executions = {
+                    'total': rolled_up['workflow_runs'] + sum(archived.values()),
+                    'recent': today['workflow_runs'],
+                    'completed': rolled_up['workflow_completed'] + archived.get('COMPLETED', 0),
+                    'failed': rolled_up['workflow_failures'] + archived.get('FAILED', 0),
+                }
+            else:
+                # Rollups not built yet: raw rows, purged ones from daily summaries
+                queryset = DataRetentionService.unarchived('workflow_execution', WorkflowExecution.objects.all())
+                archived = {}
+                watermark = DataRetentionService.get_watermark_datetime('workflow_execution')
+                if watermark:
+                    archived = dict(
+                        WorkflowExecutionDailySummary.objects.filter(date__lt=watermark.date())
+                        .order_by()
+                        .values('status')
+                        .annotate(total=Sum('executions'))
+                        .values_list('status', 'total')
+                    )
+                executions = {
+                    'total': queryset.count() + sum(archived.values()),
+                    'recent': WorkflowExecution.objects.filter(created_at__gte=now.date()).count(),
+                    'completed': queryset.filter(status='COMPLETED').count() + archived.get('COMPLETED', 0),
+                    'failed': queryset.filter(status='FAILED').count() + archived.get('FAILED', 0),
+                }
+            
             stats = {
                 'total_workflows': Workflow.objects.count(),
                 'active_workflows': Workflow.objects.filter(status='ACTIVE').count(),
                 'draft_workflows': Workflow.objects.filter(status='DRAFT').count(),
                 'paused_workflows': Workflow.objects.filter(status='PAUSED').count(),
-                'total_executions': WorkflowExecution.objects.count(),
-                'recent_executions': WorkflowExecution.objects.filter(
-                    created_at__gte=timezone.now().date()
-                ).count(),
-                'successful_executions': WorkflowExecution.objects.filter(status='COMPLETED').count(),
-                'failed_executions': WorkflowExecution.objects.filter(status='FAILED').count(),
+                'total_executions': executions['total'],
+                'recent_executions': executions['recent'],
+                'successful_executions': executions['completed'],
+                'failed_executions': executions['failed'],
+            }
+            
+            # Per-node custom code timing (recorded by workflow.utils.code_sandbox)
+            from workflow.utils.code_sandbox import get_execution_stats
+            custom_code_nodes = {
+                str(node_id): title
+                for node_id, title in ActionNode.objects.filter(
+                    workflow__in=self.get_queryset(), action_type='custom_code'
+                ).values_list('id', 'title')
             }
+            stats['custom_code_nodes'] = [
+                dict(node_stats, node_id=node_id, title=custom_code_nodes.get(node_id) or '')
+                for node_id, node_stats in get_execution_stats(custom_code_nodes).items()
+            ]
             
             return Response(stats)
         
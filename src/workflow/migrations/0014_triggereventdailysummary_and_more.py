@@ -0,0 +1,47 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0013_add_key_values_to_action_waiting_nodes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TriggerEventDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('event_type', models.CharField(max_length=100)),
+                ('user_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('events', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Trigger Event Daily Summary',
+                'verbose_name_plural': 'Trigger Event Daily Summaries',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date', 'event_type'], name='workflow_tr_date_104c00_idx'), models.Index(fields=['user_id', 'date'], name='workflow_tr_user_id_40ebe5_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkflowExecutionDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed'), ('TIMED_OUT', 'Timed Out'), ('WAITING', 'Waiting')], max_length=20)),
+                ('executions', models.PositiveIntegerField(default=0)),
+                ('total_duration_seconds', models.FloatField(default=0, help_text='Sum of started→completed durations')),
+                ('workflow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_execution_summaries', to='workflow.workflow')),
+            ],
+            options={
+                'verbose_name': 'Workflow Execution Daily Summary',
+                'verbose_name_plural': 'Workflow Execution Daily Summaries',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['workflow', 'date'], name='workflow_wo_workflo_c160ae_idx'), models.Index(fields=['date', 'status'], name='workflow_wo_date_816fdb_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:41
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY - executions stay writable while the index builds
+    atomic = False
+
+    dependencies = [
+        ('workflow', '0014_triggereventdailysummary_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='workflowexecution',
+            index=models.Index(fields=['created_at'], name='wf_exec_created_idx'),
+        ),
+    ]
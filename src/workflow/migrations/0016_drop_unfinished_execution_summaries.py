@@ -0,0 +1,20 @@
+# Generated by Django 5.1.5 on 2026-10-18 22:37
+
+from django.db import migrations
+
+
+def drop_unfinished_summaries(apps, schema_editor):
+    """Unfinished executions were summarized but kept; they are counted from raw rows now"""
+    WorkflowExecutionDailySummary = apps.get_model('workflow', 'WorkflowExecutionDailySummary')
+    WorkflowExecutionDailySummary.objects.filter(status__in=['PENDING', 'RUNNING', 'WAITING']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0015_workflowexecution_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_unfinished_summaries, migrations.RunPython.noop),
+    ]
@@ -810,6 +810,8 @@ class WorkflowExecution(models.Model):
             models.Index(fields=['workflow', 'status']),
             models.Index(fields=['user', 'created_at']),
             models.Index(fields=['conversation', 'created_at']),
+            # Incremental stats rollup: WHERE created_at >= watermark
+            models.Index(fields=['created_at'], name='wf_exec_created_idx'),
         ]
     
     def __str__(self):
@@ -904,6 +906,104 @@ class TriggerEventLog(models.Model):
         return f"{self.event_type} - {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
 
 
+class TriggerEventDailySummary(models.Model):
+    """
+    Daily event counts rolled up from TriggerEventLog before old rows are purged
+    (see core.retention)
+    """
+    date = models.DateField()
+    event_type = models.CharField(max_length=100)
+    user_id = models.CharField(max_length=100, null=True, blank=True)
+    events = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Trigger Event Daily Summary"
+        verbose_name_plural = "Trigger Event Daily Summaries"
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'event_type']),
+            models.Index(fields=['user_id', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.event_type}: {self.events}"
+    
+    @classmethod
+    def rollup(cls, start: datetime, end: datetime, day) -> int:
+        """Replace the summary rows of `day` with counts of events in [start, end)"""
+        from django.db.models import Count
+        
+        rows = (
+            TriggerEventLog.objects.filter(created_at__gte=start, created_at__lt=end)
+            .order_by()
+            .values('event_type', 'user_id')
+            .annotate(events=Count('id'))
+        )
+        summaries = [
+            cls(date=day, event_type=row['event_type'], user_id=row['user_id'], events=row['events'])
+            for row in rows
+        ]
+        cls.objects.filter(date=day).delete()
+        cls.objects.bulk_create(summaries, batch_size=1000)
+        return len(summaries)
+
+
+class WorkflowExecutionDailySummary(models.Model):
+    """
+    Daily counts of finished executions per workflow and status, by
+    completion day, rolled up from WorkflowExecution before old rows are
+    purged (see core.retention)
+    """
+    UNFINISHED_STATUSES = ('PENDING', 'RUNNING', 'WAITING')
+    
+    date = models.DateField()
+    workflow = models.ForeignKey(Workflow, on_delete=models.CASCADE, related_name='daily_execution_summaries')
+    status = models.CharField(max_length=20, choices=WorkflowExecution.STATUS_CHOICES)
+    executions = models.PositiveIntegerField(default=0)
+    total_duration_seconds = models.FloatField(default=0, help_text="Sum of started→completed durations")
+    
+    class Meta:
+        verbose_name = "Workflow Execution Daily Summary"
+        verbose_name_plural = "Workflow Execution Daily Summaries"
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['workflow', 'date']),
+            models.Index(fields=['date', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.workflow_id} {self.status}: {self.executions}"
+    
+    @classmethod
+    def rollup(cls, start: datetime, end: datetime, day) -> int:
+        """Replace the summary rows of `day` with executions finished in [start, end)"""
+        from django.db.models import Count, F, Sum
+        
+        rows = (
+            WorkflowExecution.objects.filter(completed_at__gte=start, completed_at__lt=end)
+            .exclude(status__in=cls.UNFINISHED_STATUSES)
+            .order_by()
+            .values('workflow_id', 'status')
+            .annotate(
+                executions=Count('id'),
+                total_duration=Sum(F('completed_at') - F('started_at')),
+            )
+        )
+        summaries = [
+            cls(
+                date=day,
+                workflow_id=row['workflow_id'],
+                status=row['status'],
+                executions=row['executions'],
+                total_duration_seconds=row['total_duration'].total_seconds() if row['total_duration'] else 0,
+            )
+            for row in rows
+        ]
+        cls.objects.filter(date=day).delete()
+        cls.objects.bulk_create(summaries, batch_size=1000)
+        return len(summaries)
+
+
 class ActionLog(models.Model):
     """
     Detailed logs for action executions
@@ -0,0 +1,307 @@
+"""
+Workflow execution state store
+
+Every step of a node-based execution used to UPDATE its WorkflowExecution row:
+context then status when a node starts waiting, status + context again on each
+resume / delay / timeout, then a full-row save on completion. Busy tenants
+rewrote the same hot rows many times per conversation.
+
+In-flight state (status + context_data) now lives in a Redis hash per
+execution and is changed by a Lua script (compare-and-set on status, version
+bump), so two workers can never resume the same waiting node twice.
+
+Checkpoints to Postgres:
+✅ On completion / failure (one narrow UPDATE, Redis state dropped)
+✅ When an execution starts or stops waiting - WAITING is the status every
+   router (signals, process_event, duplicate checks) filters rows on, so
+   entering WAITING and claiming a waiting execution (-> RUNNING) are written
+   through together with the context. Context changes in between stay in Redis.
+✅ Waits longer than WORKFLOW_STATE_WAIT_CHECKPOINT_SECONDS
+✅ Any state dirty for longer than WORKFLOW_STATE_CHECKPOINT_INTERVAL
+   (checkpoint_workflow_execution_state beat task)
+
+Rows read from Postgres are overlaid with the Redis state via hydrate(). If
+Redis loses the state (restart, eviction) the row is the last checkpoint and
+the execution replays from there. If Redis is unreachable every call falls
+back to writing the row directly, as before.
+
+Usage:
+    ExecutionStateStore.hydrate(execution)
+    if ExecutionStateStore.transition(execution, 'RUNNING', expected='WAITING',
+                                      remove_keys=('waiting_node_id',)):
+        ...
+    ExecutionStateStore.finish(execution, 'COMPLETED', result_data={...})
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionStateStore:
+    """Redis-backed in-flight state for WorkflowExecution rows"""
+
+    KEY = 'wf_exec_state:{execution_id}'
+    DIRTY_KEY = 'wf_exec_state:dirty'   # zset: execution id -> first unflushed change (epoch)
+
+    TERMINAL_STATUSES = ('COMPLETED', 'FAILED', 'TIMED_OUT', 'CANCELLED')
+
+    # KEYS: state hash, dirty zset
+    # ARGV: expected status ('' = any), new status, context JSON, now, ttl,
+    #       row status (used when the hash is missing), execution id
+    # Returns {1, version, db_status} or {0, current status}
+    TRANSITION_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'status')
+if not current then
+    current = ARGV[6]
+    redis.call('HSET', KEYS[1], 'db_status', ARGV[6])
+end
+if ARGV[1] ~= '' and current ~= ARGV[1] then
+    return {0, current}
+end
+local version = redis.call('HINCRBY', KEYS[1], 'version', 1)
+redis.call('HSET', KEYS[1], 'status', ARGV[2], 'context', ARGV[3], 'updated_at', ARGV[4])
+if ARGV[2] == 'WAITING' and current ~= 'WAITING' then
+    redis.call('HSET', KEYS[1], 'waiting_since', ARGV[4])
+end
+redis.call('ZADD', KEYS[2], 'NX', ARGV[4], ARGV[7])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return {1, version, redis.call('HGET', KEYS[1], 'db_status')}
+"""
+
+    # KEYS: state hash, dirty zset
+    # ARGV: version that was written, status that was written, execution id
+    # Only clears the dirty mark if nothing changed while the row was written
+    MARK_CLEAN_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('ZREM', KEYS[2], ARGV[3])
+    return 0
+end
+redis.call('HSET', KEYS[1], 'db_status', ARGV[2])
+if redis.call('HGET', KEYS[1], 'version') == ARGV[1] then
+    redis.call('ZREM', KEYS[2], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+    _client = None
+    _transition = None
+    _mark_clean = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_client(cls):
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    import redis
+                    location = settings.CACHES['default']['LOCATION']
+                    client = redis.Redis.from_url(location, socket_timeout=2, decode_responses=True)
+                    cls._transition = client.register_script(cls.TRANSITION_SCRIPT)
+                    cls._mark_clean = client.register_script(cls.MARK_CLEAN_SCRIPT)
+                    cls._client = client
+        return cls._client
+
+    @classmethod
+    def _key(cls, execution_id) -> str:
+        return cls.KEY.format(execution_id=execution_id)
+
+    # ==========================================
+    #  Reads
+    # ==========================================
+
+    @classmethod
+    def get_state(cls, execution_id) -> Optional[Dict[str, Any]]:
+        """In-flight state from Redis, or None (row is authoritative)"""
+        try:
+            raw = cls._get_client().hgetall(cls._key(execution_id))
+        except Exception as e:
+            logger.warning(f"⚠️ Execution state store unavailable, using database row: {e}")
+            return None
+        if not raw or 'status' not in raw:
+            return None
+        return {
+            'status': raw['status'],
+            'context': json.loads(raw.get('context') or '{}'),
+            'version': int(raw.get('version') or 0),
+            'db_status': raw.get('db_status'),
+            'waiting_since': float(raw['waiting_since']) if raw.get('waiting_since') else None,
+        }
+
+    @classmethod
+    def hydrate(cls, execution):
+        """
+        Overlay the in-flight status/context on a row loaded from Postgres
+
+        Terminal rows win: leftover state for them is discarded.
+        """
+        if execution is None:
+            return execution
+        if execution.status in cls.TERMINAL_STATUSES:
+            cls.discard(execution.id)
+            return execution
+        state = cls.get_state(execution.id)
+        if state:
+            execution.status = state['status']
+            execution.context_data = state['context']
+        return execution
+
+    # ==========================================
+    #  Transitions
+    # ==========================================
+
+    @classmethod
+    def transition(cls, execution, status: str, context_updates: Optional[Dict[str, Any]] = None,
+                   remove_keys: Iterable[str] = (), expected: Optional[str] = None) -> bool:
+        """
+        Atomically move an execution to `status`, applying context changes
+
+        Args:
+            execution: WorkflowExecution (updated in place on success)
+            status: New status
+            context_updates: Keys merged into context_data
+            remove_keys: Keys dropped from context_data
+            expected: Only transition if the current status is this one
+
+        Returns:
+            False if `expected` did not match (another worker got there first)
+        """
+        context = dict(execution.context_data or {})
+        if context_updates:
+            context.update(context_updates)
+        for key in remove_keys:
+            context.pop(key, None)
+
+        try:
+            payload = json.dumps(context, cls=DjangoJSONEncoder)
+            cls._get_client()
+            reply = cls._transition(
+                keys=[cls._key(execution.id), cls.DIRTY_KEY],
+                args=[expected or '', status, payload, time.time(), settings.WORKFLOW_STATE_TTL,
+                      execution.status, execution.id],
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Execution state store unavailable, writing execution #{execution.id} directly: {e}")
+            return cls._write_through(execution, status, context, expected)
+
+        if not int(reply[0]):
+            logger.info(f"⏭️ Execution #{execution.id} is {reply[1]}, not {expected}; transition to {status} skipped")
+            execution.status = reply[1]
+            return False
+
+        execution.status = status
+        execution.context_data = json.loads(payload)
+        version, db_status = int(reply[1]), reply[2]
+
+        if (status == 'WAITING') != (db_status == 'WAITING'):
+            # Routers filter rows on WAITING - a waiting row must say so, a claimed one must not
+            cls.checkpoint(execution.id, state={'status': status, 'context': execution.context_data,
+                                                'version': version})
+        return True
+
+    @classmethod
+    def _write_through(cls, execution, status, context, expected) -> bool:
+        """Pre-store behaviour: write the row (re-reading status for the CAS)"""
+        from workflow.models import WorkflowExecution
+
+        queryset = WorkflowExecution.objects.filter(id=execution.id)
+        if expected:
+            queryset = queryset.filter(status=expected)
+        if not queryset.update(status=status, context_data=context):
+            if expected:
+                return False
+        execution.status = status
+        execution.context_data = context
+        return True
+
+    @classmethod
+    def finish(cls, execution, status: str, **fields):
+        """
+        Write the final state of an execution and drop its in-flight state
+
+        Args:
+            status: COMPLETED / FAILED / ...
+            fields: result_data, error_message, error_details, ...
+        """
+        execution.status = status
+        execution.completed_at = fields.pop('completed_at', None) or execution.completed_at or timezone.now()
+        for name, value in fields.items():
+            setattr(execution, name, value)
+        execution.save(update_fields=['status', 'context_data', 'completed_at', *fields.keys()])
+        cls.discard(execution.id)
+
+    @classmethod
+    def discard(cls, execution_id):
+        try:
+            client = cls._get_client()
+            pipe = client.pipeline()
+            pipe.delete(cls._key(execution_id))
+            pipe.zrem(cls.DIRTY_KEY, str(execution_id))
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"Could not discard state of execution #{execution_id}: {e}")
+
+    # ==========================================
+    #  Checkpoints
+    # ==========================================
+
+    @classmethod
+    def checkpoint(cls, execution_id, state: Optional[Dict[str, Any]] = None) -> bool:
+        """Write the in-flight status/context to the row (one UPDATE)"""
+        from workflow.models import WorkflowExecution
+
+        state = state or cls.get_state(execution_id)
+        if not state:
+            return False
+
+        updated = WorkflowExecution.objects.filter(id=execution_id).exclude(
+            status__in=cls.TERMINAL_STATUSES
+        ).update(status=state['status'], context_data=state['context'])
+
+        try:
+            cls._get_client()
+            if updated:
+                cls._mark_clean(keys=[cls._key(execution_id), cls.DIRTY_KEY],
+                                args=[state['version'], state['status'], execution_id])
+            else:
+                # Row finished (or was deleted) elsewhere - nothing left to flush
+                cls.discard(execution_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not mark execution #{execution_id} checkpointed: {e}")
+        return bool(updated)
+
+    @classmethod
+    def checkpoint_due(cls, limit: int = 500) -> Dict[str, int]:
+        """
+        Flush states dirty for longer than WORKFLOW_STATE_CHECKPOINT_INTERVAL
+        and waits older than WORKFLOW_STATE_WAIT_CHECKPOINT_SECONDS
+        """
+        now = time.time()
+        interval = settings.WORKFLOW_STATE_CHECKPOINT_INTERVAL
+        wait_threshold = settings.WORKFLOW_STATE_WAIT_CHECKPOINT_SECONDS
+        results = {'checked': 0, 'checkpointed': 0, 'expired': 0}
+
+        candidates = cls._get_client().zrangebyscore(
+            cls.DIRTY_KEY, '-inf', now - min(interval, wait_threshold), start=0, num=limit, withscores=True
+        )
+        for execution_id, dirty_since in candidates:
+            results['checked'] += 1
+            state = cls.get_state(execution_id)
+            if not state:
+                cls.discard(execution_id)
+                results['expired'] += 1
+                continue
+            long_wait = state['status'] == 'WAITING' and state['waiting_since'] and \
+                now - state['waiting_since'] >= wait_threshold
+            if now - dirty_since >= interval or long_wait:
+                if cls.checkpoint(execution_id, state=state):
+                    results['checkpointed'] += 1
+        return results
@@ -25,6 +25,7 @@ from workflow.models import (
     NodeConnection,
     UserResponse
 )
+from workflow.services.execution_state import ExecutionStateStore
 from workflow.utils.condition_evaluator import (
     evaluate_conditions,
     evaluate_condition_group,
@@ -140,7 +141,8 @@ class NodeBasedWorkflowExecutionService:
                     status='WAITING'
                 ).first()
                 
-                if existing_waiting:
+                # Claims write RUNNING to the row; hydrate covers a claim still in flight
+                if existing_waiting and ExecutionStateStore.hydrate(existing_waiting).status == 'WAITING':
                     logger.warning(f"⚠️ Workflow '{workflow.name}' already has a WAITING execution {existing_waiting.id} for conversation {conversation_id} - skipping duplicate execution")
                     return existing_waiting
             
@@ -165,10 +167,7 @@ class NodeBasedWorkflowExecutionService:
                     start_nodes = list(workflow.nodes.filter(node_type='when', is_active=True))
                 
                 if not start_nodes:
-                    execution.status = 'COMPLETED'
-                    execution.completed_at = timezone.now()
-                    execution.result_data = {'message': 'No starting nodes found'}
-                    execution.save()
+                    ExecutionStateStore.finish(execution, 'COMPLETED', result_data={'message': 'No starting nodes found'})
                     return execution
                 
                 # Execute workflow starting from trigger nodes
@@ -200,10 +199,7 @@ class NodeBasedWorkflowExecutionService:
                 
                 # Update execution status
                 if execution.status == 'RUNNING':
-                    execution.status = 'COMPLETED'
-                    execution.completed_at = timezone.now()
-                    execution.result_data = {'message': 'Workflow completed successfully'}
-                    execution.save()
+                    ExecutionStateStore.finish(execution, 'COMPLETED', result_data={'message': 'Workflow completed successfully'})
                     
                     # Re-enable AI now that workflow is truly completed
                     try:
@@ -220,11 +216,11 @@ class NodeBasedWorkflowExecutionService:
                 return execution
             
             except Exception as e:
-                execution.status = 'FAILED'
-                execution.error_message = str(e)
-                execution.error_details = {'exception_type': type(e).__name__}
-                execution.completed_at = timezone.now()
-                execution.save()
+                ExecutionStateStore.finish(
+                    execution, 'FAILED',
+                    error_message=str(e),
+                    error_details={'exception_type': type(e).__name__}
+                )
                 logger.error(f"Node-based workflow execution #{execution.id} failed: {e}")
                 raise
         
@@ -550,16 +546,8 @@ class NodeBasedWorkflowExecutionService:
                 
                 # If waiting for response, pause execution
                 if result.waiting_for_response:
-                    # Persist waiting state details into execution context
-                    try:
-                        execution.context_data = execution.context_data or {}
-                        if result.data:
-                            execution.context_data.update(result.data)
-                        execution.save(update_fields=['context_data'])
-                    except Exception as se:
-                        logger.warning(f"Failed to persist waiting state: {se}")
-                    execution.status = 'WAITING'
-                    execution.save(update_fields=['status'])
+                    # Persist waiting state details and status in one transition
+                    ExecutionStateStore.transition(execution, 'WAITING', context_updates=result.data)
                     return
                 
                 # If node failed and is required, stop execution
@@ -611,8 +599,6 @@ class NodeBasedWorkflowExecutionService:
                         from message.serializers import WSMessageSerializer
                         from channels.layers import get_channel_layer
                         from asgiref.sync import async_to_sync
-                        from message.services.telegram_service import TelegramService
-                        from message.services.instagram_service import InstagramService
                         conversation_id = context.get('event', {}).get('conversation_id')
                         if conversation_id:
                             # Mark previous customer messages answered to prevent AI
@@ -623,58 +609,14 @@ class NodeBasedWorkflowExecutionService:
                             ).update(is_answered=True)
                             # Try to load last created marketing/support message for serialization
                             msg = Message.objects.filter(conversation_id=conversation_id).order_by('-created_at').first()
-                            # Send to external channel if possible
+                            # Queue for external channel delivery (rate-limited, retried by outbound worker)
                             try:
                                 if msg:
-                                    conversation = Conversation.objects.select_related('customer').get(id=conversation_id)
-                                    customer = conversation.customer
-                                    if getattr(customer, 'source', '') == 'telegram':
-                                        svc = TelegramService.get_service_for_conversation(conversation)
-                                        if svc:
-                                            svc.send_message_to_customer(customer, msg.content)
-                                    elif getattr(customer, 'source', '') == 'instagram':
-                                        svc = InstagramService.get_service_for_conversation(conversation)
-                                        if svc:
-                                            logger.info(f"📤 [Node] Sending Instagram message...")
-                                            logger.info(f"   Conversation: {conversation.id}")
-                                            logger.info(f"   Message ID: {msg.id}")
-                                            logger.info(f"   Content (first 80 chars): {msg.content[:80]}...")
-                                            logger.info(f"   Content length: {len(msg.content)}")
-                                            
-                                            send_res = svc.send_message_to_customer(customer, msg.content)
-                                            
-                                            if send_res.get('success'):
-                                                logger.info(f"✅ [Node] Instagram message sent successfully")
-                                                logger.info(f"   Instagram message_id: {send_res.get('message_id')}")
-                                            else:
-                                                logger.warning(f"❌ [Node] Instagram message send failed: {send_res.get('error')}")
-                                            
-                                            # ✅ Mark message as sent to prevent webhook duplicate
-                                            if send_res.get('success'):
-                                                from django.core.cache import cache
-                                                import hashlib
-                                                
-                                                message_hash = hashlib.md5(
-                                                    f"{conversation.id}:{msg.content}".encode()
-                                                ).hexdigest()
-                                                cache_key = f"instagram_sent_msg_{message_hash}"
-                                                cache.set(cache_key, True, timeout=60)
-                                                logger.info(f"📝 [Node] Cached sent message to prevent webhook duplicate")
-                                                logger.info(f"   Cache key: {cache_key}")
-                                                logger.info(f"   Cache timeout: 60 seconds")
-                                                
-                                                # Update message metadata
-                                                if send_res.get('message_id') and msg:
-                                                    msg.metadata = msg.metadata or {}
-                                                    msg.metadata['external_message_id'] = str(send_res.get('message_id'))
-                                                    msg.metadata['sent_from_app'] = True
-                                                    msg.save(update_fields=['metadata'])
-                                                    logger.info(f"📝 [Node] Stored Instagram message_id in metadata")
-                                                    logger.info(f"   Message ID: {msg.id}")
-                                                    logger.info(f"   External message_id: {send_res.get('message_id')}")
-                                                    logger.info(f"   Metadata: {msg.metadata}")
+                                    from message.services.outbound_queue import OutboundMessageQueue
+                                    if OutboundMessageQueue.enqueue(msg):
+                                        logger.info(f"📮 [Node] Message {msg.id} queued for external delivery")
                             except Exception as se:
-                                logger.warning(f"Failed to send external channel message (node-based): {se}")
+                                logger.warning(f"Failed to queue external channel message (node-based): {se}")
                             channel_layer = get_channel_layer()
                             if channel_layer and msg:
                                 async_to_sync(channel_layer.group_send)(
@@ -830,8 +772,6 @@ class NodeBasedWorkflowExecutionService:
                 from message.serializers import WSMessageSerializer
                 from channels.layers import get_channel_layer
                 from asgiref.sync import async_to_sync
-                from message.services.telegram_service import TelegramService
-                from message.services.instagram_service import InstagramService
                 conversation_id = context.get('event', {}).get('conversation_id')
                 if conversation_id:
                     # Mark previous customer messages answered to prevent AI auto-reply
@@ -856,33 +796,18 @@ class NodeBasedWorkflowExecutionService:
                         logger.warning(f"🕐 [WaitingNode {waiting_node.id}] Error finding message for broadcast: {e}")
                         msg = Message.objects.filter(conversation_id=conversation_id).order_by('-created_at').first()
 
-                    # Ensure external channel send as a fallback (usually already done in _send_customer_message)
+                    # Queue external channel delivery (rate-limited, retried by outbound worker)
                     try:
                         if msg:
-                            conversation = Conversation.objects.select_related('customer').get(id=conversation_id)
-                            customer = conversation.customer
-                            customer_source = getattr(customer, 'source', '')
-                            logger.info(f"🕐 [WaitingNode {waiting_node.id}] Sending to external channel: {customer_source}")
-                            if customer_source == 'telegram':
-                                svc = TelegramService.get_service_for_conversation(conversation)
-                                if svc:
-                                    svc.send_message_to_customer(customer, msg.content)
-                                    logger.info(f"🕐 [WaitingNode {waiting_node.id}] ✅ Sent via Telegram")
-                                else:
-                                    logger.warning(f"🕐 [WaitingNode {waiting_node.id}] ❌ No Telegram service available")
-                            elif customer_source == 'instagram':
-                                svc = InstagramService.get_service_for_conversation(conversation)
-                                if svc:
-                                    svc.send_message_to_customer(customer, msg.content)
-                                    logger.info(f"🕐 [WaitingNode {waiting_node.id}] ✅ Sent via Instagram")
-                                else:
-                                    logger.warning(f"🕐 [WaitingNode {waiting_node.id}] ❌ No Instagram service available")
+                            from message.services.outbound_queue import OutboundMessageQueue
+                            if OutboundMessageQueue.enqueue(msg):
+                                logger.info(f"🕐 [WaitingNode {waiting_node.id}] 📮 Message {msg.id} queued for external delivery")
                             else:
-                                logger.info(f"🕐 [WaitingNode {waiting_node.id}] No external channel needed for source: {customer_source}")
+                                logger.info(f"🕐 [WaitingNode {waiting_node.id}] No external channel needed for this conversation")
                         else:
                             logger.warning(f"🕐 [WaitingNode {waiting_node.id}] No message found for external channel send")
                     except Exception as se:
-                        logger.warning(f"🕐 [WaitingNode {waiting_node.id}] Failed to send external channel message: {se}")
+                        logger.warning(f"🕐 [WaitingNode {waiting_node.id}] Failed to queue external channel message: {se}")
 
                     # Broadcast via websockets
                     try:
@@ -1120,16 +1045,13 @@ class NodeBasedWorkflowExecutionService:
             
             # Broadcast conversation update to WebSocket clients
             try:
-                from channels.layers import get_channel_layer
-                from asgiref.sync import async_to_sync
+                from message.services.notification_coalescer import group_send
                 user_group = f"user_{conversation.user.id}_conversations"
-                channel_layer = get_channel_layer()
-                if channel_layer:
-                    async_to_sync(channel_layer.group_send)(user_group, {
-                        'type': 'conversation_updated',
-                        'conversation_id': str(conversation_id)
-                    })
-                    logger.info(f"✓ Broadcast sent to user group: {user_group}")
+                group_send(user_group, {
+                    'type': 'conversation_updated',
+                    'conversation_id': str(conversation_id)
+                })
+                logger.info(f"✓ Broadcast queued for user group: {user_group}")
             except Exception as broadcast_err:
                 logger.warning(f"⚠ Failed to broadcast conversation redirect for {conversation_id}: {broadcast_err}")
                 # Continue execution - broadcast failure is not critical
@@ -1258,23 +1180,19 @@ class NodeBasedWorkflowExecutionService:
             if not code:
                 return NodeExecutionResult(success=False, error="Custom code is required")
             
-            # Execute custom code in restricted environment
-            safe_globals = {
-                '__builtins__': {
-                    'len': len, 'str': str, 'int': int, 'float': float, 'bool': bool,
-                    'list': list, 'dict': dict, 'tuple': tuple, 'set': set,
-                    'abs': abs, 'min': min, 'max': max, 'sum': sum, 'round': round,
-                    'isinstance': isinstance, 'type': type, 'hasattr': hasattr, 'getattr': getattr,
-                },
-                'context': context,
-            }
-            
-            safe_locals = {'result': {}}
-            exec(code, safe_globals, safe_locals)
+            # Compiled once per source, run in the sandbox pool (time/memory limited)
+            from workflow.utils.code_sandbox import run_custom_code
+            result = run_custom_code(
+                code,
+                context,
+                default={},
+                node_id=action_node.id,
+                kind='action'
+            )
             
             return NodeExecutionResult(
                 success=True,
-                data=safe_locals.get('result', {})
+                data=result
             )
         
         except Exception as e:
@@ -1520,6 +1438,7 @@ class NodeBasedWorkflowExecutionService:
                 cache = None
 
             # Ignore if execution is not actually waiting
+            ExecutionStateStore.hydrate(execution)
             if getattr(execution, 'status', '') != 'WAITING':
                 logger.info(f"Execution {execution.id} is not WAITING; ignoring user response")
                 return
@@ -1540,7 +1459,8 @@ class NodeBasedWorkflowExecutionService:
                         status='WAITING'
                     ).order_by('-created_at').first()
                     
-                    if most_recent_waiting and most_recent_waiting.id != execution.id:
+                    if most_recent_waiting and most_recent_waiting.id != execution.id and \
+                            ExecutionStateStore.hydrate(most_recent_waiting).status == 'WAITING':
                         logger.warning(f"Execution {execution.id} is not the most recent WAITING execution (most recent: {most_recent_waiting.id}); ignoring")
                         return
             except Exception as e:
@@ -1605,15 +1525,10 @@ class NodeBasedWorkflowExecutionService:
                     pass
 
                 # Resume execution following skip connections
-                execution.status = 'RUNNING'
                 # Clear waiting node marker so AI can resume and guards pass
-                try:
-                    execution.context_data = execution.context_data or {}
-                    if 'waiting_node_id' in execution.context_data:
-                        del execution.context_data['waiting_node_id']
-                except Exception:
-                    pass
-                execution.save(update_fields=['status', 'context_data'])
+                if not ExecutionStateStore.transition(execution, 'RUNNING', remove_keys=('waiting_node_id',),
+                                                      expected='WAITING'):
+                    return
                 # Mark completion (idempotency flags)
                 try:
                     if cache is not None:
@@ -1722,14 +1637,9 @@ class NodeBasedWorkflowExecutionService:
                             logger.info(f"[WaitingNode {waiting_node_id}] AI re-enabled for conversation {conversation_id} (max errors exceeded)")
                     except Exception:
                         pass
-                    execution.status = 'RUNNING'
-                    try:
-                        execution.context_data = execution.context_data or {}
-                        if 'waiting_node_id' in execution.context_data:
-                            del execution.context_data['waiting_node_id']
-                    except Exception:
-                        pass
-                    execution.save(update_fields=['status', 'context_data'])
+                    if not ExecutionStateStore.transition(execution, 'RUNNING', remove_keys=('waiting_node_id',),
+                                                          expected='WAITING'):
+                        return
                     # Mark completion (idempotency flags) - execution level only
                     try:
                         if cache is not None:
@@ -1781,10 +1691,10 @@ class NodeBasedWorkflowExecutionService:
                         logger.info(f"📥 [WaitingResponse {waiting_node_id}] No next nodes found after failure - marking workflow as completed")
                         # Mark execution as completed only if no next nodes to execute
                         if execution.status == 'RUNNING':
-                            execution.status = 'COMPLETED'
-                            execution.completed_at = timezone.now()
-                            execution.result_data = {'message': 'Workflow completed after waiting node failure'}
-                            execution.save()
+                            ExecutionStateStore.finish(
+                                execution, 'COMPLETED',
+                                result_data={'message': 'Workflow completed after waiting node failure'}
+                            )
                             logger.info(f"✅ Marked execution #{execution.id} as COMPLETED after waiting node failure")
                             
                             # Re-enable AI now that workflow is truly completed
@@ -1825,8 +1735,6 @@ class NodeBasedWorkflowExecutionService:
                         from message.serializers import WSMessageSerializer
                         from channels.layers import get_channel_layer
                         from asgiref.sync import async_to_sync
-                        from message.services.telegram_service import TelegramService
-                        from message.services.instagram_service import InstagramService
                         conversation_id = context.get('event', {}).get('conversation_id')
                         if conversation_id:
                             # Mark previous unanswered customer messages answered
@@ -1847,58 +1755,14 @@ class NodeBasedWorkflowExecutionService:
                             except Exception:
                                 msg = Message.objects.filter(conversation_id=conversation_id).order_by('-created_at').first()
 
-                            # External channel fallback (if service available)
+                            # Queue for external channel delivery (rate-limited, retried by outbound worker)
                             try:
                                 if msg:
-                                    conversation = Conversation.objects.select_related('customer').get(id=conversation_id)
-                                    customer = conversation.customer
-                                    if getattr(customer, 'source', '') == 'telegram':
-                                        svc = TelegramService.get_service_for_conversation(conversation)
-                                        if svc:
-                                            svc.send_message_to_customer(customer, msg.content)
-                                    elif getattr(customer, 'source', '') == 'instagram':
-                                        svc = InstagramService.get_service_for_conversation(conversation)
-                                        if svc:
-                                            logger.info(f"📤 [Node] Sending Instagram message...")
-                                            logger.info(f"   Conversation: {conversation.id}")
-                                            logger.info(f"   Message ID: {msg.id}")
-                                            logger.info(f"   Content (first 80 chars): {msg.content[:80]}...")
-                                            logger.info(f"   Content length: {len(msg.content)}")
-                                            
-                                            send_res = svc.send_message_to_customer(customer, msg.content)
-                                            
-                                            if send_res.get('success'):
-                                                logger.info(f"✅ [Node] Instagram message sent successfully")
-                                                logger.info(f"   Instagram message_id: {send_res.get('message_id')}")
-                                            else:
-                                                logger.warning(f"❌ [Node] Instagram message send failed: {send_res.get('error')}")
-                                            
-                                            # ✅ Mark message as sent to prevent webhook duplicate
-                                            if send_res.get('success'):
-                                                from django.core.cache import cache
-                                                import hashlib
-                                                
-                                                message_hash = hashlib.md5(
-                                                    f"{conversation.id}:{msg.content}".encode()
-                                                ).hexdigest()
-                                                cache_key = f"instagram_sent_msg_{message_hash}"
-                                                cache.set(cache_key, True, timeout=60)
-                                                logger.info(f"📝 [Node] Cached sent message to prevent webhook duplicate")
-                                                logger.info(f"   Cache key: {cache_key}")
-                                                logger.info(f"   Cache timeout: 60 seconds")
-                                                
-                                                # Update message metadata
-                                                if send_res.get('message_id') and msg:
-                                                    msg.metadata = msg.metadata or {}
-                                                    msg.metadata['external_message_id'] = str(send_res.get('message_id'))
-                                                    msg.metadata['sent_from_app'] = True
-                                                    msg.save(update_fields=['metadata'])
-                                                    logger.info(f"📝 [Node] Stored Instagram message_id in metadata")
-                                                    logger.info(f"   Message ID: {msg.id}")
-                                                    logger.info(f"   External message_id: {send_res.get('message_id')}")
-                                                    logger.info(f"   Metadata: {msg.metadata}")
+                                    from message.services.outbound_queue import OutboundMessageQueue
+                                    if OutboundMessageQueue.enqueue(msg):
+                                        logger.info(f"📮 [Node] Message {msg.id} queued for external delivery")
                             except Exception as se:
-                                logger.warning(f"Failed to send external channel retry message (waiting-node): {se}")
+                                logger.warning(f"Failed to queue external channel retry message (waiting-node): {se}")
 
                             # Websocket broadcast
                             channel_layer = get_channel_layer()
@@ -2010,15 +1874,10 @@ class NodeBasedWorkflowExecutionService:
                 pass
             
             # Continue workflow execution from this node
-            execution.status = 'RUNNING'
             # Clear waiting node marker to avoid re-processing
-            try:
-                execution.context_data = execution.context_data or {}
-                if 'waiting_node_id' in execution.context_data:
-                    del execution.context_data['waiting_node_id']
-            except Exception:
-                pass
-            execution.save(update_fields=['status', 'context_data'])
+            if not ExecutionStateStore.transition(execution, 'RUNNING', remove_keys=('waiting_node_id',),
+                                                  expected='WAITING'):
+                return
             
             # Get next nodes and continue execution
             logger.info(f"📥 [WaitingResponse {waiting_node_id}] Getting next nodes after successful response...")
@@ -2051,10 +1910,7 @@ class NodeBasedWorkflowExecutionService:
 
             # Mark execution as completed if all nodes finished
             if execution.status == 'RUNNING':
-                execution.status = 'COMPLETED'
-                execution.completed_at = timezone.now()
-                execution.result_data = {'message': 'Workflow completed after waiting node'}
-                execution.save()
+                ExecutionStateStore.finish(execution, 'COMPLETED', result_data={'message': 'Workflow completed after waiting node'})
                 logger.info(f"✅ Marked execution #{execution.id} as COMPLETED after waiting node completion")
                 
                 # Re-enable AI now that workflow is truly completed
@@ -2080,9 +1936,7 @@ class NodeBasedWorkflowExecutionService:
         except Exception as e:
             logger.error(f"📥 [WaitingResponse {waiting_node_id}] ❌ Error processing user response: {e}")
             logger.info(f"📥 [WaitingResponse {waiting_node_id}] ===============================")
-            execution.status = 'FAILED'
-            execution.error_message = str(e)
-            execution.save()
+            ExecutionStateStore.finish(execution, 'FAILED', error_message=str(e))
         finally:
             # Release lock in any case if taken
             try:
@@ -5,7 +5,7 @@ Handles trigger processing, event filtering, and workflow discovery.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 
 from django.utils import timezone
@@ -825,6 +825,47 @@ class TriggerService:
         logger.info(f"Registered {created_count} new event types")
         return created_count
     
+    @staticmethod
+    def get_tag_listeners(owner_id: int, event_type: str) -> Tuple[bool, Optional[Set[str]]]:
+        """
+        Which tag changes of an owner's customers can start a workflow.
+        
+        Args:
+            owner_id: Workflow owner (User) ID
+            event_type: 'TAG_ADDED' or 'TAG_REMOVED'
+        
+        Returns:
+            (listening, tag_names): listening is False when no active workflow
+            handles the event; tag_names is None when any tag can match,
+            otherwise the normalized (lowercase) tag names that can match
+        """
+        # Old-style triggers: filters are evaluated per event, so any tag can match
+        has_triggers = Trigger.objects.filter(
+            trigger_type=event_type,
+            is_active=True,
+            workflow_associations__is_active=True,
+            workflow_associations__workflow__status='ACTIVE',
+            workflow_associations__workflow__created_by_id=owner_id
+        ).exists()
+        if has_triggers:
+            return True, None
+        
+        if event_type != 'TAG_ADDED':
+            return False, None
+        
+        from workflow.models import WhenNode
+        when_tags = list(WhenNode.objects.filter(
+            when_type='add_tag',
+            is_active=True,
+            workflow__status='ACTIVE',
+            workflow__created_by_id=owner_id
+        ).values_list('tags', flat=True))
+        if not when_tags:
+            return False, None
+        if any(not tags for tags in when_tags):
+            return True, None
+        return True, {str(tag).lower().strip() for tags in when_tags for tag in tags if tag}
+    
     @staticmethod
     def create_event_log(
         event_type: str,
@@ -874,15 +915,38 @@ class TriggerService:
             from django.db.models import Count
             from datetime import timedelta
             
+            from django.db.models import Sum
+            from core.retention import DataRetentionService
+            from workflow.models import TriggerEventDailySummary
+            
             cutoff_date = timezone.now() - timedelta(days=days)
             
+            # Days before the retention watermark only exist as daily summaries
+            event_counts = {}
+            live_events = TriggerEventLog.objects.filter(created_at__gte=cutoff_date)
+            watermark = DataRetentionService.get_watermark_datetime('trigger_event_log')
+            if watermark and cutoff_date < watermark:
+                live_events = live_events.filter(created_at__gte=watermark)
+                archived = (
+                    TriggerEventDailySummary.objects.filter(
+                        date__gte=timezone.localtime(cutoff_date).date(),
+                        date__lt=timezone.localtime(watermark).date()
+                    )
+                    .order_by()
+                    .values('event_type')
+                    .annotate(count=Sum('events'))
+                )
+                for row in archived:
+                    event_counts[row['event_type']] = row['count']
+            
+            for row in live_events.order_by().values('event_type').annotate(count=Count('id')):
+                event_counts[row['event_type']] = event_counts.get(row['event_type'], 0) + row['count']
+            
             # Event type statistics
-            event_stats = list(
-                TriggerEventLog.objects.filter(created_at__gte=cutoff_date)
-                .values('event_type')
-                .annotate(count=Count('id'))
-                .order_by('-count')
-            )
+            event_stats = [
+                {'event_type': event_type, 'count': count}
+                for event_type, count in sorted(event_counts.items(), key=lambda item: -item[1])
+            ]
             
             # Trigger performance
             trigger_stats = list(
@@ -894,7 +958,7 @@ class TriggerService:
                 .values('id', 'name', 'trigger_type', 'associations_count', 'active_associations_count')
             )
             
-            total_events = TriggerEventLog.objects.filter(created_at__gte=cutoff_date).count()
+            total_events = sum(event_counts.values())
             
             return {
                 'period_days': days,
@@ -435,9 +435,10 @@ class WorkflowExecutionService:
                         'external_send_result': {}
                     }
                     async_to_sync(channel_layer.group_send)(group_name, payload)
-                    # Also notify conversation list to refresh
+                    # Also notify conversation list to refresh (coalesced per conversation)
+                    from message.services.notification_coalescer import group_send
                     user_group = f"user_{conversation.user.id}_conversations"
-                    async_to_sync(channel_layer.group_send)(user_group, {
+                    group_send(user_group, {
                         'type': 'conversation_updated',
                         'conversation_id': str(conversation_id)
                     })
@@ -467,66 +468,16 @@ class WorkflowExecutionService:
                 'websocket_notification_sent': True
             }
             
-            # Try to send to external channels
+            # Queue for external channel delivery (rate-limited, retried by outbound worker)
             try:
-                source = getattr(customer, 'source', '')
-                if source == 'telegram':
-                    from message.services.telegram_service import TelegramService
-                    svc = TelegramService.get_service_for_conversation(conversation)
-                    if svc:
-                        send_res = svc.send_message_to_customer(customer, message_content)
-                        result['sent_to_channel'] = bool(send_res.get('success'))
-                        result['channel'] = 'telegram'
-                    else:
-                        logger.warning("Telegram service not available for this conversation")
-                elif source == 'instagram':
-                    from message.services.instagram_service import InstagramService
-                    svc = InstagramService.get_service_for_conversation(conversation)
-                    if svc:
-                        logger.info(f"📤 [Workflow] Sending Instagram message...")
-                        logger.info(f"   Conversation: {conversation.id}")
-                        logger.info(f"   Customer: {customer.id}")
-                        logger.info(f"   Content (first 80 chars): {message_content[:80]}...")
-                        logger.info(f"   Content length: {len(message_content)}")
-                        
-                        send_res = svc.send_message_to_customer(customer, message_content)
-                        result['sent_to_channel'] = bool(send_res.get('success'))
-                        result['channel'] = 'instagram'
-                        
-                        if send_res.get('success'):
-                            logger.info(f"✅ [Workflow] Instagram message sent successfully")
-                            logger.info(f"   Instagram message_id: {send_res.get('message_id')}")
-                        else:
-                            logger.warning(f"❌ [Workflow] Instagram message send failed: {send_res.get('error')}")
-                        
-                        # ✅ Mark message as sent to prevent webhook duplicate
-                        if send_res.get('success'):
-                            from django.core.cache import cache
-                            import hashlib
-                            
-                            message_hash = hashlib.md5(
-                                f"{conversation.id}:{message_content}".encode()
-                            ).hexdigest()
-                            cache_key = f"instagram_sent_msg_{message_hash}"
-                            cache.set(cache_key, True, timeout=60)
-                            logger.info(f"📝 [Workflow] Cached sent message to prevent webhook duplicate")
-                            logger.info(f"   Cache key: {cache_key}")
-                            logger.info(f"   Cache timeout: 60 seconds")
-                            
-                            # Also update message metadata if message_id is available
-                            if send_res.get('message_id') and message:
-                                message.metadata = message.metadata or {}
-                                message.metadata['external_message_id'] = str(send_res.get('message_id'))
-                                message.metadata['sent_from_app'] = True
-                                message.save(update_fields=['metadata'])
-                                logger.info(f"📝 [Workflow] Stored Instagram message_id in metadata")
-                                logger.info(f"   Message ID: {message.id}")
-                                logger.info(f"   External message_id: {send_res.get('message_id')}")
-                                logger.info(f"   Metadata: {message.metadata}")
-                    else:
-                        logger.warning("Instagram service not available for this conversation")
+                from message.services.outbound_queue import OutboundMessageQueue
+                if OutboundMessageQueue.enqueue(message):
+                    result['sent_to_channel'] = True
+                    result['delivery_status'] = message.delivery_status
+                    result['channel'] = conversation.source
+                    logger.info(f"📮 [Workflow] Message {message.id} queued for {conversation.source} delivery")
             except Exception as e:
-                logger.warning(f"Failed to send external channel message: {e}")
+                logger.warning(f"Failed to queue external channel message: {e}")
              
             return result
         
@@ -837,15 +788,12 @@ class WorkflowExecutionService:
             logger.info(f"Redirected conversation {conversation_id} to {destination}; status {old_status} -> {new_status}")
             # Broadcast update
             try:
-                from channels.layers import get_channel_layer
-                from asgiref.sync import async_to_sync
-                channel_layer = get_channel_layer()
-                if channel_layer:
-                    user_group = f"user_{conversation.user.id}_conversations"
-                    async_to_sync(channel_layer.group_send)(user_group, {
-                        'type': 'conversation_updated',
-                        'conversation_id': str(conversation_id)
-                    })
+                from message.services.notification_coalescer import group_send
+                user_group = f"user_{conversation.user.id}_conversations"
+                group_send(user_group, {
+                    'type': 'conversation_updated',
+                    'conversation_id': str(conversation_id)
+                })
             except Exception as be:
                 logger.warning(f"Failed to broadcast conversation redirect: {be}")
             return {
@@ -865,39 +813,15 @@ class WorkflowExecutionService:
             raise ValueError("Custom code is required")
         
         try:
-            # Create a restricted environment
-            safe_globals = {
-                '__builtins__': {
-                    'len': len,
-                    'str': str,
-                    'int': int,
-                    'float': float,
-                    'bool': bool,
-                    'list': list,
-                    'dict': dict,
-                    'tuple': tuple,
-                    'set': set,
-                    'abs': abs,
-                    'min': min,
-                    'max': max,
-                    'sum': sum,
-                    'round': round,
-                    'isinstance': isinstance,
-                    'type': type,
-                    'hasattr': hasattr,
-                    'getattr': getattr,
-                },
-                'context': context,
-                'config': config,
-            }
-            
-            # Create local namespace
-            safe_locals = {'result': {}}
-            
-            # Execute the code
-            exec(code, safe_globals, safe_locals)
-            
-            return safe_locals.get('result', {})
+            # Compiled once per source, run in the sandbox pool (time/memory limited)
+            from workflow.utils.code_sandbox import run_custom_code
+            return run_custom_code(
+                code,
+                context,
+                extra_globals={'config': config},
+                default={},
+                kind='action'
+            )
         
         except Exception as e:
             logger.error(f"Error executing custom code: {e}")
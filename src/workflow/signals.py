@@ -79,14 +79,16 @@ def handle_message_created(sender, instance, created, **kwargs):
         
         # Check if we have any WAITING executions
         from workflow.models import WorkflowExecution
+        from workflow.services.execution_state import ExecutionStateStore
         waiting_executions = WorkflowExecution.objects.filter(
             conversation=event_log.conversation_id,
             status='WAITING'
         )
         logger.info(f"🚀 [SIGNAL] Found {waiting_executions.count()} WAITING executions for conversation {event_log.conversation_id}")
         for exec in waiting_executions:
+            ExecutionStateStore.hydrate(exec)
             waiting_node_id = exec.context_data.get('waiting_node_id') if exec.context_data else None
-            logger.info(f"🚀 [SIGNAL]   - Execution {exec.id}: waiting_node_id={waiting_node_id}")
+            logger.info(f"🚀 [SIGNAL]   - Execution {exec.id}: status={exec.status}, waiting_node_id={waiting_node_id}")
         
         # Process waiting executions through Celery task (removed duplicate direct processing to prevent double messages)
         
@@ -221,6 +223,43 @@ def trigger_tag_removed_event(user_id: str, tag_name: str, removed_by: str = 'sy
         logger.error(f"Error triggering tag removed event: {e}")
 
 
+def trigger_tag_batch_event(owner_id: int, added: dict, removed: dict, changed_by: str = 'system'):
+    """
+    Trigger one TAG_BATCH event for a bulk tag change.
+    
+    The batch is expanded into per-customer TAG_ADDED / TAG_REMOVED events by
+    process_tag_batch_event, and only for tags the owner's workflows listen to.
+    
+    Args:
+        owner_id: ID of the user who owns the tagged customers
+        added: Tag name -> IDs of customers that received the tag
+        removed: Tag name -> IDs of customers that lost the tag
+        changed_by: Who changed the tags
+    """
+    try:
+        from workflow.tasks import process_tag_batch_event
+        
+        event_log = TriggerService.create_event_log(
+            event_type='TAG_BATCH',
+            event_data={
+                'owner_id': owner_id,
+                'added': added,
+                'removed': removed,
+                'changed_by': changed_by,
+                'timestamp': timezone.now().isoformat()
+            },
+            user_id=str(owner_id)
+        )
+        
+        process_tag_batch_event.delay(str(event_log.id))
+        
+        logger.info(f"Triggered TAG_BATCH event for owner {owner_id}: "
+                    f"{len(added)} tag(s) added, {len(removed)} tag(s) removed")
+    
+    except Exception as e:
+        logger.error(f"Error triggering tag batch event: {e}")
+
+
 def trigger_conversation_closed_event(conversation_id: str, user_id: str, closed_by: str = 'system'):
     """
     Manually trigger conversation closed event.
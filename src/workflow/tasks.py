@@ -63,6 +63,7 @@ def process_event(self, event_log_id: str):
             try:
                 from workflow.utils.condition_evaluator import build_context_from_event_log
                 from workflow.services.node_execution_service import NodeBasedWorkflowExecutionService
+                from workflow.services.execution_state import ExecutionStateStore
                 from django.core.cache import cache
                 
                 logger.info(f"🔍 [WaitingResume] Checking for WAITING executions in conversation {event_log.conversation_id}")
@@ -88,6 +89,9 @@ def process_event(self, event_log_id: str):
                     # Group by workflow to find duplicates
                     workflow_groups = {}
                     for exec in waiting_executions:
+                        # Skip executions already claimed by a worker (row not yet rewritten)
+                        if ExecutionStateStore.hydrate(exec).status != 'WAITING':
+                            continue
                         workflow_id = exec.workflow.id
                         if workflow_id not in workflow_groups:
                             workflow_groups[workflow_id] = []
@@ -111,6 +115,7 @@ def process_event(self, event_log_id: str):
                                 if duplicate.context_data and 'waiting_node_id' in duplicate.context_data:
                                     del duplicate.context_data['waiting_node_id']
                                 duplicate.save(update_fields=['status', 'error_message', 'completed_at', 'context_data'])
+                                ExecutionStateStore.discard(duplicate.id)
                                 logger.info(f"🔍 [WaitingResume] Cancelled duplicate execution {duplicate.id}")
                 
                 execution = WorkflowExecution.objects.filter(
@@ -119,6 +124,7 @@ def process_event(self, event_log_id: str):
                 ).order_by('-created_at').first()
                 
                 if execution:
+                    ExecutionStateStore.hydrate(execution)
                     logger.info(f"🔍 [WaitingResume] Found WAITING execution: {execution.id}")
                     waiting_node_id = (execution.context_data or {}).get('waiting_node_id')
                     if waiting_node_id:
@@ -451,7 +457,9 @@ def waiting_node_timeout(self, execution_id: int, waiting_node_id: str):
     if the execution is still WAITING on that node.
     """
     try:
-        execution = WorkflowExecution.objects.get(id=execution_id)
+        from workflow.services.execution_state import ExecutionStateStore
+
+        execution = ExecutionStateStore.hydrate(WorkflowExecution.objects.get(id=execution_id))
         if execution.status != 'WAITING':
             return {'success': True, 'skipped': 'not waiting'}
         current_waiting = (execution.context_data or {}).get('waiting_node_id')
@@ -475,14 +483,9 @@ def waiting_node_timeout(self, execution_id: int, waiting_node_id: str):
                 logger.info(f"[WaitingNode {waiting_node_id}] Timeout reached; AI re-enabled and waiting ended flagged for conversation {conv_id}")
         except Exception:
             pass
-        try:
-            execution.context_data = execution.context_data or {}
-            if 'waiting_node_id' in execution.context_data:
-                del execution.context_data['waiting_node_id']
-        except Exception:
-            pass
-        execution.status = 'RUNNING'
-        execution.save(update_fields=['status', 'context_data'])
+        if not ExecutionStateStore.transition(execution, 'RUNNING', remove_keys=('waiting_node_id',),
+                                              expected='WAITING'):
+            return {'success': True, 'skipped': 'resumed by another worker'}
 
         node_service = NodeBasedWorkflowExecutionService()
         context = execution.context_data or {}
@@ -661,40 +664,36 @@ def execute_scheduled_workflow(workflow_id: str, context_data: Optional[Dict[str
 
 
 @shared_task
-def cleanup_old_executions(days: int = 30):
+def cleanup_old_executions(days: Optional[int] = None):
     """
-    Cleanup old workflow executions and logs.
+    Apply the retention policy to workflow executions and trigger event logs.
+    
+    Days older than the retention window are rolled into daily summary tables
+    and then deleted in small batches (see core.retention).
     
     Args:
-        days: Number of days to keep (older records will be deleted)
+        days: Override settings.DATA_RETENTION_DAYS for both tables
     
     Returns:
         Dict with cleanup results
     """
     try:
-        cutoff_date = timezone.now() - timedelta(days=days)
-        
-        # Cleanup old executions
-        old_executions = WorkflowExecution.objects.filter(
-            created_at__lt=cutoff_date,
-            status__in=['COMPLETED', 'FAILED', 'TIMED_OUT']
-        )
-        
-        execution_count = old_executions.count()
-        old_executions.delete()
+        from core.retention import DataRetentionService
         
-        # Cleanup old event logs
-        old_event_logs = TriggerEventLog.objects.filter(created_at__lt=cutoff_date)
-        event_log_count = old_event_logs.count()
-        old_event_logs.delete()
+        executions = DataRetentionService.apply('workflow_execution', days=days)
+        event_logs = DataRetentionService.apply('trigger_event_log', days=days)
         
-        logger.info(f"Cleaned up {execution_count} old executions and {event_log_count} old event logs")
+        logger.info(
+            f"Cleaned up {executions['deleted_rows']} old executions and "
+            f"{event_logs['deleted_rows']} old event logs"
+        )
         
         return {
             'success': True,
-            'cutoff_date': cutoff_date.isoformat(),
-            'executions_deleted': execution_count,
-            'event_logs_deleted': event_log_count
+            'executions_archived_before': executions['archived_before'],
+            'event_logs_archived_before': event_logs['archived_before'],
+            'executions_deleted': executions['deleted_rows'],
+            'event_logs_deleted': event_logs['deleted_rows']
         }
     
     except Exception as e:
@@ -702,6 +701,28 @@ def cleanup_old_executions(days: int = 30):
         return {'success': False, 'error': str(e)}
 
 
+@shared_task
+def checkpoint_execution_state():
+    """
+    Write in-flight execution state held in Redis back to WorkflowExecution rows
+    (long waits and states dirty for longer than the checkpoint interval).
+    
+    Returns:
+        Dict with checkpoint results
+    """
+    try:
+        from workflow.services.execution_state import ExecutionStateStore
+        
+        results = ExecutionStateStore.checkpoint_due()
+        if results['checkpointed']:
+            logger.info(f"💾 Checkpointed {results['checkpointed']} workflow executions to the database")
+        return {'success': True, **results}
+    
+    except Exception as e:
+        logger.error(f"Error checkpointing workflow execution state: {e}")
+        return {'success': False, 'error': str(e)}
+
+
 @shared_task
 def retry_failed_actions():
     """
@@ -755,11 +776,15 @@ def resume_node_workflow_after_delay(self, execution_id: int, resume_from_node_i
     following the given action node.
     """
     try:
-        execution = WorkflowExecution.objects.select_related('workflow').get(id=execution_id)
-        workflow = execution.workflow
         from workflow.services.node_execution_service import NodeBasedWorkflowExecutionService, NodeExecutionResult
+        from workflow.services.execution_state import ExecutionStateStore
         from workflow.models import WorkflowNode
 
+        execution = ExecutionStateStore.hydrate(
+            WorkflowExecution.objects.select_related('workflow').get(id=execution_id)
+        )
+        workflow = execution.workflow
+
         node_service = NodeBasedWorkflowExecutionService()
         # Rebuild minimal context from stored execution context
         context = execution.context_data or {}
@@ -770,8 +795,7 @@ def resume_node_workflow_after_delay(self, execution_id: int, resume_from_node_i
         except WorkflowNode.DoesNotExist:
             return {'success': False, 'error': 'action node not found'}
 
-        execution.status = 'RUNNING'
-        execution.save(update_fields=['status'])
+        ExecutionStateStore.transition(execution, 'RUNNING')
 
         next_nodes = node_service._get_next_nodes(action_node, NodeExecutionResult(success=True, data={'delay_completed': True}), context)
         for next_node in next_nodes:
@@ -783,6 +807,89 @@ def resume_node_workflow_after_delay(self, execution_id: int, resume_from_node_i
         return {'success': False, 'error': str(e)}
 
 
+@shared_task(bind=True, max_retries=3)
+def process_tag_batch_event(self, event_log_id: str):
+    """
+    Expand a TAG_BATCH event (bulk customer tagging) into per-customer tag events.
+    
+    Only tags that an active workflow of the owner listens to are expanded;
+    a bulk change nobody listens to costs two EXISTS queries.
+    
+    Args:
+        event_log_id: ID of the TAG_BATCH TriggerEventLog
+    
+    Returns:
+        Dict with processing results
+    """
+    try:
+        try:
+            event_log = TriggerEventLog.objects.get(id=event_log_id)
+        except TriggerEventLog.DoesNotExist:
+            logger.error(f"🏷️ [TagBatch] Event log {event_log_id} not found")
+            return {'success': False, 'error': 'Event log not found'}
+        
+        data = event_log.event_data or {}
+        owner_id = data.get('owner_id')
+        batches = [
+            ('TAG_ADDED', 'added_by', data.get('added') or {}),
+            ('TAG_REMOVED', 'removed_by', data.get('removed') or {}),
+        ]
+        
+        # (event_type, actor_field, tag_name, customer_ids) for watched tags only
+        pending = []
+        for event_type, actor_field, changes in batches:
+            if not changes:
+                continue
+            listening, watched = TriggerService.get_tag_listeners(owner_id, event_type)
+            if not listening:
+                continue
+            for tag_name, customer_ids in changes.items():
+                if watched is None or str(tag_name).lower().strip() in watched:
+                    pending.append((event_type, actor_field, tag_name, customer_ids))
+        
+        if not pending:
+            logger.info(f"🏷️ [TagBatch] No workflow of owner {owner_id} listens to this tag change")
+            return {'success': True, 'events_created': 0}
+        
+        # Tag events are matched per conversation: use each customer's latest one with the owner
+        from message.models import Conversation
+        customer_ids = {cid for _, _, _, ids in pending for cid in ids}
+        latest_conversation = dict(
+            Conversation.objects.filter(user_id=owner_id, customer_id__in=customer_ids)
+            .order_by('customer_id', 'created_at')
+            .values_list('customer_id', 'id')
+        )
+        
+        event_logs = [
+            TriggerEventLog(
+                event_type=event_type,
+                event_data={
+                    'user_id': str(customer_id),
+                    'tag_name': tag_name,
+                    actor_field: data.get('changed_by', 'system'),
+                    'batch_event_id': str(event_log.id),
+                    'timestamp': data.get('timestamp') or timezone.now().isoformat()
+                },
+                user_id=str(customer_id),
+                conversation_id=str(latest_conversation[customer_id])
+            )
+            for event_type, actor_field, tag_name, ids in pending
+            for customer_id in ids
+            if customer_id in latest_conversation
+        ]
+        TriggerEventLog.objects.bulk_create(event_logs, batch_size=1000)
+        
+        for per_customer_log in event_logs:
+            process_event.delay(str(per_customer_log.id))
+        
+        logger.info(f"🏷️ [TagBatch] Expanded batch {event_log_id} into {len(event_logs)} tag events")
+        return {'success': True, 'events_created': len(event_logs)}
+    
+    except Exception as e:
+        logger.error(f"🏷️ [TagBatch] Error processing tag batch {event_log_id}: {e}")
+        raise self.retry(exc=e, countdown=60)
+
+
 @shared_task
 def process_scheduled_triggers():
     """
@@ -0,0 +1,92 @@
+"""
+Tests for the workflow custom code sandbox
+"""
+from django.test import SimpleTestCase, override_settings
+
+from workflow.utils import code_sandbox
+from workflow.utils.code_sandbox import SandboxError, SandboxTimeout, UnsafeCode, compile_code, run_custom_code
+from workflow.utils.condition_evaluator import execute_custom_code
+
+
+@override_settings(
+    WORKFLOW_CODE_SANDBOX_ENABLED=True,
+    WORKFLOW_CODE_SANDBOX_WORKERS=1,
+    WORKFLOW_CODE_TIMEOUT=1.0,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class CodeSandboxTestCase(SimpleTestCase):
+
+    def test_compiled_code_is_cached_by_source(self):
+        digest, code = compile_code("result = 1")
+        self.assertIs(compile_code("result = 1")[1], code)
+        self.assertNotEqual(compile_code("result = 2")[0], digest)
+
+    def test_unsafe_code_is_rejected(self):
+        for source in ("import os", "result = ().__class__", "result = __import__('os')"):
+            with self.assertRaises(UnsafeCode):
+                compile_code(source)
+        # Dynamic access is blocked inside the worker
+        with self.assertRaisesRegex(SandboxError, 'private attribute'):
+            run_custom_code("result = getattr(context, '__class__')", {})
+
+    def test_runs_in_sandbox_with_context(self):
+        context = {'event': {'data': {'content': 'hello world'}}}
+        result = run_custom_code("result['words'] = len(context['event']['data']['content'].split())",
+                                 context, default={}, kind='action')
+        self.assertEqual(result, {'words': 2})
+        self.assertTrue(execute_custom_code("result = get_nested_value(context, 'event.data.content') == 'hello world'",
+                                            context))
+
+    def test_runaway_code_is_killed(self):
+        with self.assertRaises(SandboxTimeout):
+            run_custom_code("while True:\n    pass", {}, node_id='node-1')
+        # The replaced worker keeps serving
+        self.assertEqual(run_custom_code("result = 1 + 1", {}), 2)
+        stats = code_sandbox.get_execution_stats(['node-1'])['node-1']
+        self.assertEqual(stats['timeouts'], 1)
+
+    def test_failing_condition_is_false(self):
+        self.assertFalse(execute_custom_code("result = 1 / 0", {}))
+
+    def test_builtins_do_not_reach_the_interpreter(self):
+        with self.assertRaisesRegex(SandboxError, "has no attribute 'enum'"):
+            run_custom_code("result = re.enum.sys.modules['os'].getpid()", {})
+        with self.assertRaisesRegex(SandboxError, "'type' is not defined"):
+            run_custom_code("result = type(context)", {})
+        with self.assertRaises(UnsafeCode):
+            compile_code("result = '{0.__globals__}'.format(get_nested_value)")
+        self.assertEqual(run_custom_code("result = re.sub(r'\\d', '#', re.search(r'id \\d+', 'id 42').group())", {}),
+                         'id ##')
+
+    def test_frames_are_not_reachable(self):
+        escape = (
+            "box = []\n"
+            "def f(b):\n"
+            "    yield b[0].gi_frame.f_back\n"
+            "g = f(box)\n"
+            "box.append(g)\n"
+            "for fr in g:\n"
+            "    break\n"
+            "while 'os' not in fr.f_globals:\n"
+            "    fr = fr.f_back\n"
+            "result = fr.f_globals['os'].popen('id').read()\n"
+        )
+        with self.assertRaises(UnsafeCode):
+            compile_code(escape)
+        for source in ("def f():\n    yield 1", "result = context.gi_frame", "result = context.f_back",
+                       "result = context.co_consts", "result = context.tb_frame"):
+            with self.assertRaises(UnsafeCode):
+                compile_code(source)
+        # Generator expressions stay usable, their frames do not
+        self.assertTrue(run_custom_code("result = any(x > 1 for x in [1, 2])", {}))
+        with self.assertRaisesRegex(SandboxError, 'private attribute'):
+            run_custom_code("g = (x for x in [1])\nresult = getattr(g, 'gi_frame')", {})
+
+    def test_fails_closed_without_sandbox(self):
+        with override_settings(WORKFLOW_CODE_SANDBOX_ENABLED=False):
+            with self.assertRaises(SandboxError):
+                run_custom_code("result = 1", {})
+            self.assertFalse(execute_custom_code("result = True", {}))
+        # Unpicklable contexts are refused, not run in-process
+        with self.assertRaisesRegex(SandboxError, 'cannot be sent'):
+            run_custom_code("result = 1", {'callback': lambda: None})
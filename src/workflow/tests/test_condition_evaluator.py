@@ -8,7 +8,8 @@ from workflow.utils.condition_evaluator import (
     evaluate_single_condition,
     evaluate_condition_group,
     evaluate_conditions,
-    substitute_template_placeholders
+    substitute_template_placeholders,
+    compile_template
 )
 
 
@@ -245,6 +246,24 @@ class TestConditionEvaluator(unittest.TestCase):
         result = substitute_template_placeholders(template, self.test_context)
         self.assertEqual(result, "User info: Premium customer from New York")
 
+    def test_compiled_template_matches_regex_rendering(self):
+        """Compiled templates render exactly like the regex implementation"""
+        from workflow.management.commands.benchmark_template_rendering import render_regex
+        context = dict(self.test_context, items=[{'name': 'A'}, None], count=0, flag=False)
+        templates = [
+            "plain text",
+            "",
+            "{{user.first_name}}",
+            "{{ user.first_name }} / {{user.missing}} / {{items.0.name}} / {{items.1.name}} / {{items.5}}",
+            "{{count}} {{flag}} {{user}}x{{}} {{user.first_name}}}} {{{user.email}}",
+        ]
+        for template in templates:
+            self.assertEqual(substitute_template_placeholders(template, context), render_regex(template, context))
+    
+    def test_templates_are_compiled_once(self):
+        """Same template text reuses the compiled form"""
+        self.assertIs(compile_template("Hi {{user.first_name}}"), compile_template("Hi {{user.first_name}}"))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for the Redis-backed workflow execution state store
+"""
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import MagicMock, patch
+
+from workflow.services.execution_state import ExecutionStateStore
+
+
+def _execution(status='RUNNING', context=None):
+    return SimpleNamespace(id=7, status=status, context_data=context or {'event': {'conversation_id': 'c1'}})
+
+
+@override_settings(WORKFLOW_STATE_TTL=60)
+class ExecutionStateStoreTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.transition_script = MagicMock()
+        patcher = patch.multiple(
+            ExecutionStateStore,
+            _client=MagicMock(),
+            _transition=self.transition_script,
+            _mark_clean=MagicMock(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.object(ExecutionStateStore, 'checkpoint')
+    def test_first_wait_is_written_through(self, checkpoint):
+        execution = _execution()
+        self.transition_script.return_value = [1, 3, 'RUNNING']
+
+        self.assertTrue(ExecutionStateStore.transition(execution, 'WAITING', {'waiting_node_id': 'n1'}))
+
+        self.assertEqual(execution.status, 'WAITING')
+        self.assertEqual(execution.context_data['waiting_node_id'], 'n1')
+        checkpoint.assert_called_once()
+        self.assertEqual(checkpoint.call_args.kwargs['state']['version'], 3)
+
+    @patch.object(ExecutionStateStore, 'checkpoint')
+    def test_claiming_a_waiting_execution_is_written_through(self, checkpoint):
+        execution = _execution('WAITING', {'waiting_node_id': 'n1'})
+        self.transition_script.return_value = [1, 4, 'WAITING']
+
+        self.assertTrue(ExecutionStateStore.transition(
+            execution, 'RUNNING', remove_keys=('waiting_node_id',), expected='WAITING'
+        ))
+
+        self.assertNotIn('waiting_node_id', execution.context_data)
+        checkpoint.assert_called_once()
+        self.assertEqual(checkpoint.call_args.kwargs['state']['status'], 'RUNNING')
+
+    @patch.object(ExecutionStateStore, 'checkpoint')
+    def test_context_changes_stay_in_redis(self, checkpoint):
+        execution = _execution('RUNNING', {'step': 1})
+        self.transition_script.return_value = [1, 5, 'RUNNING']
+
+        self.assertTrue(ExecutionStateStore.transition(execution, 'RUNNING', {'step': 2}))
+
+        checkpoint.assert_not_called()
+
+    def test_conflicting_resume_is_rejected(self):
+        execution = _execution('WAITING', {'waiting_node_id': 'n1'})
+        self.transition_script.return_value = [0, 'RUNNING']
+
+        self.assertFalse(ExecutionStateStore.transition(execution, 'RUNNING', expected='WAITING'))
+        self.assertEqual(execution.status, 'RUNNING')
+        self.assertEqual(execution.context_data, {'waiting_node_id': 'n1'})
+
+    @patch('workflow.models.WorkflowExecution.objects')
+    def test_falls_back_to_the_row_without_redis(self, objects):
+        execution = _execution('WAITING', {'waiting_node_id': 'n1'})
+        self.transition_script.side_effect = ConnectionError('redis down')
+        queryset = objects.filter.return_value
+        queryset.filter.return_value.update.return_value = 0
+
+        self.assertFalse(ExecutionStateStore.transition(execution, 'RUNNING', expected='WAITING'))
+        queryset.filter.assert_called_once_with(status='WAITING')
+        self.assertEqual(execution.status, 'WAITING')
+
+    @patch.object(ExecutionStateStore, 'discard')
+    @patch.object(ExecutionStateStore, 'get_state')
+    def test_hydrate_overlays_in_flight_state(self, get_state, discard):
+        get_state.return_value = {'status': 'RUNNING', 'context': {'step': 2}}
+        execution = ExecutionStateStore.hydrate(_execution('WAITING'))
+        self.assertEqual((execution.status, execution.context_data), ('RUNNING', {'step': 2}))
+
+        finished = ExecutionStateStore.hydrate(_execution('COMPLETED', {'done': True}))
+        self.assertEqual(finished.context_data, {'done': True})
+        discard.assert_called_once_with(7)
@@ -0,0 +1,56 @@
+"""
+Tests for workflow execution retention (only finished executions are archived)
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.retention import DataRetentionService
+from workflow.models import Workflow, WorkflowExecution, WorkflowExecutionDailySummary
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM, DATA_RETENTION_BATCH_PAUSE=0)
+class WorkflowExecutionRetentionTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.workflow = Workflow.objects.create(name='Retention')
+        self.old = timezone.now() - timedelta(days=10)
+
+    def _execution(self, status, completed_at=None):
+        execution = WorkflowExecution.objects.create(workflow=self.workflow, status=status, completed_at=completed_at)
+        WorkflowExecution.objects.filter(id=execution.id).update(created_at=self.old, started_at=self.old)
+        return execution
+
+    def _apply(self):
+        # The watermark is cached on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            DataRetentionService.archive('workflow_execution', days=2)
+        DataRetentionService.purge('workflow_execution')
+
+    def _counts(self):
+        summaries = dict(WorkflowExecutionDailySummary.objects.values_list('status', 'executions'))
+        raw = DataRetentionService.unarchived('workflow_execution', WorkflowExecution.objects.all())
+        return summaries, raw
+
+    def test_unfinished_executions_stay_raw_until_they_finish(self):
+        self._execution('COMPLETED', completed_at=self.old + timedelta(minutes=1))
+        waiting = self._execution('WAITING')
+
+        self._apply()
+
+        summaries, raw = self._counts()
+        self.assertEqual(summaries, {'COMPLETED': 1})
+        self.assertEqual(list(raw.values_list('id', flat=True)), [waiting.id])
+        self.assertEqual(list(WorkflowExecution.objects.values_list('id', flat=True)), [waiting.id])
+
+        WorkflowExecution.objects.filter(id=waiting.id).update(status='COMPLETED', completed_at=timezone.now())
+        self._apply()
+
+        summaries, raw = self._counts()
+        self.assertEqual(summaries, {'COMPLETED': 1})
+        self.assertEqual(raw.get().status, 'COMPLETED')
@@ -0,0 +1,443 @@
+"""
+Sandboxed execution of workflow custom code
+
+Custom-code conditions and actions used to `exec` the node's source text on
+every evaluation, inside the Celery worker, with no time or memory bound.
+
+✅ Compiled code objects are cached per process by SHA-256 of the source
+✅ Source is checked before compiling: no imports, no underscore attributes
+   (blocks the usual `().__class__.__subclasses__()` escapes), no frame, code
+   or traceback attributes (`gi_frame.f_back.f_globals` walks up to module
+   globals), no generator functions and no str.format / format_map (their
+   fields reach attributes without the check)
+✅ Code runs in a small pool of pre-forked sandbox processes with a wall-clock
+   timeout (the worker is killed and replaced) and an address-space limit
+✅ Only a restricted builtins set is available: no modules or classes that lead
+   back to the interpreter (`re` is a wrapper with match/search/findall/sub)
+✅ Every run is timed: Prometheus histogram by kind/outcome, plus per-node
+   timing stats in the cache that feed the workflow statistics endpoint
+
+Fails closed: custom code never runs in the worker process itself. When the
+sandbox is disabled, cannot fork, or the context cannot be pickled, the run
+raises SandboxError.
+
+Usage:
+    result = run_custom_code(code, context, default={}, node_id=node.id, kind='action')
+"""
+import ast
+import hashlib
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class UnsafeCode(ValueError):
+    pass
+
+
+class SandboxError(Exception):
+    pass
+
+
+class SandboxTimeout(SandboxError):
+    pass
+
+
+# str.format('{0.__class__}') resolves attributes itself; the rest lead from
+# generators, coroutines and tracebacks to frames and from there to the
+# globals of the worker's own modules
+BLOCKED_ATTRIBUTES = {
+    'format', 'format_map',
+    'gi_frame', 'gi_code', 'gi_yieldfrom',
+    'cr_frame', 'cr_code', 'cr_await', 'cr_origin',
+    'ag_frame', 'ag_code', 'ag_await',
+    'tb_frame', 'tb_next',
+    'f_back', 'f_globals', 'f_locals', 'f_builtins', 'f_code', 'f_trace',
+}
+BLOCKED_PREFIXES = ('_', 'co_')
+
+# Generator functions hand their own frame to the code that drives them
+BLOCKED_NODES = (ast.Yield, ast.YieldFrom, ast.Await, ast.AsyncFunctionDef, ast.AsyncFor, ast.AsyncWith)
+
+
+def _blocked(name) -> bool:
+    return isinstance(name, str) and (name.startswith(BLOCKED_PREFIXES) or name in BLOCKED_ATTRIBUTES)
+
+
+def _safe_getattr(obj, name, *default):
+    if _blocked(name):
+        raise UnsafeCode(f"Access to private attribute '{name}' is not allowed")
+    return getattr(obj, name, *default)
+
+
+def _safe_hasattr(obj, name):
+    if _blocked(name):
+        return False
+    return hasattr(obj, name)
+
+
+class _SafeRegex:
+    """The `re` functions custom code may call (the module itself reaches sys.modules)"""
+
+    __slots__ = ()
+
+    @staticmethod
+    def match(pattern, string, flags=0):
+        return re.match(pattern, string, flags)
+
+    @staticmethod
+    def search(pattern, string, flags=0):
+        return re.search(pattern, string, flags)
+
+    @staticmethod
+    def findall(pattern, string, flags=0):
+        return re.findall(pattern, string, flags)
+
+    @staticmethod
+    def sub(pattern, repl, string, count=0, flags=0):
+        return re.sub(pattern, repl, string, count=count, flags=flags)
+
+
+SAFE_BUILTINS = {
+    'len': len,
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': bool,
+    'list': list,
+    'dict': dict,
+    'tuple': tuple,
+    'set': set,
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'sum': sum,
+    'round': round,
+    'isinstance': isinstance,
+    'hasattr': _safe_hasattr,
+    'getattr': _safe_getattr,
+    're': _SafeRegex(),
+    'any': any,
+    'all': all,
+    'sorted': sorted,
+    'enumerate': enumerate,
+    'range': range,
+    'zip': zip,
+}
+
+
+# ==========================================
+#  Compilation (cached by source hash)
+# ==========================================
+
+_compiled: 'OrderedDict[str, Any]' = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def code_digest(source: str) -> str:
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def _check(tree: ast.AST):
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            raise UnsafeCode("Imports are not allowed in custom code")
+        if isinstance(node, BLOCKED_NODES):
+            raise UnsafeCode("Generators and coroutines are not allowed in custom code")
+        if isinstance(node, ast.Attribute) and _blocked(node.attr):
+            raise UnsafeCode(f"Access to private attribute '{node.attr}' is not allowed")
+        if isinstance(node, ast.Name) and node.id.startswith('__'):
+            raise UnsafeCode(f"Name '{node.id}' is not allowed")
+
+
+def compile_code(source: str):
+    """
+    Compile custom code once per source text
+
+    Returns:
+        (digest, code object)
+
+    Raises:
+        UnsafeCode / SyntaxError
+    """
+    digest = code_digest(source)
+    with _compiled_lock:
+        code = _compiled.get(digest)
+        if code is not None:
+            _compiled.move_to_end(digest)
+            return digest, code
+
+    tree = ast.parse(source, filename='<custom_code>', mode='exec')
+    _check(tree)
+    code = compile(tree, f'<custom_code:{digest[:12]}>', 'exec')
+
+    with _compiled_lock:
+        _compiled[digest] = code
+        while len(_compiled) > settings.WORKFLOW_CODE_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return digest, code
+
+
+def _execute(source: str, context: Dict[str, Any], extra_globals: Dict[str, Any], default: Any) -> Any:
+    """Run compiled code with restricted builtins; returns the `result` local"""
+    _, code = compile_code(source)
+    safe_globals = {'__builtins__': SAFE_BUILTINS, 'context': context, **extra_globals}
+    safe_locals = {'result': default}
+    exec(code, safe_globals, safe_locals)
+    return safe_locals.get('result', default)
+
+
+# ==========================================
+#  Pre-forked sandbox pool
+# ==========================================
+
+def _limit_memory(limit_mb: int):
+    """Cap the worker's address space at its size after fork + limit_mb"""
+    try:
+        import resource
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+        limit = current + limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except Exception:
+        pass
+
+
+def _worker_main(conn, memory_mb: int):
+    global _compiled_lock
+    # The lock may have been held by another thread at fork time
+    _compiled_lock = threading.Lock()
+    _limit_memory(memory_mb)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        source, context, extra_globals, default = task
+        try:
+            reply = ('ok', _execute(source, context, extra_globals, default))
+        except MemoryError:
+            reply = ('error', 'MemoryError: custom code exceeded its memory limit')
+        except Exception as e:
+            reply = ('error', f'{type(e).__name__}: {e}')
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send(('error', f'Result could not be returned: {e}'))
+
+
+class _SandboxWorker:
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, settings.WORKFLOW_CODE_MEMORY_MB),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def run(self, payload: bytes, timeout: float):
+        self.tasks += 1
+        self.conn.send_bytes(payload)
+        if not self.conn.poll(timeout):
+            self.kill()
+            raise SandboxTimeout(f"Custom code exceeded {timeout}s")
+        try:
+            return self.conn.recv()
+        except EOFError:
+            self.kill()
+            raise SandboxError("Sandbox worker died (memory limit?)")
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(1)
+        except Exception:
+            pass
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+            self.process.join(1)
+        except Exception:
+            pass
+        self.kill()
+
+
+class SandboxPool:
+    """Fixed-size pool of forked workers, created on first use in each process"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.pid = os.getpid()
+        self._ctx = multiprocessing.get_context('fork')
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(_SandboxWorker(self._ctx))
+
+    def run(self, source: str, context: Dict[str, Any], extra_globals: Dict[str, Any], default: Any,
+            timeout: float) -> Any:
+        # Pickling in the caller surfaces unpicklable contexts before a worker is used
+        payload = pickle.dumps((source, context, extra_globals, default))
+
+        worker = self._idle.get(timeout=timeout)
+        try:
+            status, value = worker.run(payload, timeout)
+        except SandboxError:
+            worker = _SandboxWorker(self._ctx)
+            raise
+        finally:
+            if not worker.is_alive() or worker.tasks >= settings.WORKFLOW_CODE_MAX_TASKS_PER_WORKER:
+                worker.stop()
+                worker = _SandboxWorker(self._ctx)
+            self._idle.put(worker)
+
+        if status != 'ok':
+            raise SandboxError(value)
+        return value
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+_pool_unavailable = False
+
+
+def get_pool() -> Optional[SandboxPool]:
+    """This process's sandbox pool (None if sandboxing is off or cannot fork)"""
+    global _pool, _pool_unavailable
+    if not settings.WORKFLOW_CODE_SANDBOX_ENABLED or _pool_unavailable:
+        return None
+    if _pool is not None and _pool.pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            try:
+                _pool = SandboxPool(settings.WORKFLOW_CODE_SANDBOX_WORKERS)
+                logger.info(f"🧪 Custom code sandbox started ({_pool.size} workers, pid {_pool.pid})")
+            except Exception as e:
+                _pool_unavailable = True
+                logger.error(f"❌ Custom code sandbox unavailable, custom code is disabled: {e}")
+                return None
+    return _pool
+
+
+# ==========================================
+#  Timing statistics
+# ==========================================
+
+STATS_KEY = 'workflow_custom_code_stats:{key}'
+STATS_TTL = 7 * 24 * 3600
+STATS_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0)
+
+
+def record_execution(key: str, kind: str, seconds: float, outcome: str):
+    """Feed the Prometheus histogram and the per-node stats (best effort)"""
+    try:
+        from monitoring.metrics import workflow_custom_code_duration_seconds
+        workflow_custom_code_duration_seconds.labels(kind=kind, outcome=outcome).observe(seconds)
+    except Exception:
+        pass
+
+    try:
+        cache_key = STATS_KEY.format(key=key)
+        stats = cache.get(cache_key) or {
+            'runs': 0, 'errors': 0, 'timeouts': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'buckets': {str(bound): 0 for bound in STATS_BUCKETS},
+        }
+        elapsed_ms = seconds * 1000
+        stats['runs'] += 1
+        stats['errors'] += outcome == 'error'
+        stats['timeouts'] += outcome == 'timeout'
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        for bound in STATS_BUCKETS:
+            if seconds <= bound:
+                stats['buckets'][str(bound)] += 1
+        stats['last_run_at'] = time.time()
+        cache.set(cache_key, stats, STATS_TTL)
+    except Exception:
+        pass
+
+
+def get_execution_stats(keys: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+    """Per-node timing stats: {key: {runs, errors, timeouts, avg_ms, max_ms, buckets}}"""
+    keys = [str(key) for key in keys]
+    cached = cache.get_many([STATS_KEY.format(key=key) for key in keys])
+    results = {}
+    for key in keys:
+        stats = cached.get(STATS_KEY.format(key=key))
+        if stats:
+            results[key] = dict(
+                stats,
+                avg_ms=round(stats['total_ms'] / stats['runs'], 2) if stats['runs'] else 0,
+                total_ms=round(stats['total_ms'], 2),
+                max_ms=round(stats['max_ms'], 2),
+            )
+    return results
+
+
+# ==========================================
+#  Entry point
+# ==========================================
+
+def run_custom_code(source: str, context: Dict[str, Any], extra_globals: Optional[Dict[str, Any]] = None,
+                    default: Any = None, node_id: Any = None, kind: str = 'condition') -> Any:
+    """
+    Execute custom code and return the value it assigns to `result`
+
+    Args:
+        source: Python source of the node
+        context: Exposed to the code as `context`
+        extra_globals: Further names exposed to the code (must be picklable)
+        default: Initial value of `result`
+        node_id: Key for per-node timing stats (defaults to the source hash)
+        kind: 'condition' or 'action' (metric label)
+
+    Raises:
+        UnsafeCode, SyntaxError, SandboxTimeout, SandboxError or the code's own exception
+    """
+    extra_globals = extra_globals or {}
+    stats_key = str(node_id) if node_id else f'code:{code_digest(source)[:16]}'
+    started = time.monotonic()
+    outcome = 'error'
+    try:
+        compile_code(source)  # reject unsafe code before it reaches a worker
+
+        pool = get_pool()
+        if pool is None:
+            raise SandboxError("Custom code sandbox is not available")
+        try:
+            result = pool.run(source, context, extra_globals, default, settings.WORKFLOW_CODE_TIMEOUT)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            raise SandboxError(f"Custom code context cannot be sent to the sandbox: {e}")
+        except queue.Empty:
+            raise SandboxTimeout("No sandbox worker became free in time")
+
+        outcome = 'success'
+        return result
+    except SandboxTimeout:
+        outcome = 'timeout'
+        raise
+    finally:
+        record_execution(stats_key, kind, time.monotonic() - started, outcome)
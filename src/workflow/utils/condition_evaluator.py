@@ -12,6 +12,7 @@ import operator
 from typing import Any, Dict, List, Union, Optional
 from datetime import datetime, date
 from decimal import Decimal
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -443,13 +444,17 @@ def evaluate_condition_group(conditions: List[Dict[str, Any]], operator: str, co
     return final
 
 
-def execute_custom_code(code: str, context: Dict[str, Any]) -> bool:
+def execute_custom_code(code: str, context: Dict[str, Any], node_id: Any = None) -> bool:
     """
     Execute custom Python code in a restricted environment.
     
+    The code is compiled once per source text and runs in the sandbox worker
+    pool with time and memory limits (see workflow.utils.code_sandbox).
+    
     Args:
         code: Python code to execute
         context: Context data available to the code
+        node_id: Optional node id for per-node timing statistics
     
     Returns:
         Boolean result of the code execution
@@ -458,41 +463,16 @@ def execute_custom_code(code: str, context: Dict[str, Any]) -> bool:
         return True
     
     try:
-        # Create a restricted environment
-        safe_globals = {
-            '__builtins__': {
-                'len': len,
-                'str': str,
-                'int': int,
-                'float': float,
-                'bool': bool,
-                'list': list,
-                'dict': dict,
-                'tuple': tuple,
-                'set': set,
-                'abs': abs,
-                'min': min,
-                'max': max,
-                'sum': sum,
-                'round': round,
-                'isinstance': isinstance,
-                'type': type,
-                'hasattr': hasattr,
-                'getattr': getattr,
-                're': re,
-            },
-            'context': context,
-            'get_nested_value': get_nested_value,
-        }
-        
-        # Create local namespace
-        safe_locals = {}
-        
-        # Execute the code
-        exec(code, safe_globals, safe_locals)
-        
-        # Return the result
-        result = safe_locals.get('result', True)
+        from workflow.utils.code_sandbox import run_custom_code
+        
+        result = run_custom_code(
+            code,
+            context,
+            extra_globals={'get_nested_value': get_nested_value},
+            default=True,
+            node_id=node_id,
+            kind='condition'
+        )
         return bool(result)
     
     except Exception as e:
@@ -551,10 +531,83 @@ def evaluate_conditions(condition_config: Dict[str, Any], context: Dict[str, Any
         return False
 
 
+PLACEHOLDER_PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+
+
+def _make_accessor(path: str):
+    """
+    Build a callable resolving a dot path against a context, rendered as text.
+    
+    Same lookup rules as get_nested_value (dict keys, numeric list indexes,
+    missing/None -> ''), with the path split once instead of on every render.
+    """
+    steps = []
+    for key in path.split('.'):
+        try:
+            index = int(key) if key.isdigit() else None
+        except ValueError:
+            index = -1  # digit-like but not an int: never a valid index
+        steps.append((key, index))
+    steps = tuple(steps)
+    
+    def resolve(context):
+        value = context
+        for key, index in steps:
+            if isinstance(value, dict):
+                value = value.get(key)
+            elif index is not None and isinstance(value, list):
+                value = value[index] if 0 <= index < len(value) else None
+            else:
+                value = None
+            if value is None:
+                return ''
+        return str(value)
+    
+    return resolve
+
+
+class CompiledTemplate:
+    """
+    A template string parsed once: literal segments and placeholder accessors.
+    
+    Rendering is a single join over the parts - no regex scan per render.
+    """
+    __slots__ = ('template', 'parts', 'placeholders')
+    
+    def __init__(self, template: str):
+        self.template = template
+        parts = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(template):
+            if match.start() > position:
+                parts.append(template[position:match.start()])
+            parts.append(_make_accessor(match.group(1)))
+            position = match.end()
+        if position < len(template):
+            parts.append(template[position:])
+        self.parts = tuple(parts)
+        self.placeholders = sum(1 for part in parts if callable(part))
+    
+    def render(self, context: Dict[str, Any]) -> str:
+        if not self.placeholders:
+            return self.template
+        return ''.join([part if part.__class__ is str else part(context) for part in self.parts])
+
+
+@lru_cache(maxsize=1024)
+def compile_template(template: str) -> CompiledTemplate:
+    """Parse a template string once per distinct text (process-wide LRU cache)"""
+    return CompiledTemplate(template)
+
+
 def substitute_template_placeholders(template: Union[str, Dict, List], context: Dict[str, Any]) -> Union[str, Dict, List]:
     """
     Recursively substitute {{path.to.value}} placeholders in templates.
     
+    String templates are compiled once and cached by text (compile_template),
+    so broadcasts rendering the same template for many conversations only pay
+    for the join.
+    
     Args:
         template: Template string, dict, or list with placeholders
         context: Context data for substitution
@@ -563,15 +616,7 @@ def substitute_template_placeholders(template: Union[str, Dict, List], context:
         Template with placeholders substituted
     """
     if isinstance(template, str):
-        # Replace placeholders in string
-        def replace_placeholder(match):
-            path = match.group(1)
-            value = get_nested_value(context, path, '')
-            return str(value) if value is not None else ''
-        
-        # Find all {{path.to.value}} patterns
-        pattern = r'\{\{([^}]+)\}\}'
-        return re.sub(pattern, replace_placeholder, template)
+        return compile_template(template).render(context)
     
     elif isinstance(template, dict):
         # Recursively process dictionary